@@ -0,0 +1,63 @@
+"""Add monthly revenue rollup for the sales report cache
+
+Revision ID: 20261017_0001
+Revises: 20260314_0001
+Create Date: 2026-10-17
+
+The rollup starts empty; the next cache sync per department rebuilds every
+month in its requested range that is missing from report_sales_cache_state.rollup_months.
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "20261017_0001"
+down_revision = "20260314_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "report_sales_cache_state",
+        sa.Column("rollup_months", sa.JSON(), nullable=False, server_default="{}"),
+    )
+    op.create_table(
+        "report_sales_monthly_rollup",
+        sa.Column("installation_id", sa.String(length=50), nullable=False),
+        sa.Column("department_id", sa.Integer(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.String(length=64), nullable=False),
+        sa.Column("account", sa.String(length=16), nullable=False),
+        sa.Column("data_source", sa.String(length=30), nullable=False),
+        sa.Column("amount_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("vat_amount_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("revenue_excl_vat", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("revenue_incl_vat", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("transaction_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.PrimaryKeyConstraint(
+            "installation_id",
+            "department_id",
+            "year",
+            "month",
+            "user_id",
+            "account",
+            "data_source",
+            name="pk_report_sales_monthly_rollup",
+        ),
+    )
+    op.create_index(
+        "idx_report_sales_rollup_dept_period",
+        "report_sales_monthly_rollup",
+        ["department_id", "year", "month"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_report_sales_rollup_dept_period", table_name="report_sales_monthly_rollup")
+    op.drop_table("report_sales_monthly_rollup")
+    op.drop_column("report_sales_cache_state", "rollup_months")
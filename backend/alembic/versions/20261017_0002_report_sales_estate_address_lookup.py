@@ -0,0 +1,35 @@
+"""Add address lookup markers to the sales report estate cache
+
+Revision ID: 20261017_0002
+Revises: 20261017_0001
+Create Date: 2026-10-17
+
+Records the outcome of estate detail lookups for missing addresses so report
+builds skip estates already checked (negative results expire after
+REPORTS_ESTATE_ADDRESS_LOOKUP_TTL_HOURS).
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "20261017_0002"
+down_revision = "20261017_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "report_sales_estate_cache",
+        sa.Column("address_lookup_status", sa.String(length=20), nullable=True),
+    )
+    op.add_column(
+        "report_sales_estate_cache",
+        sa.Column("address_lookup_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("report_sales_estate_cache", "address_lookup_at")
+    op.drop_column("report_sales_estate_cache", "address_lookup_status")
@@ -0,0 +1,28 @@
+"""Add precomputed attachment names to templates
+
+Revision ID: 20261017_0003
+Revises: 20261017_0002
+Create Date: 2026-10-17
+
+Template listings read attachment names from this column instead of loading
+the metadata JSON. Existing rows stay NULL and are filled in on first listing
+(or on their next write).
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "20261017_0003"
+down_revision = "20261017_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("templates", sa.Column("attachment_names", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("templates", "attachment_names")
@@ -0,0 +1,93 @@
+"""Add full-text search index over templates
+
+Revision ID: 20261017_0004
+Revises: 20261017_0003
+Create Date: 2026-10-17
+
+Adds ``templates.search_text`` (visible text of the HTML body, maintained by the
+application) and a generated Norwegian ``search_vector`` over title, description
+and search_text with a GIN index. pg_trgm indexes on title/description back the
+fuzzy fallback in TemplateSearchService.
+
+Existing rows are backfilled in batches with the same ``html_to_search_text``
+the application uses on save, so migrated and newly saved rows index the same text.
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.utils.template_search_text import html_to_search_text
+
+revision = "20261017_0004"
+down_revision = "20261017_0003"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    op.add_column("templates", sa.Column("search_text", sa.Text(), nullable=True))
+    _backfill_search_text(conn)
+
+    conn.execute(
+        sa.text(
+            """
+            ALTER TABLE templates ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('norwegian', coalesce(title, '')), 'A')
+                || setweight(to_tsvector('norwegian', coalesce(description, '')), 'B')
+                || setweight(to_tsvector('norwegian', coalesce(search_text, '')), 'C')
+            ) STORED
+            """
+        )
+    )
+    op.create_index("idx_templates_search_vector", "templates", ["search_vector"], postgresql_using="gin")
+
+    conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    op.create_index(
+        "idx_templates_title_trgm",
+        "templates",
+        ["title"],
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "idx_templates_description_trgm",
+        "templates",
+        ["description"],
+        postgresql_using="gin",
+        postgresql_ops={"description": "gin_trgm_ops"},
+    )
+
+
+def _backfill_search_text(conn) -> None:
+    """Set search_text for existing rows, keyset-paginated by id."""
+    templates = sa.table("templates", sa.column("id"), sa.column("content"), sa.column("search_text"))
+    update_row = (
+        templates.update()
+        .where(templates.c.id == sa.bindparam("row_id"))
+        .values(search_text=sa.bindparam("row_search_text"))
+    )
+    last_id = None
+    while True:
+        batch = sa.select(templates.c.id, templates.c.content).where(templates.c.content.is_not(None))
+        if last_id is not None:
+            batch = batch.where(templates.c.id > last_id)
+        rows = conn.execute(batch.order_by(templates.c.id).limit(BACKFILL_BATCH_SIZE)).all()
+        if not rows:
+            return
+        conn.execute(
+            update_row,
+            [{"row_id": row.id, "row_search_text": html_to_search_text(row.content)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index("idx_templates_description_trgm", table_name="templates")
+    op.drop_index("idx_templates_title_trgm", table_name="templates")
+    op.drop_index("idx_templates_search_vector", table_name="templates")
+    op.drop_column("templates", "search_vector")
+    op.drop_column("templates", "search_text")
@@ -0,0 +1,72 @@
+"""Add template_facets for indexed receiver/phase/assignment/department/property filters
+
+Revision ID: 20261017_0005
+Revises: 20261017_0004
+Create Date: 2026-10-17
+
+One row per (template, facet, value), derived from the template list columns
+on every write. Replaces JSON text matching in the template list filters.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "20261017_0005"
+down_revision = "20261017_0004"
+branch_labels = None
+depends_on = None
+
+# facet name -> JSONB list column on templates
+LIST_FACETS = {
+    "extra_receiver": "extra_receivers",
+    "phase": "phases",
+    "assignment_type": "assignment_types",
+    "department": "departments",
+    "property_type": "property_types",
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "template_facets",
+        sa.Column("template_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("facet", sa.String(length=30), nullable=False),
+        sa.Column("value", sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(["template_id"], ["templates.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("template_id", "facet", "value"),
+    )
+    op.create_index("idx_template_facets_facet_value", "template_facets", ["facet", "value"])
+
+    conn = op.get_bind()
+    conn.execute(
+        sa.text(
+            """
+            INSERT INTO template_facets (template_id, facet, value)
+            SELECT id, 'receiver', left(btrim(receiver), 255) FROM templates
+            WHERE receiver IS NOT NULL AND btrim(receiver) <> ''
+            ON CONFLICT DO NOTHING
+            """
+        )
+    )
+    for facet, column in LIST_FACETS.items():
+        conn.execute(
+            sa.text(
+                f"""
+                INSERT INTO template_facets (template_id, facet, value)
+                SELECT DISTINCT t.id, '{facet}', left(btrim(v.value), 255)
+                FROM templates t
+                CROSS JOIN LATERAL jsonb_array_elements_text(
+                    CASE WHEN jsonb_typeof(t.{column}) = 'array' THEN t.{column} ELSE '[]'::jsonb END
+                ) AS v(value)
+                WHERE btrim(v.value) <> ''
+                ON CONFLICT DO NOTHING
+                """
+            )
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_template_facets_facet_value", table_name="template_facets")
+    op.drop_table("template_facets")
@@ -0,0 +1,25 @@
+"""Add (sort column, id) indexes for keyset pagination of templates
+
+Revision ID: 20261017_0006
+Revises: 20261017_0005
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+
+revision = "20261017_0006"
+down_revision = "20261017_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_templates_updated_at_id", "templates", ["updated_at", "id"])
+    op.create_index("idx_templates_created_at_id", "templates", ["created_at", "id"])
+    op.create_index("idx_templates_title_id", "templates", ["title", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_templates_title_id", table_name="templates")
+    op.drop_index("idx_templates_created_at_id", table_name="templates")
+    op.drop_index("idx_templates_updated_at_id", table_name="templates")
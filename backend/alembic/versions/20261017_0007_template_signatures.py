@@ -0,0 +1,36 @@
+"""Add template_signatures (MinHash signatures for near-duplicate detection)
+
+Revision ID: 20261017_0007
+Revises: 20261017_0006
+Create Date: 2026-10-17
+
+Rows are written whenever template content changes. Templates without a row
+get one computed on the next dedup scan (TemplateDedupService.find_candidates).
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "20261017_0007"
+down_revision = "20261017_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "template_signatures",
+        sa.Column("template_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("shingle_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("minhash", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["template_id"], ["templates.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("template_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("template_signatures")
@@ -0,0 +1,41 @@
+"""Add template_fingerprints (parsed template structure keyed by content hash)
+
+Revision ID: 20261017_0008
+Revises: 20261017_0007
+Create Date: 2026-10-17
+
+Rows are computed lazily the first time an analyzer, merge field discovery,
+dedup analysis or comparison needs the structure of a given content hash.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "20261017_0008"
+down_revision = "20261017_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "template_fingerprints",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("fingerprint_version", sa.Integer(), nullable=False),
+        sa.Column("sections", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("merge_fields", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("merge_field_tokens", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("conditions", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("loops", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("foreach_expressions", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("tag_histogram", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("style_blocks", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.PrimaryKeyConstraint("content_hash"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("template_fingerprints")
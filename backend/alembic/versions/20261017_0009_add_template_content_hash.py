@@ -0,0 +1,30 @@
+"""Add templates.content_hash for incremental merge field scans
+
+Revision ID: 20261017_0009
+Revises: 20261017_0008
+Create Date: 2026-10-17
+
+SHA-256 hex of the content (the template_fingerprints key). Library scans join
+on it and only load content for templates without a current fingerprint.
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "20261017_0009"
+down_revision = "20261017_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("templates", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.execute(
+        "UPDATE templates SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex') "
+        "WHERE content IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("templates", "content_hash")
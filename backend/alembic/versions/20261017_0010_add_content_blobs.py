@@ -0,0 +1,119 @@
+"""Add content_blobs (content-addressed, zstd-delta version bodies)
+
+Revision ID: 20261017_0010
+Revises: 20261017_0009
+Create Date: 2026-10-17
+
+template_versions and layout_partial_versions reference their HTML by
+content_hash. Existing layout partial versions keep their full html_content
+copy (now nullable); new versions only store the hash.
+
+Downgrading writes the bodies of hash-only layout partial versions back into
+html_content (in batches) before the column becomes NOT NULL again.
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.services.content_blob_service import decode_blobs
+
+revision = "20261017_0010"
+down_revision = "20261017_0009"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 200
+
+
+def upgrade() -> None:
+    op.create_table(
+        "content_blobs",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("encoding", sa.String(length=10), nullable=False),
+        sa.Column("base_hash", sa.String(length=64), nullable=True),
+        sa.Column("chain_depth", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("raw_size", sa.Integer(), nullable=False),
+        sa.Column("stored_size", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["base_hash"], ["content_blobs.content_hash"]),
+        sa.PrimaryKeyConstraint("content_hash"),
+    )
+
+    op.add_column("template_versions", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_foreign_key(
+        "fk_template_versions_content_hash_content_blobs",
+        "template_versions",
+        "content_blobs",
+        ["content_hash"],
+        ["content_hash"],
+    )
+
+    op.add_column("layout_partial_versions", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_foreign_key(
+        "fk_layout_partial_versions_content_hash_content_blobs",
+        "layout_partial_versions",
+        "content_blobs",
+        ["content_hash"],
+        ["content_hash"],
+    )
+    op.alter_column("layout_partial_versions", "html_content", existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    _backfill_layout_partial_html(op.get_bind())
+    op.alter_column("layout_partial_versions", "html_content", existing_type=sa.Text(), nullable=False)
+    op.drop_constraint(
+        "fk_layout_partial_versions_content_hash_content_blobs", "layout_partial_versions", type_="foreignkey"
+    )
+    op.drop_column("layout_partial_versions", "content_hash")
+    op.drop_constraint("fk_template_versions_content_hash_content_blobs", "template_versions", type_="foreignkey")
+    op.drop_column("template_versions", "content_hash")
+    op.drop_table("content_blobs")
+
+
+def _backfill_layout_partial_html(conn) -> None:
+    """Restore html_content of versions that only reference a content blob, keyset-paginated by id."""
+    versions = sa.table(
+        "layout_partial_versions", sa.column("id"), sa.column("html_content"), sa.column("content_hash")
+    )
+    blobs_table = sa.table(
+        "content_blobs", sa.column("content_hash"), sa.column("base_hash"), sa.column("encoding"), sa.column("data")
+    )
+    update_row = (
+        versions.update()
+        .where(versions.c.id == sa.bindparam("row_id"))
+        .values(html_content=sa.bindparam("row_html"))
+    )
+    last_id = None
+    while True:
+        batch = sa.select(versions.c.id, versions.c.content_hash).where(
+            versions.c.html_content.is_(None), versions.c.content_hash.is_not(None)
+        )
+        if last_id is not None:
+            batch = batch.where(versions.c.id > last_id)
+        rows = conn.execute(batch.order_by(versions.c.id).limit(BACKFILL_BATCH_SIZE)).all()
+        if not rows:
+            return
+
+        # Fetch each delta chain one level at a time, as ContentBlobService.get_many does
+        blobs: dict[str, tuple[str | None, bytes]] = {}
+        requested: set[str] = set()
+        pending = {row.content_hash for row in rows}
+        while pending:
+            requested |= pending
+            for content_hash, base_hash, encoding, data in conn.execute(
+                sa.select(
+                    blobs_table.c.content_hash, blobs_table.c.base_hash, blobs_table.c.encoding, blobs_table.c.data
+                ).where(blobs_table.c.content_hash.in_(pending))
+            ):
+                blobs[content_hash] = (base_hash if encoding == "delta" else None, data)
+            pending = {base for base, _ in blobs.values() if base is not None and base not in requested}
+
+        contents = decode_blobs(blobs, [row.content_hash for row in rows])
+        restored = [
+            {"row_id": row.id, "row_html": contents[row.content_hash]} for row in rows if row.content_hash in contents
+        ]
+        if restored:
+            conn.execute(update_row, restored)
+        last_id = rows[-1].id
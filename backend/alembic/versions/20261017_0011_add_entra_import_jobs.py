@@ -0,0 +1,59 @@
+"""Add entra_import_jobs and entra_import_job_events
+
+Revision ID: 20261017_0011
+Revises: 20261017_0010
+Create Date: 2026-10-17
+
+Entra employee/office imports run as background jobs; their progress events
+are streamed to the UI over SSE.
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "20261017_0011"
+down_revision = "20261017_0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "entra_import_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("options", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("progress", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("result", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("cancel_requested", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_entra_import_jobs_status", "entra_import_jobs", ["status"])
+    op.create_index("idx_entra_import_jobs_created", "entra_import_jobs", ["created_at"])
+
+    op.create_table(
+        "entra_import_job_events",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("job_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("event_type", sa.String(length=40), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["entra_import_jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_entra_import_job_events_job", "entra_import_job_events", ["job_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_entra_import_job_events_job", table_name="entra_import_job_events")
+    op.drop_table("entra_import_job_events")
+    op.drop_index("idx_entra_import_jobs_created", table_name="entra_import_jobs")
+    op.drop_index("idx_entra_import_jobs_status", table_name="entra_import_jobs")
+    op.drop_table("entra_import_jobs")
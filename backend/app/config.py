@@ -78,6 +78,50 @@ class Settings(BaseSettings):
     VITEC_HUB_ACCESS_KEY: str = ""
     # Rate limit: max Vitec Hub requests per second (API limit ~600/sec; we stay well below)
     VITEC_RATE_LIMIT_REQUESTS_PER_SECOND: int = 50
+    # Max concurrent month fetches during a sales cache sync (also capped by the rate limit above)
+    VITEC_SALES_SYNC_MONTH_CONCURRENCY: int = 6
+    # Max department reports built concurrently for franchise/best-performer reports
+    # (each holds a DB connection during its cache sync; pool is 5 + 10 overflow)
+    REPORTS_FANOUT_CONCURRENCY: int = 4
+    # Hours before an estate Vitec had no address for (404 or address-less detail) is looked up again
+    REPORTS_ESTATE_ADDRESS_LOOKUP_TTL_HOURS: int = 168
+    # In-app report scheduler: warms every report department's sales cache and sends due
+    # report subscriptions. Loops sleep interval + random(0, jitter) seconds between runs.
+    REPORTS_SCHEDULER_ENABLED: bool = True
+    REPORTS_CACHE_WARM_INTERVAL_SECONDS: int = 900
+    REPORTS_SUBSCRIPTION_POLL_SECONDS: int = 300
+    REPORTS_SCHEDULER_JITTER_SECONDS: int = 30
+    # Token-bucket burst: requests allowed to start together before pacing kicks in
+    VITEC_RATE_LIMIT_BURST: int = 10
+    # Pooled HTTP client (shared keep-alive connections to Vitec Hub)
+    VITEC_HTTP_MAX_CONNECTIONS: int = 20
+    VITEC_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    VITEC_HTTP_TIMEOUT_SECONDS: float = 30.0
+    # Retries for 429 (honors Retry-After) and transient 5xx/network errors on GET
+    VITEC_MAX_RETRIES: int = 3
+
+    # Template library: total/facet counts are cached per filter set and cleared when this
+    # process commits a template write; the TTL bounds staleness from other replicas.
+    TEMPLATE_COUNT_CACHE_TTL_SECONDS: int = 60
+    TEMPLATE_COUNT_CACHE_MAX_ENTRIES: int = 256
+
+    # Worker processes for CPU-bound HTML work (sanitize, normalize, Word conversion, comparison,
+    # dedup similarity). 0 runs those jobs on a thread pool in the API process instead.
+    CPU_POOL_MAX_WORKERS: int = 2
+    # Jobs admitted at once (running + queued in the pool); further callers wait for a slot
+    CPU_POOL_MAX_PENDING: int = 16
+    # Deadline per job, including time spent waiting for a slot (sec)
+    CPU_POOL_JOB_TIMEOUT_SECONDS: float = 60.0
+    # Recycle a worker after this many jobs (bounds lxml/mammoth memory growth); 0 = never
+    CPU_POOL_MAX_TASKS_PER_CHILD: int = 200
+
+    # Sanitizer/normalizer endpoint results, keyed by (operation, sha256(html), options)
+    SANITIZER_CACHE_TTL_SECONDS: int = 600
+    SANITIZER_CACHE_MAX_ENTRIES: int = 512
+    # Upper bound for the serialized size of all cached results (bytes)
+    SANITIZER_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # Optional Redis URL to share results between replicas (needs the `redis` package); empty = per process
+    SANITIZER_CACHE_REDIS_URL: str = ""
 
     # WebDAV Network Storage
     WEBDAV_URL: str = ""
@@ -99,6 +143,12 @@ class Settings(BaseSettings):
     MICROSOFT_CLIENT_ID: str = "placeholder"  # App registration client ID
     MICROSOFT_CLIENT_SECRET: str = ""  # App registration secret
     MICROSOFT_SENDER_EMAIL: str = ""  # Email address for sending (must be authorized)
+    # One pooled HTTP client (shared keep-alive connections) for every Graph caller
+    GRAPH_HTTP_MAX_CONNECTIONS: int = 20
+    GRAPH_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    GRAPH_HTTP_TIMEOUT_SECONDS: float = 30.0
+    # Cached Graph access tokens are refreshed this long before they expire (sec)
+    GRAPH_TOKEN_REFRESH_MARGIN_SECONDS: int = 300
 
     # Firecrawl (web scraping / crawling)
     # Keep secrets out of code: set FIRECRAWL_API_KEY via env (.env locally, Railway variables in prod)
@@ -113,6 +163,15 @@ class Settings(BaseSettings):
     ENTRA_CLIENT_SECRET: str = ""  # Client secret (or use certificate)
     ENTRA_CERT_THUMBPRINT: str = ""  # Certificate thumbprint (alternative to secret)
     ENTRA_ORGANIZATION: str = ""  # Microsoft 365 domain (e.g., proaktiv.onmicrosoft.com)
+    # Writes to Entra ID / Exchange Online are forbidden unless this is true; pushes otherwise run as dry runs
+    ENTRA_ALLOW_WRITES: bool = False
+    # Push to Entra (profile/photo/signature): Graph $batch calls and per-user uploads in flight at once
+    ENTRA_SYNC_CONCURRENCY: int = 4
+    # Retries for Graph/Exchange 429 (honors Retry-After) and 503/504 responses
+    ENTRA_SYNC_MAX_RETRIES: int = 3
+    ENTRA_SYNC_TIMEOUT_SECONDS: float = 30.0
+    # Entra employee/office imports run as background jobs; a run is terminated after this long (sec)
+    ENTRA_IMPORT_TIMEOUT_SECONDS: float = 300.0
 
     @field_validator("SECRET_KEY", mode="before")
     @classmethod
@@ -5,6 +5,7 @@ Provides async SQLAlchemy engine and session factory for database operations.
 Supports both PostgreSQL (production) and SQLite (development/low-cost).
 """
 
+import hashlib
 import logging
 import os
 from collections.abc import AsyncGenerator
@@ -23,6 +24,11 @@ def is_sqlite(url: str) -> bool:
     return url.startswith("sqlite")
 
 
+def advisory_lock_key(name: str) -> int:
+    """Stable 31-bit key for PostgreSQL ``pg_advisory_*lock`` calls (``hash()`` differs per process)."""
+    return int.from_bytes(hashlib.sha1(name.encode("utf-8")).digest()[:4], "big") & 0x7FFFFFFF
+
+
 def get_async_database_url(url: str) -> str:
     """
     Convert database URL to async format.
@@ -187,6 +193,7 @@ async def init_db() -> None:
         checklist,
         code_pattern,
         company_asset,
+        content_blob,
         employee,
         external_listing,
         firecrawl_scrape,
@@ -203,6 +210,7 @@ async def init_db() -> None:
         sync_session,
         tag,
         template,
+        template_fingerprint,
         vitec_registry,
     )
 
@@ -220,12 +228,29 @@ async def init_db() -> None:
             async with async_engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
             logger.info("Database tables created/verified successfully")
+            await _backfill_sqlite_template_facets()
 
     except Exception as e:
         logger.error(f"Failed to connect to database: {e}")
         raise
 
 
+async def _backfill_sqlite_template_facets() -> None:
+    """Fill template_facets for SQLite databases created before the table existed (PostgreSQL uses a migration)."""
+    from sqlalchemy import func, select
+
+    from app.models.template import Template, template_facets
+    from app.services.template_service import TemplateService
+
+    async with async_session_factory() as session:
+        if await session.scalar(select(func.count()).select_from(template_facets)):
+            return
+        if not await session.scalar(select(func.count()).select_from(Template)):
+            return
+        await TemplateService.rebuild_facets(session)
+        await session.commit()
+
+
 async def close_db() -> None:
     """
     Close database connections.
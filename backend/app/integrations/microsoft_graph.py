@@ -2,9 +2,24 @@
 Microsoft Graph API Client
 
 Integration with Microsoft 365 for Teams and SharePoint operations.
+
+Every Graph caller in the process (``MicrosoftGraphClient`` and
+``GraphService``) shares one pooled ``httpx.AsyncClient`` (keep-alive
+connections) and one client-credentials token cache. Tokens are reused until
+shortly before ``expires_in`` runs out, and concurrent callers share a single
+refresh. The pooled client is closed from the FastAPI lifespan via
+``close_graph_http_client()``.
+
+Requests throttled with 429 (or failing with 503/504) are retried after
+Retry-After, and ``batch()`` sends sub-requests through Graph JSON batching,
+20 per call.
 """
 
+import asyncio
 import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
 from typing import Any
 
 import httpx
@@ -14,6 +29,217 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+GRAPH_SCOPE = "https://graph.microsoft.com/.default"
+LOGIN_URL = "https://login.microsoftonline.com"
+# Throttling/transient statuses retried for whole requests and for $batch sub-requests
+RETRYABLE_STATUS_CODES = {429, 503, 504}
+# Upper bound for a single Retry-After / backoff sleep (sec)
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+
+def _retry_delay(status_code: int, headers: dict[str, str] | httpx.Headers, attempt: int) -> float:
+    """Seconds to wait before retrying: the Retry-After header if present, else exponential backoff."""
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value:
+        try:
+            return min(MAX_RETRY_DELAY_SECONDS, max(0.0, float(value)))
+        except ValueError:
+            try:
+                return min(MAX_RETRY_DELAY_SECONDS, max(0.0, parsedate_to_datetime(value).timestamp() - time.time()))
+            except (TypeError, ValueError):
+                pass
+    base = 0.5 * (2**attempt)
+    return min(MAX_RETRY_DELAY_SECONDS, base + random.uniform(0, base / 2))
+
+
+# =============================================================================
+# Shared HTTP client and token cache
+# =============================================================================
+
+_graph_http_client: httpx.AsyncClient | None = None
+_graph_http_client_loop: asyncio.AbstractEventLoop | None = None
+# Closes of clients replaced after an event loop change, kept so they are not garbage collected mid-close
+_graph_client_closes: set[asyncio.Future] = set()
+
+
+def _log_failed_close(future: asyncio.Future) -> None:
+    _graph_client_closes.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        logger.debug("Closing a replaced Microsoft Graph HTTP client failed: %s", future.exception())
+
+
+def _close_replaced_client(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None) -> None:
+    """Close a client created on another event loop, on that loop while it is still running."""
+    if client.is_closed:
+        return
+    if loop is not None and loop.is_running():
+        future = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+    else:
+        future = asyncio.ensure_future(client.aclose())
+    _graph_client_closes.add(future)
+    future.add_done_callback(_log_failed_close)
+
+
+def get_graph_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled Graph client, creating it on first use (or after an event loop change)."""
+    global _graph_http_client, _graph_http_client_loop
+    loop = asyncio.get_running_loop()
+    if _graph_http_client is None or _graph_http_client.is_closed or _graph_http_client_loop is not loop:
+        if _graph_http_client is not None:
+            _close_replaced_client(_graph_http_client, _graph_http_client_loop)
+        _graph_http_client = httpx.AsyncClient(
+            timeout=settings.GRAPH_HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.GRAPH_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GRAPH_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=30.0,
+            ),
+        )
+        _graph_http_client_loop = loop
+    return _graph_http_client
+
+
+async def close_graph_http_client() -> None:
+    """Close the pooled Graph client. Called on application shutdown."""
+    global _graph_http_client, _graph_http_client_loop
+    client = _graph_http_client
+    _graph_http_client = None
+    _graph_http_client_loop = None
+    loop = asyncio.get_running_loop()
+    pending = [future for future in _graph_client_closes if future.get_loop() is loop]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("Microsoft Graph HTTP client closed")
+
+
+class GraphTokenCache:
+    """
+    Client-credentials access tokens shared by every Graph caller in the process.
+
+    Tokens are keyed by (login URL, tenant, client, scope) and refreshed once
+    they are within the refresh margin of ``expires_in``. One caller fetches a
+    new token while concurrent callers wait for it (or keep using the current
+    token if it has not expired yet).
+    """
+
+    def __init__(self, *, refresh_margin_seconds: float | None = None) -> None:
+        self._refresh_margin_seconds = refresh_margin_seconds
+        self._tokens: dict[
+            tuple[str, str, str, str], tuple[str, float, float]
+        ] = {}  # key -> (token, refresh_at, expires_at)
+        self._inflight: dict[tuple[str, str, str, str], asyncio.Future] = {}
+        self.hits = 0
+        self.fetches = 0
+        self.coalesced = 0
+
+    @property
+    def refresh_margin_seconds(self) -> float:
+        if self._refresh_margin_seconds is None:
+            return settings.GRAPH_TOKEN_REFRESH_MARGIN_SECONDS
+        return self._refresh_margin_seconds
+
+    async def get(
+        self,
+        *,
+        tenant_id: str,
+        client_id: str,
+        client_secret: str,
+        scope: str = GRAPH_SCOPE,
+        login_url: str = LOGIN_URL,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> str:
+        """Return a valid token for ``scope``, fetching one if needed (raises ``httpx.HTTPError``)."""
+        key = (login_url, tenant_id, client_id, scope)
+        now = time.monotonic()
+        cached = self._tokens.get(key)
+        if cached is not None and now < cached[1]:
+            self.hits += 1
+            return cached[0]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            if cached is not None and now < cached[2]:
+                # Early refresh already running; the current token is still valid
+                self.hits += 1
+                return cached[0]
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            token, expires_in = await self._fetch(
+                http_client or get_graph_http_client(), login_url, tenant_id, client_id, client_secret, scope
+            )
+            fetched_at = time.monotonic()
+            margin = min(self.refresh_margin_seconds, expires_in / 2)
+            self._tokens[key] = (token, fetched_at + expires_in - margin, fetched_at + expires_in)
+            future.set_result(token)
+            return token
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            if cached is not None and time.monotonic() < cached[2]:
+                # Early refresh failed; keep using the token until it actually expires
+                logger.warning(f"Graph token refresh failed, using current token: {exc}")
+                future.set_result(cached[0])
+                return cached[0]
+            future.set_exception(exc)
+            # Mark the exception retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _fetch(
+        self,
+        client: httpx.AsyncClient,
+        login_url: str,
+        tenant_id: str,
+        client_id: str,
+        client_secret: str,
+        scope: str,
+    ) -> tuple[str, float]:
+        self.fetches += 1
+        response = await client.post(
+            f"{login_url}/{tenant_id}/oauth2/v2.0/token",
+            data={
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "scope": scope,
+                "grant_type": "client_credentials",
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        if not data.get("access_token"):
+            raise ValueError("Graph token response missing access_token")
+        return data["access_token"], float(data.get("expires_in") or 3600)
+
+    def invalidate(
+        self, *, tenant_id: str, client_id: str, scope: str = GRAPH_SCOPE, login_url: str = LOGIN_URL
+    ) -> None:
+        """Drop a cached token (e.g. after Graph rejected it with 401)."""
+        self._tokens.pop((login_url, tenant_id, client_id, scope), None)
+
+    def clear(self) -> None:
+        self._tokens.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "tokens": len(self._tokens),
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "coalesced": self.coalesced,
+            "refresh_margin_seconds": self.refresh_margin_seconds,
+        }
+
+
+graph_token_cache = GraphTokenCache()
+
 
 # =============================================================================
 # Response Models
@@ -37,6 +263,27 @@ class TeamMember(BaseModel):
     email: str | None = None
 
 
+class GraphBatchResponse(BaseModel):
+    """One sub-response of a Graph ``$batch`` call."""
+
+    id: str
+    status: int
+    headers: dict[str, str] = {}
+    body: Any = None
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def error_message(self) -> str:
+        """Graph error message for a failed sub-request."""
+        error = self.body.get("error") if isinstance(self.body, dict) else None
+        if isinstance(error, dict) and error.get("message"):
+            return f"{error.get('code') or self.status}: {error['message']}"
+        return f"Graph returned {self.status}"
+
+
 # =============================================================================
 # Microsoft Graph Client
 # =============================================================================
@@ -51,62 +298,155 @@ class MicrosoftGraphClient:
     - Team membership queries
     - Email sending via Exchange
 
-    Uses client credentials flow (service account).
+    Uses client credentials flow (service account). Credentials default to the
+    ``MICROSOFT_*`` settings; ``base_url``/``login_url`` can point at a stub server.
     """
 
     BASE_URL = "https://graph.microsoft.com/v1.0"
+    LOGIN_URL = LOGIN_URL
+    # Graph JSON batching accepts at most 20 sub-requests per call
+    BATCH_SIZE = 20
 
-    def __init__(self):
-        self.tenant_id = settings.MICROSOFT_TENANT_ID
-        self.client_id = settings.MICROSOFT_CLIENT_ID
-        self.client_secret = settings.MICROSOFT_CLIENT_SECRET
-        self._access_token: str | None = None
+    def __init__(
+        self,
+        *,
+        tenant_id: str | None = None,
+        client_id: str | None = None,
+        client_secret: str | None = None,
+        base_url: str | None = None,
+        login_url: str | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        max_retries: int = 3,
+        timeout: float | None = None,
+    ):
+        self.tenant_id = tenant_id if tenant_id is not None else settings.MICROSOFT_TENANT_ID
+        self.client_id = client_id if client_id is not None else settings.MICROSOFT_CLIENT_ID
+        self.client_secret = client_secret if client_secret is not None else settings.MICROSOFT_CLIENT_SECRET
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.login_url = (login_url or self.LOGIN_URL).rstrip("/")
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._http = http_client
 
     @property
     def is_configured(self) -> bool:
         """Check if Microsoft Graph credentials are configured."""
         return bool(self.tenant_id and self.client_id and self.client_secret and self.tenant_id != "placeholder")
 
-    async def _get_access_token(self) -> str:
-        """Get access token using client credentials flow."""
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """The injected HTTP client, or the process-wide pooled one."""
+        return self._http or get_graph_http_client()
+
+    async def _get_access_token(self, scope: str = GRAPH_SCOPE) -> str:
+        """Get access token using client credentials flow (cached process-wide)."""
         if not self.is_configured:
             raise ValueError("Microsoft Graph credentials not configured")
 
-        token_url = f"https://login.microsoftonline.com/{self.tenant_id}/oauth2/v2.0/token"
+        return await graph_token_cache.get(
+            tenant_id=self.tenant_id,
+            client_id=self.client_id,
+            client_secret=self.client_secret,
+            scope=scope,
+            login_url=self.login_url,
+            http_client=self.http,
+        )
+
+    async def _http_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        return await self.http.request(method, url, **kwargs)
+
+    async def send(
+        self,
+        method: str,
+        url: str,
+        *,
+        scope: str | None = GRAPH_SCOPE,
+        headers: dict[str, str] | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send a request and return the response (status not checked).
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                token_url,
-                data={
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret,
-                    "scope": "https://graph.microsoft.com/.default",
-                    "grant_type": "client_credentials",
-                },
+        ``url`` is relative to ``base_url`` unless absolute. A bearer token for
+        ``scope`` is attached; ``scope=None`` sends the request unauthenticated
+        (e.g. downloading a public photo). 429/503/504 responses are retried;
+        a 401 drops the cached token and is retried once with a fresh one.
+        """
+        if not url.startswith(("http://", "https://")):
+            url = f"{self.base_url}{url}"
+        request_headers = dict(headers or {})
+        if scope is not None:
+            request_headers["Authorization"] = f"Bearer {await self._get_access_token(scope)}"
+
+        token_refreshed = False
+        for attempt in range(self.max_retries + 1):
+            response = await self._http_request(method, url, headers=request_headers, **kwargs)
+            if response.status_code == 401 and scope is not None and not token_refreshed:
+                token_refreshed = True
+                graph_token_cache.invalidate(
+                    tenant_id=self.tenant_id, client_id=self.client_id, scope=scope, login_url=self.login_url
+                )
+                request_headers["Authorization"] = f"Bearer {await self._get_access_token(scope)}"
+                response = await self._http_request(method, url, headers=request_headers, **kwargs)
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                return response
+            delay = _retry_delay(response.status_code, response.headers, attempt)
+            logger.warning(
+                "Graph returned %s for %s %s; retry %d/%d in %.1fs",
+                response.status_code,
+                method,
+                url,
+                attempt + 1,
+                self.max_retries,
+                delay,
             )
-            response.raise_for_status()
-            data = response.json()
-            return data["access_token"]
+            await asyncio.sleep(delay)
+        return response
 
     async def _request(self, method: str, endpoint: str, **kwargs) -> dict[str, Any]:
         """Make authenticated request to Graph API."""
-        if not self._access_token:
-            self._access_token = await self._get_access_token()
+        response = await self.send(method, endpoint, headers={"Content-Type": "application/json"}, **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else {}
 
-        headers = {
-            "Authorization": f"Bearer {self._access_token}",
-            "Content-Type": "application/json",
-        }
+    async def batch(self, requests: list[dict[str, Any]], *, concurrency: int = 1) -> dict[str, GraphBatchResponse]:
+        """
+        Send ``requests`` through Graph JSON batching (``POST /$batch``), ``BATCH_SIZE`` per call.
 
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method,
-                f"{self.BASE_URL}{endpoint}",
-                headers=headers,
-                **kwargs,
-            )
-            response.raise_for_status()
-            return response.json() if response.content else {}
+        Each request is ``{"id", "method", "url"[, "body", "headers"]}`` with ``url``
+        relative to the API version (e.g. ``/users/{id}``). Up to ``concurrency``
+        batch calls are in flight at once. Sub-requests answered with 429/503/504
+        are resent after their Retry-After. Returns the responses keyed by id.
+        """
+        responses: dict[str, GraphBatchResponse] = {}
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def send_chunk(chunk: list[dict[str, Any]]) -> None:
+            by_id = {request["id"]: request for request in chunk}
+            pending = chunk
+            async with semaphore:
+                for attempt in range(self.max_retries + 1):
+                    data = await self._request("POST", "/$batch", json={"requests": pending})
+                    retry: list[dict[str, Any]] = []
+                    delay = 0.0
+                    for item in data.get("responses", []):
+                        response = GraphBatchResponse(**item)
+                        if response.status in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                            retry.append(by_id[response.id])
+                            delay = max(delay, _retry_delay(response.status, response.headers, attempt))
+                        else:
+                            responses[response.id] = response
+                    if not retry:
+                        return
+                    logger.warning("Graph throttled %d batch sub-requests; retrying in %.1fs", len(retry), delay)
+                    await asyncio.sleep(delay)
+                    pending = retry
+
+        chunks = [requests[start : start + self.BATCH_SIZE] for start in range(0, len(requests), self.BATCH_SIZE)]
+        await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+        return responses
 
     # =========================================================================
     # Teams Operations
@@ -10,8 +10,9 @@ import os
 from contextlib import asynccontextmanager
 
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import settings
 
@@ -31,6 +32,7 @@ if os.environ.get("SENTRY_DSN"):
         profiles_sample_rate=0.05,
     )
 from app.database import close_db, init_db
+from app.integrations.microsoft_graph import close_graph_http_client
 from app.middleware.auth import AuthMiddleware
 
 # V3 Routers
@@ -63,6 +65,11 @@ from app.routers import (
     vitec,
     web_crawl,
 )
+from app.services.cpu_pool_service import CpuPoolTimeoutError, start_cpu_pool, stop_cpu_pool
+from app.services.entra_import_job_service import start_entra_import_jobs, stop_entra_import_jobs
+from app.services.report_scheduler_service import start_report_scheduler, stop_report_scheduler
+from app.services.sanitizer_result_cache import close_sanitizer_result_cache
+from app.services.vitec_hub_service import close_vitec_http_client
 
 # Configure logging
 logging.basicConfig(
@@ -79,7 +86,16 @@ async def lifespan(app: FastAPI):
         await init_db()
     except Exception as e:
         logger.warning(f"Database init check failed: {e}")
+    start_cpu_pool()
+    start_report_scheduler()
+    await start_entra_import_jobs()
     yield
+    await stop_report_scheduler()
+    await stop_entra_import_jobs()
+    await stop_cpu_pool()
+    await close_sanitizer_result_cache()
+    await close_vitec_http_client()
+    await close_graph_http_client()
     await close_db()
     logger.info("Shutting down application")
 
@@ -127,6 +143,14 @@ app.add_middleware(
 # Auth middleware (only active if APP_PASSWORD_HASH is set)
 app.add_middleware(AuthMiddleware)
 
+
+@app.exception_handler(CpuPoolTimeoutError)
+async def cpu_pool_timeout_handler(request: Request, exc: CpuPoolTimeoutError) -> JSONResponse:
+    """CPU-bound work (sanitize, conversion, comparison) that missed its deadline."""
+    logger.warning(f"{request.method} {request.url.path}: {exc}")
+    return JSONResponse(status_code=504, content={"detail": "Document processing timed out, please try again"})
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api", tags=["Auth"])
 app.include_router(health.router)
@@ -11,7 +11,9 @@ from app.models.category import Category
 from app.models.checklist import ChecklistInstance, ChecklistTemplate
 from app.models.code_pattern import CodePattern
 from app.models.company_asset import CompanyAsset
+from app.models.content_blob import ContentBlob
 from app.models.employee import Employee
+from app.models.entra_import_job import EntraImportJob, EntraImportJobEvent
 from app.models.external_listing import ExternalListing
 from app.models.firecrawl_scrape import FirecrawlScrape
 from app.models.layout_partial import LayoutPartial
@@ -28,6 +30,7 @@ from app.models.report_budget import ReportBudget
 from app.models.report_sales_cache import (
     ReportSalesCacheState,
     ReportSalesEstateCache,
+    ReportSalesMonthlyRollup,
     ReportSalesSyncEvent,
     ReportSalesTransactionCache,
 )
@@ -35,7 +38,15 @@ from app.models.report_subscription import ReportSubscription
 from app.models.signature_override import SignatureOverride
 from app.models.sync_session import SyncSession
 from app.models.tag import Tag
-from app.models.template import Template, TemplateVersion, template_categories, template_tags
+from app.models.template import (
+    Template,
+    TemplateSignature,
+    TemplateVersion,
+    template_categories,
+    template_facets,
+    template_tags,
+)
+from app.models.template_fingerprint import TemplateFingerprint
 from app.models.vitec_registry import VitecTemplateRegistry
 
 __all__ = [
@@ -44,8 +55,12 @@ __all__ = [
     # Templates
     "Template",
     "TemplateVersion",
+    "TemplateSignature",
+    "TemplateFingerprint",
+    "ContentBlob",
     "template_tags",
     "template_categories",
+    "template_facets",
     # Tags & Categories
     "Tag",
     "Category",
@@ -80,8 +95,12 @@ __all__ = [
     "ReportSalesEstateCache",
     "ReportSalesTransactionCache",
     "ReportSalesCacheState",
+    "ReportSalesMonthlyRollup",
     "ReportSalesSyncEvent",
     "ReportSubscription",
     # Sync review sessions
     "SyncSession",
+    # Entra import jobs
+    "EntraImportJob",
+    "EntraImportJobEvent",
 ]
@@ -0,0 +1,43 @@
+"""
+ContentBlob SQLAlchemy Model
+
+Content-addressed, zstd-compressed storage for version history bodies
+(template and layout partial versions).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+
+
+class ContentBlob(Base):
+    """
+    One distinct text body, keyed by the SHA-256 of its UTF-8 encoding.
+
+    ``encoding`` is ``full`` (a standalone zstd frame, a keyframe) or ``delta``
+    (a zstd frame compressed with the text of ``base_hash`` as raw-content
+    dictionary). ``chain_depth`` counts the deltas between this blob and its
+    keyframe, so reconstruction never decodes more than
+    ``ContentBlobService.KEYFRAME_INTERVAL`` frames.
+    """
+
+    __tablename__ = "content_blobs"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    encoding: Mapped[str] = mapped_column(String(10), nullable=False)  # 'full' | 'delta'
+    base_hash: Mapped[str | None] = mapped_column(String(64), ForeignKey("content_blobs.content_hash"), nullable=True)
+    chain_depth: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    # Sizes in bytes, for storage reporting
+    raw_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    stored_size: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<ContentBlob(content_hash={self.content_hash[:12]}, encoding='{self.encoding}', depth={self.chain_depth})>"
@@ -0,0 +1,78 @@
+"""
+Entra import job models.
+
+Background runs of ``scripts/import_entra_employees.py`` /
+``scripts/import_entra_offices.py`` started from the API, plus the progress
+events they emit (streamed to the UI over SSE).
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.models.base import GUID, Base, JSONType
+
+
+class EntraImportJob(Base):
+    """One Entra employee or office import run."""
+
+    __tablename__ = "entra_import_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        GUID,
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+    )
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)  # employees | offices
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default="queued",
+    )  # queued | running | succeeded | failed | cancelled
+    options: Mapped[dict[str, Any]] = mapped_column(JSONType, nullable=False, default=dict)
+    # Latest progress event payload reported by the import script
+    progress: Mapped[dict[str, Any] | None] = mapped_column(JSONType, nullable=True)
+    # JSON summary printed by the import script
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSONType, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_entra_import_jobs_status", "status"),
+        Index("idx_entra_import_jobs_created", "created_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<EntraImportJob(id={self.id}, kind='{self.kind}', status='{self.status}')>"
+
+
+class EntraImportJobEvent(Base):
+    """Progress/lifecycle event of an import job (polled by the SSE stream)."""
+
+    __tablename__ = "entra_import_job_events"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[uuid.UUID] = mapped_column(
+        GUID,
+        ForeignKey("entra_import_jobs.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    event_type: Mapped[str] = mapped_column(String(40), nullable=False)
+    payload_json: Mapped[dict[str, Any]] = mapped_column("payload", JSONType, nullable=False, default=dict)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("idx_entra_import_job_events_job", "job_id", "id"),)
@@ -23,7 +23,9 @@ class LayoutPartialVersion(Base):
     """
     LayoutPartialVersion model for tracking version history.
 
-    Each version stores the complete HTML content at that point in time.
+    Each version references its HTML content in the blob store by ``content_hash``
+    (see ContentBlobService). Versions written before the blob store keep a full
+    copy in ``html_content``; LayoutPartialVersionService resolves either form.
     """
 
     __tablename__ = "layout_partial_versions"
@@ -38,7 +40,10 @@ class LayoutPartialVersion(Base):
 
     # Version info
     version_number: Mapped[int] = mapped_column(Integer, nullable=False)
-    html_content: Mapped[str] = mapped_column(Text, nullable=False)
+    html_content: Mapped[str | None] = mapped_column(Text, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(
+        String(64), ForeignKey("content_blobs.content_hash"), nullable=True
+    )
     change_notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_by: Mapped[str] = mapped_column(String(255), nullable=False)
 
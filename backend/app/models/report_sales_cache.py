@@ -21,6 +21,9 @@ from app.models.base import Base, JSONType
 DATA_SOURCE_VITEC_NEXT = "vitec_next"
 DATA_SOURCE_LEGACY_IMPORT = "legacy_import"
 
+ADDRESS_LOOKUP_FOUND = "found"
+ADDRESS_LOOKUP_NOT_FOUND = "not_found"
+
 
 class ReportSalesEstateCache(Base):
     """Cached estate metadata used by reports."""
@@ -43,6 +46,9 @@ class ReportSalesEstateCache(Base):
     assignment_type: Mapped[str] = mapped_column(String(100), nullable=False, default="—")
     assignment_number: Mapped[str | None] = mapped_column(String(64), nullable=True)
     brokers_json: Mapped[list[dict]] = mapped_column("brokers", JSONType, nullable=False, default=list)
+    # Result of the last estate detail lookup for a missing address: "found" or "not_found".
+    address_lookup_status: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    address_lookup_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -106,6 +112,8 @@ class ReportSalesCacheState(Base):
     department_id: Mapped[int] = mapped_column(Integer, nullable=False)
     last_estates_sync_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     month_sync_json: Mapped[dict] = mapped_column("month_sync", JSONType, nullable=False, default=dict)
+    # Months ("YYYY-MM") whose rows in report_sales_monthly_rollup are current.
+    rollup_months_json: Mapped[dict] = mapped_column("rollup_months", JSONType, nullable=False, default=dict)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -118,6 +126,38 @@ class ReportSalesCacheState(Base):
     )
 
 
+class ReportSalesMonthlyRollup(Base):
+    """
+    Monthly revenue rollup of ``report_sales_transaction_cache``.
+
+    One row per department × month × broker × account × data source. Rebuilt by the
+    cache sync for the months it touched. ``revenue_*`` columns sum the absolute
+    value per transaction, matching how the reports count credits as revenue.
+    """
+
+    __tablename__ = "report_sales_monthly_rollup"
+
+    installation_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    department_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    account: Mapped[str] = mapped_column(String(16), primary_key=True)
+    data_source: Mapped[str] = mapped_column(String(30), primary_key=True)
+    amount_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    vat_amount_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    revenue_excl_vat: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    revenue_incl_vat: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    transaction_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (Index("idx_report_sales_rollup_dept_period", "department_id", "year", "month"),)
+
+
 class ReportSalesSyncEvent(Base):
     """Outbox-style sync events for realtime subscriptions."""
 
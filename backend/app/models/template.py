@@ -2,15 +2,34 @@
 Template and TemplateVersion SQLAlchemy Models
 """
 
+import hashlib
+import json
 import uuid
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, ForeignKey, Index, Integer, Numeric, String, Table, Text
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Table,
+    Text,
+    event,
+    inspect,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from app.models.base import GUID, Base, JSONType
+from app.utils.template_attachments import extract_attachment_names
+from app.utils.template_minhash import signature_record
+from app.utils.template_search_text import html_to_search_text
 
 # Junction table: Template <-> Tag (many-to-many)
 template_tags = Table(
@@ -28,6 +47,50 @@ template_categories = Table(
     Column("category_id", GUID, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True),
 )
 
+# Facet values denormalized from the Template list columns for indexed filtering
+# (one row per template/facet/value). Rewritten on every write, see _write_facets.
+template_facets = Table(
+    "template_facets",
+    Base.metadata,
+    Column("template_id", GUID, ForeignKey("templates.id", ondelete="CASCADE"), primary_key=True),
+    Column("facet", String(30), primary_key=True),
+    Column("value", String(255), primary_key=True),
+    Index("idx_template_facets_facet_value", "facet", "value"),
+)
+
+# Facet name -> Template attribute it is derived from.
+TEMPLATE_FACET_ATTRIBUTES = {
+    "receiver": "receiver",
+    "extra_receiver": "extra_receivers",
+    "phase": "phases",
+    "assignment_type": "assignment_types",
+    "department": "departments",
+    "property_type": "property_types",
+}
+
+
+def template_facet_values(raw) -> list[str]:
+    """Normalize a facet source value (scalar, list, or JSON-encoded list) to distinct non-empty strings."""
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        stripped = raw.strip()
+        if stripped.startswith("["):
+            try:
+                raw = json.loads(stripped)
+            except json.JSONDecodeError:
+                raw = [stripped]
+        else:
+            raw = [stripped]
+    if not isinstance(raw, list | tuple):
+        raw = [raw]
+    values: list[str] = []
+    for item in raw:
+        value = str(item).strip()[:255] if item is not None else ""
+        if value and value not in values:
+            values.append(value)
+    return values
+
 
 class Template(Base):
     """
@@ -61,10 +124,19 @@ class Template(Base):
 
     # HTML content storage (for HTML templates)
     content: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Visible text of `content` for the search index (see _sync_search_text and TemplateSearchService).
+    # On PostgreSQL the unmapped generated column `search_vector` is built from title, description and this.
+    search_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # SHA-256 of `content` (see _sync_content_hash); the key of the parsed TemplateFingerprint.
+    # NULL for rows written before the column existed until the next library scan fills it in.
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     # Array and JSON fields (using cross-database compatible types)
     vitec_merge_fields: Mapped[list[str] | None] = mapped_column(JSONType, nullable=True, default=list)
     metadata_json: Mapped[dict | None] = mapped_column("metadata", JSONType, nullable=True, default=dict)
+    # Derived from metadata_json on every write (see _sync_attachment_names) so listings never load metadata.
+    # NULL means "not computed yet" (rows written before the column existed).
+    attachment_names: Mapped[list[str] | None] = mapped_column(JSONType, nullable=True)
 
     # Vitec Metadata Fields (V2.7)
     channel: Mapped[str] = mapped_column(String(20), default="pdf_email")
@@ -135,12 +207,120 @@ class Template(Base):
         Index("idx_templates_created_at", "created_at"),
         Index("idx_templates_workflow_status", "workflow_status"),
         Index("idx_templates_origin", "origin"),
+        # Keyset pagination (TemplateService.get_list_keyset)
+        Index("idx_templates_updated_at_id", "updated_at", "id"),
+        Index("idx_templates_created_at_id", "created_at", "id"),
+        Index("idx_templates_title_id", "title", "id"),
     )
 
     def __repr__(self) -> str:
         return f"<Template(id={self.id}, title='{self.title}', status='{self.status}')>"
 
 
+@event.listens_for(Template, "before_insert")
+@event.listens_for(Template, "before_update")
+def _sync_attachment_names(mapper, connection, target: Template) -> None:
+    """Keep ``attachment_names`` in step with ``metadata_json`` (reassignments; in-place edits are not tracked)."""
+    state = inspect(target)
+    if "metadata_json" in state.unloaded:
+        return
+    stale = "attachment_names" not in state.unloaded and target.attachment_names is None
+    if state.pending or stale or state.attrs.metadata_json.history.has_changes():
+        target.attachment_names = extract_attachment_names(target.metadata_json)
+
+
+@event.listens_for(Template, "before_insert")
+@event.listens_for(Template, "before_update")
+def _sync_search_text(mapper, connection, target: Template) -> None:
+    """Keep ``search_text`` in step with ``content`` so the search index follows every content write."""
+    state = inspect(target)
+    if "content" in state.unloaded:
+        return
+    stale = "search_text" not in state.unloaded and target.search_text is None and bool(target.content)
+    if state.pending or stale or state.attrs.content.history.has_changes():
+        target.search_text = html_to_search_text(target.content)
+
+
+@event.listens_for(Template, "before_insert")
+@event.listens_for(Template, "before_update")
+def _sync_content_hash(mapper, connection, target: Template) -> None:
+    """Keep ``content_hash`` in step with ``content`` so scans can tell which templates changed."""
+    state = inspect(target)
+    if "content" in state.unloaded:
+        return
+    stale = "content_hash" not in state.unloaded and target.content_hash is None and target.content is not None
+    if state.pending or stale or state.attrs.content.history.has_changes():
+        target.content_hash = (
+            hashlib.sha256(target.content.encode()).hexdigest() if target.content is not None else None
+        )
+
+
+def _write_facets(connection, target: Template, facets) -> None:
+    table = template_facets
+    facets = list(facets)
+    if not facets:
+        return
+    connection.execute(table.delete().where(table.c.template_id == target.id, table.c.facet.in_(facets)))
+    rows = [
+        {"template_id": target.id, "facet": facet, "value": value}
+        for facet in facets
+        for value in template_facet_values(getattr(target, TEMPLATE_FACET_ATTRIBUTES[facet]))
+    ]
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+@event.listens_for(Template, "after_insert")
+def _insert_facets(mapper, connection, target: Template) -> None:
+    unloaded = inspect(target).unloaded
+    _write_facets(connection, target, (f for f, attr in TEMPLATE_FACET_ATTRIBUTES.items() if attr not in unloaded))
+
+
+@event.listens_for(Template, "after_update")
+def _update_facets(mapper, connection, target: Template) -> None:
+    """Rewrite the facets whose source column was reassigned (in-place list edits are not tracked)."""
+    attrs = inspect(target).attrs
+    changed = (f for f, attr in TEMPLATE_FACET_ATTRIBUTES.items() if getattr(attrs, attr).history.has_changes())
+    _write_facets(connection, target, changed)
+
+
+@event.listens_for(Template, "after_insert")
+@event.listens_for(Template, "after_update")
+def _sync_signature(mapper, connection, target: Template) -> None:
+    """Recompute the dedup MinHash signature when ``content`` is written."""
+    state = inspect(target)
+    if "content" in state.unloaded or not state.attrs.content.history.has_changes():
+        return
+    table = TemplateSignature.__table__
+    connection.execute(table.delete().where(table.c.template_id == target.id))
+    record = signature_record(target.content)
+    if record:
+        connection.execute(table.insert().values(template_id=target.id, **record))
+
+
+class TemplateSignature(Base):
+    """
+    MinHash signature of a template's HTML content for near-duplicate detection.
+
+    Written whenever the content changes (see _sync_signature); read by TemplateDedupService.
+    """
+
+    __tablename__ = "template_signatures"
+
+    template_id: Mapped[uuid.UUID] = mapped_column(
+        GUID, ForeignKey("templates.id", ondelete="CASCADE"), primary_key=True
+    )
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    shingle_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    minhash: Mapped[list[int]] = mapped_column(JSONType, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<TemplateSignature(template_id={self.template_id}, content_hash={self.content_hash[:12]})>"
+
+
 class TemplateVersion(Base):
     """
     Template version history.
@@ -165,6 +345,11 @@ class TemplateVersion(Base):
 
     # Optional fields
     change_notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # HTML content of this version in the blob store (see ContentBlobService); NULL for
+    # snapshots taken before content was versioned.
+    content_hash: Mapped[str | None] = mapped_column(
+        String(64), ForeignKey("content_blobs.content_hash"), nullable=True
+    )
 
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,47 @@
+"""
+TemplateFingerprint SQLAlchemy Model
+
+Structural facts derived from a template's HTML, stored once per content hash.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.models.base import Base, JSONType
+
+
+class TemplateFingerprint(Base):
+    """
+    Parsed structure of one HTML document, keyed by the SHA-256 of its content.
+
+    Templates, versions and identical copies with the same content share a row.
+    Rows are immutable; ``fingerprint_version`` lets a changed extractor
+    recompute old rows (see TemplateFingerprintService).
+    """
+
+    __tablename__ = "template_fingerprints"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    fingerprint_version: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Top-level sections: [{"tag", "path", "hash", "preview"}]
+    sections: Mapped[list[dict]] = mapped_column(JSONType, nullable=False, default=list)
+    # Merge field paths (sorted, without brackets) and the raw [[...]] tokens
+    merge_fields: Mapped[list[str]] = mapped_column(JSONType, nullable=False, default=list)
+    merge_field_tokens: Mapped[list[str]] = mapped_column(JSONType, nullable=False, default=list)
+    # vitec-if expressions (sorted, distinct)
+    conditions: Mapped[list[str]] = mapped_column(JSONType, nullable=False, default=list)
+    # vitec-foreach loops in document order: [{"variable", "collection"}], and the raw expressions
+    loops: Mapped[list[dict]] = mapped_column(JSONType, nullable=False, default=list)
+    foreach_expressions: Mapped[list[str]] = mapped_column(JSONType, nullable=False, default=list)
+    # Element count per tag name, and <style> block texts in order
+    tag_histogram: Mapped[dict[str, int]] = mapped_column(JSONType, nullable=False, default=dict)
+    style_blocks: Mapped[list[str]] = mapped_column(JSONType, nullable=False, default=list)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<TemplateFingerprint(content_hash={self.content_hash[:12]}, version={self.fingerprint_version})>"
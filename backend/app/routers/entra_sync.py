@@ -7,16 +7,23 @@ Provides endpoints for:
 - Sync single employee to Entra ID
 - Batch sync multiple employees
 - Check connection status
+- Import Entra users/groups as background jobs (progress over SSE, cancellation)
 """
 
+import asyncio
+import json
+import time
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.schemas.entra_sync import (
     EntraConnectionStatus,
+    EntraImportJobEventResponse,
+    EntraImportJobResponse,
     EntraImportRequest,
     EntraImportResult,
     EntraOfficeImportRequest,
@@ -29,6 +36,7 @@ from app.schemas.entra_sync import (
     RoamingSignaturesStatus,
     SignaturePreview,
 )
+from app.services.entra_import_job_service import TERMINAL_STATUSES, entra_import_jobs
 from app.services.entra_sync_service import EntraSyncService
 
 router = APIRouter(prefix="/entra-sync", tags=["Entra Sync"])
@@ -60,9 +68,10 @@ async def import_entra_employees(request: EntraImportRequest):
     """
     Import Entra ID users into the local database (read-only to Entra).
 
-    Writes only to local database; Entra is never modified.
+    Writes only to local database; Entra is never modified. Waits for the
+    import to finish; use ``POST /import-jobs/employees`` to follow progress instead.
     """
-    result = EntraSyncService.import_entra_employees(
+    result = await EntraSyncService.import_entra_employees(
         dry_run=request.dry_run,
         filter_email=request.filter_email,
     )
@@ -76,8 +85,9 @@ async def import_entra_offices(request: EntraOfficeImportRequest):
 
     Fetches M365 Groups from Microsoft Graph, matches them to local offices,
     and stores the Entra data in secondary columns. Vitec data is never modified.
+    Waits for the import to finish; use ``POST /import-jobs/offices`` to follow progress instead.
     """
-    result = EntraSyncService.import_entra_offices(
+    result = await EntraSyncService.import_entra_offices(
         dry_run=request.dry_run,
         filter_office_id=str(request.filter_office_id) if request.filter_office_id else None,
         fetch_details=request.fetch_details if hasattr(request, "fetch_details") else False,
@@ -85,6 +95,123 @@ async def import_entra_offices(request: EntraOfficeImportRequest):
     return result
 
 
+@router.post("/import-jobs/employees", response_model=EntraImportJobResponse, status_code=202)
+async def start_employee_import_job(request: EntraImportRequest):
+    """
+    Start importing Entra ID users into the local database in the background.
+
+    Returns the job right away (or the identical import already running).
+    Follow it with ``GET /import-jobs/{job_id}/events/stream``.
+    """
+    return await entra_import_jobs.start(
+        "employees",
+        {"dry_run": request.dry_run, "filter_email": request.filter_email},
+    )
+
+
+@router.post("/import-jobs/offices", response_model=EntraImportJobResponse, status_code=202)
+async def start_office_import_job(request: EntraOfficeImportRequest):
+    """
+    Start importing Entra ID M365 Groups into local office records in the background.
+
+    Returns the job right away (or the identical import already running).
+    """
+    return await entra_import_jobs.start(
+        "offices",
+        {
+            "dry_run": request.dry_run,
+            "filter_office_id": str(request.filter_office_id) if request.filter_office_id else None,
+            "fetch_details": request.fetch_details,
+        },
+    )
+
+
+@router.get("/import-jobs", response_model=list[EntraImportJobResponse])
+async def list_import_jobs(
+    kind: str | None = Query(None, pattern="^(employees|offices)$"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """List recent import jobs, newest first."""
+    return await entra_import_jobs.list_jobs(kind=kind, limit=limit)
+
+
+@router.get("/import-jobs/{job_id}", response_model=EntraImportJobResponse)
+async def get_import_job(job_id: UUID):
+    """Get an import job with its latest progress and result."""
+    job = await entra_import_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.post("/import-jobs/{job_id}/cancel", response_model=EntraImportJobResponse)
+async def cancel_import_job(job_id: UUID):
+    """
+    Cancel a queued or running import job.
+
+    The import script is terminated before it commits, so the database is left unchanged.
+    """
+    job = await entra_import_jobs.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.get("/import-jobs/{job_id}/events", response_model=list[EntraImportJobEventResponse])
+async def list_import_job_events(
+    job_id: UUID,
+    since_id: int | None = Query(None, ge=1),
+    limit: int = Query(200, ge=1, le=500),
+):
+    """List progress events of an import job."""
+    return await entra_import_jobs.list_events(job_id, since_id=since_id, limit=limit)
+
+
+@router.get("/import-jobs/{job_id}/events/stream")
+async def stream_import_job_events(
+    job_id: UUID,
+    since_id: int | None = Query(None, ge=1),
+    poll_interval_seconds: float = Query(1.0, ge=0.2, le=30.0),
+    max_seconds: int = Query(300, ge=0, le=900),
+):
+    """
+    Stream an import job's events as Server-Sent Events.
+
+    The stream ends after the job's final event (succeeded, failed or cancelled).
+    Reconnect with ``since_id`` set to the last received event id to resume.
+    """
+    if not await entra_import_jobs.get(job_id):
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    async def event_stream():
+        current_since = since_id
+        deadline = time.monotonic() + max_seconds
+        while True:
+            # Read the status before the events so the final event is never missed
+            job = await entra_import_jobs.get(job_id)
+            events = await entra_import_jobs.list_events(job_id, since_id=current_since, limit=200)
+            for event in events:
+                current_since = event.id
+                payload = EntraImportJobEventResponse.model_validate(event).model_dump(mode="json")
+                yield f"id: {event.id}\nevent: {event.event_type}\ndata: {json.dumps(payload)}\n\n"
+            if job is None or (job.status in TERMINAL_STATUSES and len(events) < 200):
+                return
+            if time.monotonic() >= deadline:
+                return
+            yield ": keepalive\n\n"
+            await asyncio.sleep(poll_interval_seconds)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @router.get("/preview/{employee_id}", response_model=EntraSyncPreview)
 async def get_sync_preview(
     employee_id: UUID,
@@ -11,6 +11,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
 from app.database import get_db
 from app.services.azure_storage_service import get_azure_storage_service
+from app.services.cpu_pool_service import cpu_pool
+from app.services.sanitizer_result_cache import sanitizer_result_cache
 from app.services.vitec_hub_service import VitecHubService
 
 router = APIRouter()
@@ -79,6 +81,18 @@ async def azure_storage_check():
     return {"timestamp": datetime.utcnow().isoformat(), **result}
 
 
+@router.get("/api/health/cpu-pool")
+async def cpu_pool_check():
+    """Worker pool for CPU-bound document processing: queue depth, job counts and timings."""
+    return {"timestamp": datetime.utcnow().isoformat(), **cpu_pool.stats()}
+
+
+@router.get("/api/health/sanitizer-cache")
+async def sanitizer_cache_check():
+    """Result cache of the /api/sanitize endpoints: hit ratio, size and shared-tier status."""
+    return {"timestamp": datetime.utcnow().isoformat(), **sanitizer_result_cache.stats()}
+
+
 @router.get("/api/health/ready")
 async def readiness_check():
     """Kubernetes readiness probe."""
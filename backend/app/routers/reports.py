@@ -31,6 +31,7 @@ from app.schemas.reports import (
 )
 from app.services.report_budget_service import ReportBudgetService
 from app.services.report_delivery_service import ReportDeliveryService
+from app.services.report_scheduler_service import get_report_scheduler
 from app.services.report_subscription_service import ReportSubscriptionService
 from app.services.sales_report_service import SalesReportService
 
@@ -45,6 +46,7 @@ _SAFE_PARAM_KEYS = frozenset(
         "from_date",
         "to_date",
         "include_vat",
+        "include_transactions",
         "department_ids",
         "top_n",
         "since_id",
@@ -114,6 +116,7 @@ async def get_sales_report_data(
     from_date: str | None = Query(None, description="Start date (YYYY-MM-DD)"),
     to_date: str | None = Query(None, description="End date (YYYY-MM-DD)"),
     include_vat: bool = Query(False, description="Include VAT in revenue sums"),
+    include_transactions: bool = Query(True, description="Include per-transaction detail for each property"),
 ):
     """
     Get sales report data as JSON for dashboard display.
@@ -127,6 +130,7 @@ async def get_sales_report_data(
             from_date=from_date,
             to_date=to_date,
             include_vat=include_vat,
+            include_transactions=include_transactions,
         )
         return data
     except ValueError as e:
@@ -162,7 +166,7 @@ async def get_sales_report(
     await _write_audit_log_safe(request, action="download")
     try:
         service = SalesReportService()
-        excel_bytes = await service.build_report(
+        chunks = await service.stream_report(
             department_id=department_id,
             year=year,
             from_date=from_date,
@@ -182,8 +186,8 @@ async def get_sales_report(
 
     y = year or datetime.now().year
     filename = f"formidlingsrapport_{department_id}_{y}.xlsx"
-    return Response(
-        content=excel_bytes,
+    return StreamingResponse(
+        chunks,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"',
@@ -251,7 +255,7 @@ async def download_best_performers(
 ) -> Response:
     await _write_audit_log_safe(request, action="download")
     service = SalesReportService()
-    excel = await service.build_best_performers_report(
+    chunks = await service.stream_best_performers_report(
         year=year,
         from_date=from_date,
         to_date=to_date,
@@ -259,8 +263,8 @@ async def download_best_performers(
         department_ids=department_ids,
         top_n=top_n,
     )
-    return Response(
-        content=excel,
+    return StreamingResponse(
+        chunks,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={
             "Content-Disposition": 'attachment; filename="best_performers.xlsx"',
@@ -436,26 +440,19 @@ async def test_send_subscription(
     return {"success": True}
 
 
+@router.get("/scheduler/status")
+async def get_scheduler_status() -> dict:
+    """In-app report scheduler state and run counters (cache warming + subscriptions)."""
+    return get_report_scheduler().status()
+
+
 @router.post("/subscriptions/run-due")
 async def run_due_subscriptions(
-    db: AsyncSession = Depends(get_db),
     x_scheduler_token: str | None = Header(None),
 ):
+    """Send due subscriptions now (same run lock as the in-app scheduler, so nothing is sent twice)."""
     expected = os.getenv("REPORTS_SCHEDULER_TOKEN", "")
     if expected and x_scheduler_token != expected:
         raise HTTPException(status_code=401, detail="Invalid scheduler token")
 
-    due = await ReportSubscriptionService.due_subscriptions(db)
-    delivery = ReportDeliveryService()
-    sent = 0
-    failed = 0
-    for item in due:
-        try:
-            ok = await delivery.send_subscription(item)
-            ReportSubscriptionService.mark_run(item, success=ok, error=None if ok else "send_failed")
-            sent += int(ok)
-            failed += int(not ok)
-        except Exception as exc:  # noqa: BLE001
-            ReportSubscriptionService.mark_run(item, success=False, error=str(exc)[:500])
-            failed += 1
-    return {"processed": len(due), "sent": sent, "failed": failed}
+    return await get_report_scheduler().run_due_subscriptions()
@@ -2,14 +2,17 @@
 Sanitizer Router - API endpoints for HTML sanitization.
 
 Provides endpoints for cleaning and validating HTML templates
-for Vitec Next compatibility.
+for Vitec Next compatibility. Results are cached per (operation, HTML hash,
+options) and marked with an ``X-Cache: HIT|MISS`` header.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel, Field
 
-from app.services.sanitizer_service import SanitizerService, get_sanitizer_service
-from app.services.vitec_normalizer_service import VitecNormalizerService
+from app.services.cpu_pool_service import CpuPoolTimeoutError, run_cpu_bound
+from app.services.sanitizer_result_cache import sanitizer_result_cache
+from app.services.sanitizer_service import sanitize_html, strip_styles_html, validate_html_structure
+from app.services.vitec_normalizer_service import normalize_html
 
 router = APIRouter(prefix="/api/sanitize", tags=["sanitizer"])
 
@@ -71,10 +74,22 @@ class StripStylesRequest(BaseModel):
 # ============================================================================
 
 
+async def _cached(response: Response, operation: str, html: str, job, *args, **options):
+    """
+    Run ``job(html, *args)`` on the CPU pool unless the result is cached.
+
+    Sets ``X-Cache: HIT|MISS``; ``options`` (the request options that change
+    the output) are part of the cache key.
+    """
+    result, hit = await sanitizer_result_cache.get_or_compute(
+        operation, html, lambda: run_cpu_bound(job, html, *args), **options
+    )
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return result
+
+
 @router.post("/preview", response_model=SanitizeResponse)
-async def sanitize_preview(
-    request: SanitizeRequest, service: SanitizerService = Depends(get_sanitizer_service)
-) -> SanitizeResponse:
+async def sanitize_preview(request: SanitizeRequest, response: Response) -> SanitizeResponse:
     """
     Sanitize HTML for preview purposes.
 
@@ -86,7 +101,6 @@ async def sanitize_preview(
 
     Args:
         request: The sanitization request containing raw HTML.
-        service: The injected SanitizerService instance.
 
     Returns:
         The sanitized HTML with metadata.
@@ -95,22 +109,25 @@ async def sanitize_preview(
         HTTPException: If sanitization fails.
     """
     try:
-        # Create a service with custom theme class if provided
-        if request.theme_class != "proaktiv-theme":
-            custom_service = SanitizerService(theme_class=request.theme_class)
-            sanitized = custom_service.sanitize(request.html, update_resource=request.update_resource)
-        else:
-            sanitized = service.sanitize(request.html, update_resource=request.update_resource)
-
+        sanitized = await _cached(
+            response,
+            "preview",
+            request.html,
+            sanitize_html,
+            request.theme_class,
+            request.update_resource,
+            theme_class=request.theme_class,
+            update_resource=request.update_resource,
+        )
         return SanitizeResponse(html=sanitized, original_length=len(request.html), sanitized_length=len(sanitized))
+    except CpuPoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to sanitize HTML: {str(e)}")
 
 
 @router.post("/validate", response_model=ValidateResponse)
-async def validate_template(
-    request: ValidateRequest, service: SanitizerService = Depends(get_sanitizer_service)
-) -> ValidateResponse:
+async def validate_template(request: ValidateRequest, response: Response) -> ValidateResponse:
     """
     Validate an HTML template for Vitec compatibility.
 
@@ -122,7 +139,6 @@ async def validate_template(
 
     Args:
         request: The validation request containing HTML to validate.
-        service: The injected SanitizerService instance.
 
     Returns:
         Validation results with detailed checks.
@@ -131,14 +147,16 @@ async def validate_template(
         HTTPException: If validation fails.
     """
     try:
-        result = service.validate_structure(request.html)
+        result = await _cached(response, "validate", request.html, validate_html_structure)
         return ValidateResponse(**result)
+    except CpuPoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to validate HTML: {str(e)}")
 
 
 @router.post("/normalize", response_model=NormalizeResponse)
-async def normalize_template(request: SanitizeRequest) -> NormalizeResponse:
+async def normalize_template(request: SanitizeRequest, response: Response) -> NormalizeResponse:
     """
     Normalize HTML template to Vitec structure and styling conventions.
 
@@ -146,17 +164,16 @@ async def normalize_template(request: SanitizeRequest) -> NormalizeResponse:
     functional CSS (tables, insert placeholders, checkbox/radio, etc.).
     """
     try:
-        normalizer = VitecNormalizerService()
-        normalized_html, report = normalizer.normalize(request.html)
+        normalized_html, report = await _cached(response, "normalize", request.html, normalize_html)
         return NormalizeResponse(html=normalized_html, report=report)
+    except CpuPoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to normalize HTML: {str(e)}")
 
 
 @router.post("/strip-styles", response_model=SanitizeResponse)
-async def strip_styles(
-    request: StripStylesRequest, service: SanitizerService = Depends(get_sanitizer_service)
-) -> SanitizeResponse:
+async def strip_styles(request: StripStylesRequest, response: Response) -> SanitizeResponse:
     """
     Strip only inline styles without other processing.
 
@@ -165,7 +182,6 @@ async def strip_styles(
 
     Args:
         request: The request containing HTML to process.
-        service: The injected SanitizerService instance.
 
     Returns:
         The HTML with inline styles removed.
@@ -174,7 +190,9 @@ async def strip_styles(
         HTTPException: If style stripping fails.
     """
     try:
-        result = service.strip_styles_only(request.html)
+        result = await _cached(response, "strip-styles", request.html, strip_styles_html)
         return SanitizeResponse(html=result, original_length=len(request.html), sanitized_length=len(result))
+    except CpuPoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to strip styles: {str(e)}")
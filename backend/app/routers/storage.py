@@ -16,7 +16,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import get_mock_user
 from app.database import get_db
 from app.services.audit_service import AuditService
-from app.services.sanitizer_service import get_sanitizer_service
+from app.services.cpu_pool_service import run_cpu_bound
+from app.services.sanitizer_service import sanitize_html
 from app.services.template_service import TemplateService
 from app.services.webdav_service import StorageItem, get_webdav_service
 
@@ -483,8 +484,7 @@ async def import_to_library(
                 html_content = content.decode("latin-1")
 
             if request.auto_sanitize:
-                sanitizer = get_sanitizer_service()
-                html_content = sanitizer.sanitize(html_content)
+                html_content = await run_cpu_bound(sanitize_html, html_content)
                 logger.info(f"Sanitized HTML content for import: {request.title}")
 
         # Create template record
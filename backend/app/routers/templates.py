@@ -7,7 +7,6 @@ Handles all template CRUD operations with database integration.
 import io
 import logging
 from datetime import UTC, datetime
-from typing import Any
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
@@ -16,6 +15,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_mock_user
 from app.database import get_db
+from app.schemas.template import (
+    TemplateCategoryRef,
+    TemplateCountsResponse,
+    TemplateListItem,
+    TemplateListResponse,
+    TemplatePagination,
+    TemplateSearchResponse,
+    TemplateTagRef,
+)
 from app.schemas.template_comparison import (
     AnalysisReport,
     CompareApplyRequest,
@@ -42,96 +50,27 @@ from app.schemas.template_workflow import WorkflowEvent, WorkflowStatusResponse,
 from app.schemas.word_conversion import ConversionResult
 from app.services.audit_service import AuditService
 from app.services.azure_storage_service import get_azure_storage_service
-from app.services.sanitizer_service import get_sanitizer_service
+from app.services.cpu_pool_service import run_cpu_bound
+from app.services.sanitizer_service import sanitize_html
 from app.services.template_analysis_ai_service import get_ai_analysis_service
 from app.services.template_analyzer_service import TemplateAnalyzerService
 from app.services.template_comparison_service import get_comparison_service
 from app.services.template_content_service import TemplateContentService
 from app.services.template_dedup_service import TemplateDedupService
+from app.services.template_fingerprint_service import TemplateFingerprintService
+from app.services.template_search_service import TemplateSearchService
 from app.services.template_service import TemplateService
 from app.services.template_settings_service import TemplateSettingsService
 from app.services.template_workflow_service import TemplateWorkflowService
 from app.services.thumbnail_service import ThumbnailService
 from app.services.word_conversion_service import get_word_conversion_service
+from app.utils.template_attachments import extract_attachment_names
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-def _normalize_attachment_name(value: Any) -> str | None:
-    if value is None:
-        return None
-    name = str(value).strip()
-    return name or None
-
-
-def _looks_like_attachment_key(key: str) -> bool:
-    lowered = key.lower()
-    return "attachment" in lowered or "vedlegg" in lowered
-
-
-def _extract_attachment_names_from_value(value: Any) -> list[str]:
-    names: list[str] = []
-    if value is None:
-        return names
-    if isinstance(value, list):
-        for entry in value:
-            names.extend(_extract_attachment_names_from_value(entry))
-        return names
-    if isinstance(value, dict):
-        for key in ("name", "fileName", "filename", "title", "documentName", "attachmentName", "templateName"):
-            if key in value:
-                name = _normalize_attachment_name(value.get(key))
-                if name:
-                    names.append(name)
-                    break
-        return names
-    name = _normalize_attachment_name(value)
-    if name:
-        names.append(name)
-    return names
-
-
-def _find_attachment_values(source: dict[str, Any], *, depth: int = 0, max_depth: int = 2) -> list[Any]:
-    if depth > max_depth:
-        return []
-    values: list[Any] = []
-    for key, value in source.items():
-        if _looks_like_attachment_key(key):
-            values.append(value)
-        if isinstance(value, dict):
-            values.extend(_find_attachment_values(value, depth=depth + 1, max_depth=max_depth))
-    return values
-
-
-def _extract_attachment_names(metadata_json: dict | None) -> list[str]:
-    if not isinstance(metadata_json, dict):
-        return []
-
-    # Prefer normalized attachments stored by importer
-    if isinstance(metadata_json.get("vitec_attachments"), list):
-        raw_entries = metadata_json.get("vitec_attachments", [])
-        names = _extract_attachment_names_from_value(raw_entries)
-        return sorted(set(names))
-
-    candidates: list[Any] = []
-    for key in ("attachments", "attachmentTemplates", "attachmentTemplateList"):
-        if isinstance(metadata_json.get(key), list):
-            candidates.append(metadata_json.get(key))
-
-    for source_key in ("vitec_details", "vitec_raw"):
-        source = metadata_json.get(source_key)
-        if isinstance(source, dict):
-            candidates.extend(_find_attachment_values(source))
-
-    names: list[str] = []
-    for candidate in candidates:
-        names.extend(_extract_attachment_names_from_value(candidate))
-
-    return sorted(set(names))
-
-
 # Pydantic schemas for request bodies
 class TemplateUpdateRequest(BaseModel):
     """Request body for updating a template."""
@@ -147,19 +86,17 @@ def get_current_user():
     return get_mock_user()
 
 
-@router.get("")
-async def list_templates(
-    db: AsyncSession = Depends(get_db),
+def template_list_filters(
     status: str | None = Query(None, description="Filter by status"),
-    search: str | None = Query(None, description="Search in title/description"),
+    search: str | None = Query(None, description="Full-text search in title, description and content"),
     category_id: str | None = Query(None, description="Filter by category UUID"),
     receiver: str | None = Query(None, description="Filter by receiver (primary or extra)"),
-    page: int = Query(1, ge=1),
-    per_page: int = Query(20, ge=1, le=100),
-    sort_by: str = Query("updated_at"),
-    sort_order: str = Query("desc"),
-):
-    """List all templates with filtering and pagination."""
+    phase: str | None = Query(None, description="Filter by phase"),
+    assignment_type: str | None = Query(None, description="Filter by assignment type"),
+    department: str | None = Query(None, description="Filter by department"),
+    property_type: str | None = Query(None, description="Filter by property type"),
+) -> dict:
+    """Filter query parameters shared by the listing and count endpoints."""
     # Validate category_id is a valid UUID if provided
     validated_category_id: UUID | None = None
     if category_id:
@@ -169,49 +106,96 @@ async def list_templates(
             raise HTTPException(
                 status_code=400, detail=f"Invalid category_id format: '{category_id}' is not a valid UUID"
             )
+    return {
+        "status": status,
+        "search": search,
+        "category_id": validated_category_id,
+        "receiver": receiver,
+        "phase": phase,
+        "assignment_type": assignment_type,
+        "department": department,
+        "property_type": property_type,
+    }
 
-    templates, total = await TemplateService.get_list(
-        db,
-        status=status,
-        search=search,
-        category_id=validated_category_id,
-        receiver=receiver,
-        page=page,
-        per_page=per_page,
-        sort_by=sort_by,
-        sort_order=sort_order,
-    )
 
-    return {
-        "templates": [
-            {
-                "id": str(t.id),
-                "title": t.title,
-                "description": t.description,
-                "file_name": t.file_name,
-                "file_type": t.file_type,
-                "file_size_bytes": t.file_size_bytes,
-                "status": t.status,
-                "version": t.version,
-                "preview_url": t.preview_url,
-                "created_at": t.created_at.isoformat() if t.created_at else None,
-                "updated_at": t.updated_at.isoformat() if t.updated_at else None,
-                "tags": [{"id": str(tag.id), "name": tag.name, "color": tag.color} for tag in t.tags],
-                "categories": [{"id": str(cat.id), "name": cat.name, "icon": cat.icon} for cat in t.categories],
-                "attachments": _extract_attachment_names(t.metadata_json),
-                "workflow_status": getattr(t, "workflow_status", t.status),
-                "is_archived_legacy": getattr(t, "is_archived_legacy", False),
-                "origin": getattr(t, "origin", None),
-            }
+@router.get("", response_model=TemplateListResponse)
+async def list_templates(
+    db: AsyncSession = Depends(get_db),
+    filters: dict = Depends(template_list_filters),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(
+        None, description="Keyset pagination: empty for the first page, then pagination.next_cursor (ignores page)"
+    ),
+    sort_by: str = Query("updated_at"),
+    sort_order: str = Query("desc"),
+):
+    """List all templates with filtering and pagination (page/per_page, or cursor for infinite scroll)."""
+    next_cursor = None
+    if cursor is not None:
+        try:
+            templates, next_cursor = await TemplateService.get_list_keyset(
+                db, cursor=cursor or None, per_page=per_page, sort_by=sort_by, sort_order=sort_order, **filters
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        total = (await TemplateService.get_counts(db, **filters))["total"]
+    else:
+        templates, total = await TemplateService.get_list(
+            db, page=page, per_page=per_page, sort_by=sort_by, sort_order=sort_order, **filters
+        )
+
+    return TemplateListResponse(
+        templates=[
+            TemplateListItem(
+                id=str(t.id),
+                title=t.title,
+                description=t.description,
+                file_name=t.file_name,
+                file_type=t.file_type,
+                file_size_bytes=t.file_size_bytes,
+                status=t.status,
+                version=t.version,
+                preview_url=t.preview_url,
+                created_at=t.created_at.isoformat() if t.created_at else None,
+                updated_at=t.updated_at.isoformat() if t.updated_at else None,
+                tags=[TemplateTagRef(id=str(tag.id), name=tag.name, color=tag.color) for tag in t.tags],
+                categories=[TemplateCategoryRef(id=str(cat.id), name=cat.name, icon=cat.icon) for cat in t.categories],
+                attachments=t.attachment_names or [],
+                workflow_status=t.workflow_status,
+                is_archived_legacy=bool(t.is_archived_legacy),
+                origin=t.origin,
+            )
             for t in templates
         ],
-        "pagination": {
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "total_pages": (total + per_page - 1) // per_page if total > 0 else 0,
-        },
-    }
+        pagination=TemplatePagination(
+            total=total,
+            page=None if cursor is not None else page,
+            per_page=per_page,
+            total_pages=(total + per_page - 1) // per_page if total > 0 else 0,
+            next_cursor=next_cursor,
+        ),
+    )
+
+
+@router.get("/counts", response_model=TemplateCountsResponse)
+async def template_counts(
+    db: AsyncSession = Depends(get_db),
+    filters: dict = Depends(template_list_filters),
+):
+    """Total and per-status/per-category counts for the current filters (cached, cleared on template writes)."""
+    return await TemplateService.get_counts(db, **filters)
+
+
+@router.get("/search", response_model=TemplateSearchResponse)
+async def search_templates(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    status: str | None = Query(None, description="Filter by status"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """Ranked full-text search over title, description and content, with highlighted snippets."""
+    return await TemplateSearchService.search(db, q, status=status, limit=limit)
 
 
 # ---------------------------------------------------------------------------
@@ -290,7 +274,7 @@ async def get_template(template_id: UUID, db: AsyncSession = Depends(get_db)):
         "vitec_merge_fields": template.vitec_merge_fields or [],
         "tags": [{"id": str(tag.id), "name": tag.name, "color": tag.color} for tag in template.tags],
         "categories": [{"id": str(cat.id), "name": cat.name, "icon": cat.icon} for cat in template.categories],
-        "attachments": _extract_attachment_names(template.metadata_json),
+        "attachments": extract_attachment_names(template.metadata_json),
         "workflow_status": getattr(template, "workflow_status", template.status),
         "is_archived_legacy": getattr(template, "is_archived_legacy", False),
         "origin": getattr(template, "origin", None),
@@ -339,8 +323,7 @@ async def create_template(
 
         # Sanitize HTML if requested
         if auto_sanitize:
-            sanitizer = get_sanitizer_service()
-            html_content = sanitizer.sanitize(html_content)
+            html_content = await run_cpu_bound(sanitize_html, html_content)
             logger.info(f"Sanitized HTML content for template: {title}")
 
     # Upload to Azure Blob Storage
@@ -636,6 +619,52 @@ async def save_template_content(
     return TemplateContentResponse(**result)
 
 
+@router.get("/{template_id}/versions/{version_number}/content")
+async def get_template_version_content(template_id: UUID, version_number: int, db: AsyncSession = Depends(get_db)):
+    """
+    Get the HTML content of a template version snapshot.
+
+    Snapshots taken before content versioning have no stored content (404).
+    """
+    content = await TemplateContentService.get_version_content(db, template_id, version_number)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Template version has no stored content")
+
+    return {
+        "id": str(template_id),
+        "version_number": version_number,
+        "content": content,
+    }
+
+
+@router.post("/{template_id}/versions/{version_number}/restore", response_model=TemplateContentResponse)
+async def restore_template_version(
+    template_id: UUID,
+    version_number: int,
+    db: AsyncSession = Depends(get_db),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Restore the content of a template version snapshot.
+
+    The restored content is saved as a new version; the current content is
+    snapshotted first, so the restore itself can be undone.
+    """
+    result = await TemplateContentService.restore_version(db, template_id, version_number, restored_by=user["email"])
+
+    # Audit log
+    await AuditService.log(
+        db,
+        entity_type="template",
+        entity_id=str(template_id),
+        action="content_restored",
+        user_email=user["email"],
+        details={"version": result["version"], "restored_from": version_number},
+    )
+
+    return TemplateContentResponse(**result)
+
+
 @router.put("/{template_id}/settings", response_model=TemplateSettingsResponse)
 async def update_template_settings(
     template_id: UUID,
@@ -799,6 +828,7 @@ async def compare_template(
         template_id=template_id,
         template_title=template.title,
         vitec_source_hash=getattr(template, "vitec_source_hash", None),
+        stored_fingerprint=await TemplateFingerprintService.get_for_content(db, template.content),
     )
 
     ai_svc = get_ai_analysis_service()
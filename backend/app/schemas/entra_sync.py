@@ -2,16 +2,19 @@
 Pydantic schemas for Entra ID sync operations.
 """
 
-from typing import Literal
+from datetime import datetime
+from typing import Any, Literal
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 # =============================================================================
 # Type Aliases
 # =============================================================================
 
 SyncScope = Literal["profile", "photo", "signature"]
+ImportJobKind = Literal["employees", "offices"]
+ImportJobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
 
 
 # =============================================================================
@@ -173,6 +176,41 @@ class EntraSyncBatchResult(BaseModel):
     signatures_pushed: int = Field(0, description="Total signatures pushed")
 
 
+# =============================================================================
+# Import Job Schemas
+# =============================================================================
+
+
+class EntraImportJobResponse(BaseModel):
+    """Background Entra import job (employees or offices)."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID = Field(..., description="Job UUID")
+    kind: ImportJobKind = Field(..., description="What is imported: employees or offices")
+    status: ImportJobStatus = Field(..., description="queued, running, succeeded, failed or cancelled")
+    options: dict[str, Any] = Field(default_factory=dict, description="Import request options")
+    progress: dict[str, Any] | None = Field(None, description="Latest progress reported by the import")
+    result: dict[str, Any] | None = Field(None, description="Import summary (when finished)")
+    error: str | None = Field(None, description="Error message if the import failed")
+    cancel_requested: bool = Field(False, description="Whether cancellation was requested")
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class EntraImportJobEventResponse(BaseModel):
+    """Progress or lifecycle event of an import job."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    job_id: UUID
+    event_type: str = Field(..., description="started, progress, succeeded, failed or cancelled")
+    payload: dict[str, Any] = Field(default_factory=dict, validation_alias="payload_json")
+    created_at: datetime | None = None
+
+
 # =============================================================================
 # Status Schemas
 # =============================================================================
@@ -77,3 +77,7 @@ class SyncCommitResult(BaseModel):
     employees_created: int = 0
     employees_updated: int = 0
     employees_skipped: int = 0
+    timings_ms: dict[str, float] = Field(
+        default_factory=dict,
+        description="Duration per commit phase: prefetch, offices, employees, finalize, total",
+    )
@@ -0,0 +1,83 @@
+"""
+Pydantic schemas for template listings.
+
+List items carry summary fields only; HTML content and Vitec metadata are
+never loaded for listings (see ``TemplateService.get_list``).
+"""
+
+from pydantic import BaseModel, Field
+
+
+class TemplateTagRef(BaseModel):
+    id: str
+    name: str
+    color: str | None = None
+
+
+class TemplateCategoryRef(BaseModel):
+    id: str
+    name: str
+    icon: str | None = None
+
+
+class TemplateListItem(BaseModel):
+    """Compact template row for ``GET /api/templates``."""
+
+    id: str
+    title: str
+    description: str | None = None
+    file_name: str
+    file_type: str
+    file_size_bytes: int
+    status: str
+    version: int | None = None
+    preview_url: str | None = None
+    created_at: str | None = None
+    updated_at: str | None = None
+    tags: list[TemplateTagRef] = Field(default_factory=list)
+    categories: list[TemplateCategoryRef] = Field(default_factory=list)
+    attachments: list[str] = Field(default_factory=list)
+    workflow_status: str | None = None
+    is_archived_legacy: bool = False
+    origin: str | None = None
+
+
+class TemplatePagination(BaseModel):
+    total: int
+    page: int | None = Field(None, description="Current page (None in cursor mode)")
+    per_page: int
+    total_pages: int
+    next_cursor: str | None = Field(None, description="Cursor for the next page in cursor mode (None on the last page)")
+
+
+class TemplateListResponse(BaseModel):
+    templates: list[TemplateListItem]
+    pagination: TemplatePagination
+
+
+class TemplateCountsResponse(BaseModel):
+    """Facet counts for ``GET /api/templates/counts``."""
+
+    total: int
+    by_status: dict[str, int] = Field(default_factory=dict)
+    by_category: dict[str, int] = Field(default_factory=dict, description="Category UUID -> count")
+
+
+class TemplateSearchHit(BaseModel):
+    """Ranked hit for ``GET /api/templates/search``."""
+
+    id: str
+    title: str
+    description: str | None = None
+    status: str | None = None
+    workflow_status: str | None = None
+    updated_at: str | None = None
+    rank: float
+    snippet: str | None = Field(None, description="HTML-escaped excerpt with matches wrapped in <mark>")
+    match: str = Field(..., description="'fulltext' or 'fuzzy'")
+
+
+class TemplateSearchResponse(BaseModel):
+    query: str
+    hits: list[TemplateSearchHit]
+    took_ms: float
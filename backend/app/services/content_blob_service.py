@@ -0,0 +1,147 @@
+"""
+Content Blob Service - Content-addressed, delta-compressed version bodies.
+
+Version history (TemplateVersion, LayoutPartialVersion) references bodies by
+SHA-256 instead of storing a copy per row. Identical bodies are stored once.
+A new body is stored as a zstd frame compressed against the previous version
+of the same document (used as a raw-content dictionary, so unchanged markup
+costs a few bytes); every ``KEYFRAME_INTERVAL``-th link in a chain is a full
+frame, which bounds reconstruction to that many decompressions.
+"""
+
+import hashlib
+import logging
+
+import zstandard
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.content_blob import ContentBlob
+
+logger = logging.getLogger(__name__)
+
+
+def _dictionary(base: bytes) -> zstandard.ZstdCompressionDict:
+    return zstandard.ZstdCompressionDict(base, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+
+
+def decode_blobs(blobs: dict[str, tuple[str | None, bytes]], content_hashes: list[str]) -> dict[str, str]:
+    """
+    Reconstruct bodies from fetched blobs (hash -> (delta base, zstd frame)), keyed by hash.
+
+    Every base a requested blob depends on must be in ``blobs``; hashes missing
+    from ``blobs`` are left out. Each shared base is decompressed once.
+    """
+    texts: dict[str, bytes] = {}
+
+    def decode(content_hash: str) -> bytes:
+        chain = [content_hash]
+        while chain[-1] not in texts and blobs[chain[-1]][0] is not None:
+            base = blobs[chain[-1]][0]
+            if base not in blobs:
+                raise LookupError(f"Content blob {base} (base of {content_hash}) is missing")
+            chain.append(base)
+        for current in reversed(chain):
+            if current in texts:
+                continue
+            base, data = blobs[current]
+            dict_data = _dictionary(texts[base]) if base is not None else None
+            texts[current] = zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+        return texts[content_hash]
+
+    return {h: decode(h).decode("utf-8") for h in dict.fromkeys(content_hashes) if h in blobs}
+
+
+class ContentBlobService:
+    """Stores and reconstructs version bodies in ``content_blobs``."""
+
+    # Longest delta chain: a blob is stored full once its base is this many links from a keyframe
+    KEYFRAME_INTERVAL = 16
+    ZSTD_LEVEL = 10
+
+    @staticmethod
+    def compute_hash(content: str) -> str:
+        """SHA-256 of the UTF-8 encoded content (same as TemplateContentService.compute_content_hash)."""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @classmethod
+    async def put(cls, db: AsyncSession, content: str, *, base_hash: str | None = None) -> str:
+        """
+        Store ``content`` unless a blob with its hash exists, and return the hash.
+
+        Args:
+            db: Database session
+            content: Text body to store
+            base_hash: Hash of the previous version of the same document; the
+                body is stored as a delta against it when that is smaller and
+                the chain is shorter than ``KEYFRAME_INTERVAL``
+
+        Returns:
+            SHA-256 content hash (the blob key)
+        """
+        content_hash = cls.compute_hash(content)
+        if await cls._chain_depth(db, content_hash) is not None:
+            return content_hash
+
+        raw = content.encode("utf-8")
+        row = {
+            "content_hash": content_hash,
+            "encoding": "full",
+            "base_hash": None,
+            "chain_depth": 0,
+            "data": zstandard.ZstdCompressor(level=cls.ZSTD_LEVEL).compress(raw),
+            "raw_size": len(raw),
+        }
+
+        base_depth = await cls._chain_depth(db, base_hash) if base_hash else None
+        if base_depth is not None and base_depth + 1 < cls.KEYFRAME_INTERVAL:
+            base_text = await cls.get(db, base_hash)
+            delta = zstandard.ZstdCompressor(
+                level=cls.ZSTD_LEVEL, dict_data=_dictionary(base_text.encode("utf-8"))
+            ).compress(raw)
+            if len(delta) < len(row["data"]):
+                row.update(encoding="delta", base_hash=base_hash, chain_depth=base_depth + 1, data=delta)
+        row["stored_size"] = len(row["data"])
+
+        insert = sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
+        await db.execute(insert(ContentBlob).values(row).on_conflict_do_nothing(index_elements=["content_hash"]))
+        logger.debug(
+            f"Stored content blob {content_hash[:12]} ({row['encoding']}, {len(raw)} -> {row['stored_size']} bytes)"
+        )
+        return content_hash
+
+    @staticmethod
+    async def _chain_depth(db: AsyncSession, content_hash: str) -> int | None:
+        result = await db.execute(select(ContentBlob.chain_depth).where(ContentBlob.content_hash == content_hash))
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def get(cls, db: AsyncSession, content_hash: str) -> str | None:
+        """Reconstruct the text stored under ``content_hash`` (None if there is no such blob)."""
+        return (await cls.get_many(db, [content_hash])).get(content_hash)
+
+    @staticmethod
+    async def get_many(db: AsyncSession, content_hashes: list[str]) -> dict[str, str]:
+        """
+        Reconstruct several bodies, keyed by hash (unknown hashes are left out).
+
+        Blobs are fetched one chain level per query (at most ``KEYFRAME_INTERVAL``
+        queries) and each shared base is decompressed once.
+        """
+        blobs: dict[str, tuple[str | None, bytes]] = {}  # hash -> (delta base, zstd frame)
+        requested: set[str] = set()
+        pending = set(content_hashes)
+        while pending:
+            requested |= pending
+            result = await db.execute(
+                select(ContentBlob.content_hash, ContentBlob.base_hash, ContentBlob.encoding, ContentBlob.data).where(
+                    ContentBlob.content_hash.in_(pending)
+                )
+            )
+            for content_hash, base_hash, encoding, data in result.all():
+                blobs[content_hash] = (base_hash if encoding == "delta" else None, data)
+            pending = {base for base, _ in blobs.values() if base is not None and base not in requested}
+
+        return decode_blobs(blobs, content_hashes)
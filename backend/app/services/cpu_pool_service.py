@@ -0,0 +1,220 @@
+"""
+CPU Pool Service - Shared worker processes for CPU-bound HTML processing.
+
+Sanitizing, normalizing, Word conversion, structural comparison and dedup
+similarity parse whole documents with BeautifulSoup/lxml. Run inline they hold
+the event loop (and the GIL) for the duration of the parse, so every other
+request on the worker stalls. ``run_cpu_bound`` submits such jobs to one
+bounded ``ProcessPoolExecutor`` that is started and shut down from the FastAPI
+lifespan (``start_cpu_pool()`` / ``stop_cpu_pool()``).
+
+Jobs must be module-level functions with picklable arguments and results.
+Admission is bounded by ``CPU_POOL_MAX_PENDING`` (running + queued jobs);
+callers beyond that wait for a slot. Each job has a deadline covering both the
+wait and the run; when it passes the caller gets ``CpuPoolTimeoutError``.
+When the pool is not started (tests, scripts) or ``CPU_POOL_MAX_WORKERS`` is 0,
+jobs run on a small thread pool instead so callers never block the loop.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CpuPoolTimeoutError(TimeoutError):
+    """A CPU pool job did not finish (or did not get a worker) before its deadline."""
+
+
+class CpuPool:
+    """Bounded process pool with per-job deadlines and queue-depth metrics."""
+
+    def __init__(
+        self,
+        *,
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+        timeout_seconds: float | None = None,
+    ) -> None:
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._timeout_seconds = timeout_seconds
+        self._executor: ProcessPoolExecutor | None = None
+        self._thread_executor: ThreadPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._slots_loop: asyncio.AbstractEventLoop | None = None
+
+        self.waiting = 0
+        self.max_waiting = 0
+        self.admitted = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.total_job_seconds = 0.0
+        self.max_job_seconds = 0.0
+
+    @property
+    def max_workers(self) -> int:
+        return settings.CPU_POOL_MAX_WORKERS if self._max_workers is None else self._max_workers
+
+    @property
+    def max_pending(self) -> int:
+        return max(1, settings.CPU_POOL_MAX_PENDING if self._max_pending is None else self._max_pending)
+
+    @property
+    def timeout_seconds(self) -> float:
+        return settings.CPU_POOL_JOB_TIMEOUT_SECONDS if self._timeout_seconds is None else self._timeout_seconds
+
+    @property
+    def is_started(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        """Create the worker processes (no-op when already started or ``max_workers`` is 0)."""
+        if self._executor is not None or self.max_workers <= 0:
+            return
+        # spawn: workers must not inherit the parent's event loop, DB pool or open sockets
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=settings.CPU_POOL_MAX_TASKS_PER_CHILD or None,
+        )
+        logger.info(f"CPU pool started with {self.max_workers} worker process(es)")
+
+    async def shutdown(self) -> None:
+        """Stop the workers; queued jobs are cancelled, running ones are allowed to finish."""
+        executor, self._executor = self._executor, None
+        thread_executor, self._thread_executor = self._thread_executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+            logger.info("CPU pool stopped")
+        if thread_executor is not None:
+            thread_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._slots_loop = loop
+            self.admitted = 0
+        return self._slots
+
+    def _get_executor(self) -> Executor:
+        if self._executor is not None:
+            return self._executor
+        if self._thread_executor is None:
+            self._thread_executor = ThreadPoolExecutor(
+                max_workers=max(1, self.max_workers), thread_name_prefix="cpu-pool"
+            )
+        return self._thread_executor
+
+    async def run(self, fn: Callable[..., T], *args: Any, timeout: float | None = None, **kwargs: Any) -> T:
+        """
+        Run ``fn(*args, **kwargs)`` in a worker and return its result.
+
+        Args:
+            fn: Module-level (picklable) function
+            timeout: Seconds until the job must have finished, including time
+                spent waiting for a slot; defaults to ``CPU_POOL_JOB_TIMEOUT_SECONDS``
+
+        Raises:
+            CpuPoolTimeoutError: If the deadline passes. A job that already
+                started keeps its worker until it finishes; queued jobs are dropped.
+            Exception: Whatever ``fn`` raised.
+        """
+        timeout = self.timeout_seconds if timeout is None else timeout
+        name = getattr(fn, "__name__", repr(fn))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        slots = self._get_slots()
+
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout)
+        except TimeoutError:
+            self.timed_out += 1
+            raise CpuPoolTimeoutError(f"{name} waited more than {timeout:g}s for a CPU pool slot") from None
+        finally:
+            self.waiting -= 1
+
+        self.admitted += 1
+        self.submitted += 1
+        started = time.perf_counter()
+        try:
+            job: Future = self._get_executor().submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self.admitted -= 1
+            slots.release()
+            raise
+
+        def _finished(done: Future) -> None:
+            # Runs on the loop once the worker is free, so the slot tracks real pool occupancy
+            self.admitted -= 1
+            slots.release()
+            if done.cancelled():
+                return
+            if done.exception() is not None:
+                self.failed += 1
+                return
+            elapsed = time.perf_counter() - started
+            self.completed += 1
+            self.total_job_seconds += elapsed
+            self.max_job_seconds = max(self.max_job_seconds, elapsed)
+
+        result = asyncio.wrap_future(job)
+        result.add_done_callback(_finished)
+        try:
+            return await asyncio.wait_for(asyncio.shield(result), max(0.0, deadline - loop.time()))
+        except TimeoutError:
+            self.timed_out += 1
+            job.cancel()
+            raise CpuPoolTimeoutError(f"{name} did not finish within {timeout:g}s") from None
+
+    def stats(self) -> dict[str, Any]:
+        workers = self.max_workers if self._executor is not None else max(1, self.max_workers)
+        return {
+            "mode": "process" if self._executor is not None else "thread",
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "running": min(self.admitted, workers),
+            "queue_depth": self.waiting + max(0, self.admitted - workers),
+            "waiting_for_slot": self.waiting,
+            "max_waiting_for_slot": self.max_waiting,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "avg_job_seconds": round(self.total_job_seconds / self.completed, 4) if self.completed else 0.0,
+            "max_job_seconds": round(self.max_job_seconds, 4),
+            "timeout_seconds": self.timeout_seconds,
+        }
+
+
+cpu_pool = CpuPool()
+
+
+def start_cpu_pool() -> None:
+    """Start the shared worker processes. Called on application startup."""
+    cpu_pool.start()
+
+
+async def stop_cpu_pool() -> None:
+    """Shut down the shared worker processes. Called on application shutdown."""
+    await cpu_pool.shutdown()
+
+
+async def run_cpu_bound(fn: Callable[..., T], *args: Any, timeout: float | None = None, **kwargs: Any) -> T:
+    """Run ``fn`` on the shared CPU pool (see ``CpuPool.run``)."""
+    return await cpu_pool.run(fn, *args, timeout=timeout, **kwargs)
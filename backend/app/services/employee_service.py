@@ -10,14 +10,13 @@ from fastapi import HTTPException
 from sqlalchemy import func, or_, select
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload, selectinload
 
 from app.config import settings
 from app.models.employee import Employee
 from app.models.office import Office
 from app.schemas.employee import EmployeeCreate, EmployeeUpdate, StartOffboarding
 from app.services.notification_service import NotificationService
-from app.services.office_service import OfficeService
 from app.services.vitec_hub_service import VitecHubService
 
 logger = logging.getLogger(__name__)
@@ -170,7 +169,18 @@ class EmployeeService:
         Returns:
             Created employee
         """
-        employee = Employee(
+        employee = EmployeeService.build(data)
+        db.add(employee)
+        await db.flush()
+        await db.refresh(employee)
+
+        logger.info(f"Created employee: {employee.full_name} ({employee.id})")
+        return employee
+
+    @staticmethod
+    def build(data: EmployeeCreate) -> Employee:
+        """Unsaved Employee for ``data`` (used by ``create`` and batched sync commits)."""
+        return Employee(
             office_id=str(data.office_id),
             vitec_employee_id=data.vitec_employee_id,
             employee_type=data.employee_type,
@@ -213,12 +223,6 @@ class EmployeeService:
             hide_from_homepage_date=data.hide_from_homepage_date,
             delete_data_date=data.delete_data_date,
         )
-        db.add(employee)
-        await db.flush()
-        await db.refresh(employee)
-
-        logger.info(f"Created employee: {employee.full_name} ({employee.id})")
-        return employee
 
     @staticmethod
     async def update(db: AsyncSession, employee_id: UUID, data: EmployeeUpdate) -> Employee | None:
@@ -478,19 +482,7 @@ class EmployeeService:
             existing = result.scalar_one_or_none()
 
         if not existing:
-            employee = Employee(
-                office_id=str(office.id),
-                vitec_employee_id=vitec_employee_id,
-                first_name=payload.get("first_name") or "",
-                last_name=payload.get("last_name") or "",
-                title=payload.get("title"),
-                email=payload.get("email"),
-                phone=payload.get("phone"),
-                description=payload.get("description"),
-                profile_image_url=payload.get("profile_image_url"),
-                system_roles=payload.get("system_roles") or [],
-                status=payload.get("status") or "active",
-            )
+            employee = EmployeeService._build_from_hub(payload, office)
             db.add(employee)
             await db.flush()
             await db.refresh(employee)
@@ -500,15 +492,44 @@ class EmployeeService:
                 logger.warning("Failed to create employee added notification: %s", exc)
             return employee, "created"
 
-        updated = False
+        changed_fields = EmployeeService._apply_hub_payload(existing, payload, office)
+        if changed_fields:
+            await db.flush()
+            await db.refresh(existing)
+            try:
+                await NotificationService.notify_employee_updated(db, existing, changed_fields)
+            except Exception as exc:
+                logger.warning("Failed to create employee updated notification: %s", exc)
+            return existing, "updated"
+
+        return existing, "skipped"
+
+    @staticmethod
+    def _build_from_hub(payload: dict, office: Office) -> Employee:
+        return Employee(
+            office_id=str(office.id),
+            vitec_employee_id=payload.get("vitec_employee_id"),
+            first_name=payload.get("first_name") or "",
+            last_name=payload.get("last_name") or "",
+            title=payload.get("title"),
+            email=payload.get("email"),
+            phone=payload.get("phone"),
+            description=payload.get("description"),
+            profile_image_url=payload.get("profile_image_url"),
+            system_roles=payload.get("system_roles") or [],
+            status=payload.get("status") or "active",
+        )
+
+    @staticmethod
+    def _apply_hub_payload(existing: Employee, payload: dict, office: Office) -> builtins.list[str]:
+        """Copy Vitec values that differ onto ``existing``; returns the changed field names."""
         changed_fields: list[str] = []
+        vitec_employee_id = payload.get("vitec_employee_id")
         if vitec_employee_id and existing.vitec_employee_id != vitec_employee_id:
             existing.vitec_employee_id = vitec_employee_id
-            updated = True
             changed_fields.append("vitec_employee_id")
         if existing.office_id != str(office.id):
             existing.office_id = str(office.id)
-            updated = True
             changed_fields.append("office_id")
 
         for field in [
@@ -526,26 +547,14 @@ class EmployeeService:
                 continue
             if getattr(existing, field) != value:
                 setattr(existing, field, value)
-                updated = True
                 changed_fields.append(field)
 
         roles = payload.get("system_roles") or []
         if roles and existing.system_roles != roles:
             existing.system_roles = roles
-            updated = True
             changed_fields.append("system_roles")
 
-        if updated:
-            await db.flush()
-            await db.refresh(existing)
-            if changed_fields:
-                try:
-                    await NotificationService.notify_employee_updated(db, existing, changed_fields)
-                except Exception as exc:
-                    logger.warning("Failed to create employee updated notification: %s", exc)
-            return existing, "updated"
-
-        return existing, "skipped"
+        return changed_fields
 
     @staticmethod
     async def sync_from_hub(
@@ -562,6 +571,30 @@ class EmployeeService:
         created = updated = skipped = missing_office = 0
         sync_errors: list[str] = []
 
+        # Same match priority as upsert_from_hub, against offices and employees loaded once
+        # raiseload: the sync only touches columns, so skip the eager-loaded relationship queries
+        offices = (await db.execute(select(Office).options(raiseload("*")))).scalars().all()
+        office_by_department: dict[int, Office] = {}
+        for office in offices:
+            if office.vitec_department_id is not None:
+                office_by_department.setdefault(office.vitec_department_id, office)
+
+        by_vitec_id: dict[str, Employee] = {}
+        by_email: dict[str, Employee] = {}
+        by_name_office: dict[tuple[str, str, str], Employee] = {}
+
+        def index(employee: Employee) -> None:
+            if employee.vitec_employee_id:
+                by_vitec_id.setdefault(employee.vitec_employee_id, employee)
+            if employee.email:
+                by_email.setdefault(employee.email, employee)
+            by_name_office.setdefault((employee.first_name, employee.last_name, str(employee.office_id)), employee)
+
+        for employee in (await db.execute(select(Employee).options(raiseload("*")))).scalars().all():
+            index(employee)
+
+        added: list[Employee] = []
+        changed: list[tuple[Employee, list[str]]] = []
         for raw in employees:
             payload = EmployeeService._map_employee_payload(raw or {})
             if not payload.get("first_name") and not payload.get("last_name"):
@@ -574,20 +607,46 @@ class EmployeeService:
                 sync_errors.append("missing_department_id")
                 continue
 
-            office = await OfficeService.get_by_vitec_department_id(db, department_id)
+            office = office_by_department.get(department_id)
             if not office:
                 missing_office += 1
                 sync_errors.append(f"missing_office:{department_id}")
                 continue
 
-            _, action = await EmployeeService.upsert_from_hub(db, payload, office)
-            if action == "created":
+            vitec_employee_id = payload.get("vitec_employee_id")
+            existing = (by_vitec_id.get(vitec_employee_id) if vitec_employee_id else None) or (
+                by_email.get(payload["email"]) if payload.get("email") else None
+            )
+            if not existing and payload.get("first_name") and payload.get("last_name"):
+                existing = by_name_office.get((payload["first_name"], payload["last_name"], str(office.id)))
+
+            if not existing:
+                employee = EmployeeService._build_from_hub(payload, office)
+                db.add(employee)
+                index(employee)
+                added.append(employee)
                 created += 1
-            elif action == "updated":
+                continue
+
+            changed_fields = EmployeeService._apply_hub_payload(existing, payload, office)
+            if changed_fields:
+                index(existing)
+                changed.append((existing, changed_fields))
                 updated += 1
             else:
                 skipped += 1
 
+        # One flush writes all inserts/updates in batches; notifications go in one INSERT
+        await db.flush()
+        try:
+            await NotificationService.create_many(
+                db,
+                [NotificationService.build_employee_added(employee) for employee in added]
+                + [NotificationService.build_employee_updated(employee, fields) for employee, fields in changed],
+            )
+        except Exception as exc:
+            logger.warning("Failed to create employee sync notifications: %s", exc)
+
         # Explicitly commit all changes
         if sync_errors:
             try:
@@ -0,0 +1,289 @@
+"""
+Entra Graph Sync - Native async push of employee profiles, photos and signatures.
+
+Replaces the per-employee ``pwsh Sync-EntraIdEmployees.ps1`` subprocess. All
+calls for a sync run go over one pooled ``MicrosoftGraphClient``:
+
+1. Entra users are resolved by UPN through Graph ``$batch`` (20 per call), with
+   a second batch matching ``mail``/``proxyAddresses`` for the misses
+2. Profile changes (same rules as ``Sync-UserProfile`` in the script) are
+   PATCHed through ``$batch``
+3. Photos (``PUT /users/{id}/photo/$value``) and signatures (Exchange Online
+   ``Set-MailboxMessageConfiguration`` over the admin REST endpoint) are sent
+   per user
+
+Batch calls and per-user uploads run under a shared concurrency bound.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Any
+from urllib.parse import quote
+
+import httpx
+
+from app.config import settings
+from app.integrations.microsoft_graph import MicrosoftGraphClient
+from app.models.employee import Employee
+from app.schemas.entra_sync import EntraSyncResult, SyncScope
+
+logger = logging.getLogger(__name__)
+
+USER_FIELDS = (
+    "id,userPrincipalName,mail,displayName,givenName,surname,jobTitle,mobilePhone,"
+    "department,officeLocation,streetAddress,postalCode,country"
+)
+
+
+def profile_updates(employee: Employee, user: dict[str, Any]) -> tuple[dict[str, str], list[str]]:
+    """Graph ``PATCH /users`` body for ``employee`` and a readable change list (mirrors ``Sync-UserProfile``)."""
+    office = employee.office
+    department = (office.legal_name or office.name) if office else None
+    wanted: list[tuple[str, str | None, bool]] = [
+        # (property, value, always set even when empty)
+        ("displayName", f"{employee.first_name} {employee.last_name}", True),
+        ("givenName", employee.first_name, True),
+        ("surname", employee.last_name, True),
+        ("jobTitle", employee.title, False),
+        ("mobilePhone", employee.phone, False),
+        ("department", department, False),
+        ("officeLocation", office.city if office else None, False),
+        ("streetAddress", office.street_address if office else None, False),
+        ("postalCode", office.postal_code if office else None, False),
+        ("country", "NO", True),
+    ]
+    updates: dict[str, str] = {}
+    changes: list[str] = []
+    for name, value, always in wanted:
+        if (value or always) and user.get(name) != value:
+            updates[name] = value
+            changes.append(f"{name}: '{user.get(name) or ''}' -> '{value or ''}'")
+    return updates, changes
+
+
+class EntraGraphSync:
+    """Push local employee data to Entra ID / Exchange Online over Microsoft Graph."""
+
+    EXCHANGE_URL = "https://outlook.office365.com/adminapi/beta/{tenant_id}/InvokeCommand"
+    EXCHANGE_SCOPE = "https://outlook.office365.com/.default"
+    # Graph rejects profile photos over 4 MB
+    MAX_PHOTO_BYTES = 4 * 1024 * 1024
+
+    def __init__(
+        self,
+        graph: MicrosoftGraphClient,
+        *,
+        render_signature: Callable[[Employee], tuple[str, str]],
+        concurrency: int | None = None,
+        exchange_url: str | None = None,
+    ) -> None:
+        self.graph = graph
+        self.render_signature = render_signature
+        self.concurrency = max(1, concurrency or settings.ENTRA_SYNC_CONCURRENCY)
+        self.exchange_url = (exchange_url or self.EXCHANGE_URL).format(tenant_id=graph.tenant_id)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def sync(
+        self,
+        employees: list[Employee],
+        scope: list[SyncScope],
+        *,
+        dry_run: bool = False,
+    ) -> dict[str, EntraSyncResult]:
+        """Sync ``employees`` (with ``office`` loaded); returns results keyed by employee id."""
+        results: dict[str, EntraSyncResult] = {}
+        with_email: list[Employee] = []
+        for employee in employees:
+            if employee.email:
+                with_email.append(employee)
+            else:
+                results[str(employee.id)] = EntraSyncResult(
+                    success=False,
+                    employee_id=employee.id,
+                    employee_name=employee.full_name,
+                    error="Employee has no email address",
+                )
+
+        users = await self.resolve_users([employee.email for employee in with_email])
+        matched: list[tuple[Employee, dict[str, Any], EntraSyncResult]] = []
+        for employee in with_email:
+            user = users.get(employee.email.lower())
+            if not user:
+                results[str(employee.id)] = EntraSyncResult(
+                    success=False,
+                    employee_id=employee.id,
+                    employee_name=employee.full_name,
+                    error=f"Entra user not found for {employee.email}",
+                )
+                continue
+            result = EntraSyncResult(
+                success=True,
+                employee_id=employee.id,
+                employee_name=employee.full_name,
+                entra_user_id=user["id"],
+            )
+            results[str(employee.id)] = result
+            matched.append((employee, user, result))
+
+        if "profile" in scope:
+            await self._sync_profiles(matched, dry_run=dry_run)
+
+        uploads = []
+        for employee, user, result in matched:
+            if "photo" in scope:
+                uploads.append(self._sync_photo(employee, user, result, dry_run=dry_run))
+            if "signature" in scope:
+                uploads.append(self._sync_signature(employee, result, dry_run=dry_run))
+        await asyncio.gather(*uploads)
+
+        for _, _, result in matched:
+            errors = [error for error in (result.profile_error, result.photo_error, result.signature_error) if error]
+            if errors:
+                result.success = False
+                result.error = "; ".join(errors)
+        return results
+
+    async def resolve_users(self, emails: list[str]) -> dict[str, dict[str, Any]]:
+        """Entra users keyed by lower-cased email: UPN lookup first, then ``mail``/``proxyAddresses``."""
+        emails = list(dict.fromkeys(email.lower() for email in emails))
+        responses = await self.graph.batch(
+            [
+                {"id": str(index), "method": "GET", "url": f"/users/{quote(email)}?$select={USER_FIELDS}"}
+                for index, email in enumerate(emails)
+            ],
+            concurrency=self.concurrency,
+        )
+        users: dict[str, dict[str, Any]] = {}
+        missing: list[str] = []
+        for index, email in enumerate(emails):
+            response = responses.get(str(index))
+            if response is not None and response.ok:
+                users[email] = response.body
+            else:
+                missing.append(email)
+
+        if missing:
+            requests = []
+            for index, email in enumerate(missing):
+                value = email.replace("'", "''")
+                query = f"mail eq '{value}' or proxyAddresses/any(p:p eq 'smtp:{value}')"
+                requests.append(
+                    {
+                        "id": str(index),
+                        "method": "GET",
+                        "url": f"/users?$filter={quote(query)}&$select={USER_FIELDS}&$count=true",
+                        # proxyAddresses filters are advanced queries
+                        "headers": {"ConsistencyLevel": "eventual"},
+                    }
+                )
+            responses = await self.graph.batch(requests, concurrency=self.concurrency)
+            for index, email in enumerate(missing):
+                response = responses.get(str(index))
+                found = response.body.get("value") if response is not None and response.ok else None
+                if found:
+                    users[email] = found[0]
+        return users
+
+    async def _sync_profiles(
+        self,
+        matched: list[tuple[Employee, dict[str, Any], EntraSyncResult]],
+        *,
+        dry_run: bool,
+    ) -> None:
+        patches: dict[str, dict[str, Any]] = {}
+        pending: dict[str, EntraSyncResult] = {}
+        for employee, user, result in matched:
+            updates, result.profile_changes = profile_updates(employee, user)
+            if not updates:
+                continue
+            if dry_run:
+                result.profile_updated = True
+                continue
+            request_id = str(len(patches))
+            patches[request_id] = {
+                "id": request_id,
+                "method": "PATCH",
+                "url": f"/users/{user['id']}",
+                "body": updates,
+                "headers": {"Content-Type": "application/json"},
+            }
+            pending[request_id] = result
+
+        if not patches:
+            return
+        responses = await self.graph.batch(list(patches.values()), concurrency=self.concurrency)
+        for request_id, result in pending.items():
+            response = responses.get(request_id)
+            if response is not None and response.ok:
+                result.profile_updated = True
+            else:
+                result.profile_error = response.error_message if response is not None else "No response from Graph"
+
+    async def _sync_photo(
+        self,
+        employee: Employee,
+        user: dict[str, Any],
+        result: EntraSyncResult,
+        *,
+        dry_run: bool,
+    ) -> None:
+        photo_url = employee.profile_image_url or ""
+        if not photo_url.startswith(("http://", "https://")):
+            return
+        if dry_run:
+            result.photo_updated = True
+            return
+
+        async with self._semaphore:
+            try:
+                download = await self.graph.send("GET", photo_url, scope=None)
+                download.raise_for_status()
+                if len(download.content) > self.MAX_PHOTO_BYTES:
+                    result.photo_error = f"Photo too large: {len(download.content) / 1024 / 1024:.1f}MB (max 4MB)"
+                    return
+                upload = await self.graph.send(
+                    "PUT",
+                    f"/users/{user['id']}/photo/$value",
+                    content=download.content,
+                    headers={"Content-Type": download.headers.get("Content-Type", "image/jpeg")},
+                )
+                upload.raise_for_status()
+                result.photo_updated = True
+            except httpx.HTTPError as exc:
+                logger.warning("Photo sync failed for %s: %s", employee.email, exc)
+                result.photo_error = str(exc)
+
+    async def _sync_signature(self, employee: Employee, result: EntraSyncResult, *, dry_run: bool) -> None:
+        if dry_run:
+            result.signature_pushed = True
+            return
+
+        html_signature, text_signature = self.render_signature(employee)
+        payload = {
+            "CmdletInput": {
+                "CmdletName": "Set-MailboxMessageConfiguration",
+                "Parameters": {
+                    "Identity": employee.email,
+                    "SignatureHtml": html_signature,
+                    "SignatureText": text_signature,
+                    "AutoAddSignature": True,
+                    "AutoAddSignatureOnMobile": True,
+                    "AutoAddSignatureOnReply": True,
+                },
+            }
+        }
+        async with self._semaphore:
+            try:
+                response = await self.graph.send(
+                    "POST",
+                    self.exchange_url,
+                    scope=self.EXCHANGE_SCOPE,
+                    json=payload,
+                    headers={"Content-Type": "application/json", "X-ResponseFormat": "json"},
+                )
+                response.raise_for_status()
+                result.signature_pushed = True
+            except httpx.HTTPError as exc:
+                logger.warning("Signature sync failed for %s: %s", employee.email, exc)
+                result.signature_error = str(exc)
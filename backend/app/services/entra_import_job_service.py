@@ -0,0 +1,398 @@
+"""
+Entra Import Jobs - Background runs of the Entra employee/office import scripts.
+
+``scripts/import_entra_employees.py`` and ``scripts/import_entra_offices.py``
+run as asyncio subprocesses, so a running import never blocks the event loop
+or other requests. Each run is an ``EntraImportJob`` row:
+
+- The script is started with ``--json --progress``; every JSON progress line
+  becomes an ``EntraImportJobEvent`` (streamed to the UI over SSE) and the
+  job's ``progress`` snapshot, and the final JSON line becomes ``result``
+- Starting an import with the same options as a queued or running job (in
+  this process or on another replica) returns that job instead of starting a
+  second one
+- Cancelling terminates the script; the scripts commit once at the end, so a
+  cancelled run leaves the database untouched. A cancel requested on another
+  replica is picked up at the next progress event
+
+A job can only be alive for ``ENTRA_IMPORT_TIMEOUT_SECONDS`` (plus the
+terminate grace period); queued/running rows older than that belong to a
+process that died. They are marked failed on startup and never count as
+running. Running jobs are cancelled from the FastAPI lifespan on shutdown.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sys
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import select, text
+
+from app.config import settings
+from app.database import advisory_lock_key, async_session_factory
+from app.models.entra_import_job import EntraImportJob, EntraImportJobEvent
+
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = Path(__file__).parent.parent.parent / "scripts"
+IMPORT_SCRIPTS: dict[str, Path] = {
+    "employees": SCRIPTS_DIR / "import_entra_employees.py",
+    "offices": SCRIPTS_DIR / "import_entra_offices.py",
+}
+TERMINAL_STATUSES = frozenset({"succeeded", "failed", "cancelled"})
+ACTIVE_STATUSES = ("queued", "running")
+# Seconds a terminated script gets to exit before it is killed
+TERMINATE_GRACE_SECONDS = 5.0
+# Extra seconds (job bookkeeping) before an unfinished job is considered abandoned
+STALE_JOB_MARGIN_SECONDS = 60.0
+# Seconds between status checks when waiting for a job running in another process
+WAIT_POLL_SECONDS = 1.0
+
+
+def _job_lifetime_seconds() -> float:
+    """Longest an unfinished job can still be running somewhere."""
+    return settings.ENTRA_IMPORT_TIMEOUT_SECONDS + TERMINATE_GRACE_SECONDS + STALE_JOB_MARGIN_SECONDS
+
+
+def _stale_before() -> datetime:
+    """Creation time before which an unfinished job can no longer be running anywhere."""
+    return datetime.now(UTC) - timedelta(seconds=_job_lifetime_seconds())
+
+
+def _import_arguments(kind: str, options: dict[str, Any]) -> list[str]:
+    args = ["--json", "--progress"]
+    if options.get("dry_run"):
+        args.append("--dry-run")
+    if kind == "employees" and options.get("filter_email"):
+        args.extend(["--filter-email", options["filter_email"]])
+    if kind == "offices":
+        if options.get("filter_office_id"):
+            args.extend(["--filter-office-id", str(options["filter_office_id"])])
+        if options.get("fetch_details"):
+            args.append("--fetch-details")
+    return args
+
+
+def _import_environment() -> tuple[dict[str, str], str | None]:
+    """Environment for the import script, or an error when Entra is not configured."""
+    env = os.environ.copy()
+    for name in ("DATABASE_URL", "ENTRA_TENANT_ID", "ENTRA_CLIENT_ID", "ENTRA_CLIENT_SECRET"):
+        value = getattr(settings, name)
+        if value and not env.get(name):
+            env[name] = value
+
+    if not env.get("ENTRA_TENANT_ID") or not env.get("ENTRA_CLIENT_ID"):
+        return env, "ENTRA_TENANT_ID and ENTRA_CLIENT_ID must be configured"
+    if not env.get("ENTRA_CLIENT_SECRET"):
+        return env, "ENTRA_CLIENT_SECRET must be configured for Entra import"
+    return env, None
+
+
+class EntraImportJobRunner:
+    """Start, track and cancel Entra import jobs running in this process."""
+
+    def __init__(self) -> None:
+        self._tasks: dict[str, asyncio.Task] = {}
+        # (kind, options) -> id of the job running with them
+        self._active: dict[str, str] = {}
+        # (kind, options) -> job being created, so concurrent identical starts share it
+        self._inflight: dict[str, asyncio.Future[EntraImportJob]] = {}
+
+    @staticmethod
+    def _active_key(kind: str, options: dict[str, Any]) -> str:
+        return json.dumps([kind, options], sort_keys=True, default=str)
+
+    def is_running(self, job_id: str) -> bool:
+        task = self._tasks.get(str(job_id))
+        return task is not None and not task.done()
+
+    async def start(self, kind: str, options: dict[str, Any]) -> EntraImportJob:
+        """Queue an import and return its job right away (or the identical job already queued/running)."""
+        if kind not in IMPORT_SCRIPTS:
+            raise ValueError(f"Unknown import kind: {kind}")
+        key = self._active_key(kind, options)
+        active_id = self._active.get(key)
+        if active_id and self.is_running(active_id):
+            job = await self.get(active_id)
+            if job is not None:
+                return job
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future[EntraImportJob] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            async with async_session_factory() as db:
+                existing = await self._find_active_job(db, kind, key)
+                if existing is None:
+                    job = EntraImportJob(kind=kind, status="queued", options=options)
+                    db.add(job)
+                    await db.commit()
+                    await db.refresh(job)
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited failure is not logged as "never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+        if existing is not None:
+            # Queued or running on another replica
+            future.set_result(existing)
+            return existing
+
+        job_id = str(job.id)
+        self._active[key] = job_id
+        task = asyncio.create_task(self._run(job_id, kind, options), name=f"entra-import-{job_id}")
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _task: self._forget(job_id, key))
+        future.set_result(job)
+        return job
+
+    async def _find_active_job(self, db, kind: str, key: str) -> EntraImportJob | None:
+        """
+        Unfinished, non-stale job with the same kind and options, from any process.
+
+        On PostgreSQL a transaction-level advisory lock on the options key makes the
+        check and the insert that follows atomic across replicas.
+        """
+        if db.get_bind().dialect.name != "sqlite":
+            lock_key = advisory_lock_key(f"entra-import:{key}")
+            await db.execute(text(f"SELECT pg_advisory_xact_lock({lock_key})"))
+        stmt = (
+            select(EntraImportJob)
+            .where(
+                EntraImportJob.kind == kind,
+                EntraImportJob.status.in_(ACTIVE_STATUSES),
+                EntraImportJob.created_at >= _stale_before(),
+            )
+            .order_by(EntraImportJob.created_at.desc())
+        )
+        for job in (await db.execute(stmt)).scalars():
+            if self._active_key(job.kind, job.options) == key:
+                return job
+        return None
+
+    async def fail_stale_jobs(self) -> int:
+        """Mark queued/running jobs abandoned by a process that died as failed; returns how many."""
+        async with async_session_factory() as db:
+            stmt = select(EntraImportJob.id).where(
+                EntraImportJob.status.in_(ACTIVE_STATUSES),
+                EntraImportJob.created_at < _stale_before(),
+            )
+            job_ids = [str(job_id) for job_id in (await db.execute(stmt)).scalars()]
+        for job_id in job_ids:
+            await self._finish(job_id, "failed", error="Import was interrupted (the server stopped while it ran)")
+        if job_ids:
+            logger.warning("Marked %d abandoned Entra import job(s) as failed", len(job_ids))
+        return len(job_ids)
+
+    def _forget(self, job_id: str, key: str) -> None:
+        self._tasks.pop(job_id, None)
+        if self._active.get(key) == job_id:
+            del self._active[key]
+
+    async def wait(self, job_id: str) -> EntraImportJob | None:
+        """
+        Wait for a job to finish (the job keeps running if the waiter is cancelled).
+
+        Jobs running in another process are polled until they finish or can no longer be alive.
+        """
+        task = self._tasks.get(str(job_id))
+        if task is not None:
+            with contextlib.suppress(asyncio.CancelledError):
+                await asyncio.shield(task)
+            return await self.get(job_id)
+
+        deadline = asyncio.get_running_loop().time() + _job_lifetime_seconds()
+        while True:
+            job = await self.get(job_id)
+            if job is None or job.status in TERMINAL_STATUSES or asyncio.get_running_loop().time() >= deadline:
+                return job
+            await asyncio.sleep(WAIT_POLL_SECONDS)
+
+    async def cancel(self, job_id: str) -> EntraImportJob | None:
+        """Request cancellation; the script is terminated and the job ends as ``cancelled``."""
+        async with async_session_factory() as db:
+            job = await db.get(EntraImportJob, str(job_id))
+            if job is None:
+                return None
+            if job.status in TERMINAL_STATUSES:
+                return job
+            job.cancel_requested = True
+            await db.commit()
+
+        task = self._tasks.get(str(job_id))
+        if task is not None and not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await asyncio.shield(task)
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> EntraImportJob | None:
+        async with async_session_factory() as db:
+            return await db.get(EntraImportJob, str(job_id))
+
+    async def list_jobs(self, *, kind: str | None = None, limit: int = 20) -> list[EntraImportJob]:
+        async with async_session_factory() as db:
+            stmt = select(EntraImportJob)
+            if kind is not None:
+                stmt = stmt.where(EntraImportJob.kind == kind)
+            stmt = stmt.order_by(EntraImportJob.created_at.desc()).limit(max(1, min(limit, 100)))
+            return list((await db.execute(stmt)).scalars().all())
+
+    async def list_events(
+        self,
+        job_id: str,
+        *,
+        since_id: int | None = None,
+        limit: int = 200,
+    ) -> list[EntraImportJobEvent]:
+        async with async_session_factory() as db:
+            stmt = select(EntraImportJobEvent).where(EntraImportJobEvent.job_id == str(job_id))
+            if since_id is not None:
+                stmt = stmt.where(EntraImportJobEvent.id > since_id)
+            stmt = stmt.order_by(EntraImportJobEvent.id).limit(max(1, min(limit, 500)))
+            return list((await db.execute(stmt)).scalars().all())
+
+    async def stop(self) -> None:
+        """Cancel every job running in this process (called on shutdown)."""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _record(self, job_id: str, event_type: str, payload: dict[str, Any], **changes: Any) -> bool:
+        """Store an event and apply ``changes`` to the job; returns whether cancellation was requested."""
+        async with async_session_factory() as db:
+            job = await db.get(EntraImportJob, job_id)
+            if job is None:
+                return False
+            for name, value in changes.items():
+                setattr(job, name, value)
+            db.add(EntraImportJobEvent(job_id=job_id, event_type=event_type, payload_json=payload))
+            await db.commit()
+            return job.cancel_requested
+
+    async def _finish(self, job_id: str, status: str, *, error: str | None = None, result: dict | None = None) -> None:
+        payload = {"error": error} if error else dict(result or {})
+        await self._record(
+            job_id,
+            status,
+            payload,
+            status=status,
+            error=error,
+            result=result,
+            finished_at=datetime.now(UTC),
+        )
+
+    async def _run(self, job_id: str, kind: str, options: dict[str, Any]) -> None:
+        try:
+            await self._run_script(job_id, kind, options)
+        except asyncio.CancelledError:
+            await asyncio.shield(self._finish(job_id, "cancelled", error="Import cancelled"))
+            raise
+        except Exception as exc:
+            logger.exception("Entra %s import job %s failed", kind, job_id)
+            await self._finish(job_id, "failed", error=str(exc))
+
+    async def _run_script(self, job_id: str, kind: str, options: dict[str, Any]) -> None:
+        script_path = IMPORT_SCRIPTS[kind]
+        if not script_path.exists():
+            await self._finish(job_id, "failed", error=f"Import script not found at {script_path}")
+            return
+        env, config_error = _import_environment()
+        if config_error:
+            await self._finish(job_id, "failed", error=config_error)
+            return
+
+        cancel_requested = await self._record(
+            job_id, "started", {"kind": kind, **options}, status="running", started_at=datetime.now(UTC)
+        )
+        if cancel_requested:
+            raise asyncio.CancelledError
+
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            str(script_path),
+            *_import_arguments(kind, options),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=str(script_path.parent.parent),
+            env=env,
+        )
+        stderr_task = asyncio.create_task(process.stderr.read())
+        summary: dict[str, Any] | None = None
+        try:
+            async with asyncio.timeout(settings.ENTRA_IMPORT_TIMEOUT_SECONDS):
+                async for raw_line in process.stdout:
+                    try:
+                        payload = json.loads(raw_line)
+                    except ValueError:
+                        continue
+                    if not isinstance(payload, dict):
+                        continue
+                    if "event" not in payload:
+                        summary = payload
+                        continue
+                    event_type = str(payload.pop("event"))
+                    if await self._record(job_id, event_type, payload, progress=payload):
+                        raise asyncio.CancelledError
+                returncode = await process.wait()
+                stderr = (await stderr_task).decode(errors="replace")
+        except TimeoutError:
+            await self._terminate(process)
+            await self._finish(
+                job_id, "failed", error=f"Import timed out after {settings.ENTRA_IMPORT_TIMEOUT_SECONDS:g} seconds"
+            )
+            return
+        except BaseException:
+            await asyncio.shield(self._terminate(process))
+            raise
+        finally:
+            stderr_task.cancel()
+
+        if returncode != 0:
+            await self._finish(job_id, "failed", error=stderr.strip() or "Import failed")
+        elif summary is None:
+            await self._finish(job_id, "failed", error="Import completed but returned invalid JSON")
+        else:
+            await self._finish(job_id, "succeeded", result=summary)
+
+    @staticmethod
+    async def _terminate(process: asyncio.subprocess.Process) -> None:
+        if process.returncode is not None:
+            return
+        with contextlib.suppress(ProcessLookupError):
+            process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), TERMINATE_GRACE_SECONDS)
+        except TimeoutError:
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+            await process.wait()
+
+
+entra_import_jobs = EntraImportJobRunner()
+
+
+async def start_entra_import_jobs() -> None:
+    """Fail jobs left unfinished by a previous process (FastAPI lifespan startup)."""
+    try:
+        await entra_import_jobs.fail_stale_jobs()
+    except Exception as exc:
+        logger.warning("Could not reconcile Entra import jobs: %s", exc)
+
+
+async def stop_entra_import_jobs() -> None:
+    """Cancel running import jobs (FastAPI lifespan shutdown)."""
+    await entra_import_jobs.stop()
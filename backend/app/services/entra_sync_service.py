@@ -8,23 +8,24 @@ This service provides methods to:
 4. Upload photos to Entra ID
 5. Push email signatures to Exchange Online
 
-Note: The actual sync is performed via the PowerShell script for full functionality.
-This service provides preview and status functionality for the UI.
+Pushing (3-5) uses the native async Graph engine in ``entra_graph_sync_service``;
+``scripts/Sync-EntraIdEmployees.ps1`` remains for command-line runs.
+Importing Entra users/groups into local records runs the import scripts as
+background jobs (``entra_import_job_service``).
 """
 
-import json
 import logging
 import os
-import subprocess
-import sys
 from pathlib import Path
 from uuid import UUID
 
+import httpx
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload, selectinload
 
 from app.config import settings
+from app.integrations.microsoft_graph import MicrosoftGraphClient
 from app.models.employee import Employee
 from app.schemas.entra_sync import (
     EntraConnectionStatus,
@@ -38,6 +39,8 @@ from app.schemas.entra_sync import (
     SignaturePreview,
     SyncScope,
 )
+from app.services.entra_graph_sync_service import EntraGraphSync
+from app.services.entra_import_job_service import entra_import_jobs
 
 logger = logging.getLogger(__name__)
 
@@ -47,8 +50,6 @@ class EntraSyncService:
 
     # Template directory path
     TEMPLATES_DIR = Path(__file__).parent.parent.parent / "scripts" / "templates"
-    IMPORT_SCRIPT_PATH = Path(__file__).parent.parent.parent / "scripts" / "import_entra_employees.py"
-    OFFICE_IMPORT_SCRIPT_PATH = Path(__file__).parent.parent.parent / "scripts" / "import_entra_offices.py"
 
     @staticmethod
     def is_enabled() -> bool:
@@ -98,166 +99,44 @@ class EntraSyncService:
         )
 
     @staticmethod
-    def import_entra_employees(*, dry_run: bool = False, filter_email: str | None = None) -> EntraImportResult:
-        """Import Entra ID users into local database (read-only to Entra)."""
-        script_path = EntraSyncService.IMPORT_SCRIPT_PATH
-        if not script_path.exists():
-            return EntraImportResult(
-                success=False,
-                dry_run=dry_run,
-                error=f"Import script not found at {script_path}",
-            )
-
-        env = os.environ.copy()
-        if settings.DATABASE_URL and not env.get("DATABASE_URL"):
-            env["DATABASE_URL"] = settings.DATABASE_URL
-        if settings.ENTRA_TENANT_ID and not env.get("ENTRA_TENANT_ID"):
-            env["ENTRA_TENANT_ID"] = settings.ENTRA_TENANT_ID
-        if settings.ENTRA_CLIENT_ID and not env.get("ENTRA_CLIENT_ID"):
-            env["ENTRA_CLIENT_ID"] = settings.ENTRA_CLIENT_ID
-        if settings.ENTRA_CLIENT_SECRET and not env.get("ENTRA_CLIENT_SECRET"):
-            env["ENTRA_CLIENT_SECRET"] = settings.ENTRA_CLIENT_SECRET
-
-        if not env.get("ENTRA_TENANT_ID") or not env.get("ENTRA_CLIENT_ID"):
-            return EntraImportResult(
-                success=False,
-                dry_run=dry_run,
-                error="ENTRA_TENANT_ID and ENTRA_CLIENT_ID must be configured",
-            )
-        if not env.get("ENTRA_CLIENT_SECRET"):
-            return EntraImportResult(
-                success=False,
-                dry_run=dry_run,
-                error="ENTRA_CLIENT_SECRET must be configured for Entra import",
-            )
-
-        cmd = [sys.executable, str(script_path), "--json"]
-        if dry_run:
-            cmd.append("--dry-run")
-        if filter_email:
-            cmd.extend(["--filter-email", filter_email])
-
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                cwd=str(script_path.parent.parent),
-                env=env,
-            )
-        except subprocess.TimeoutExpired:
-            return EntraImportResult(success=False, dry_run=dry_run, error="Import timed out after 5 minutes")
-        except Exception as exc:
-            logger.exception("Error running Entra import")
-            return EntraImportResult(success=False, dry_run=dry_run, error=str(exc))
-
-        if result.returncode != 0:
-            error_message = result.stderr.strip() or result.stdout.strip() or "Import failed"
-            return EntraImportResult(success=False, dry_run=dry_run, error=error_message)
-
-        try:
-            payload = json.loads(result.stdout.strip())
-        except json.JSONDecodeError:
-            return EntraImportResult(
-                success=False,
-                dry_run=dry_run,
-                error="Import completed but returned invalid JSON",
-            )
+    async def import_entra_employees(*, dry_run: bool = False, filter_email: str | None = None) -> EntraImportResult:
+        """Import Entra ID users into local database (read-only to Entra) and wait for the result.
 
+        Runs as a background import job (see ``entra_import_job_service``); the
+        import keeps running if the caller goes away.
+        """
+        options = {"dry_run": dry_run, "filter_email": filter_email}
+        job = await entra_import_jobs.wait((await entra_import_jobs.start("employees", options)).id)
+        result = (job.result if job else None) or {}
         return EntraImportResult(
-            success=True,
-            dry_run=payload.get("dry_run", False),
-            employees_loaded=payload.get("employees_loaded"),
-            matched_updated=payload.get("matched_updated"),
-            employees_not_matched=payload.get("employees_not_matched"),
-            entra_users_not_matched=payload.get("entra_users_not_matched"),
-            error=None,
+            success=job is not None and job.status == "succeeded",
+            dry_run=result.get("dry_run", dry_run),
+            employees_loaded=result.get("employees_loaded"),
+            matched_updated=result.get("matched_updated"),
+            employees_not_matched=result.get("employees_not_matched"),
+            entra_users_not_matched=result.get("entra_users_not_matched"),
+            error=job.error if job else "Import job not found",
         )
 
     @staticmethod
-    def import_entra_offices(
+    async def import_entra_offices(
         *,
         dry_run: bool = False,
         filter_office_id: str | None = None,
         fetch_details: bool = False,
     ) -> EntraOfficeImportResult:
-        """Import Entra ID M365 Groups into local office records (read-only to Entra)."""
-        script_path = EntraSyncService.OFFICE_IMPORT_SCRIPT_PATH
-        if not script_path.exists():
-            return EntraOfficeImportResult(
-                success=False,
-                dry_run=dry_run,
-                error=f"Import script not found at {script_path}",
-            )
-
-        env = os.environ.copy()
-        if settings.DATABASE_URL and not env.get("DATABASE_URL"):
-            env["DATABASE_URL"] = settings.DATABASE_URL
-        if settings.ENTRA_TENANT_ID and not env.get("ENTRA_TENANT_ID"):
-            env["ENTRA_TENANT_ID"] = settings.ENTRA_TENANT_ID
-        if settings.ENTRA_CLIENT_ID and not env.get("ENTRA_CLIENT_ID"):
-            env["ENTRA_CLIENT_ID"] = settings.ENTRA_CLIENT_ID
-        if settings.ENTRA_CLIENT_SECRET and not env.get("ENTRA_CLIENT_SECRET"):
-            env["ENTRA_CLIENT_SECRET"] = settings.ENTRA_CLIENT_SECRET
-
-        if not env.get("ENTRA_TENANT_ID") or not env.get("ENTRA_CLIENT_ID"):
-            return EntraOfficeImportResult(
-                success=False,
-                dry_run=dry_run,
-                error="ENTRA_TENANT_ID and ENTRA_CLIENT_ID must be configured",
-            )
-        if not env.get("ENTRA_CLIENT_SECRET"):
-            return EntraOfficeImportResult(
-                success=False,
-                dry_run=dry_run,
-                error="ENTRA_CLIENT_SECRET must be configured for Entra import",
-            )
-
-        cmd = [sys.executable, str(script_path), "--json"]
-        if dry_run:
-            cmd.append("--dry-run")
-        if filter_office_id:
-            cmd.extend(["--filter-office-id", filter_office_id])
-        if fetch_details:
-            cmd.append("--fetch-details")
-
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                cwd=str(script_path.parent.parent),
-                env=env,
-            )
-        except subprocess.TimeoutExpired:
-            return EntraOfficeImportResult(success=False, dry_run=dry_run, error="Import timed out after 5 minutes")
-        except Exception as exc:
-            logger.exception("Error running Entra office import")
-            return EntraOfficeImportResult(success=False, dry_run=dry_run, error=str(exc))
-
-        if result.returncode != 0:
-            error_message = result.stderr.strip() or result.stdout.strip() or "Import failed"
-            return EntraOfficeImportResult(success=False, dry_run=dry_run, error=error_message)
-
-        try:
-            payload = json.loads(result.stdout.strip())
-        except json.JSONDecodeError:
-            return EntraOfficeImportResult(
-                success=False,
-                dry_run=dry_run,
-                error="Import completed but returned invalid JSON",
-            )
-
+        """Import Entra ID M365 Groups into local office records (read-only to Entra) and wait for the result."""
+        options = {"dry_run": dry_run, "filter_office_id": filter_office_id, "fetch_details": fetch_details}
+        job = await entra_import_jobs.wait((await entra_import_jobs.start("offices", options)).id)
+        result = (job.result if job else None) or {}
         return EntraOfficeImportResult(
-            success=True,
-            dry_run=payload.get("dry_run", False),
-            offices_loaded=payload.get("offices_loaded"),
-            matched_updated=payload.get("matched_updated"),
-            offices_not_matched=payload.get("offices_not_matched"),
-            groups_not_matched=payload.get("groups_not_matched"),
-            error=None,
+            success=job is not None and job.status == "succeeded",
+            dry_run=result.get("dry_run", dry_run),
+            offices_loaded=result.get("offices_loaded"),
+            matched_updated=result.get("matched_updated"),
+            offices_not_matched=result.get("offices_not_matched"),
+            groups_not_matched=result.get("groups_not_matched"),
+            error=job.error if job else "Import job not found",
         )
 
     @staticmethod
@@ -424,7 +303,17 @@ class EntraSyncService:
         if not employee:
             return None
 
-        # Load templates
+        html_signature, text_signature = EntraSyncService.render_signature(employee)
+        return SignaturePreview(
+            employee_id=employee.id,
+            employee_name=employee.full_name,
+            html=html_signature,
+            text=text_signature,
+        )
+
+    @staticmethod
+    def render_signature(employee: Employee) -> tuple[str, str]:
+        """Render the (HTML, text) email signature for an employee with ``office`` loaded."""
         html_template_path = EntraSyncService.TEMPLATES_DIR / "email-signature.html"
         txt_template_path = EntraSyncService.TEMPLATES_DIR / "email-signature.txt"
 
@@ -440,11 +329,30 @@ class EntraSyncService:
         except FileNotFoundError:
             text_signature = f"{employee.full_name}\n{employee.title or ''}\n{employee.email or ''}"
 
-        return SignaturePreview(
-            employee_id=employee.id,
-            employee_name=employee.full_name,
-            html=html_signature,
-            text=text_signature,
+        return html_signature, text_signature
+
+    @staticmethod
+    def _sync_configuration_error() -> str | None:
+        """Why pushing to Entra cannot run, or None when it is configured."""
+        if not EntraSyncService.is_enabled():
+            return "Entra ID sync is not configured. Set ENTRA_TENANT_ID and ENTRA_CLIENT_ID."
+        if not (os.environ.get("ENTRA_CLIENT_SECRET") or settings.ENTRA_CLIENT_SECRET):
+            return "ENTRA_CLIENT_SECRET must be configured for Entra sync"
+        return None
+
+    @staticmethod
+    def writes_allowed() -> bool:
+        """Read-only policy: writes need ENTRA_ALLOW_WRITES=true (as for the PowerShell script)."""
+        return settings.ENTRA_ALLOW_WRITES
+
+    @staticmethod
+    def _graph_client() -> MicrosoftGraphClient:
+        return MicrosoftGraphClient(
+            tenant_id=os.environ.get("ENTRA_TENANT_ID") or settings.ENTRA_TENANT_ID,
+            client_id=os.environ.get("ENTRA_CLIENT_ID") or settings.ENTRA_CLIENT_ID,
+            client_secret=os.environ.get("ENTRA_CLIENT_SECRET") or settings.ENTRA_CLIENT_SECRET,
+            max_retries=settings.ENTRA_SYNC_MAX_RETRIES,
+            timeout=settings.ENTRA_SYNC_TIMEOUT_SECONDS,
         )
 
     @staticmethod
@@ -454,152 +362,9 @@ class EntraSyncService:
         scope: list[SyncScope],
         dry_run: bool = False,
     ) -> EntraSyncResult:
-        """Sync a single employee to Entra ID.
-
-        This method calls the PowerShell script to perform the actual sync.
-        For production use, the script should be run with proper credentials.
-        """
-        employee = await EntraSyncService.get_employee_with_office(db, employee_id)
-        if not employee:
-            return EntraSyncResult(
-                success=False,
-                employee_id=employee_id,
-                employee_name="Unknown",
-                error="Employee not found",
-            )
-
-        if not employee.email:
-            return EntraSyncResult(
-                success=False,
-                employee_id=employee.id,
-                employee_name=employee.full_name,
-                error="Employee has no email address",
-            )
-
-        # Check if Entra sync is enabled
-        if not EntraSyncService.is_enabled():
-            return EntraSyncResult(
-                success=False,
-                employee_id=employee.id,
-                employee_name=employee.full_name,
-                error="Entra ID sync is not configured. Set ENTRA_TENANT_ID and ENTRA_CLIENT_ID.",
-            )
-
-        # Build PowerShell command
-        script_path = Path(__file__).parent.parent.parent / "scripts" / "Sync-EntraIdEmployees.ps1"
-
-        if not script_path.exists():
-            return EntraSyncResult(
-                success=False,
-                employee_id=employee.id,
-                employee_name=employee.full_name,
-                error="Sync script not found",
-            )
-
-        # Get credentials from environment
-        tenant_id = os.environ.get("ENTRA_TENANT_ID")
-        client_id = os.environ.get("ENTRA_CLIENT_ID")
-        organization = os.environ.get("ENTRA_ORGANIZATION")
-        cert_thumbprint = os.environ.get("ENTRA_CERT_THUMBPRINT")
-        client_secret = os.environ.get("ENTRA_CLIENT_SECRET")
-
-        if not organization:
-            return EntraSyncResult(
-                success=False,
-                employee_id=employee.id,
-                employee_name=employee.full_name,
-                error="ENTRA_ORGANIZATION environment variable not set",
-            )
-
-        # Build command
-        cmd = [
-            "pwsh",
-            "-ExecutionPolicy",
-            "Bypass",
-            "-File",
-            str(script_path),
-            "-TenantId",
-            tenant_id,
-            "-ClientId",
-            client_id,
-            "-Organization",
-            organization,
-            "-FilterEmail",
-            employee.email,
-        ]
-
-        # Add auth method
-        if cert_thumbprint:
-            cmd.extend(["-CertificateThumbprint", cert_thumbprint])
-        elif client_secret:
-            # Client secret is passed via environment variable
-            pass
-        else:
-            return EntraSyncResult(
-                success=False,
-                employee_id=employee.id,
-                employee_name=employee.full_name,
-                error="No authentication method configured (certificate or secret)",
-            )
-
-        # Add scope flags
-        if "profile" not in scope:
-            cmd.append("-SkipProfile")
-        if "photo" not in scope:
-            cmd.append("-SkipPhoto")
-        if "signature" not in scope:
-            cmd.append("-SkipSignature")
-
-        if dry_run:
-            cmd.append("-DryRun")
-
-        cmd.append("-Force")  # Skip confirmation
-
-        try:
-            # Run the PowerShell script
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120,  # 2 minute timeout
-                cwd=str(script_path.parent.parent),  # backend directory
-            )
-
-            success = result.returncode == 0
-
-            return EntraSyncResult(
-                success=success,
-                employee_id=employee.id,
-                employee_name=employee.full_name,
-                entra_user_id=None,  # Would need to parse from output
-                profile_updated="profile" in scope and success,
-                photo_updated="photo" in scope and success,
-                signature_pushed="signature" in scope and success,
-                error=result.stderr if not success else None,
-            )
-
-        except subprocess.TimeoutExpired:
-            return EntraSyncResult(
-                success=False,
-                employee_id=employee.id,
-                employee_name=employee.full_name,
-                error="Sync timed out after 2 minutes",
-            )
-        except FileNotFoundError:
-            return EntraSyncResult(
-                success=False,
-                employee_id=employee.id,
-                employee_name=employee.full_name,
-                error="PowerShell (pwsh) not found. Install PowerShell 7+.",
-            )
-        except Exception as e:
-            logger.exception(f"Error syncing employee {employee_id}")
-            return EntraSyncResult(
-                success=False,
-                employee_id=employee.id,
-                employee_name=employee.full_name,
-                error=str(e),
-            )
+        """Sync a single employee to Entra ID (see ``sync_batch``)."""
+        batch = await EntraSyncService.sync_batch(db, [employee_id], scope, dry_run)
+        return batch.results[0]
 
     @staticmethod
     async def sync_batch(
@@ -608,19 +373,68 @@ class EntraSyncService:
         scope: list[SyncScope],
         dry_run: bool = False,
     ) -> EntraSyncBatchResult:
-        """Sync multiple employees to Entra ID."""
+        """Sync multiple employees to Entra ID.
+
+        Employees are loaded in one query and pushed together by ``EntraGraphSync``
+        over the shared pooled Graph client (``$batch`` lookups/profile patches, bounded
+        concurrent photo and signature uploads). Runs as a dry run unless
+        writes are allowed by policy.
+        """
+        rows = await db.execute(
+            select(Employee)
+            .options(selectinload(Employee.office).raiseload("*"), raiseload("*"))
+            .where(Employee.id.in_([str(employee_id) for employee_id in employee_ids]))
+        )
+        employees = {str(employee.id): employee for employee in rows.scalars().all()}
+
+        synced: dict[str, EntraSyncResult] = {}
+        error = EntraSyncService._sync_configuration_error()
+        if not error:
+            try:
+                engine = EntraGraphSync(
+                    EntraSyncService._graph_client(),
+                    render_signature=EntraSyncService.render_signature,
+                )
+                synced = await engine.sync(
+                    list(employees.values()),
+                    scope,
+                    dry_run=dry_run or not EntraSyncService.writes_allowed(),
+                )
+            except (httpx.HTTPError, ValueError) as exc:
+                logger.exception("Entra sync failed")
+                error = f"Entra sync failed: {exc}"
+
         results: list[EntraSyncResult] = []
+        for employee_id in employee_ids:
+            employee = employees.get(str(employee_id))
+            if not employee:
+                results.append(
+                    EntraSyncResult(
+                        success=False,
+                        employee_id=employee_id,
+                        employee_name="Unknown",
+                        error="Employee not found",
+                    )
+                )
+            elif str(employee_id) in synced:
+                results.append(synced[str(employee_id)])
+            else:
+                results.append(
+                    EntraSyncResult(
+                        success=False,
+                        employee_id=employee.id,
+                        employee_name=employee.full_name,
+                        error=error,
+                    )
+                )
+
         successful = 0
         failed = 0
         skipped = 0
         profiles_updated = 0
         photos_uploaded = 0
         signatures_pushed = 0
-
-        for employee_id in employee_ids:
-            result = await EntraSyncService.sync_employee(db, employee_id, scope, dry_run)
-            results.append(result)
-
+        for result in results:
             if result.success:
                 successful += 1
                 if result.profile_updated:
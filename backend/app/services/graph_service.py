@@ -1,5 +1,9 @@
 """
 Graph Service - Microsoft Graph email sender for signature notifications.
+
+Uses the process-wide pooled Graph client and token cache from
+``app.integrations.microsoft_graph``, so repeated sends reuse one connection
+and one access token until it is due for refresh.
 """
 
 from __future__ import annotations
@@ -11,13 +15,14 @@ from urllib.parse import quote
 
 import httpx
 
+from app.integrations.microsoft_graph import get_graph_http_client, graph_token_cache
+
 logger = logging.getLogger(__name__)
 
 
 class GraphService:
     """Service for Microsoft Graph mail operations."""
 
-    TOKEN_URL = "https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
     SEND_MAIL_URL = "https://graph.microsoft.com/v1.0/users/{sender}/sendMail"
 
     @staticmethod
@@ -29,27 +34,14 @@ class GraphService:
 
     @staticmethod
     async def get_access_token() -> str:
-        """Get Graph access token using client credentials flow."""
+        """Get Graph access token using client credentials flow (cached until shortly before expiry)."""
         tenant_id, client_id, client_secret = GraphService._get_credentials()
         if not tenant_id or not client_id or not client_secret:
             logger.error("Missing ENTRA Graph credentials; cannot request access token.")
             return ""
 
-        token_url = GraphService.TOKEN_URL.format(tenant_id=tenant_id)
-
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    token_url,
-                    data={
-                        "client_id": client_id,
-                        "client_secret": client_secret,
-                        "scope": "https://graph.microsoft.com/.default",
-                        "grant_type": "client_credentials",
-                    },
-                )
-                response.raise_for_status()
-                data = response.json()
+            return await graph_token_cache.get(tenant_id=tenant_id, client_id=client_id, client_secret=client_secret)
         except httpx.HTTPStatusError as exc:
             logger.error(
                 "Graph token request failed (status %s): %s",
@@ -60,14 +52,10 @@ class GraphService:
         except httpx.HTTPError as exc:
             logger.error("Graph token request failed: %s", exc)
             return ""
-
-        token = data.get("access_token")
-        if not token:
-            logger.error("Graph token response missing access_token.")
+        except ValueError as exc:
+            logger.error("%s.", exc)
             return ""
 
-        return token
-
     @staticmethod
     async def send_mail(
         sender_email: str,
@@ -125,9 +113,18 @@ class GraphService:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            client = get_graph_http_client()
+            response = await client.post(send_url, json=payload, headers=headers)
+            if response.status_code == 401:
+                # Token revoked or rotated before its expiry: fetch a new one and retry once
+                tenant_id, client_id, _ = GraphService._get_credentials()
+                graph_token_cache.invalidate(tenant_id=tenant_id, client_id=client_id)
+                token = await GraphService.get_access_token()
+                if not token:
+                    return False
+                headers["Authorization"] = f"Bearer {token}"
                 response = await client.post(send_url, json=payload, headers=headers)
-                response.raise_for_status()
+            response.raise_for_status()
         except httpx.HTTPStatusError as exc:
             logger.error(
                 "Graph sendMail failed (status %s): %s",
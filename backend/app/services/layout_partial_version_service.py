@@ -8,6 +8,7 @@ from uuid import UUID
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.layout_partial import LayoutPartial
 from app.models.layout_partial_version import LayoutPartialDefault, LayoutPartialVersion
@@ -16,6 +17,7 @@ from app.schemas.layout_partial_version import (
     LayoutPartialDefaultUpdate,
     LayoutPartialVersionCreate,
 )
+from app.services.content_blob_service import ContentBlobService
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +51,7 @@ class LayoutPartialVersionService:
             .order_by(LayoutPartialVersion.version_number.desc())
         )
         versions = list(result.scalars().all())
+        await LayoutPartialVersionService._load_content(db, versions)
 
         return versions, current_version
 
@@ -60,7 +63,31 @@ class LayoutPartialVersionService:
             .where(LayoutPartialVersion.partial_id == str(partial_id))
             .where(LayoutPartialVersion.version_number == version_number)
         )
-        return result.scalar_one_or_none()
+        version = result.scalar_one_or_none()
+        if version:
+            await LayoutPartialVersionService._load_content(db, [version])
+        return version
+
+    @staticmethod
+    async def _load_content(db: AsyncSession, versions: list[LayoutPartialVersion]) -> None:
+        """Fill ``html_content`` from the blob store for versions that only reference it (not marked dirty)."""
+        stored = [version for version in versions if version.html_content is None and version.content_hash]
+        if not stored:
+            return
+        contents = await ContentBlobService.get_many(db, [version.content_hash for version in stored])
+        for version in stored:
+            set_committed_value(version, "html_content", contents.get(version.content_hash))
+
+    @staticmethod
+    async def _store_content(db: AsyncSession, partial_id: UUID, html_content: str) -> str:
+        """Store a version body as a delta against the partial's latest stored version."""
+        previous = await db.execute(
+            select(LayoutPartialVersion.content_hash)
+            .where(LayoutPartialVersion.partial_id == str(partial_id), LayoutPartialVersion.content_hash.isnot(None))
+            .order_by(LayoutPartialVersion.version_number.desc())
+            .limit(1)
+        )
+        return await ContentBlobService.put(db, html_content, base_hash=previous.scalar_one_or_none())
 
     @staticmethod
     async def create_version(
@@ -88,13 +115,14 @@ class LayoutPartialVersionService:
         version = LayoutPartialVersion(
             partial_id=str(partial_id),
             version_number=max_version + 1,
-            html_content=data.html_content,
+            content_hash=await LayoutPartialVersionService._store_content(db, partial_id, data.html_content),
             change_notes=data.change_notes,
             created_by=data.created_by,
         )
         db.add(version)
         await db.flush()
         await db.refresh(version)
+        set_committed_value(version, "html_content", data.html_content)
 
         logger.info(f"Created version {version.version_number} for partial {partial_id}")
         return version
@@ -138,7 +166,7 @@ class LayoutPartialVersionService:
         new_version = LayoutPartialVersion(
             partial_id=str(partial_id),
             version_number=current_version_num + 1,
-            html_content=version.html_content,
+            content_hash=await LayoutPartialVersionService._store_content(db, partial_id, version.html_content),
             change_notes=f"Reverted from version {version_number}",
             created_by=reverted_by,
         )
@@ -3,17 +3,20 @@ Merge Field Service - Business logic for Flettekode operations.
 """
 
 import logging
-import re
 from uuid import UUID
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import Integer, String, case, column, func, literal, or_, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.merge_field import MergeField
 from app.models.template import Template
+from app.services.template_fingerprint_service import TemplateFingerprintService
 
 logger = logging.getLogger(__name__)
 
+# Paths per UPDATE ... FROM (VALUES ...) statement when applying usage counts
+USAGE_UPDATE_CHUNK_SIZE = 1000
+
 
 class MergeFieldService:
     """
@@ -25,11 +28,6 @@ class MergeFieldService:
     - Search and filtering
     """
 
-    # Regex patterns for Vitec merge field syntax
-    MERGE_FIELD_PATTERN = re.compile(r"\[\[(\*?)([^\]]+)\]\]")
-    VITEC_IF_PATTERN = re.compile(r'vitec-if="([^"]+)"')
-    VITEC_FOREACH_PATTERN = re.compile(r'vitec-foreach="(\w+)\s+in\s+([^"]+)"')
-
     @staticmethod
     async def get_list(
         db: AsyncSession,
@@ -251,25 +249,14 @@ class MergeFieldService:
         Returns:
             Dict with discovered fields, conditions, loops
         """
-        content = template.content or ""
-
-        # Extract merge fields [[field.name]]
-        merge_fields = set()
-        for match in cls.MERGE_FIELD_PATTERN.finditer(content):
-            field_path = match.group(2).strip()
-            merge_fields.add(field_path)
+        # Parsed once per content hash; unchanged templates reuse the stored fingerprint
+        fingerprint = await TemplateFingerprintService.get_for_content(db, template.content)
 
-        # Extract conditions vitec-if="..."
-        conditions = set()
-        for match in cls.VITEC_IF_PATTERN.finditer(content):
-            conditions.add(match.group(1))
-
-        # Extract loops vitec-foreach="item in collection"
-        loops = []
-        for match in cls.VITEC_FOREACH_PATTERN.finditer(content):
-            loops.append({"variable": match.group(1), "collection": match.group(2)})
-
-        return {"merge_fields": list(merge_fields), "conditions": list(conditions), "loops": loops}
+        return {
+            "merge_fields": list(fingerprint["merge_fields"]),
+            "conditions": list(fingerprint["conditions"]),
+            "loops": list(fingerprint["loops"]),
+        }
 
     @classmethod
     async def discover_all(cls, db: AsyncSession, *, create_missing: bool = True) -> dict:
@@ -283,21 +270,13 @@ class MergeFieldService:
         Returns:
             Dict with discovery statistics
         """
-        # Get all HTML templates
-        result = await db.execute(
-            select(Template).where(Template.file_type == "html").where(Template.content.isnot(None))
-        )
-        templates = list(result.scalars().all())
-
         # Get existing merge fields
         existing_result = await db.execute(select(MergeField.path))
         existing_paths = {row[0] for row in existing_result.all()}
 
-        # Discover from all templates
-        all_discovered = set()
-        for template in templates:
-            discovery = await cls.discover_from_template(db, template)
-            all_discovered.update(discovery["merge_fields"])
+        # Discover from all templates (only changed content is re-parsed)
+        scan = await TemplateFingerprintService.scan_library(db)
+        all_discovered = set(scan["field_usage"])
 
         # Separate new and existing
         new_fields = list(all_discovered - existing_paths)
@@ -335,9 +314,41 @@ class MergeFieldService:
             "discovered_count": len(all_discovered),
             "new_fields": new_fields,
             "existing_fields": existing_fields,
-            "templates_scanned": len(templates),
+            "templates_scanned": scan["templates_scanned"],
         }
 
+    @staticmethod
+    async def set_usage_counts(db: AsyncSession, usage: dict[str, int]) -> None:
+        """
+        Set ``usage_count`` for every merge field in bulk.
+
+        Paths in ``usage`` get their count, all other fields are reset to 0.
+        PostgreSQL applies the counts with ``UPDATE ... FROM (VALUES ...)``;
+        SQLite (no column aliases on VALUES) uses a single ``CASE`` update.
+
+        Args:
+            db: Database session
+            usage: Merge field path -> number of templates using it
+        """
+        paths = list(usage)
+        if db.get_bind().dialect.name == "sqlite":
+            counts = case(usage, value=MergeField.path, else_=0) if usage else literal(0)
+            await db.execute(update(MergeField).values(usage_count=counts))
+            return
+
+        await db.execute(
+            update(MergeField).where(MergeField.usage_count != 0, MergeField.path.not_in(paths)).values(usage_count=0)
+        )
+        for start in range(0, len(paths), USAGE_UPDATE_CHUNK_SIZE):
+            chunk = values(column("path", String), column("usage_count", Integer), name="usage").data(
+                [(path, usage[path]) for path in paths[start : start + USAGE_UPDATE_CHUNK_SIZE]]
+            )
+            await db.execute(
+                update(MergeField)
+                .where(MergeField.path == chunk.c.path, MergeField.usage_count.is_distinct_from(chunk.c.usage_count))
+                .values(usage_count=chunk.c.usage_count)
+            )
+
     @staticmethod
     async def increment_usage(db: AsyncSession, field_id: UUID) -> None:
         """
@@ -5,7 +5,7 @@ Notification Service - Business logic for notifications.
 import logging
 from uuid import UUID
 
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.employee import Employee
@@ -40,6 +40,34 @@ class NotificationService:
         logger.info("Created notification: %s (%s)", notification.type, notification.id)
         return notification
 
+    @staticmethod
+    async def create_many(db: AsyncSession, items: list[NotificationCreate]) -> int:
+        """
+        Insert several notifications in one batched INSERT (rows are not loaded back).
+
+        Returns:
+            Number of notifications created.
+        """
+        if not items:
+            return 0
+        await db.execute(
+            insert(Notification),
+            [
+                {
+                    "type": data.type,
+                    "entity_type": data.entity_type,
+                    "entity_id": str(data.entity_id) if data.entity_id else None,
+                    "title": data.title,
+                    "message": data.message,
+                    "severity": data.severity,
+                    "metadata_json": data.metadata,
+                }
+                for data in items
+            ],
+        )
+        logger.info("Created %d notifications", len(items))
+        return len(items)
+
     @staticmethod
     async def get_all(
         db: AsyncSession,
@@ -165,22 +193,19 @@ class NotificationService:
         }
 
     @staticmethod
-    async def notify_employee_added(db: AsyncSession, employee: Employee) -> Notification:
-        return await NotificationService.create(
-            db,
-            NotificationCreate(
-                type="employee_added",
-                entity_type="employee",
-                entity_id=employee.id,
-                title="Ny ansatt lagt til",
-                message=f"{employee.full_name} ble lagt til.",
-                severity="info",
-                metadata=NotificationService._employee_metadata(employee),
-            ),
+    def build_employee_added(employee: Employee) -> NotificationCreate:
+        return NotificationCreate(
+            type="employee_added",
+            entity_type="employee",
+            entity_id=employee.id,
+            title="Ny ansatt lagt til",
+            message=f"{employee.full_name} ble lagt til.",
+            severity="info",
+            metadata=NotificationService._employee_metadata(employee),
         )
 
     @staticmethod
-    async def notify_employee_updated(db: AsyncSession, employee: Employee, changed_fields: list[str]) -> Notification:
+    def build_employee_updated(employee: Employee, changed_fields: list[str]) -> NotificationCreate:
         fields = [field for field in changed_fields if field]
         fields_text = ", ".join(fields)
         message = (
@@ -190,17 +215,24 @@ class NotificationService:
         )
         metadata = NotificationService._employee_metadata(employee)
         metadata["changed_fields"] = fields
+        return NotificationCreate(
+            type="employee_updated",
+            entity_type="employee",
+            entity_id=employee.id,
+            title="Ansatt oppdatert",
+            message=message,
+            severity="info",
+            metadata=metadata,
+        )
+
+    @staticmethod
+    async def notify_employee_added(db: AsyncSession, employee: Employee) -> Notification:
+        return await NotificationService.create(db, NotificationService.build_employee_added(employee))
+
+    @staticmethod
+    async def notify_employee_updated(db: AsyncSession, employee: Employee, changed_fields: list[str]) -> Notification:
         return await NotificationService.create(
-            db,
-            NotificationCreate(
-                type="employee_updated",
-                entity_type="employee",
-                entity_id=employee.id,
-                title="Ansatt oppdatert",
-                message=message,
-                severity="info",
-                metadata=metadata,
-            ),
+            db, NotificationService.build_employee_updated(employee, changed_fields)
         )
 
     @staticmethod
@@ -219,40 +251,42 @@ class NotificationService:
         )
 
     @staticmethod
-    async def notify_office_added(db: AsyncSession, office: Office) -> Notification:
-        return await NotificationService.create(
-            db,
-            NotificationCreate(
-                type="office_added",
-                entity_type="office",
-                entity_id=office.id,
-                title="Nytt kontor lagt til",
-                message=f"{office.name} ble lagt til.",
-                severity="info",
-                metadata=NotificationService._office_metadata(office),
-            ),
+    def build_office_added(office: Office) -> NotificationCreate:
+        return NotificationCreate(
+            type="office_added",
+            entity_type="office",
+            entity_id=office.id,
+            title="Nytt kontor lagt til",
+            message=f"{office.name} ble lagt til.",
+            severity="info",
+            metadata=NotificationService._office_metadata(office),
         )
 
     @staticmethod
-    async def notify_office_updated(db: AsyncSession, office: Office, changed_fields: list[str]) -> Notification:
+    def build_office_updated(office: Office, changed_fields: list[str]) -> NotificationCreate:
         fields = [field for field in changed_fields if field]
         fields_text = ", ".join(fields)
         message = f"{office.name} ble oppdatert ({fields_text})." if fields_text else f"{office.name} ble oppdatert."
         metadata = NotificationService._office_metadata(office)
         metadata["changed_fields"] = fields
-        return await NotificationService.create(
-            db,
-            NotificationCreate(
-                type="office_updated",
-                entity_type="office",
-                entity_id=office.id,
-                title="Kontor oppdatert",
-                message=message,
-                severity="info",
-                metadata=metadata,
-            ),
+        return NotificationCreate(
+            type="office_updated",
+            entity_type="office",
+            entity_id=office.id,
+            title="Kontor oppdatert",
+            message=message,
+            severity="info",
+            metadata=metadata,
         )
 
+    @staticmethod
+    async def notify_office_added(db: AsyncSession, office: Office) -> Notification:
+        return await NotificationService.create(db, NotificationService.build_office_added(office))
+
+    @staticmethod
+    async def notify_office_updated(db: AsyncSession, office: Office, changed_fields: list[str]) -> Notification:
+        return await NotificationService.create(db, NotificationService.build_office_updated(office, changed_fields))
+
     @staticmethod
     async def notify_office_removed(db: AsyncSession, office: Office) -> Notification:
         return await NotificationService.create(
@@ -2,15 +2,17 @@
 Office Service - Business logic for office management.
 """
 
+import builtins
 import logging
 import re
+from collections.abc import Iterator
 from uuid import UUID
 
 from fastapi import HTTPException
 from sqlalchemy import func, select
 from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload, selectinload
 from sqlalchemy.orm.attributes import NO_VALUE
 
 from app.config import settings
@@ -163,7 +165,18 @@ class OfficeService:
         Returns:
             Created office
         """
-        office = Office(
+        office = OfficeService.build(data)
+        db.add(office)
+        await db.flush()
+        await db.refresh(office)
+
+        logger.info(f"Created office: {office.name} ({office.short_code})")
+        return office
+
+    @staticmethod
+    def build(data: OfficeCreate) -> Office:
+        """Unsaved Office for ``data`` (used by ``create`` and batched sync commits)."""
+        return Office(
             name=data.name,
             short_code=data.short_code.upper(),
             vitec_department_id=data.vitec_department_id,
@@ -182,12 +195,6 @@ class OfficeService:
             color=data.color,
             is_active=data.is_active,
         )
-        db.add(office)
-        await db.flush()
-        await db.refresh(office)
-
-        logger.info(f"Created office: {office.name} ({office.short_code})")
-        return office
 
     @staticmethod
     async def update(db: AsyncSession, office_id: UUID, data: OfficeUpdate) -> Office | None:
@@ -364,17 +371,30 @@ class OfficeService:
         return cleaned if cleaned else None
 
     @staticmethod
-    async def _ensure_unique_short_code(db: AsyncSession, base_code: str) -> str:
+    def _short_code_candidates(base_code: str) -> Iterator[str]:
         base = re.sub(r"[^A-Z0-9]", "", (base_code or "").upper()) or "OFF"
-        candidate = base[:10]
+        yield base[:10]
         suffix = 1
         while True:
+            suffix += 1
+            trim_len = max(1, 10 - len(str(suffix)))
+            yield f"{base[:trim_len]}{suffix}"
+
+    @staticmethod
+    async def _ensure_unique_short_code(db: AsyncSession, base_code: str) -> str:
+        candidates = OfficeService._short_code_candidates(base_code)
+        while True:
+            candidate = next(candidates)
             result = await db.execute(select(Office).where(Office.short_code == candidate))
             if not result.scalar_one_or_none():
                 return candidate
-            suffix += 1
-            trim_len = max(1, 10 - len(str(suffix)))
-            candidate = f"{base[:trim_len]}{suffix}"
+
+    @staticmethod
+    def _claim_short_code(base_code: str, taken: set[str]) -> str:
+        """First free short code for ``base_code`` given the codes in ``taken`` (which it is added to)."""
+        candidate = next(c for c in OfficeService._short_code_candidates(base_code) if c not in taken)
+        taken.add(candidate)
+        return candidate
 
     @staticmethod
     def _map_department_payload(raw: dict) -> dict:
@@ -448,22 +468,7 @@ class OfficeService:
         if not existing:
             base_code = str(payload.get("department_number") or payload.get("name") or "OFF")
             short_code = await OfficeService._ensure_unique_short_code(db, base_code)
-            office = Office(
-                name=payload.get("name") or "Vitec Office",
-                legal_name=payload.get("legal_name"),
-                short_code=short_code,
-                organization_number=org_number,
-                vitec_department_id=department_id,
-                email=payload.get("email"),
-                phone=payload.get("phone"),
-                street_address=payload.get("street_address"),
-                postal_code=payload.get("postal_code"),
-                city=payload.get("city"),
-                description=payload.get("description"),
-                profile_image_url=payload.get("profile_image_url"),
-                banner_image_url=payload.get("banner_image_url"),
-                is_active=payload.get("is_active") if payload.get("is_active") is not None else True,
-            )
+            office = OfficeService._build_from_hub(payload, short_code)
             db.add(office)
             await db.flush()
             await db.refresh(office)
@@ -473,19 +478,52 @@ class OfficeService:
                 logger.warning("Failed to create office added notification: %s", exc)
             return office, "created"
 
-        updated = False
+        changed_fields = OfficeService._apply_hub_payload(existing, payload)
+        if changed_fields:
+            await db.flush()
+            await db.refresh(existing)
+            try:
+                await NotificationService.notify_office_updated(db, existing, changed_fields)
+            except Exception as exc:
+                logger.warning("Failed to create office updated notification: %s", exc)
+            return existing, "updated"
+
+        return existing, "skipped"
+
+    @staticmethod
+    def _build_from_hub(payload: dict, short_code: str) -> Office:
+        return Office(
+            name=payload.get("name") or "Vitec Office",
+            legal_name=payload.get("legal_name"),
+            short_code=short_code,
+            organization_number=payload.get("organization_number"),
+            vitec_department_id=payload.get("vitec_department_id"),
+            email=payload.get("email"),
+            phone=payload.get("phone"),
+            street_address=payload.get("street_address"),
+            postal_code=payload.get("postal_code"),
+            city=payload.get("city"),
+            description=payload.get("description"),
+            profile_image_url=payload.get("profile_image_url"),
+            banner_image_url=payload.get("banner_image_url"),
+            is_active=payload.get("is_active") if payload.get("is_active") is not None else True,
+        )
+
+    @staticmethod
+    def _apply_hub_payload(existing: Office, payload: dict) -> builtins.list[str]:
+        """Copy Vitec values that differ onto ``existing``; returns the changed field names."""
         changed_fields: list[str] = []
+        org_number = payload.get("organization_number")
+        department_id = payload.get("vitec_department_id")
 
         # Update organization_number if we now have it
         if org_number and existing.organization_number != org_number:
             existing.organization_number = org_number
-            updated = True
             changed_fields.append("organization_number")
 
         # Update department_id if we now have it
         if department_id is not None and existing.vitec_department_id != department_id:
             existing.vitec_department_id = department_id
-            updated = True
             changed_fields.append("vitec_department_id")
 
         # Update other fields
@@ -506,25 +544,13 @@ class OfficeService:
                 continue
             if getattr(existing, field) != value:
                 setattr(existing, field, value)
-                updated = True
                 changed_fields.append(field)
 
         if payload.get("is_active") is not None and existing.is_active != payload.get("is_active"):
             existing.is_active = payload.get("is_active")
-            updated = True
             changed_fields.append("is_active")
 
-        if updated:
-            await db.flush()
-            await db.refresh(existing)
-            if changed_fields:
-                try:
-                    await NotificationService.notify_office_updated(db, existing, changed_fields)
-                except Exception as exc:
-                    logger.warning("Failed to create office updated notification: %s", exc)
-            return existing, "updated"
-
-        return existing, "skipped"
+        return changed_fields
 
     @staticmethod
     async def sync_from_hub(
@@ -540,20 +566,69 @@ class OfficeService:
         departments = await hub.get_departments(install_id)
         created = updated = skipped = 0
         sync_errors: list[str] = []
+
+        # Same match priority as upsert_from_hub, against offices loaded once
+        # raiseload: the sync only touches columns, so skip the eager-loaded relationship queries
+        offices = list((await db.execute(select(Office).options(raiseload("*")))).scalars().all())
+        by_org_number: dict[str, Office] = {}
+        by_department: dict[int, Office] = {}
+        by_name: dict[str, Office] = {}
+
+        def index(office: Office) -> None:
+            if office.organization_number:
+                by_org_number.setdefault(office.organization_number, office)
+            if office.vitec_department_id is not None:
+                by_department.setdefault(office.vitec_department_id, office)
+            by_name.setdefault(office.name, office)
+
+        for office in offices:
+            index(office)
+        short_codes = {office.short_code for office in offices}
+
+        added: list[Office] = []
+        changed: list[tuple[Office, list[str]]] = []
         for raw in departments:
             payload = OfficeService._map_department_payload(raw or {})
             if not payload.get("name"):
                 skipped += 1
                 sync_errors.append("missing_office_name")
                 continue
-            _, action = await OfficeService.upsert_from_hub(db, payload)
-            if action == "created":
+
+            org_number = payload.get("organization_number")
+            department_id = payload.get("vitec_department_id")
+            existing = (
+                (by_org_number.get(org_number) if org_number else None)
+                or (by_department.get(department_id) if department_id is not None else None)
+                or by_name.get(payload["name"])
+            )
+            if not existing:
+                base_code = str(payload.get("department_number") or payload.get("name") or "OFF")
+                office = OfficeService._build_from_hub(payload, OfficeService._claim_short_code(base_code, short_codes))
+                db.add(office)
+                index(office)
+                added.append(office)
                 created += 1
-            elif action == "updated":
+                continue
+
+            changed_fields = OfficeService._apply_hub_payload(existing, payload)
+            if changed_fields:
+                index(existing)
+                changed.append((existing, changed_fields))
                 updated += 1
             else:
                 skipped += 1
 
+        # One flush writes all inserts/updates in batches; notifications go in one INSERT
+        await db.flush()
+        try:
+            await NotificationService.create_many(
+                db,
+                [NotificationService.build_office_added(office) for office in added]
+                + [NotificationService.build_office_updated(office, fields) for office, fields in changed],
+            )
+        except Exception as exc:
+            logger.warning("Failed to create office sync notifications: %s", exc)
+
         # Explicitly commit all changes
         if sync_errors:
             try:
@@ -100,7 +100,13 @@ class ReportBudgetService:
                 for m in range(1, 13):
                     by_month[m] += missing_each
 
-        sales = SalesReportService()
+        # One cache sync + one grouped query for all 12 months.
+        monthly = await SalesReportService().get_monthly_revenue(
+            department_id=department_id,
+            year=year,
+            include_vat=include_vat,
+        )
+        actual_by_month = {int(row["month"]): float(row["total_revenue"] or 0.0) for row in monthly["months"]}
         month_rows: list[dict] = []
         ytd_actual = 0.0
         ytd_budget = 0.0
@@ -108,20 +114,7 @@ class ReportBudgetService:
         current_month = 12 if year < now.year else now.month
 
         for m in range(1, 13):
-            from_date = f"{year}-{m:02d}-01"
-            if m == 12:
-                to_date = f"{year}-12-31"
-            else:
-                to_date = f"{year}-{m + 1:02d}-01"
-                to_date = (datetime.fromisoformat(to_date) - datetime.resolution).strftime("%Y-%m-%d")
-            data = await sales.get_report_data(
-                department_id=department_id,
-                from_date=from_date,
-                to_date=to_date,
-                include_vat=include_vat,
-                year=year,
-            )
-            actual = float(data.get("total_revenue") or 0.0)
+            actual = actual_by_month.get(m, 0.0)
             budget = float(by_month[m] or 0.0)
             variance = actual - budget
             achieved = (actual / budget * 100.0) if budget > 0 else 0.0
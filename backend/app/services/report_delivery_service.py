@@ -2,13 +2,19 @@
 Report Delivery Service
 """
 
+import logging
 from datetime import date, timedelta
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.config import settings
 from app.models.report_subscription import ReportSubscription
 from app.services.graph_service import GraphService
+from app.services.report_subscription_service import ReportSubscriptionService
 from app.services.sales_report_service import SalesReportService
 
+logger = logging.getLogger(__name__)
+
 
 class ReportDeliveryService:
     def __init__(self) -> None:
@@ -85,3 +91,19 @@ class ReportDeliveryService:
             html_body=html,
             attachments=attachments,
         )
+
+    async def claim_due(self, db: AsyncSession) -> list[ReportSubscription]:
+        """Claim every due subscription by scheduling its next run. Caller commits before sending."""
+        due = await ReportSubscriptionService.due_subscriptions(db)
+        for item in due:
+            ReportSubscriptionService.claim_run(item)
+        return due
+
+    async def deliver(self, sub: ReportSubscription) -> tuple[bool, str | None]:
+        """Send a claimed subscription. Returns (success, error)."""
+        try:
+            ok = await self.send_subscription(sub)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Report subscription %s failed: %s", sub.id, exc)
+            return False, str(exc)[:500]
+        return ok, None if ok else "send_failed"
@@ -0,0 +1,220 @@
+"""
+Report Scheduler Service
+
+In-process background loops started from the FastAPI lifespan:
+
+- **Cache warming**: syncs every report department's sales cache for the
+  current year so interactive report requests read a fresh cache instead of
+  calling Vitec (see ``SalesReportService._sync_sales_cache(max_age_seconds=...)``).
+- **Subscriptions**: claims due ``ReportSubscription`` rows, commits, then sends
+  them through ``ReportDeliveryService`` (same path as ``POST /api/reports/subscriptions/run-due``).
+
+Each loop sleeps ``interval + random(0, jitter)`` between runs so replicas drift
+apart. Departments are warmed with bounded concurrency; a department already
+being warmed in this process is skipped, and PostgreSQL advisory try-locks keep
+replicas from syncing the same department or sending the same subscriptions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import advisory_lock_key, async_session_factory
+from app.services.report_delivery_service import ReportDeliveryService
+from app.services.report_subscription_service import ReportSubscriptionService
+from app.services.sales_report_service import SalesReportService
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTIONS_LOCK_NAME = "report_subscriptions:run_due"
+
+
+class ReportScheduler:
+    """Background cache warming and subscription delivery with simple run metrics."""
+
+    def __init__(
+        self,
+        *,
+        sales: SalesReportService | None = None,
+        delivery: ReportDeliveryService | None = None,
+    ) -> None:
+        self._sales = sales
+        self._delivery = delivery
+        self._tasks: list[asyncio.Task] = []
+        self._department_locks: dict[int, asyncio.Lock] = {}
+        self.metrics: dict[str, Any] = {
+            "warm_runs": 0,
+            "warm_departments_synced": 0,
+            "warm_departments_skipped": 0,
+            "warm_departments_failed": 0,
+            "last_warm_started_at": None,
+            "last_warm_duration_ms": None,
+            "last_warm_error": None,
+            "subscription_runs": 0,
+            "subscriptions_sent": 0,
+            "subscriptions_failed": 0,
+            "last_subscription_run_at": None,
+            "last_subscription_error": None,
+        }
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self) -> None:
+        """Start both loops (no-op if already running)."""
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(
+                self._loop("cache-warm", settings.REPORTS_CACHE_WARM_INTERVAL_SECONDS, self.warm_caches),
+                name="report-scheduler-cache-warm",
+            ),
+            asyncio.create_task(
+                self._loop("subscriptions", settings.REPORTS_SUBSCRIPTION_POLL_SECONDS, self.run_due_subscriptions),
+                name="report-scheduler-subscriptions",
+            ),
+        ]
+        logger.info(
+            "Report scheduler started (warm every %ss, subscriptions every %ss)",
+            settings.REPORTS_CACHE_WARM_INTERVAL_SECONDS,
+            settings.REPORTS_SUBSCRIPTION_POLL_SECONDS,
+        )
+
+    async def stop(self) -> None:
+        """Cancel the loops and wait for them to finish."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self, name: str, interval_seconds: int, run) -> None:
+        jitter = max(0, settings.REPORTS_SCHEDULER_JITTER_SECONDS)
+        await asyncio.sleep(random.uniform(0, jitter))
+        while True:
+            try:
+                await run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("Report scheduler %s run failed: %s", name, exc)
+            await asyncio.sleep(max(1, interval_seconds) + random.uniform(0, jitter))
+
+    def _sales_service(self) -> SalesReportService:
+        if self._sales is None:
+            self._sales = SalesReportService()
+        return self._sales
+
+    async def warm_caches(self) -> dict[str, int]:
+        """Warm every report department once. Returns synced/skipped/failed counts for this run."""
+        sales = self._sales_service()
+        counts = {"synced": 0, "skipped": 0, "failed": 0}
+        if not sales.is_configured:
+            return counts
+
+        started = time.perf_counter()
+        self.metrics["warm_runs"] += 1
+        self.metrics["last_warm_started_at"] = datetime.now(UTC).isoformat()
+        department_ids = await sales.list_report_department_ids()
+        sem = asyncio.Semaphore(max(1, settings.REPORTS_FANOUT_CONCURRENCY))
+
+        async def warm_one(department_id: int) -> None:
+            lock = self._department_locks.setdefault(department_id, asyncio.Lock())
+            if lock.locked():
+                counts["skipped"] += 1
+                return
+            async with lock, sem:
+                try:
+                    result = await sales.warm_department_cache(department_id)
+                except Exception as exc:
+                    counts["failed"] += 1
+                    self.metrics["last_warm_error"] = f"{department_id}: {str(exc)[:200]}"
+                    logger.warning("Cache warm failed for department %s: %s", department_id, exc)
+                    return
+                counts["skipped" if result.get("skipped") else "synced"] += 1
+
+        await asyncio.gather(*[warm_one(dep_id) for dep_id in department_ids])
+        self.metrics["warm_departments_synced"] += counts["synced"]
+        self.metrics["warm_departments_skipped"] += counts["skipped"]
+        self.metrics["warm_departments_failed"] += counts["failed"]
+        self.metrics["last_warm_duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info("Report cache warm: %s", counts)
+        return counts
+
+    async def run_due_subscriptions(self) -> dict[str, int]:
+        """
+        Send due subscriptions (skipped while another process holds the run lock).
+
+        Due subscriptions are claimed (next run scheduled) and committed before any mail is
+        sent, so no transaction or run lock is held across Graph calls. Each result is then
+        recorded in its own short session.
+        """
+        delivery = self._delivery or ReportDeliveryService()
+        self.metrics["subscription_runs"] += 1
+        self.metrics["last_subscription_run_at"] = datetime.now(UTC).isoformat()
+        async with async_session_factory() as db:
+            if db.get_bind().dialect.name != "sqlite":
+                lock_key = advisory_lock_key(SUBSCRIPTIONS_LOCK_NAME)
+                if not (await db.execute(text(f"SELECT pg_try_advisory_xact_lock({lock_key})"))).scalar():
+                    return {"processed": 0, "sent": 0, "failed": 0}
+            try:
+                claimed = await delivery.claim_due(db)
+                await db.commit()
+            except Exception as exc:
+                await db.rollback()
+                self.metrics["last_subscription_error"] = str(exc)[:200]
+                raise
+
+        result = {"processed": len(claimed), "sent": 0, "failed": 0}
+        for item in claimed:
+            ok, error = await delivery.deliver(item)
+            result["sent" if ok else "failed"] += 1
+            try:
+                async with async_session_factory() as db:
+                    await ReportSubscriptionService.record_result(db, item.id, success=ok, error=error)
+                    await db.commit()
+            except Exception as exc:
+                self.metrics["last_subscription_error"] = str(exc)[:200]
+                logger.warning("Recording report subscription %s result failed: %s", item.id, exc)
+        self.metrics["subscriptions_sent"] += result["sent"]
+        self.metrics["subscriptions_failed"] += result["failed"]
+        return result
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "enabled": settings.REPORTS_SCHEDULER_ENABLED,
+            "running": self.running,
+            "cache_warm_interval_seconds": settings.REPORTS_CACHE_WARM_INTERVAL_SECONDS,
+            "subscription_poll_seconds": settings.REPORTS_SUBSCRIPTION_POLL_SECONDS,
+            **self.metrics,
+        }
+
+
+_scheduler: ReportScheduler | None = None
+
+
+def get_report_scheduler() -> ReportScheduler:
+    """Process-wide scheduler instance."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ReportScheduler()
+    return _scheduler
+
+
+def start_report_scheduler() -> None:
+    """Start the scheduler from the app lifespan when enabled."""
+    if settings.REPORTS_SCHEDULER_ENABLED:
+        get_report_scheduler().start()
+
+
+async def stop_report_scheduler() -> None:
+    if _scheduler is not None:
+        await _scheduler.stop()
@@ -128,10 +128,17 @@ class ReportSubscriptionService:
 
     @staticmethod
     def mark_run(item: ReportSubscription, *, success: bool, error: str | None = None) -> None:
-        now = datetime.utcnow()
-        item.last_run_at = now
+        ReportSubscriptionService.claim_run(item)
         item.last_status = "success" if success else "failed"
         item.last_error = error
+
+    @staticmethod
+    def claim_run(item: ReportSubscription) -> None:
+        """Schedule the next run before sending so a concurrent or repeated run skips this one."""
+        now = datetime.utcnow()
+        item.last_run_at = now
+        item.last_status = "sending"
+        item.last_error = None
         item.next_run_at = _next_run_at(
             cadence=item.cadence,
             day_of_week=item.day_of_week,
@@ -139,3 +146,12 @@ class ReportSubscriptionService:
             send_hour=item.send_hour,
             now=now + timedelta(minutes=1),
         )
+
+    @staticmethod
+    async def record_result(db: AsyncSession, subscription_id, *, success: bool, error: str | None = None) -> None:
+        """Store the outcome of a claimed run. Caller commits."""
+        item = await db.get(ReportSubscription, subscription_id)
+        if not item:
+            return
+        item.last_status = "success" if success else "failed"
+        item.last_error = error
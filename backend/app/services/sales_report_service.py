@@ -23,25 +23,33 @@ and future KPI sources coexist with live Vitec Next data.  Current values:
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import hashlib
-import io
 import logging
 import re
+import tempfile
+import time
 from collections import defaultdict
+from collections.abc import AsyncIterator, Iterator
 from datetime import datetime, timedelta, timezone
 from typing import Any
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import and_, select, text
+from sqlalchemy import and_, case, delete, insert, literal, or_, select, text
 from sqlalchemy import func as sa_func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.config import settings
-from app.database import async_session_factory
+from app.database import advisory_lock_key, async_session_factory
 from app.models.office import Office
 from app.models.report_sales_cache import (
+    ADDRESS_LOOKUP_FOUND,
+    ADDRESS_LOOKUP_NOT_FOUND,
     DATA_SOURCE_VITEC_NEXT,
     ReportSalesCacheState,
     ReportSalesEstateCache,
+    ReportSalesMonthlyRollup,
     ReportSalesSyncEvent,
     ReportSalesTransactionCache,
 )
@@ -140,6 +148,81 @@ SYNC_SOURCES: dict[str, dict[str, Any]] = {
 }
 
 
+# Rows per INSERT ... ON CONFLICT statement during cache sync. Keeps bind
+# parameter counts well below asyncpg/SQLite limits (~11 columns per row).
+UPSERT_CHUNK_SIZE = 500
+
+# Values written for estates Vitec's list endpoint has no data for. A sync must not
+# replace an address/metadata found by a detail lookup with these.
+ESTATE_PLACEHOLDER_VALUES = {
+    "address": "(ukjent adresse)",
+    "property_type": "—",
+    "assignment_type": "—",
+}
+
+# Concurrent estate detail lookups when filling in missing addresses.
+ESTATE_LOOKUP_CONCURRENCY = 5
+
+# Excel exports are written with openpyxl write-only sheets into a spooled
+# temp file (in memory up to the limit, then on disk) and streamed in chunks.
+EXCEL_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+EXCEL_STREAM_CHUNK_SIZE = 64 * 1024
+# Cached transaction rows fetched per round trip when streaming an export's detail rows.
+EXCEL_TRANSACTION_BATCH_SIZE = 1000
+
+
+def _dialect_name(db) -> str | None:
+    try:
+        return db.get_bind().dialect.name
+    except Exception:
+        return None
+
+
+def _interactive_cache_max_age() -> float | None:
+    """
+    Cache age (seconds) under which report requests skip the Vitec sync.
+
+    Only when the in-app scheduler keeps caches warm; otherwise every request syncs.
+    """
+    if not settings.REPORTS_SCHEDULER_ENABLED:
+        return None
+    return float(settings.REPORTS_CACHE_WARM_INTERVAL_SECONDS * 2)
+
+
+def _data_freshness_note() -> str:
+    """Describe when a report load re-syncs from Vitec (shown under the report scope)."""
+    max_age = _interactive_cache_max_age()
+    if max_age is None:
+        return "Current month re-synced on every load; past months cached"
+    return (
+        f"Cache reused while newer than {round(max_age / 60)} min; "
+        "after that the current month is re-synced on load; past months cached"
+    )
+
+
+def _report_department_ids(departments: list[dict]) -> list[int]:
+    """Vitec department IDs included in franchise-wide reports (settlement/Pacta units excluded)."""
+    selected: list[int] = []
+    for dep in departments or []:
+        dep_id = dep.get("departmentId") or dep.get("id")
+        dep_name = str(dep.get("name") or "").lower()
+        if dep_id is None:
+            continue
+        if "oppgjør" in dep_name or "pacta" in dep_name:
+            continue
+        try:
+            selected.append(int(dep_id))
+        except (TypeError, ValueError):
+            continue
+    return list(dict.fromkeys(selected))
+
+
+def _month_fetch_concurrency() -> int:
+    """Concurrent month fetches per sync, never above the Vitec requests-per-second budget."""
+    rps = max(1, settings.VITEC_RATE_LIMIT_REQUESTS_PER_SECOND)
+    return max(1, min(settings.VITEC_SALES_SYNC_MONTH_CONCURRENCY, rps))
+
+
 def _parse_iso_datetime(value: str | None) -> datetime | None:
     if not value:
         return None
@@ -152,6 +235,11 @@ def _parse_iso_datetime(value: str | None) -> datetime | None:
         return None
 
 
+def _as_utc(dt: datetime) -> datetime:
+    """Treat naive datetimes (SQLite round-trips) as UTC."""
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
 def _month_key(year: int, month: int) -> str:
     return f"{year:04d}-{month:02d}"
 
@@ -180,6 +268,64 @@ def _month_bounds(year: int, month: int) -> tuple[datetime, datetime]:
     return start, end
 
 
+def _write_only_workbook(title: str):
+    """Create a write-only workbook with a single sheet named ``title``."""
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    return wb, wb.create_sheet(title)
+
+
+def _styled_row(ws, values: list, font) -> list:
+    """Wrap each value in a ``WriteOnlyCell`` carrying ``font``."""
+    from openpyxl.cell import WriteOnlyCell
+
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = font
+        cells.append(cell)
+    return cells
+
+
+def _save_to_spool(wb):
+    """Save ``wb`` to a spooled temp file and rewind it for reading."""
+    spool = tempfile.SpooledTemporaryFile(max_size=EXCEL_SPOOL_MAX_BYTES)
+    try:
+        wb.save(spool)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def _iter_file_chunks(fh, chunk_size: int = EXCEL_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield ``fh`` in chunks and close it when exhausted or abandoned."""
+    try:
+        while chunk := fh.read(chunk_size):
+            yield chunk
+    finally:
+        fh.close()
+
+
+def _read_and_close(fh) -> bytes:
+    with fh:
+        return fh.read()
+
+
+def _whole_months_in_range(from_dt: datetime, to_dt: datetime) -> list[tuple[int, int]]:
+    """Months covered by [from_dt, to_dt] if it starts and ends on UTC month boundaries, else []."""
+    months = _iter_months(from_dt, to_dt)
+    if not months:
+        return []
+    first_start, _ = _month_bounds(*months[0])
+    _, last_end = _month_bounds(*months[-1])
+    if from_dt.astimezone(timezone.utc) != first_start or to_dt.astimezone(timezone.utc) != last_end:
+        return []
+    return months
+
+
 def _normalize_account(account: str | None) -> str:
     """Normalize account number for comparison (strip, handle None)."""
     if account is None:
@@ -217,6 +363,35 @@ def _needs_address_enrichment(addr: str) -> bool:
     return False
 
 
+def _address_enrichment_candidates(estate_ids: set[str], estate_address: dict[str, str]) -> list[str]:
+    """Estate IDs worth a detail lookup: real UUIDs whose known address is missing or a placeholder."""
+    return sorted(
+        eid
+        for eid in estate_ids
+        if eid
+        and eid != "(ukjent)"
+        and _looks_like_uuid(eid)
+        and _needs_address_enrichment(estate_address.get(eid, ""))
+    )
+
+
+def _apply_estate_detail(
+    eid: str,
+    detail: dict[str, Any] | None,
+    estate_address: dict[str, str],
+    estate_metadata: dict[str, dict[str, str]],
+) -> bool:
+    """Copy address/metadata from an estate detail payload. Returns False when it has no address."""
+    addr = _build_estate_address(detail) if detail else ""
+    if not addr:
+        return False
+    estate_address[eid] = addr
+    meta = _build_estate_metadata(detail)
+    if meta:
+        estate_metadata[eid] = meta
+    return True
+
+
 def _build_estate_address(est: dict) -> str:
     """Build display address from estate object (Vitec Next field names may vary)."""
     # Direct full address
@@ -305,12 +480,165 @@ def _infer_broker_role(employee: dict) -> str:
     return "unknown"
 
 
+def _cached_transaction_filters(
+    installation_id: str,
+    department_id: int,
+    from_dt: datetime,
+    to_dt: datetime,
+    accounts: set[str],
+) -> list:
+    """WHERE clauses selecting a department's report transactions from the cache."""
+    tx = ReportSalesTransactionCache
+    return [
+        tx.installation_id == installation_id,
+        tx.department_id == department_id,
+        tx.posting_date.is_not(None),
+        tx.posting_date >= from_dt,
+        tx.posting_date <= to_dt,
+        tx.account.in_(sorted(accounts)),
+        tx.user_id != "",
+    ]
+
+
+def _property_transaction(txn: dict, include_vat: bool) -> dict:
+    """Transaction row as shown in a property's drill-down (``txn`` uses Vitec's camelCase keys)."""
+    return {
+        "posting_date": _format_date_iso(txn.get("postingDate")),
+        "account": txn.get("account"),
+        "description": (txn.get("description") or "")[:80],
+        "amount": round(
+            _revenue_amount(float(txn.get("amount") or 0), float(txn.get("vatAmount") or 0), include_vat),
+            2,
+        ),
+    }
+
+
+def _cached_transaction(
+    account: str | None,
+    user_id: str,
+    estate_id: str,
+    amount: float | None,
+    vat_amount: float | None,
+    description: str | None,
+    posting_date: datetime | None,
+) -> dict:
+    """Cached transaction row in the Vitec camelCase shape the report builders read."""
+    return {
+        "account": account,
+        "userId": user_id,
+        "estateId": estate_id,
+        "amount": amount,
+        "vatAmount": vat_amount,
+        "description": description,
+        "postingDate": posting_date.isoformat() if posting_date else None,
+    }
+
+
+async def _iter_broker_estates(
+    broker_estates: dict[str, dict[str, list[dict]]],
+    broker_ids: list[str],
+) -> AsyncIterator[tuple[str, dict[str, list[dict]]]]:
+    """Yield already-loaded ``broker_estates`` in ``broker_ids`` order (see ``_write_excel``)."""
+    for broker_id in broker_ids:
+        yield broker_id, broker_estates.get(broker_id, {})
+
+
+def _resolve_report_range(
+    year: int | None,
+    from_date: str | None,
+    to_date: str | None,
+) -> tuple[int, str, str, datetime, datetime]:
+    """(year, from_date, to_date, from_dt, to_dt) with defaults: start of ``year`` through today."""
+    y = year or datetime.now().year
+    if from_date:
+        from_date = from_date if "T" in from_date else f"{from_date}T00:00:00"
+    else:
+        from_date = f"{y}-01-01T00:00:00"
+    if to_date:
+        to_date = to_date if "T" in to_date else f"{to_date}T23:59:59"
+    else:
+        to_date = datetime.now().strftime("%Y-%m-%dT23:59:59")
+
+    from_dt = _parse_iso_datetime(from_date)
+    to_dt = _parse_iso_datetime(to_date)
+    if from_dt is None or to_dt is None:
+        raise ValueError("Invalid from_date/to_date format.")
+    return y, from_date, to_date, from_dt, to_dt
+
+
+def _sum_broker_estate_totals(
+    broker_estates: dict[str, dict[str, list[dict]]],
+    include_vat: bool,
+) -> dict[str, dict[str, float]]:
+    """Revenue per broker per estate from raw transaction payloads (live path)."""
+    return {
+        broker_id: {
+            estate_id: sum(
+                _revenue_amount(float(t.get("amount") or 0), float(t.get("vatAmount") or 0), include_vat) for t in txns
+            )
+            for estate_id, txns in estates.items()
+        }
+        for broker_id, estates in broker_estates.items()
+    }
+
+
+def _build_broker_map(employees: list[dict] | None) -> dict[str, str]:
+    """Map Vitec employeeId -> display name."""
+    broker_map: dict[str, str] = {}
+    for emp in employees or []:
+        eid = emp.get("employeeId")
+        name = emp.get("name")
+        if eid and name:
+            broker_map[str(eid).strip()] = str(name).strip()
+    return broker_map
+
+
+class ReportFanoutContext:
+    """
+    Request-scoped state shared by per-department report builds.
+
+    Franchise and best-performer reports build one report per department. The
+    context fetches the Vitec employee and department lists once (single-flight,
+    even when the department builds start concurrently) and caps how many department
+    syncs run at the same time, so a large franchise does not exhaust the DB pool.
+    """
+
+    def __init__(self, hub: VitecHubService, installation_id: str, *, max_concurrency: int | None = None) -> None:
+        self.hub = hub
+        self.installation_id = installation_id
+        limit = max_concurrency or settings.REPORTS_FANOUT_CONCURRENCY
+        self.semaphore = asyncio.Semaphore(max(1, limit))
+        self._employees_task: asyncio.Future[list[dict]] | None = None
+        self._departments_task: asyncio.Future[list[dict]] | None = None
+        self._broker_map: dict[str, str] | None = None
+
+    async def get_employees(self) -> list[dict]:
+        if self._employees_task is None:
+            self._employees_task = asyncio.ensure_future(self.hub.get_employees(self.installation_id))
+        return list(await self._employees_task or [])
+
+    async def get_departments(self) -> list[dict]:
+        if self._departments_task is None:
+            self._departments_task = asyncio.ensure_future(self.hub.get_departments(self.installation_id))
+        return list(await self._departments_task or [])
+
+    async def get_broker_map(self) -> dict[str, str]:
+        if self._broker_map is None:
+            self._broker_map = _build_broker_map(await self.get_employees())
+        return self._broker_map
+
+
 class SalesReportService:
     """Build sales report from Vitec Hub Accounting API."""
 
     def __init__(self, hub: VitecHubService | None = None) -> None:
         self._hub = hub or VitecHubService()
 
+    @property
+    def is_configured(self) -> bool:
+        """True when Vitec Hub credentials and the installation ID are set."""
+        return bool(self._hub.is_configured and settings.VITEC_INSTALLATION_ID)
+
     async def build_report(
         self,
         *,
@@ -325,6 +653,63 @@ class SalesReportService:
         """
         Build Excel sales report for brokers who sold properties this year.
         """
+        return _read_and_close(
+            await self._export_report_file(
+                department_id=department_id,
+                year=year,
+                from_date=from_date,
+                to_date=to_date,
+                include_vat=include_vat,
+                revenue_scope=revenue_scope,
+                accounts_included=accounts_included,
+            )
+        )
+
+    async def stream_report(
+        self,
+        *,
+        department_id: int = DEFAULT_DEPARTMENT_ID,
+        year: int | None = None,
+        from_date: str | None = None,
+        to_date: str | None = None,
+        include_vat: bool = False,
+        revenue_scope: str | None = None,
+        accounts_included: list[str] | None = None,
+    ) -> Iterator[bytes]:
+        """
+        Same workbook as ``build_report``, returned as byte chunks for ``StreamingResponse``.
+
+        Data is fetched (and errors raised) before the first chunk is produced.
+        """
+        return _iter_file_chunks(
+            await self._export_report_file(
+                department_id=department_id,
+                year=year,
+                from_date=from_date,
+                to_date=to_date,
+                include_vat=include_vat,
+                revenue_scope=revenue_scope,
+                accounts_included=accounts_included,
+            )
+        )
+
+    async def _export_report_file(
+        self,
+        *,
+        department_id: int,
+        year: int | None,
+        from_date: str | None,
+        to_date: str | None,
+        include_vat: bool,
+        revenue_scope: str | None,
+        accounts_included: list[str] | None,
+    ):
+        """
+        Write the sales workbook to a spooled temp file.
+
+        Totals come from the report build; transaction detail is streamed from the
+        cache one broker at a time (a live Vitec fallback already holds every row).
+        """
         result = await self._fetch_report_data(
             department_id=department_id,
             year=year,
@@ -333,25 +718,71 @@ class SalesReportService:
             include_vat=include_vat,
             revenue_scope=revenue_scope,
             accounts_included=accounts_included,
+            include_transactions=False,
         )
-        report_data, broker_map, brokers_with_sales, broker_estates, estate_address, estate_metadata, _ = result
-        y = report_data["year"]
-        from_date = report_data["from_date"]
-        to_date = report_data["to_date"]
-
-        return self._build_excel(
-            year=y,
+        report_data, broker_map, _, broker_estates, estate_address, estate_metadata, _ = result
+        broker_ids = [broker["broker_id"] for broker in report_data["brokers"]]
+        if broker_estates:
+            broker_rows = _iter_broker_estates(broker_estates, broker_ids)
+        else:
+            _, _, _, from_dt, to_dt = _resolve_report_range(year, from_date, to_date)
+            broker_rows = self._stream_broker_estates(
+                installation_id=settings.VITEC_INSTALLATION_ID,
+                department_id=department_id,
+                from_dt=from_dt,
+                to_dt=to_dt,
+                accounts=_resolve_accounts_filter(revenue_scope, accounts_included),
+                broker_ids=broker_ids,
+            )
+        return await self._write_excel(
+            year=report_data["year"],
             department_id=department_id,
-            from_date=from_date,
-            to_date=to_date,
+            from_date=report_data["from_date"],
+            to_date=report_data["to_date"],
             broker_map=broker_map,
-            brokers_with_sales=brokers_with_sales,
-            broker_estates=broker_estates,
+            broker_estates=broker_rows,
             estate_address=estate_address,
             estate_metadata=estate_metadata,
             include_vat=include_vat,
         )
 
+    @staticmethod
+    async def _stream_broker_estates(
+        *,
+        installation_id: str,
+        department_id: int,
+        from_dt: datetime,
+        to_dt: datetime,
+        accounts: set[str],
+        broker_ids: list[str],
+    ) -> AsyncIterator[tuple[str, dict[str, list[dict]]]]:
+        """
+        Yield (broker_id, {estate_id: transactions}) from the cache in ``broker_ids`` order.
+
+        Each broker's rows are streamed in ``EXCEL_TRANSACTION_BATCH_SIZE`` batches, so only
+        the broker being written is held in memory.
+        """
+        if not broker_ids:
+            return
+        tx = ReportSalesTransactionCache
+        tx_filters = _cached_transaction_filters(installation_id, department_id, from_dt, to_dt, accounts)
+        async with async_session_factory() as db:
+            for broker_id in broker_ids:
+                stmt = (
+                    select(tx.account, tx.estate_id, tx.amount, tx.vat_amount, tx.description, tx.posting_date)
+                    .where(and_(*tx_filters), tx.user_id == broker_id)
+                    .order_by(tx.posting_date.asc())
+                    .execution_options(yield_per=EXCEL_TRANSACTION_BATCH_SIZE)
+                )
+                estates: dict[str, list[dict]] = {}
+                result = await db.stream(stmt)
+                async for account, estate_id, amount, vat_amount, description, posting_date in result:
+                    eid = str(estate_id or "").strip() or "(ukjent)"
+                    estates.setdefault(eid, []).append(
+                        _cached_transaction(account, broker_id, eid, amount, vat_amount, description, posting_date)
+                    )
+                yield broker_id, estates
+
     async def get_report_data(
         self,
         *,
@@ -362,9 +793,14 @@ class SalesReportService:
         include_vat: bool = False,
         revenue_scope: str | None = None,
         accounts_included: list[str] | None = None,
+        include_transactions: bool = True,
+        context: ReportFanoutContext | None = None,
     ) -> dict:
         """
         Fetch and return sales report data as structured dict for JSON API.
+
+        With ``include_transactions=False`` properties carry totals only
+        (``transactions`` is empty) and no per-transaction rows are loaded.
         """
         result = await self._fetch_report_data(
             department_id=department_id,
@@ -374,9 +810,80 @@ class SalesReportService:
             include_vat=include_vat,
             revenue_scope=revenue_scope,
             accounts_included=accounts_included,
+            include_transactions=include_transactions,
+            context=context,
         )
         return result[0]
 
+    async def get_monthly_revenue(
+        self,
+        *,
+        department_id: int = DEFAULT_DEPARTMENT_ID,
+        year: int | None = None,
+        include_vat: bool = False,
+        revenue_scope: str | None = None,
+        accounts_included: list[str] | None = None,
+    ) -> dict:
+        """
+        Return revenue per calendar month for one department and year.
+
+        Syncs the cache once for the whole year and aggregates all months in a
+        single grouped query, using the same account/broker/VAT rules as
+        ``get_report_data``.
+        """
+        accounts_filter = _resolve_accounts_filter(revenue_scope, accounts_included)
+        if not self._hub.is_configured:
+            raise ValueError("Vitec Hub credentials are not configured.")
+
+        installation_id = settings.VITEC_INSTALLATION_ID
+        if not installation_id:
+            raise ValueError("VITEC_INSTALLATION_ID is not configured.")
+
+        y = year or datetime.now().year
+        from_dt, _ = _month_bounds(y, 1)
+        _, to_dt = _month_bounds(y, 12)
+        today_end = datetime.now(timezone.utc).replace(hour=23, minute=59, second=59, microsecond=0)
+        sync_to_dt = min(to_dt, today_end)
+
+        async with async_session_factory() as db:
+            try:
+                sync_result = await self._sync_sales_cache(
+                    db=db,
+                    installation_id=installation_id,
+                    department_id=department_id,
+                    from_dt=from_dt,
+                    to_dt=max(from_dt, sync_to_dt),
+                )
+                monthly = await self._aggregate_monthly_revenue(
+                    db=db,
+                    installation_id=installation_id,
+                    department_id=department_id,
+                    year=y,
+                    include_vat=include_vat,
+                    accounts_filter=accounts_filter,
+                )
+                await db.commit()
+                last_synced_at = sync_result.get("last_synced_at")
+            except Exception as cache_err:
+                await db.rollback()
+                logger.warning("Monthly revenue cache path failed, falling back to live fetch: %s", cache_err)
+                monthly = await self._monthly_revenue_live(
+                    installation_id=installation_id,
+                    department_id=department_id,
+                    year=y,
+                    include_vat=include_vat,
+                    accounts_filter=accounts_filter,
+                )
+                last_synced_at = None
+
+        return {
+            "year": y,
+            "department_id": department_id,
+            "include_vat": include_vat,
+            "months": [{"month": m, "total_revenue": round(monthly.get(m, 0.0), 2)} for m in range(1, 13)],
+            "last_synced_at": last_synced_at,
+        }
+
     async def get_franchise_report_data(
         self,
         *,
@@ -387,32 +894,23 @@ class SalesReportService:
         department_ids: list[int] | None = None,
         revenue_scope: str | None = None,
         accounts_included: list[str] | None = None,
+        context: ReportFanoutContext | None = None,
     ) -> dict:
         """
         Fetch franchise report data across departments.
+
+        Employees are fetched once per request and department builds run with
+        bounded concurrency (see ``ReportFanoutContext``).
         """
         installation_id = settings.VITEC_INSTALLATION_ID
         if not installation_id:
             raise ValueError("VITEC_INSTALLATION_ID is not configured.")
+        context = context or ReportFanoutContext(self._hub, installation_id)
 
         if department_ids:
             selected_departments = list(dict.fromkeys(department_ids))
         else:
-            departments_raw = await self._hub.get_departments(installation_id)
-            selected_departments = []
-            for dep in departments_raw or []:
-                dep_id = dep.get("departmentId") or dep.get("id")
-                dep_name = str(dep.get("name") or "").lower()
-                if dep_id is None:
-                    continue
-                if "oppgjør" in dep_name or "pacta" in dep_name:
-                    continue
-                try:
-                    selected_departments.append(int(dep_id))
-                except (TypeError, ValueError):
-                    continue
-
-        selected_departments = list(dict.fromkeys(selected_departments))
+            selected_departments = _report_department_ids(await context.get_departments())
         if not selected_departments:
             return {
                 "year": year or datetime.now().year,
@@ -436,6 +934,8 @@ class SalesReportService:
                 include_vat=include_vat,
                 revenue_scope=revenue_scope,
                 accounts_included=accounts_included,
+                include_transactions=False,
+                context=context,
             )
             for dep_id in selected_departments
         ]
@@ -501,6 +1001,8 @@ class SalesReportService:
         """
         Build best-performers leaderboard by role and department.
         """
+        installation_id = settings.VITEC_INSTALLATION_ID
+        context = ReportFanoutContext(self._hub, installation_id) if installation_id else None
         franchise = await self.get_franchise_report_data(
             year=year,
             from_date=from_date,
@@ -509,10 +1011,10 @@ class SalesReportService:
             department_ids=department_ids,
             revenue_scope=revenue_scope,
             accounts_included=accounts_included,
+            context=context,
         )
 
-        installation_id = settings.VITEC_INSTALLATION_ID
-        employees = await self._hub.get_employees(installation_id) if installation_id else []
+        employees = await context.get_employees() if context else []
         role_by_broker: dict[str, str] = {}
         for emp in employees or []:
             eid = str(emp.get("employeeId") or "").strip()
@@ -583,6 +1085,17 @@ class SalesReportService:
             }
             for d in dept_list
         ]
+        # Department builds above skip transaction rows; load them only for what is returned
+        await self._attach_property_transactions(
+            [(None, row) for row in (*eiendomsmegler, *fullmektig, *unknown)]
+            + [(d["department_id"], broker) for d in departments for broker in d["brokers"]],
+            department_ids=[d["department_id"] for d in franchise.get("departments", [])],
+            year=year,
+            from_date=from_date,
+            to_date=to_date,
+            include_vat=include_vat,
+            accounts_filter=_resolve_accounts_filter(revenue_scope, accounts_included),
+        )
 
         return {
             "from_date": franchise.get("from_date"),
@@ -597,6 +1110,93 @@ class SalesReportService:
             "departments": departments,
         }
 
+    async def _attach_property_transactions(
+        self,
+        owners: list[tuple[int | None, dict]],
+        *,
+        department_ids: list[int],
+        year: int | None,
+        from_date: str | None,
+        to_date: str | None,
+        include_vat: bool,
+        accounts_filter: set[str] | None,
+    ) -> None:
+        """
+        Fill ``transactions`` on the properties of ``owners`` from the cache in one query.
+
+        ``owners`` are (department_id, broker row) pairs; ``None`` matches the broker's
+        transactions in every department. Properties that already carry transactions
+        (live fallback path) are left as they are.
+        """
+        installation_id = settings.VITEC_INSTALLATION_ID
+        wanted = [
+            (department_id, str(row.get("broker_id") or ""), prop)
+            for department_id, row in owners
+            for prop in row.get("properties") or []
+            if not prop.get("transactions")
+        ]
+        if not installation_id or not department_ids or not wanted:
+            return
+
+        _, _, _, from_dt, to_dt = _resolve_report_range(year, from_date, to_date)
+        broker_ids = {broker_id for _, broker_id, _ in wanted}
+        estate_ids = {str(prop.get("estate_id") or "") for _, _, prop in wanted}
+        tx = ReportSalesTransactionCache
+        estate_filter = tx.estate_id.in_(sorted(estate_ids - {"(ukjent)"}))
+        if "(ukjent)" in estate_ids:
+            estate_filter = or_(estate_filter, tx.estate_id.is_(None), tx.estate_id == "")
+        stmt = (
+            select(
+                tx.department_id,
+                tx.user_id,
+                tx.estate_id,
+                tx.account,
+                tx.amount,
+                tx.vat_amount,
+                tx.description,
+                tx.posting_date,
+            )
+            .where(
+                and_(
+                    tx.installation_id == installation_id,
+                    tx.department_id.in_(sorted(set(department_ids))),
+                    tx.posting_date.is_not(None),
+                    tx.posting_date >= from_dt,
+                    tx.posting_date <= to_dt,
+                    tx.account.in_(sorted(accounts_filter or REVENUE_ACCOUNTS)),
+                    tx.user_id.in_(sorted(broker_ids)),
+                    estate_filter,
+                )
+            )
+            .order_by(tx.posting_date.asc())
+        )
+        try:
+            async with async_session_factory() as db:
+                rows = (await db.execute(stmt)).all()
+        except Exception as exc:
+            logger.warning("Could not load property transactions for best performers: %s", exc)
+            return
+
+        by_key: dict[tuple[int | None, str, str], list[dict]] = defaultdict(list)
+        for department_id, user_id, estate_id, account, amount, vat_amount, description, posting_date in rows:
+            txn = _property_transaction(
+                {
+                    "postingDate": posting_date.isoformat() if posting_date else None,
+                    "account": account,
+                    "amount": amount,
+                    "vatAmount": vat_amount,
+                    "description": description,
+                },
+                include_vat,
+            )
+            uid = str(user_id).strip()
+            eid = str(estate_id or "").strip() or "(ukjent)"
+            by_key[(department_id, uid, eid)].append(txn)
+            by_key[(None, uid, eid)].append(txn)
+
+        for department_id, broker_id, prop in wanted:
+            prop["transactions"] = list(by_key.get((department_id, broker_id, str(prop.get("estate_id") or "")), []))
+
     async def list_cache_events(
         self,
         *,
@@ -630,9 +1230,6 @@ class SalesReportService:
         """
         Generate Excel workbook for best performers leaderboard.
         """
-        import openpyxl
-        from openpyxl.styles import Font
-
         data = await self.get_best_performers_data(
             year=year,
             from_date=from_date,
@@ -643,43 +1240,110 @@ class SalesReportService:
             revenue_scope=revenue_scope,
             accounts_included=accounts_included,
         )
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Best performers"
-        ws.append(["Best performers"])
-        ws["A1"].font = Font(bold=True, size=14)
-        ws.append([f"Periode: {data.get('from_date_display', '')} - {data.get('to_date_display', '')}"])
-        ws.append([])
-
-        def add_section(title: str, rows: list[dict], name_key: str = "name") -> None:
-            ws.append([title])
-            ws.cell(row=ws.max_row, column=1).font = Font(bold=True)
-            ws.append(["Navn", "Antall salg", "Omsetning (kr)"])
-            ws.cell(row=ws.max_row, column=1).font = Font(bold=True)
-            ws.cell(row=ws.max_row, column=2).font = Font(bold=True)
-            ws.cell(row=ws.max_row, column=3).font = Font(bold=True)
-            for row in rows:
-                ws.append(
-                    [
-                        row.get(name_key, "—"),
-                        int(row.get("total_sales", 0)),
-                        round(float(row.get("total_revenue", 0.0)), 0),
-                    ]
-                )
-            ws.append([])
+        return _read_and_close(self._write_best_performers_excel(data))
 
-        add_section("Eiendomsmegler", data.get("eiendomsmegler", []))
-        add_section("Eiendomsmeglerfullmektig", data.get("eiendomsmeglerfullmektig", []))
-        if data.get("unknown"):
-            add_section("Ukjent rolle", data.get("unknown", []))
-        add_section("Avdelinger", data.get("departments", []), name_key="department_name")
-
-        ws.column_dimensions["A"].width = 36
-        ws.column_dimensions["B"].width = 14
+    async def stream_best_performers_report(
+        self,
+        *,
+        year: int | None = None,
+        from_date: str | None = None,
+        to_date: str | None = None,
+        include_vat: bool = False,
+        department_ids: list[int] | None = None,
+        top_n: int = 5,
+        revenue_scope: str | None = None,
+        accounts_included: list[str] | None = None,
+    ) -> Iterator[bytes]:
+        """
+        Same workbook as ``build_best_performers_report``, returned as byte chunks.
+        """
+        data = await self.get_best_performers_data(
+            year=year,
+            from_date=from_date,
+            to_date=to_date,
+            include_vat=include_vat,
+            department_ids=department_ids,
+            top_n=top_n,
+            revenue_scope=revenue_scope,
+            accounts_included=accounts_included,
+        )
+        return _iter_file_chunks(self._write_best_performers_excel(data))
+
+    @staticmethod
+    def _write_best_performers_excel(data: dict):
+        """Write the best performers leaderboard to a spooled temp file (write-only sheet)."""
+        from openpyxl.styles import Font
+
+        wb, ws = _write_only_workbook("Best performers")
+        ws.column_dimensions["A"].width = 36
+        ws.column_dimensions["B"].width = 14
         ws.column_dimensions["C"].width = 20
-        buf = io.BytesIO()
-        wb.save(buf)
-        return buf.getvalue()
+        bold = Font(bold=True)
+
+        ws.append(_styled_row(ws, ["Best performers"], Font(bold=True, size=14)))
+        ws.append([f"Periode: {data.get('from_date_display', '')} - {data.get('to_date_display', '')}"])
+        ws.append([])
+
+        def add_section(title: str, rows: list[dict], name_key: str = "name") -> None:
+            ws.append(_styled_row(ws, [title], bold))
+            ws.append(_styled_row(ws, ["Navn", "Antall salg", "Omsetning (kr)"], bold))
+            for row in rows:
+                ws.append(
+                    [
+                        row.get(name_key, "—"),
+                        int(row.get("total_sales", 0)),
+                        round(float(row.get("total_revenue", 0.0)), 0),
+                    ]
+                )
+            ws.append([])
+
+        add_section("Eiendomsmegler", data.get("eiendomsmegler", []))
+        add_section("Eiendomsmeglerfullmektig", data.get("eiendomsmeglerfullmektig", []))
+        if data.get("unknown"):
+            add_section("Ukjent rolle", data.get("unknown", []))
+        add_section("Avdelinger", data.get("departments", []), name_key="department_name")
+
+        return _save_to_spool(wb)
+
+    async def list_report_department_ids(self) -> list[int]:
+        """Departments included in franchise-wide reports (and warmed by the scheduler)."""
+        installation_id = settings.VITEC_INSTALLATION_ID
+        if not installation_id:
+            raise ValueError("VITEC_INSTALLATION_ID is not configured.")
+        return _report_department_ids(await self._hub.get_departments(installation_id))
+
+    async def warm_department_cache(self, department_id: int) -> dict[str, Any]:
+        """
+        Sync one department's cache for the current year up to today (the default report range).
+
+        Skips the department when another process holds its sync lock (PostgreSQL).
+        Returns the sync result, or ``{"skipped": "locked"}``.
+        """
+        if not self._hub.is_configured:
+            raise ValueError("Vitec Hub credentials are not configured.")
+        installation_id = settings.VITEC_INSTALLATION_ID
+        if not installation_id:
+            raise ValueError("VITEC_INSTALLATION_ID is not configured.")
+
+        now = datetime.now()
+        from_dt = _parse_iso_datetime(f"{now.year}-01-01T00:00:00")
+        to_dt = _parse_iso_datetime(now.strftime("%Y-%m-%dT23:59:59"))
+        async with async_session_factory() as db:
+            if _dialect_name(db) != "sqlite":
+                lock_key = advisory_lock_key(f"{installation_id}:{department_id}")
+                acquired = (await db.execute(text(f"SELECT pg_try_advisory_xact_lock({lock_key})"))).scalar()
+                if not acquired:
+                    return {"skipped": "locked"}
+            result = await self._sync_sales_cache(
+                db=db,
+                installation_id=installation_id,
+                department_id=department_id,
+                from_dt=from_dt,
+                to_dt=to_dt,
+                trigger="scheduler",
+            )
+            await db.commit()
+        return result
 
     async def _fetch_report_data(
         self,
@@ -691,6 +1355,8 @@ class SalesReportService:
         include_vat: bool = False,
         revenue_scope: str | None = None,
         accounts_included: list[str] | None = None,
+        include_transactions: bool = True,
+        context: ReportFanoutContext | None = None,
     ) -> tuple:
         """Fetch report data and return (report_data_dict, broker_map, ...) for Excel or JSON."""
         accounts_filter = _resolve_accounts_filter(revenue_scope, accounts_included)
@@ -701,31 +1367,46 @@ class SalesReportService:
         if not installation_id:
             raise ValueError("VITEC_INSTALLATION_ID is not configured.")
 
-        y = year or datetime.now().year
-        if from_date:
-            from_date = from_date if "T" in from_date else f"{from_date}T00:00:00"
-        else:
-            from_date = f"{y}-01-01T00:00:00"
-        if to_date:
-            to_date = to_date if "T" in to_date else f"{to_date}T23:59:59"
-        else:
-            to_date = datetime.now().strftime("%Y-%m-%dT23:59:59")
+        y, from_date, to_date, from_dt, to_dt = _resolve_report_range(year, from_date, to_date)
 
-        from_dt = _parse_iso_datetime(from_date)
-        to_dt = _parse_iso_datetime(to_date)
-        if from_dt is None or to_dt is None:
-            raise ValueError("Invalid from_date/to_date format.")
-
-        # 1) Employee names are lightweight and can stay live.
-        employees = await self._hub.get_employees(installation_id)
-        broker_map: dict[str, str] = {}
-        for emp in employees or []:
-            eid = emp.get("employeeId")
-            name = emp.get("name")
-            if eid and name:
-                broker_map[str(eid).strip()] = str(name).strip()
+        # 1) Employee names are lightweight and can stay live (fetched once per fan-out request).
+        if context is not None:
+            broker_map = await context.get_broker_map()
+        else:
+            broker_map = _build_broker_map(await self._hub.get_employees(installation_id))
 
         # 2) Sync missing/new data into local cache and build report from cached rows.
+        async with context.semaphore if context is not None else contextlib.nullcontext():
+            return await self._fetch_report_data_cached(
+                installation_id=installation_id,
+                department_id=department_id,
+                year=y,
+                from_date=from_date,
+                to_date=to_date,
+                from_dt=from_dt,
+                to_dt=to_dt,
+                include_vat=include_vat,
+                broker_map=broker_map,
+                accounts_filter=accounts_filter,
+                include_transactions=include_transactions,
+            )
+
+    async def _fetch_report_data_cached(
+        self,
+        *,
+        installation_id: str,
+        department_id: int,
+        year: int,
+        from_date: str,
+        to_date: str,
+        from_dt: datetime,
+        to_dt: datetime,
+        include_vat: bool,
+        broker_map: dict[str, str],
+        accounts_filter: set[str],
+        include_transactions: bool,
+    ) -> tuple:
+        """Sync the department cache and build the report tuple, falling back to live Vitec data."""
         async with async_session_factory() as db:
             try:
                 sync_result = await self._sync_sales_cache(
@@ -734,12 +1415,13 @@ class SalesReportService:
                     department_id=department_id,
                     from_dt=from_dt,
                     to_dt=to_dt,
+                    max_age_seconds=_interactive_cache_max_age(),
                 )
                 report_tuple = await self._build_report_tuple_from_cache(
                     db=db,
                     installation_id=installation_id,
                     department_id=department_id,
-                    year=y,
+                    year=year,
                     from_date=from_date,
                     to_date=to_date,
                     from_dt=from_dt,
@@ -748,6 +1430,7 @@ class SalesReportService:
                     broker_map=broker_map,
                     sync_metadata=sync_result,
                     accounts_filter=accounts_filter,
+                    include_transactions=include_transactions,
                 )
                 await db.commit()
                 return report_tuple
@@ -757,7 +1440,7 @@ class SalesReportService:
                 return await self._fetch_report_data_live(
                     installation_id=installation_id,
                     department_id=department_id,
-                    year=y,
+                    year=year,
                     from_date=from_date,
                     to_date=to_date,
                     include_vat=include_vat,
@@ -856,36 +1539,115 @@ class SalesReportService:
         estate_ids: set[str],
     ) -> None:
         """Fetch estate details by ID for estates with missing addresses. Mutates estate_address and estate_metadata."""
-        to_enrich = [
-            eid
-            for eid in estate_ids
-            if eid
-            and eid != "(ukjent)"
-            and _looks_like_uuid(eid)
-            and _needs_address_enrichment(estate_address.get(eid, ""))
-        ]
+        to_enrich = _address_enrichment_candidates(estate_ids, estate_address)
         if not to_enrich:
             return
+        details = await self._fetch_estate_details(installation_id, to_enrich)
+        for eid, detail in details.items():
+            _apply_estate_detail(eid, detail, estate_address, estate_metadata)
 
-        sem = asyncio.Semaphore(5)
+    async def _enrich_cached_estate_addresses(
+        self,
+        *,
+        db,
+        installation_id: str,
+        department_id: int,
+        estate_address: dict[str, str],
+        estate_metadata: dict[str, dict[str, str]],
+        estate_ids: set[str],
+    ) -> dict[str, int]:
+        """
+        Like ``_enrich_estate_addresses``, but remembers lookups in ``report_sales_estate_cache``.
 
-        async def fetch_one(eid: str) -> tuple[str, dict[str, Any] | None]:
+        Estates marked "not_found" within the TTL are skipped. A found address is written
+        back to the cache; a 404 or a detail response without an address is remembered as
+        "not_found". Estates without a cache row get one. Failed requests (transport errors,
+        5xx) are not recorded and are retried on the next build.
+        Returns hit/miss counters for the sync event payload.
+        """
+        stats = {"address_cache_hits": 0, "address_cache_misses": 0, "address_lookups_not_found": 0}
+        candidates = _address_enrichment_candidates(estate_ids, estate_address)
+        if not candidates:
+            return stats
+
+        est = ReportSalesEstateCache
+        now_utc = datetime.now(timezone.utc)
+        cutoff = now_utc - timedelta(hours=settings.REPORTS_ESTATE_ADDRESS_LOOKUP_TTL_HOURS)
+        checked: set[str] = set()
+        for start in range(0, len(candidates), UPSERT_CHUNK_SIZE):
+            keys = [f"{installation_id}:{eid}" for eid in candidates[start : start + UPSERT_CHUNK_SIZE]]
+            stmt = select(est.estate_id, est.address_lookup_status, est.address_lookup_at).where(
+                est.estate_key.in_(keys)
+            )
+            for estate_id, status, looked_up_at in (await db.execute(stmt)).all():
+                if status == ADDRESS_LOOKUP_NOT_FOUND and looked_up_at and _as_utc(looked_up_at) >= cutoff:
+                    checked.add(estate_id)
+
+        to_fetch = [eid for eid in candidates if eid not in checked]
+        stats["address_cache_hits"] = len(candidates) - len(to_fetch)
+        stats["address_cache_misses"] = len(to_fetch)
+        if not to_fetch:
+            return stats
+
+        details = await self._fetch_estate_details(installation_id, to_fetch)
+        rows: dict[bool, list[dict[str, Any]]] = {True: [], False: []}
+        for eid, detail in details.items():
+            found = _apply_estate_detail(eid, detail, estate_address, estate_metadata)
+            meta = estate_metadata.get(eid) or {}
+            if not found:
+                stats["address_lookups_not_found"] += 1
+            rows[found].append(
+                {
+                    "estate_key": f"{installation_id}:{eid}",
+                    "installation_id": installation_id,
+                    "department_id": department_id,
+                    "estate_id": eid,
+                    "data_source": DATA_SOURCE_VITEC_NEXT,
+                    "sold_at": None,
+                    "address": estate_address[eid] if found else ESTATE_PLACEHOLDER_VALUES["address"],
+                    "property_type": meta.get("property_type") or "—",
+                    "assignment_type": meta.get("assignment_type") or "—",
+                    "assignment_number": meta.get("assignment_number") or None,
+                    "brokers": [],
+                    "address_lookup_status": ADDRESS_LOOKUP_FOUND if found else ADDRESS_LOOKUP_NOT_FOUND,
+                    "address_lookup_at": now_utc,
+                }
+            )
+        # Estates without a cache row are inserted with placeholders; existing rows only get
+        # the lookup result (and, when found, the address/metadata from the detail response).
+        insert = sqlite_insert if _dialect_name(db) == "sqlite" else pg_insert
+        for found, batch in rows.items():
+            update_cols = ["address_lookup_status", "address_lookup_at"]
+            if found:
+                update_cols += ["address", "property_type", "assignment_type", "assignment_number"]
+            for start in range(0, len(batch), UPSERT_CHUNK_SIZE):
+                stmt = insert(est).values(batch[start : start + UPSERT_CHUNK_SIZE])
+                set_ = {col: stmt.excluded[col] for col in update_cols}
+                set_["updated_at"] = sa_func.now()
+                await db.execute(stmt.on_conflict_do_update(index_elements=["estate_key"], set_=set_))
+        return stats
+
+    async def _fetch_estate_details(
+        self,
+        installation_id: str,
+        estate_ids: list[str],
+    ) -> dict[str, dict[str, Any] | None]:
+        """
+        Fetch estate details concurrently (bounded). Estates whose request failed are left out;
+        ``None`` means Vitec answered 404 for the estate.
+        """
+        sem = asyncio.Semaphore(ESTATE_LOOKUP_CONCURRENCY)
+
+        async def fetch_one(eid: str) -> tuple[str, dict[str, Any] | None, bool]:
             async with sem:
                 try:
-                    detail = await self._hub.get_accounting_estate_by_id(installation_id, eid)
-                    return (eid, detail)
-                except Exception:
-                    return (eid, None)
-
-        results = await asyncio.gather(*[fetch_one(eid) for eid in to_enrich])
-        for eid, detail in results:
-            if detail:
-                addr = _build_estate_address(detail)
-                if addr:
-                    estate_address[eid] = addr
-                    meta = _build_estate_metadata(detail)
-                    if meta:
-                        estate_metadata[eid] = meta
+                    return eid, await self._hub.get_accounting_estate_by_id(installation_id, eid), True
+                except Exception as exc:
+                    logger.debug("Estate detail lookup failed for %s: %s", eid, exc)
+                    return eid, None, False
+
+        results = await asyncio.gather(*[fetch_one(eid) for eid in estate_ids])
+        return {eid: detail for eid, detail, ok in results if ok}
 
     async def _sync_sales_cache(
         self,
@@ -895,10 +1657,23 @@ class SalesReportService:
         department_id: int,
         from_dt: datetime,
         to_dt: datetime,
+        max_age_seconds: float | None = None,
+        trigger: str = "request",
     ) -> dict[str, Any]:
-        # Advisory lock prevents concurrent syncs for the same department.
-        lock_key = hash(f"{installation_id}:{department_id}") & 0x7FFFFFFF
-        await db.execute(text(f"SELECT pg_advisory_xact_lock({lock_key})"))
+        """
+        Bring the department cache up to date for [from_dt, to_dt].
+
+        With ``max_age_seconds``, a cache synced that recently that already holds every
+        month in range is used as is (no Vitec calls, no sync event).
+        """
+        sync_started = time.perf_counter()
+        write_seconds = 0.0
+
+        # Advisory lock prevents concurrent syncs for the same department (PostgreSQL only;
+        # SQLite dev databases serialize writers on their own).
+        if _dialect_name(db) != "sqlite":
+            lock_key = advisory_lock_key(f"{installation_id}:{department_id}")
+            await db.execute(text(f"SELECT pg_advisory_xact_lock({lock_key})"))
 
         state_key = f"{installation_id}:{department_id}"
         state = await db.get(ReportSalesCacheState, state_key)
@@ -912,6 +1687,19 @@ class SalesReportService:
             db.add(state)
             await db.flush()
 
+        if max_age_seconds is not None and state.last_estates_sync_at is not None:
+            age = (datetime.now(timezone.utc) - _as_utc(state.last_estates_sync_at)).total_seconds()
+            synced = state.month_sync_json or {}
+            if age <= max_age_seconds and all(_month_key(y, m) in synced for y, m in _iter_months(from_dt, to_dt)):
+                return {
+                    "estates_upserted": 0,
+                    "transactions_upserted": 0,
+                    "last_synced_at": _as_utc(state.last_estates_sync_at).isoformat(),
+                    "validation_warnings_count": 0,
+                    "sync_event_id": None,
+                    "cache_fresh": True,
+                }
+
         estates_upserted = 0
         transactions_upserted = 0
         skipped: dict[str, int] = {"future_date": 0, "orphan": 0}
@@ -927,44 +1715,21 @@ class SalesReportService:
             department_id=department_id,
             changed_after=changed_after,
         )
-        estate_ids_from_estates_api: set[str] = set()
-        for est in estates or []:
-            estate_id = str(est.get("estateId") or "").strip()
-            if not estate_id:
-                continue
-            estate_ids_from_estates_api.add(estate_id)
-            estate_key = f"{installation_id}:{estate_id}"
-            row = await db.get(ReportSalesEstateCache, estate_key)
-            metadata = _build_estate_metadata(est)
-            sold_dt = _parse_iso_datetime(est.get("sold"))
-            payload_brokers = est.get("brokersIdWithRoles") or []
-            oppdrag = metadata.get("assignment_number") or None
-            if row is None:
-                row = ReportSalesEstateCache(
-                    estate_key=estate_key,
-                    installation_id=installation_id,
-                    department_id=department_id,
-                    estate_id=estate_id,
-                    data_source=DATA_SOURCE_VITEC_NEXT,
-                    sold_at=sold_dt,
-                    address=_build_estate_address(est) or "(ukjent adresse)",
-                    property_type=metadata["property_type"],
-                    assignment_type=metadata["assignment_type"],
-                    assignment_number=oppdrag,
-                    brokers_json=payload_brokers,
-                )
-                db.add(row)
-                estates_upserted += 1
-            else:
-                row.department_id = department_id
-                row.data_source = DATA_SOURCE_VITEC_NEXT
-                row.sold_at = sold_dt
-                row.address = _build_estate_address(est) or "(ukjent adresse)"
-                row.property_type = metadata["property_type"]
-                row.assignment_type = metadata["assignment_type"]
-                row.assignment_number = oppdrag
-                row.brokers_json = payload_brokers
-                estates_upserted += 1
+        estate_rows = self._stage_estate_rows(
+            installation_id=installation_id,
+            department_id=department_id,
+            estates=estates or [],
+        )
+        estate_ids_from_estates_api = {row["estate_id"] for row in estate_rows}
+        write_started = time.perf_counter()
+        estates_upserted += await self._bulk_upsert(
+            db,
+            ReportSalesEstateCache,
+            estate_rows,
+            key="estate_key",
+            keep_existing_over=ESTATE_PLACEHOLDER_VALUES,
+        )
+        write_seconds += time.perf_counter() - write_started
 
         # Transactions: sync unsynced months, always refresh current month.
         # Also collect estate_ids from transactions so we can ensure all are in estate cache.
@@ -972,102 +1737,84 @@ class SalesReportService:
         current_month_key = _month_key(now_utc.year, now_utc.month)
         month_sync = dict(state.month_sync_json or {})
         months = _iter_months(from_dt, to_dt)
-        for year, month in months:
-            mk = _month_key(year, month)
-            should_fetch = mk not in month_sync or mk == current_month_key
-            if not should_fetch:
-                continue
-
-            month_start, month_end = _month_bounds(year, month)
-            txns = await self._hub.get_accounting_transactions(
-                installation_id,
-                from_date=month_start.strftime("%Y-%m-%dT%H:%M:%S"),
-                to_date=month_end.strftime("%Y-%m-%dT%H:%M:%S"),
+        months_to_fetch = [
+            (year, month)
+            for year, month in months
+            if _month_key(year, month) not in month_sync or _month_key(year, month) == current_month_key
+        ]
+        # Months are fetched concurrently; this loop is the single writer and consumes them in order.
+        # aclosing() runs the generator's cleanup (cancel/log pending fetches) as soon as this loop exits.
+        async with contextlib.aclosing(
+            self._fetch_month_transactions(
+                installation_id=installation_id,
                 department_id=department_id,
-                ledger_type=1,
+                months=months_to_fetch,
             )
-            for txn in txns or []:
-                posting_dt = _parse_iso_datetime(txn.get("postingDate"))
-
-                # Validation: reject future-dated transactions
-                if posting_dt and posting_dt > tomorrow:
-                    skipped["future_date"] += 1
-                    continue
-
-                # Validation: skip orphan records with no estate AND no user
-                user_id = str(txn.get("userId") or "").strip()
-                estate_id_raw = str(txn.get("estateId") or "").strip()
-                if not user_id and not estate_id_raw:
-                    skipped["orphan"] += 1
-                    continue
-                if estate_id_raw and estate_id_raw != "(ukjent)" and _looks_like_uuid(estate_id_raw):
-                    estate_ids_from_transactions.add(estate_id_raw)
-
-                # Anomaly warning: unusually large amounts
-                amt = abs(float(txn.get("amount") or 0))
-                if amt > 5_000_000:
-                    warnings_count += 1
-                    logger.warning(
-                        "Large transaction amount %.2f for dept %s estate %s",
-                        amt,
-                        department_id,
-                        estate_id_raw,
-                    )
-
-                tx_key = self._transaction_cache_key(installation_id=installation_id, txn=txn)
-                row = await db.get(ReportSalesTransactionCache, tx_key)
-                if row is None:
-                    row = ReportSalesTransactionCache(
-                        transaction_key=tx_key,
-                        installation_id=installation_id,
-                        department_id=department_id,
-                        data_source=DATA_SOURCE_VITEC_NEXT,
-                        posting_date=posting_dt,
-                        account=str(txn.get("account") or "").strip(),
-                        user_id=user_id,
-                        estate_id=estate_id_raw,
-                        amount=float(txn.get("amount") or 0),
-                        vat_amount=float(txn.get("vatAmount") or 0),
-                        description=str(txn.get("description") or ""),
-                    )
-                    db.add(row)
-                    transactions_upserted += 1
-                else:
-                    row.department_id = department_id
-                    row.data_source = DATA_SOURCE_VITEC_NEXT
-                    row.posting_date = posting_dt
-                    row.account = str(txn.get("account") or "").strip()
-                    row.user_id = user_id
-                    row.estate_id = estate_id_raw
-                    row.amount = float(txn.get("amount") or 0)
-                    row.vat_amount = float(txn.get("vatAmount") or 0)
-                    row.description = str(txn.get("description") or "")
-                    transactions_upserted += 1
-            month_sync[mk] = now_utc.isoformat()
-
-        # Ensure all estate_ids from transactions are in estate cache (for features needing full coverage).
-        missing_estate_ids = estate_ids_from_transactions - estate_ids_from_estates_api
-        for estate_id in missing_estate_ids:
-            estate_key = f"{installation_id}:{estate_id}"
-            if await db.get(ReportSalesEstateCache, estate_key) is None:
-                row = ReportSalesEstateCache(
-                    estate_key=estate_key,
+        ) as month_fetches:
+            async for year, month, txns in month_fetches:
+                mk = _month_key(year, month)
+                tx_rows, month_warnings = self._stage_transaction_rows(
                     installation_id=installation_id,
                     department_id=department_id,
-                    estate_id=estate_id,
-                    data_source=DATA_SOURCE_VITEC_NEXT,
-                    sold_at=None,
-                    address="(ukjent adresse)",
-                    property_type="—",
-                    assignment_type="—",
-                    assignment_number=None,
-                    brokers_json=[],
+                    transactions=txns or [],
+                    not_after=tomorrow,
+                    skipped=skipped,
+                    estate_ids=estate_ids_from_transactions,
                 )
-                db.add(row)
-                estates_upserted += 1
+                warnings_count += month_warnings
+                write_started = time.perf_counter()
+                transactions_upserted += await self._bulk_upsert(
+                    db, ReportSalesTransactionCache, tx_rows, key="transaction_key"
+                )
+                write_seconds += time.perf_counter() - write_started
+                month_sync[mk] = now_utc.isoformat()
+
+        # Ensure all estate_ids from transactions are in estate cache (for features needing full coverage).
+        missing_estate_ids = estate_ids_from_transactions - estate_ids_from_estates_api
+        placeholder_rows = [
+            {
+                "estate_key": f"{installation_id}:{estate_id}",
+                "installation_id": installation_id,
+                "department_id": department_id,
+                "estate_id": estate_id,
+                "data_source": DATA_SOURCE_VITEC_NEXT,
+                "sold_at": None,
+                "address": "(ukjent adresse)",
+                "property_type": "—",
+                "assignment_type": "—",
+                "assignment_number": None,
+                "brokers": [],
+            }
+            for estate_id in sorted(missing_estate_ids)
+        ]
+        write_started = time.perf_counter()
+        estates_upserted += await self._bulk_upsert(
+            db, ReportSalesEstateCache, placeholder_rows, key="estate_key", update=False
+        )
+        write_seconds += time.perf_counter() - write_started
+
+        # Rebuild the monthly rollup for months written now, plus any month in range not rolled up yet.
+        rollup_done = dict(state.rollup_months_json or {})
+        fetched_keys = {_month_key(y, m) for y, m in months_to_fetch}
+        rollup_months = [
+            (y, m) for y, m in months if _month_key(y, m) in fetched_keys or _month_key(y, m) not in rollup_done
+        ]
+        write_started = time.perf_counter()
+        await self._refresh_monthly_rollup(
+            db=db,
+            installation_id=installation_id,
+            department_id=department_id,
+            months=rollup_months,
+        )
+        write_seconds += time.perf_counter() - write_started
+        for y, m in rollup_months:
+            rollup_done[_month_key(y, m)] = now_utc.isoformat()
 
         state.month_sync_json = month_sync
+        state.rollup_months_json = rollup_done
         state.last_estates_sync_at = now_utc
+        rows_ingested = estates_upserted + transactions_upserted
+        sync_seconds = time.perf_counter() - sync_started
         event = ReportSalesSyncEvent(
             installation_id=installation_id,
             department_id=department_id,
@@ -1077,21 +1824,296 @@ class SalesReportService:
             estates_upserted=estates_upserted,
             transactions_upserted=transactions_upserted,
             payload_json={
+                "trigger": trigger,
                 "months_scanned": len(months),
+                "months_fetched": len(months_to_fetch),
+                "fetch_concurrency": _month_fetch_concurrency(),
+                "rollup_months_refreshed": len(rollup_months),
                 "current_month_refresh": current_month_key,
-                "rows_ingested": estates_upserted + transactions_upserted,
+                "rows_ingested": rows_ingested,
                 "rows_skipped": skipped,
                 "validation_warnings_count": warnings_count,
+                "sync_duration_ms": round(sync_seconds * 1000, 1),
+                "write_duration_ms": round(write_seconds * 1000, 1),
+                "rows_per_sec": round(rows_ingested / sync_seconds, 1) if sync_seconds > 0 else None,
+                "write_rows_per_sec": round(rows_ingested / write_seconds, 1) if write_seconds > 0 else None,
             },
         )
         db.add(event)
+        await db.flush()
         return {
             "estates_upserted": estates_upserted,
             "transactions_upserted": transactions_upserted,
             "last_synced_at": now_utc.isoformat(),
             "validation_warnings_count": warnings_count,
+            "sync_event_id": event.id,
         }
 
+    @staticmethod
+    async def _refresh_monthly_rollup(
+        *,
+        db,
+        installation_id: str,
+        department_id: int,
+        months: list[tuple[int, int]],
+    ) -> None:
+        """Recompute ``report_sales_monthly_rollup`` rows for the given months from cached transactions."""
+        tx = ReportSalesTransactionCache
+        rollup = ReportSalesMonthlyRollup
+        for year, month in months:
+            month_start, month_end = _month_bounds(year, month)
+            await db.execute(
+                delete(rollup).where(
+                    and_(
+                        rollup.installation_id == installation_id,
+                        rollup.department_id == department_id,
+                        rollup.year == year,
+                        rollup.month == month,
+                    )
+                )
+            )
+            grouped = (
+                select(
+                    literal(installation_id),
+                    literal(department_id),
+                    literal(year),
+                    literal(month),
+                    tx.user_id,
+                    tx.account,
+                    tx.data_source,
+                    sa_func.sum(tx.amount),
+                    sa_func.sum(tx.vat_amount),
+                    sa_func.sum(sa_func.abs(tx.amount)),
+                    sa_func.sum(sa_func.abs(tx.amount + tx.vat_amount)),
+                    sa_func.count(),
+                )
+                .where(
+                    and_(
+                        tx.installation_id == installation_id,
+                        tx.department_id == department_id,
+                        tx.posting_date.is_not(None),
+                        tx.posting_date >= month_start,
+                        tx.posting_date <= month_end,
+                    )
+                )
+                .group_by(tx.user_id, tx.account, tx.data_source)
+            )
+            await db.execute(
+                insert(rollup).from_select(
+                    [
+                        "installation_id",
+                        "department_id",
+                        "year",
+                        "month",
+                        "user_id",
+                        "account",
+                        "data_source",
+                        "amount_sum",
+                        "vat_amount_sum",
+                        "revenue_excl_vat",
+                        "revenue_incl_vat",
+                        "transaction_count",
+                    ],
+                    grouped,
+                )
+            )
+
+    @staticmethod
+    async def _rollup_covers(
+        *,
+        db,
+        installation_id: str,
+        department_id: int,
+        months: list[tuple[int, int]],
+    ) -> bool:
+        """True when every month in ``months`` has a current rollup for the department."""
+        state = await db.get(ReportSalesCacheState, f"{installation_id}:{department_id}")
+        if state is None:
+            return False
+        done = state.rollup_months_json or {}
+        return all(_month_key(y, m) in done for y, m in months)
+
+    async def _fetch_month_transactions(
+        self,
+        *,
+        installation_id: str,
+        department_id: int,
+        months: list[tuple[int, int]],
+    ) -> AsyncIterator[tuple[int, int, list[dict]]]:
+        """
+        Fetch ledger transactions for several months concurrently and yield them in month order.
+
+        At most ``_month_fetch_concurrency()`` requests are in flight; pacing across all callers
+        is still enforced by the Vitec Hub rate limiter. Outstanding fetches are cancelled if the
+        consumer stops early or fails, and failures of fetches that were never consumed are logged.
+        """
+        if not months:
+            return
+        sem = asyncio.Semaphore(_month_fetch_concurrency())
+
+        async def fetch(year: int, month: int) -> list[dict]:
+            async with sem:
+                month_start, month_end = _month_bounds(year, month)
+                txns = await self._hub.get_accounting_transactions(
+                    installation_id,
+                    from_date=month_start.strftime("%Y-%m-%dT%H:%M:%S"),
+                    to_date=month_end.strftime("%Y-%m-%dT%H:%M:%S"),
+                    department_id=department_id,
+                    ledger_type=1,
+                )
+                return list(txns or [])
+
+        tasks = [
+            asyncio.create_task(fetch(year, month), name=f"sales-month-{year}-{month:02d}") for year, month in months
+        ]
+        consumed = 0
+        try:
+            for (year, month), task in zip(months, tasks, strict=True):
+                # Counted before the await: its result or error goes to the consumer
+                consumed += 1
+                yield year, month, await task
+        finally:
+            unconsumed = tasks[consumed:]
+            for t in unconsumed:
+                t.cancel()
+            results = await asyncio.gather(*unconsumed, return_exceptions=True)
+            for (year, month), result in zip(months[consumed:], results, strict=True):
+                if isinstance(result, Exception):
+                    logger.warning("Sales transaction fetch for %d-%02d failed: %s", year, month, result)
+
+    @staticmethod
+    def _stage_estate_rows(
+        *,
+        installation_id: str,
+        department_id: int,
+        estates: list[dict],
+    ) -> list[dict[str, Any]]:
+        """Convert Vitec estate payloads to estate cache rows (last occurrence wins per estate)."""
+        staged: dict[str, dict[str, Any]] = {}
+        for est in estates:
+            estate_id = str(est.get("estateId") or "").strip()
+            if not estate_id:
+                continue
+            estate_key = f"{installation_id}:{estate_id}"
+            metadata = _build_estate_metadata(est)
+            staged[estate_key] = {
+                "estate_key": estate_key,
+                "installation_id": installation_id,
+                "department_id": department_id,
+                "estate_id": estate_id,
+                "data_source": DATA_SOURCE_VITEC_NEXT,
+                "sold_at": _parse_iso_datetime(est.get("sold")),
+                "address": _build_estate_address(est) or "(ukjent adresse)",
+                "property_type": metadata["property_type"],
+                "assignment_type": metadata["assignment_type"],
+                "assignment_number": metadata.get("assignment_number") or None,
+                "brokers": est.get("brokersIdWithRoles") or [],
+            }
+        return list(staged.values())
+
+    def _stage_transaction_rows(
+        self,
+        *,
+        installation_id: str,
+        department_id: int,
+        transactions: list[dict],
+        not_after: datetime,
+        skipped: dict[str, int],
+        estate_ids: set[str],
+    ) -> tuple[list[dict[str, Any]], int]:
+        """
+        Validate and convert one month of Vitec transactions to cache rows.
+
+        Mutates ``skipped`` counters and ``estate_ids``; returns (rows, warnings_count).
+        """
+        staged: dict[str, dict[str, Any]] = {}
+        warnings_count = 0
+        for txn in transactions:
+            posting_dt = _parse_iso_datetime(txn.get("postingDate"))
+
+            # Validation: reject future-dated transactions
+            if posting_dt and posting_dt > not_after:
+                skipped["future_date"] += 1
+                continue
+
+            # Validation: skip orphan records with no estate AND no user
+            user_id = str(txn.get("userId") or "").strip()
+            estate_id_raw = str(txn.get("estateId") or "").strip()
+            if not user_id and not estate_id_raw:
+                skipped["orphan"] += 1
+                continue
+            if estate_id_raw and estate_id_raw != "(ukjent)" and _looks_like_uuid(estate_id_raw):
+                estate_ids.add(estate_id_raw)
+
+            # Anomaly warning: unusually large amounts
+            amt = abs(float(txn.get("amount") or 0))
+            if amt > 5_000_000:
+                warnings_count += 1
+                logger.warning(
+                    "Large transaction amount %.2f for dept %s estate %s",
+                    amt,
+                    department_id,
+                    estate_id_raw,
+                )
+
+            tx_key = self._transaction_cache_key(installation_id=installation_id, txn=txn)
+            staged[tx_key] = {
+                "transaction_key": tx_key,
+                "installation_id": installation_id,
+                "department_id": department_id,
+                "data_source": DATA_SOURCE_VITEC_NEXT,
+                "posting_date": posting_dt,
+                "account": str(txn.get("account") or "").strip(),
+                "user_id": user_id,
+                "estate_id": estate_id_raw,
+                "amount": float(txn.get("amount") or 0),
+                "vat_amount": float(txn.get("vatAmount") or 0),
+                "description": str(txn.get("description") or ""),
+            }
+        return list(staged.values()), warnings_count
+
+    @staticmethod
+    async def _bulk_upsert(
+        db,
+        model,
+        rows: list[dict[str, Any]],
+        *,
+        key: str,
+        update: bool = True,
+        keep_existing_over: dict[str, str] | None = None,
+    ) -> int:
+        """
+        Write staged cache rows with chunked ``INSERT ... ON CONFLICT`` statements.
+
+        Uses the PostgreSQL dialect in production and the SQLite dialect for dev
+        databases (both support the same ON CONFLICT syntax). With ``update=False``
+        existing rows are left untouched and only newly inserted rows are counted.
+        ``keep_existing_over`` maps columns to placeholder values that must not
+        overwrite what is already stored (e.g. an enriched address).
+        """
+        if not rows:
+            return 0
+        insert = sqlite_insert if _dialect_name(db) == "sqlite" else pg_insert
+        written = 0
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            chunk = rows[start : start + UPSERT_CHUNK_SIZE]
+            stmt = insert(model).values(chunk)
+            if update:
+                set_ = {col: stmt.excluded[col] for col in chunk[0] if col != key}
+                for col, placeholder in (keep_existing_over or {}).items():
+                    set_[col] = case(
+                        (stmt.excluded[col] == placeholder, model.__table__.c[col]), else_=stmt.excluded[col]
+                    )
+                set_["updated_at"] = sa_func.now()
+                stmt = stmt.on_conflict_do_update(index_elements=[key], set_=set_)
+                await db.execute(stmt)
+                written += len(chunk)
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[key])
+                result = await db.execute(stmt)
+                written += max(result.rowcount or 0, 0)
+        return written
+
     async def _build_report_tuple_from_cache(
         self,
         *,
@@ -1107,101 +2129,123 @@ class SalesReportService:
         broker_map: dict[str, str],
         sync_metadata: dict[str, Any] | None = None,
         accounts_filter: set[str] | None = None,
+        include_transactions: bool = True,
     ) -> tuple:
-        estates_stmt = select(ReportSalesEstateCache).where(
-            and_(
-                ReportSalesEstateCache.installation_id == installation_id,
-                ReportSalesEstateCache.department_id == department_id,
-            )
+        """
+        Build report data from the cache tables.
+
+        Account, broker and VAT rules plus per-broker/per-estate sums run in SQL
+        (``GROUP BY user_id, estate_id``). Individual transaction rows are only
+        loaded when ``include_transactions`` is set (Excel export, detail view).
+        """
+        accts = accounts_filter or REVENUE_ACCOUNTS
+        brokers_with_sales = await self._load_brokers_with_sales(
+            db=db,
+            installation_id=installation_id,
+            department_id=department_id,
+            year=year,
         )
-        estates = list((await db.execute(estates_stmt)).scalars().all())
 
-        estate_address: dict[str, str] = {}
-        estate_metadata: dict[str, dict[str, str]] = {}
-        brokers_with_sales: set[str] = set()
-        for est in estates:
-            eid = str(est.estate_id or "").strip()
-            if not eid:
-                continue
-            estate_address[eid] = est.address or "(ukjent adresse)"
-            estate_metadata[eid] = {
-                "property_type": est.property_type or "—",
-                "assignment_type": est.assignment_type or "—",
-                "assignment_number": est.assignment_number or "",
-            }
-            sold_dt = est.sold_at
-            if sold_dt is None or sold_dt.year != year:
-                continue
-            for b in est.brokers_json or []:
-                bid = str((b or {}).get("employeeId") or "").strip()
-                if bid:
-                    brokers_with_sales.add(bid)
+        tx = ReportSalesTransactionCache
+        tx_filters = _cached_transaction_filters(installation_id, department_id, from_dt, to_dt, accts)
+        if brokers_with_sales:
+            tx_filters.append(tx.user_id.in_(sorted(brokers_with_sales)))
 
-        tx_stmt = select(ReportSalesTransactionCache).where(
-            and_(
-                ReportSalesTransactionCache.installation_id == installation_id,
-                ReportSalesTransactionCache.department_id == department_id,
-                ReportSalesTransactionCache.posting_date.is_not(None),
-                ReportSalesTransactionCache.posting_date >= from_dt,
-                ReportSalesTransactionCache.posting_date <= to_dt,
-            )
+        amount_expr = tx.amount + tx.vat_amount if include_vat else tx.amount
+        sums_stmt = (
+            select(tx.user_id, tx.estate_id, sa_func.sum(sa_func.abs(amount_expr)))
+            .where(and_(*tx_filters))
+            .group_by(tx.user_id, tx.estate_id)
         )
-        tx_rows = list((await db.execute(tx_stmt)).scalars().all())
+        broker_estate_totals: dict[str, dict[str, float]] = {}
+        for user_id, estate_id, revenue in (await db.execute(sums_stmt)).all():
+            eid = str(estate_id or "").strip() or "(ukjent)"
+            per_estate = broker_estate_totals.setdefault(str(user_id).strip(), {})
+            per_estate[eid] = per_estate.get(eid, 0.0) + float(revenue or 0.0)
 
-        accts = accounts_filter or REVENUE_ACCOUNTS
         broker_estates: dict[str, dict[str, list[dict[str, Any]]]] = {}
-        for txn in tx_rows:
-            account = _normalize_account(txn.account)
-            if account not in accts:
-                continue
-            user_id = str(txn.user_id or "").strip()
-            if not user_id:
-                continue
-            if brokers_with_sales and user_id not in brokers_with_sales:
-                continue
-            estate_id = str(txn.estate_id or "").strip() or "(ukjent)"
-            txn_payload = {
-                "account": txn.account,
-                "userId": user_id,
-                "estateId": estate_id,
-                "amount": txn.amount,
-                "vatAmount": txn.vat_amount,
-                "description": txn.description,
-                "postingDate": txn.posting_date.isoformat() if txn.posting_date else None,
-            }
-            broker_estates.setdefault(user_id, {}).setdefault(estate_id, []).append(txn_payload)
+        if include_transactions and broker_estate_totals:
+            detail_stmt = (
+                select(tx.account, tx.user_id, tx.estate_id, tx.amount, tx.vat_amount, tx.description, tx.posting_date)
+                .where(and_(*tx_filters))
+                .order_by(tx.posting_date.asc())
+            )
+            for account, user_id, estate_id, amount, vat_amount, description, posting_date in (
+                await db.execute(detail_stmt)
+            ).all():
+                uid = str(user_id).strip()
+                eid = str(estate_id or "").strip() or "(ukjent)"
+                broker_estates.setdefault(uid, {}).setdefault(eid, []).append(
+                    _cached_transaction(account, uid, eid, amount, vat_amount, description, posting_date)
+                )
 
-        if not brokers_with_sales and broker_estates:
-            brokers_with_sales = set(broker_estates.keys())
+        if not brokers_with_sales and broker_estate_totals:
+            brokers_with_sales = set(broker_estate_totals.keys())
 
-        all_estate_ids = set(estate_address) | {eid for ests in broker_estates.values() for eid in ests}
-        await self._enrich_estate_addresses(
+        # Only estates that appear in the report need address/metadata.
+        report_estate_ids = {eid for ests in broker_estate_totals.values() for eid in ests}
+        estate_address, estate_metadata = await self._load_estate_details(
+            db=db,
+            installation_id=installation_id,
+            department_id=department_id,
+            estate_ids=report_estate_ids,
+        )
+        lookup_stats = await self._enrich_cached_estate_addresses(
+            db=db,
             installation_id=installation_id,
+            department_id=department_id,
             estate_address=estate_address,
             estate_metadata=estate_metadata,
-            estate_ids=all_estate_ids,
+            estate_ids=report_estate_ids,
         )
+        sync_event_id = (sync_metadata or {}).get("sync_event_id")
+        sync_event = await db.get(ReportSalesSyncEvent, sync_event_id) if sync_event_id is not None else None
+        if sync_event is not None:
+            sync_event.payload_json = {**(sync_event.payload_json or {}), **lookup_stats}
 
-        # Count rows by data source for scope metadata
+        # Count rows by data source for scope metadata (from the rollup when the range is whole months)
         source_counts: dict[str, int] = {}
-        src_stmt = (
-            select(
-                ReportSalesTransactionCache.data_source,
-                sa_func.count().label("cnt"),
+        aligned_months = _whole_months_in_range(from_dt, to_dt)
+        if aligned_months and await self._rollup_covers(
+            db=db,
+            installation_id=installation_id,
+            department_id=department_id,
+            months=aligned_months,
+        ):
+            rollup = ReportSalesMonthlyRollup
+            period = rollup.year * 100 + rollup.month
+            (first_y, first_m), (last_y, last_m) = aligned_months[0], aligned_months[-1]
+            src_stmt = (
+                select(rollup.data_source, sa_func.sum(rollup.transaction_count))
+                .where(
+                    and_(
+                        rollup.installation_id == installation_id,
+                        rollup.department_id == department_id,
+                        period >= first_y * 100 + first_m,
+                        period <= last_y * 100 + last_m,
+                    )
+                )
+                .group_by(rollup.data_source)
             )
-            .where(
-                and_(
-                    ReportSalesTransactionCache.installation_id == installation_id,
-                    ReportSalesTransactionCache.department_id == department_id,
-                    ReportSalesTransactionCache.posting_date.is_not(None),
-                    ReportSalesTransactionCache.posting_date >= from_dt,
-                    ReportSalesTransactionCache.posting_date <= to_dt,
+        else:
+            src_stmt = (
+                select(
+                    ReportSalesTransactionCache.data_source,
+                    sa_func.count().label("cnt"),
+                )
+                .where(
+                    and_(
+                        ReportSalesTransactionCache.installation_id == installation_id,
+                        ReportSalesTransactionCache.department_id == department_id,
+                        ReportSalesTransactionCache.posting_date.is_not(None),
+                        ReportSalesTransactionCache.posting_date >= from_dt,
+                        ReportSalesTransactionCache.posting_date <= to_dt,
+                    )
                 )
+                .group_by(ReportSalesTransactionCache.data_source)
             )
-            .group_by(ReportSalesTransactionCache.data_source)
-        )
         for row in (await db.execute(src_stmt)).all():
-            source_counts[row[0]] = row[1]
+            source_counts[row[0]] = int(row[1] or 0)
 
         report_data = self._build_report_data_dict(
             year=year,
@@ -1212,6 +2256,7 @@ class SalesReportService:
             broker_map=broker_map,
             brokers_with_sales=brokers_with_sales,
             broker_estates=broker_estates,
+            broker_estate_totals=broker_estate_totals,
             estate_address=estate_address,
             estate_metadata=estate_metadata,
             sync_metadata=sync_metadata,
@@ -1221,6 +2266,188 @@ class SalesReportService:
 
         return report_data, broker_map, brokers_with_sales, broker_estates, estate_address, estate_metadata, include_vat
 
+    @staticmethod
+    async def _load_brokers_with_sales(
+        *,
+        db,
+        installation_id: str,
+        department_id: int,
+        year: int,
+    ) -> set[str]:
+        """Broker IDs on estates in the cache that were sold in ``year``."""
+        year_start, _ = _month_bounds(year, 1)
+        next_year_start, _ = _month_bounds(year + 1, 1)
+        stmt = select(ReportSalesEstateCache.brokers_json).where(
+            and_(
+                ReportSalesEstateCache.installation_id == installation_id,
+                ReportSalesEstateCache.department_id == department_id,
+                ReportSalesEstateCache.sold_at >= year_start,
+                ReportSalesEstateCache.sold_at < next_year_start,
+            )
+        )
+        brokers_with_sales: set[str] = set()
+        for brokers in (await db.execute(stmt)).scalars():
+            for b in brokers or []:
+                bid = str((b or {}).get("employeeId") or "").strip()
+                if bid:
+                    brokers_with_sales.add(bid)
+        return brokers_with_sales
+
+    @staticmethod
+    async def _load_estate_details(
+        *,
+        db,
+        installation_id: str,
+        department_id: int,
+        estate_ids: set[str],
+    ) -> tuple[dict[str, str], dict[str, dict[str, str]]]:
+        """Load address and metadata for the given estates from the estate cache."""
+        estate_address: dict[str, str] = {}
+        estate_metadata: dict[str, dict[str, str]] = {}
+        ids = sorted(eid for eid in estate_ids if eid and eid != "(ukjent)")
+        est = ReportSalesEstateCache
+        for start in range(0, len(ids), UPSERT_CHUNK_SIZE):
+            stmt = select(
+                est.estate_id, est.address, est.property_type, est.assignment_type, est.assignment_number
+            ).where(
+                and_(
+                    est.installation_id == installation_id,
+                    est.department_id == department_id,
+                    est.estate_id.in_(ids[start : start + UPSERT_CHUNK_SIZE]),
+                )
+            )
+            for estate_id, address, property_type, assignment_type, assignment_number in (await db.execute(stmt)).all():
+                eid = str(estate_id or "").strip()
+                if not eid:
+                    continue
+                estate_address[eid] = address or "(ukjent adresse)"
+                estate_metadata[eid] = {
+                    "property_type": property_type or "—",
+                    "assignment_type": assignment_type or "—",
+                    "assignment_number": assignment_number or "",
+                }
+        return estate_address, estate_metadata
+
+    async def _aggregate_monthly_revenue(
+        self,
+        *,
+        db,
+        installation_id: str,
+        department_id: int,
+        year: int,
+        include_vat: bool,
+        accounts_filter: set[str] | None = None,
+    ) -> dict[int, float]:
+        """
+        Sum cached revenue per month of ``year`` in one GROUP BY (month, user).
+
+        Reads the monthly rollup when it covers the year so far, else the raw transaction cache.
+        """
+        year_start, _ = _month_bounds(year, 1)
+        next_year_start, _ = _month_bounds(year + 1, 1)
+
+        # Brokers with a sold estate this year (same rule as the full report).
+        brokers_with_sales = await self._load_brokers_with_sales(
+            db=db,
+            installation_id=installation_id,
+            department_id=department_id,
+            year=year,
+        )
+
+        accts = sorted(accounts_filter or REVENUE_ACCOUNTS)
+        elapsed_months = [(year, m) for m in range(1, 13) if _month_bounds(year, m)[0] <= datetime.now(timezone.utc)]
+        if await self._rollup_covers(
+            db=db,
+            installation_id=installation_id,
+            department_id=department_id,
+            months=elapsed_months,
+        ):
+            rollup = ReportSalesMonthlyRollup
+            revenue_col = rollup.revenue_incl_vat if include_vat else rollup.revenue_excl_vat
+            stmt = (
+                select(rollup.month, rollup.user_id, sa_func.sum(revenue_col))
+                .where(
+                    and_(
+                        rollup.installation_id == installation_id,
+                        rollup.department_id == department_id,
+                        rollup.year == year,
+                        rollup.account.in_(accts),
+                        rollup.user_id != "",
+                    )
+                )
+                .group_by(rollup.month, rollup.user_id)
+            )
+        else:
+            # Portable month bucket: compare against UTC month starts instead of dialect date functions.
+            posting_date = ReportSalesTransactionCache.posting_date
+            month_bucket = case(
+                *[(posting_date < _month_bounds(year, m + 1)[0], m) for m in range(1, 12)],
+                else_=12,
+            )
+            amount_expr = ReportSalesTransactionCache.amount
+            if include_vat:
+                amount_expr = amount_expr + ReportSalesTransactionCache.vat_amount
+            stmt = (
+                select(
+                    month_bucket.label("month"),
+                    ReportSalesTransactionCache.user_id,
+                    sa_func.sum(sa_func.abs(amount_expr)).label("revenue"),
+                )
+                .where(
+                    and_(
+                        ReportSalesTransactionCache.installation_id == installation_id,
+                        ReportSalesTransactionCache.department_id == department_id,
+                        posting_date.is_not(None),
+                        posting_date >= year_start,
+                        posting_date < next_year_start,
+                        ReportSalesTransactionCache.account.in_(accts),
+                        ReportSalesTransactionCache.user_id != "",
+                    )
+                )
+                .group_by(month_bucket, ReportSalesTransactionCache.user_id)
+            )
+
+        monthly: dict[int, float] = defaultdict(float)
+        for month, user_id, revenue in (await db.execute(stmt)).all():
+            if brokers_with_sales and str(user_id).strip() not in brokers_with_sales:
+                continue
+            monthly[int(month)] += float(revenue or 0.0)
+        return dict(monthly)
+
+    async def _monthly_revenue_live(
+        self,
+        *,
+        installation_id: str,
+        department_id: int,
+        year: int,
+        include_vat: bool,
+        accounts_filter: set[str] | None = None,
+    ) -> dict[int, float]:
+        """Fallback for ``get_monthly_revenue``: one live fetch for the year, bucketed in Python."""
+        _, _, _, broker_estates, _, _, _ = await self._fetch_report_data_live(
+            installation_id=installation_id,
+            department_id=department_id,
+            year=year,
+            from_date=f"{year}-01-01T00:00:00",
+            to_date=f"{year}-12-31T23:59:59",
+            include_vat=include_vat,
+            broker_map={},
+            accounts_filter=accounts_filter,
+        )
+        monthly: dict[int, float] = defaultdict(float)
+        for estates in broker_estates.values():
+            for txns in estates.values():
+                for txn in txns:
+                    posting_dt = _parse_iso_datetime(txn.get("postingDate"))
+                    if posting_dt is None or posting_dt.year != year:
+                        continue
+                    monthly[posting_dt.month] += _revenue_amount(
+                        float(txn.get("amount") or 0),
+                        float(txn.get("vatAmount") or 0),
+                        include_vat,
+                    )
+        return dict(monthly)
+
     @staticmethod
     async def _resolve_department_names(department_ids: list[int]) -> dict[int, str]:
         """Map Vitec department IDs to office names from the offices table."""
@@ -1269,7 +2496,14 @@ class SalesReportService:
         sync_metadata: dict[str, Any] | None = None,
         source_counts: dict[str, int] | None = None,
         accounts_filter: set[str] | None = None,
+        broker_estate_totals: dict[str, dict[str, float]] | None = None,
     ) -> dict:
+        """
+        Shape report JSON. Revenue comes from ``broker_estate_totals`` (computed from
+        ``broker_estates`` when not given); transaction detail is included when present.
+        """
+        if broker_estate_totals is None:
+            broker_estate_totals = _sum_broker_estate_totals(broker_estates, include_vat)
         report_data = {
             "year": year,
             "department_id": department_id,
@@ -1291,35 +2525,20 @@ class SalesReportService:
 
         for broker_id in sorted(brokers_with_sales):
             name = broker_map.get(broker_id, broker_id)
-            estates_data = broker_estates.get(broker_id, {})
-            sale_count = len(estates_data)
+            estate_totals = broker_estate_totals.get(broker_id, {})
+            estate_txns = broker_estates.get(broker_id, {})
+            sale_count = len(estate_totals)
             total = 0.0
             properties: list[dict] = []
-            for estate_id, txns in sorted(estates_data.items(), key=lambda x: estate_address.get(x[0], x[0])):
+            for estate_id, prop_total in sorted(estate_totals.items(), key=lambda x: estate_address.get(x[0], x[0])):
                 raw_addr = estate_address.get(estate_id, estate_id)
                 meta = estate_metadata.get(
                     estate_id,
                     {"property_type": "—", "assignment_type": "—", "assignment_number": ""},
                 )
                 addr = _display_address(estate_id, raw_addr, meta)
-                prop_total = 0.0
-                txns_data: list[dict] = []
-                for txn in txns:
-                    amt = _revenue_amount(
-                        float(txn.get("amount") or 0),
-                        float(txn.get("vatAmount") or 0),
-                        include_vat,
-                    )
-                    prop_total += amt
-                    total += amt
-                    txns_data.append(
-                        {
-                            "posting_date": _format_date_iso(txn.get("postingDate")),
-                            "account": txn.get("account"),
-                            "description": (txn.get("description") or "")[:80],
-                            "amount": round(amt, 2),
-                        }
-                    )
+                total += prop_total
+                txns_data = [_property_transaction(txn, include_vat) for txn in estate_txns.get(estate_id, [])]
                 properties.append(
                     {
                         "address": addr,
@@ -1373,13 +2592,13 @@ class SalesReportService:
             "last_synced_at": (sync_metadata or {}).get("last_synced_at"),
             "data_sources": data_sources,
             "brokers_filter": "only brokers with sales in period",
-            "data_freshness_note": "Current month re-synced on every load; past months cached",
+            "data_freshness_note": _data_freshness_note(),
             "validation_warnings_count": (sync_metadata or {}).get("validation_warnings_count", 0),
         }
 
         return report_data
 
-    def _build_excel(
+    async def _write_excel(
         self,
         *,
         year: int,
@@ -1387,47 +2606,66 @@ class SalesReportService:
         from_date: str,
         to_date: str,
         broker_map: dict[str, str],
-        brokers_with_sales: set[str],
-        broker_estates: dict[str, dict[str, list[dict]]],
+        broker_estates: AsyncIterator[tuple[str, dict[str, list[dict]]]],
         estate_address: dict[str, str],
         estate_metadata: dict[str, dict[str, str]],
         include_vat: bool,
-    ) -> bytes:
-        """Generate Excel workbook with expandable broker/property/transaction detail."""
-        import openpyxl
+    ):
+        """
+        Write Excel workbook with expandable broker/property/transaction detail.
+
+        ``broker_estates`` yields (broker_id, {estate_id: transactions}) in display
+        order; brokers without estates are left out. Rows go straight to a write-only
+        sheet, so no cell objects are kept in memory; the saved workbook is returned
+        as a spooled temp file at offset 0.
+        """
         from openpyxl.styles import Font
 
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Formidlingsrapport"
+        wb, ws = _write_only_workbook("Formidlingsrapport")
+        # Write-only sheets need column widths and outline settings before the first row.
+        ws.column_dimensions["A"].width = 45
+        ws.column_dimensions["B"].width = 14
+        ws.column_dimensions["C"].width = 18
+        ws.column_dimensions["D"].width = 18
+        ws.column_dimensions["E"].width = 38
+        ws.sheet_format.outlineLevelRow = 2
+        bold = Font(bold=True)
+        italic = Font(italic=True)
 
         from_display = _format_date_iso(from_date) or from_date[:10]
         to_display = _format_date_iso(to_date) or to_date[:10]
         sum_label = "Sum vederlag + andre inntekter (kr)" + (" inkl. mva." if include_vat else " eksl. mva.")
 
+        row = 0
+
+        def append(values: list, *, font=None, outline_level: int = 0) -> None:
+            nonlocal row
+            row += 1
+            if outline_level:
+                ws.row_dimensions[row].outline_level = outline_level
+            ws.append(_styled_row(ws, values, font) if font else values)
+            # The row is serialized on append; drop its dimension so memory stays flat.
+            ws.row_dimensions.pop(row, None)
+
         # Header
-        ws.append(["Formidlingsrapport - Vederlag og andre inntekter"])
-        ws.merge_cells("A1:E1")
-        ws["A1"].font = Font(bold=True, size=14)
-        ws.append([f"Avdeling: {department_id}  |  År: {year}  |  Periode: {from_display} - {to_display}"])
-        ws.merge_cells("A2:E2")
-        ws.append([])
+        append(["Formidlingsrapport - Vederlag og andre inntekter"], font=Font(bold=True, size=14))
+        ws.merged_cells.add("A1:E1")
+        append([f"Avdeling: {department_id}  |  År: {year}  |  Periode: {from_display} - {to_display}"])
+        ws.merged_cells.add("A2:E2")
+        append([])
 
         # Column headers: Megler, Antall salg, Eiendomstype, Oppdragstype, Sum
-        headers = ["Megler", "Antall salg", "Eiendomstype", "Oppdragstype", sum_label]
-        ws.append(headers)
-        header_row = ws.max_row
-        for col in range(1, len(headers) + 1):
-            ws.cell(row=header_row, column=col).font = Font(bold=True)
+        append(["Megler", "Antall salg", "Eiendomstype", "Oppdragstype", sum_label], font=bold)
 
         # Data rows with expandable detail
-        # Only include brokers with at least one sale
-        brokers_sorted = [b for b in sorted(brokers_with_sales) if len(broker_estates.get(b, {})) > 0]
-        row = header_row + 1
+        total_revenue = 0.0
+        total_sales = 0
 
-        for broker_id in brokers_sorted:
+        async for broker_id, estates in broker_estates:
+            # Only include brokers with at least one sale
+            if not estates:
+                continue
             name = broker_map.get(broker_id, broker_id)
-            estates = broker_estates.get(broker_id, {})
             sale_count = len(estates)
 
             total = 0.0
@@ -1438,11 +2676,11 @@ class SalesReportService:
                         float(txn.get("vatAmount") or 0),
                         include_vat,
                     )
+            total_revenue += total
+            total_sales += sale_count
 
             # Broker summary row (level 0) - no property/assignment type at broker level
-            ws.append([name, sale_count, "", "", round(total, 0)])
-            broker_row = row
-            row += 1
+            append([name, sale_count, "", "", round(total, 0)])
 
             # Property and transaction detail (grouped)
             for estate_id, txns in sorted(estates.items(), key=lambda x: estate_address.get(x[0], x[0])):
@@ -1458,10 +2696,11 @@ class SalesReportService:
                     suffix = f" ({oppdrag})" if oppdrag else ""
                     addr = f"Adresse ukjent{suffix}" if suffix else "Adresse ukjent"
                 # Property row (level 1)
-                ws.append([f"  {addr}", "", meta["property_type"], meta["assignment_type"], ""])
-                ws.cell(row=row, column=1).font = Font(italic=True)
-                prop_row = row
-                row += 1
+                append(
+                    [f"  {addr}", "", meta["property_type"], meta["assignment_type"], ""],
+                    font=italic,
+                    outline_level=1,
+                )
 
                 # Transaction rows (level 2)
                 for txn in txns:
@@ -1473,38 +2712,12 @@ class SalesReportService:
                     post_date = _format_date_iso(txn.get("postingDate"))
                     acc = txn.get("account") or ""
                     desc = (txn.get("description") or "")[:40]
-                    ws.append([f"    {post_date} | Konto {acc} | {desc}", "", "", "", round(amt, 0)])
-                    row += 1
-
-                # Group property + its transactions
-                ws.row_dimensions.group(prop_row, row - 1, outline_level=2, hidden=False)
-
-            # Group broker + all properties
-            if row > broker_row + 1:
-                ws.row_dimensions.group(broker_row + 1, row - 1, outline_level=1, hidden=False)
+                    append(
+                        [f"    {post_date} | Konto {acc} | {desc}", "", "", "", round(amt, 0)],
+                        outline_level=2,
+                    )
 
         # Total row
-        total_revenue = sum(
-            sum(
-                _revenue_amount(float(t.get("amount") or 0), float(t.get("vatAmount") or 0), include_vat)
-                for est_txns in broker_estates.get(b, {}).values()
-                for t in est_txns
-            )
-            for b in brokers_sorted
-        )
-        total_sales = sum(len(broker_estates.get(b, {})) for b in brokers_sorted)
-        ws.append(["Sum", total_sales, "", "", round(total_revenue, 0)])
-        total_row = row
-        for col in range(1, 6):
-            ws.cell(row=total_row, column=col).font = Font(bold=True)
-
-        # Column widths
-        ws.column_dimensions["A"].width = 45
-        ws.column_dimensions["B"].width = 14
-        ws.column_dimensions["C"].width = 18
-        ws.column_dimensions["D"].width = 18
-        ws.column_dimensions["E"].width = 38
+        append(["Sum", total_sales, "", "", round(total_revenue, 0)], font=bold)
 
-        buf = io.BytesIO()
-        wb.save(buf)
-        return buf.getvalue()
+        return _save_to_spool(wb)
@@ -0,0 +1,230 @@
+"""
+Sanitizer Result Cache - Cached results for the stateless sanitizer/normalizer endpoints.
+
+The editor calls ``/api/sanitize/*`` repeatedly with the same HTML. Results are
+keyed by ``(operation, sha256(html), options)`` and kept in a process-local
+LRU + TTL cache bounded by entry count and payload bytes. Concurrent misses
+for the same key share one computation, so a burst of identical requests costs
+one parse. When ``SANITIZER_CACHE_REDIS_URL`` is set (and the optional
+``redis`` package is installed) results are also shared between replicas;
+Redis errors degrade to process-local caching.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "sanitizer-result:v1"
+
+
+class _LeaderCancelled(Exception):
+    """Set on an in-flight computation whose leading request was cancelled; waiters retry."""
+
+
+class SanitizerResultCache:
+    """LRU + TTL cache of JSON-serializable endpoint payloads, with an optional Redis tier."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        redis_url: str | None = None,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._redis_url = redis_url
+        self._entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()  # key -> (expires, size, value)
+        self._bytes = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._redis: Any = None
+        self._redis_loop: asyncio.AbstractEventLoop | None = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.shared_errors = 0
+
+    @property
+    def ttl_seconds(self) -> float:
+        return settings.SANITIZER_CACHE_TTL_SECONDS if self._ttl_seconds is None else self._ttl_seconds
+
+    @property
+    def max_entries(self) -> int:
+        return settings.SANITIZER_CACHE_MAX_ENTRIES if self._max_entries is None else self._max_entries
+
+    @property
+    def max_bytes(self) -> int:
+        return settings.SANITIZER_CACHE_MAX_BYTES if self._max_bytes is None else self._max_bytes
+
+    @property
+    def redis_url(self) -> str:
+        return settings.SANITIZER_CACHE_REDIS_URL if self._redis_url is None else self._redis_url
+
+    @staticmethod
+    def make_key(operation: str, html: str, **options: Any) -> str:
+        """``operation:sha256(html):options``; options are sorted so argument order does not matter."""
+        digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        option_part = ",".join(f"{name}={value}" for name, value in sorted(options.items()))
+        return f"{KEY_PREFIX}:{operation}:{digest}:{option_part}"
+
+    async def get_or_compute(
+        self,
+        operation: str,
+        html: str,
+        compute: Callable[[], Awaitable[Any]],
+        **options: Any,
+    ) -> tuple[Any, bool]:
+        """
+        Return ``(payload, hit)`` for ``operation`` on ``html``.
+
+        ``compute`` is awaited on a miss; its result must be JSON-serializable.
+        Exceptions are not cached and propagate to every coalesced caller. If the
+        leading request is cancelled, its waiters retry and one of them computes.
+        """
+        key = self.make_key(operation, html, **options)
+        value = self._get_local(key)
+        if value is not None:
+            self.hits += 1
+            return value, True
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending), True
+            except _LeaderCancelled:
+                return await self.get_or_compute(operation, html, compute, **options)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            raw = await self._get_shared(key)
+            if raw is not None:
+                value = json.loads(raw)
+                self.shared_hits += 1
+                hit = True
+            else:
+                self.misses += 1
+                value = await compute()
+                raw = json.dumps(value)
+                await self._set_shared(key, raw)
+                hit = False
+            self._set_local(key, value, len(raw))
+            future.set_result(value)
+            return value, hit
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def _get_local(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def _set_local(self, key: str, value: Any, size: int) -> None:
+        if self.ttl_seconds <= 0 or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._evict(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self._bytes += size
+        while len(self._entries) > max(1, self.max_entries) or self._bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _get_redis(self) -> Any:
+        """Redis client for the shared tier, or None when it is not configured/available."""
+        if not self.redis_url:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                logger.warning("SANITIZER_CACHE_REDIS_URL is set but the redis package is not installed")
+                self._redis_url = ""
+                return None
+            self._redis = redis.from_url(self.redis_url)
+            self._redis_loop = loop
+        return self._redis
+
+    async def _get_shared(self, key: str) -> bytes | None:
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            return await client.get(key)
+        except Exception as exc:
+            self.shared_errors += 1
+            logger.warning(f"Sanitizer cache: shared read failed: {exc}")
+            return None
+
+    async def _set_shared(self, key: str, raw: str) -> None:
+        client = self._get_redis()
+        if client is None or self.ttl_seconds <= 0:
+            return
+        try:
+            await client.set(key, raw, ex=max(1, int(self.ttl_seconds)))
+        except Exception as exc:
+            self.shared_errors += 1
+            logger.warning(f"Sanitizer cache: shared write failed: {exc}")
+
+    async def close(self) -> None:
+        client, self._redis, self._redis_loop = self._redis, None, None
+        if client is not None:
+            await client.aclose()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.shared_hits + self.coalesced + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_ratio": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            "shared_backend": "redis" if self.redis_url else None,
+            "shared_errors": self.shared_errors,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+sanitizer_result_cache = SanitizerResultCache()
+
+
+async def close_sanitizer_result_cache() -> None:
+    """Close the shared-tier connection. Called on application shutdown."""
+    await sanitizer_result_cache.close()
@@ -479,3 +479,23 @@ def get_sanitizer_service() -> SanitizerService:
     if _sanitizer_service is None:
         _sanitizer_service = SanitizerService()
     return _sanitizer_service
+
+
+# Module-level entry points for the CPU pool (see cpu_pool_service.run_cpu_bound)
+
+
+def sanitize_html(html: str, theme_class: str = "proaktiv-theme", update_resource: bool = True) -> str:
+    """``SanitizerService(theme_class).sanitize(html)`` as a picklable worker job."""
+    if theme_class == "proaktiv-theme":
+        return get_sanitizer_service().sanitize(html, update_resource=update_resource)
+    return SanitizerService(theme_class=theme_class).sanitize(html, update_resource=update_resource)
+
+
+def strip_styles_html(html: str) -> str:
+    """``SanitizerService.strip_styles_only`` as a picklable worker job."""
+    return get_sanitizer_service().strip_styles_only(html)
+
+
+def validate_html_structure(html: str) -> dict:
+    """``SanitizerService.validate_structure`` as a picklable worker job."""
+    return get_sanitizer_service().validate_structure(html)
@@ -1,17 +1,29 @@
 """
 Sync commit service for Vitec review workflow.
+
+Committing loads every office/employee the session touches with one query per
+table, applies the accepted fields to those rows and writes them with one flush
+per table, so the database sees batched UPDATE/INSERT statements instead of a
+read + write round trip per record. Phase durations are returned in
+``SyncCommitResult.timings_ms``.
 """
 
 from __future__ import annotations
 
+import logging
+import time
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import Any
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
+from app.models.employee import Employee
+from app.models.office import Office
 from app.models.sync_session import SyncSession
 from app.schemas.employee import EmployeeCreate, EmployeeUpdate
 from app.schemas.office import OfficeCreate, OfficeUpdate
@@ -19,6 +31,18 @@ from app.schemas.sync import SyncCommitResult, SyncDecisionUpdate
 from app.services.employee_service import EmployeeService
 from app.services.office_service import OfficeService
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CommitTargets:
+    """Local rows touched by a commit, loaded up front."""
+
+    offices_by_id: dict[str, Office]
+    offices_by_department: dict[int, Office]
+    employees_by_id: dict[str, Employee]
+    short_codes: set[str]
+
 
 class SyncCommitService:
     """Apply approved decisions from a sync session."""
@@ -57,26 +81,50 @@ class SyncCommitService:
         payloads = preview_data.get("_payloads", {})
         office_payloads = payloads.get("offices", {})
         employee_payloads = payloads.get("employees", {})
+        office_records = preview_data.get("offices", [])
+        employee_records = preview_data.get("employees", [])
 
         result = SyncCommitResult()
+        started = phase_started = time.perf_counter()
+
+        def end_phase(name: str) -> None:
+            nonlocal phase_started
+            now = time.perf_counter()
+            result.timings_ms[name] = round((now - phase_started) * 1000, 2)
+            phase_started = now
+
+        targets = await self._prefetch(db, office_records, employee_records, employee_payloads)
+        end_phase("prefetch")
         await self._commit_offices(
             db,
-            preview_data.get("offices", []),
+            office_records,
             decisions.get("office", {}),
             office_payloads,
+            targets,
             result,
         )
+        end_phase("offices")
         await self._commit_employees(
             db,
-            preview_data.get("employees", []),
+            employee_records,
             decisions.get("employee", {}),
             employee_payloads,
+            targets,
             result,
         )
+        end_phase("employees")
 
         session.status = "committed"
         await db.flush()
-
+        end_phase("finalize")
+        result.timings_ms["total"] = round((time.perf_counter() - started) * 1000, 2)
+
+        logger.info(
+            f"Committed sync session {session.id}: "
+            f"offices +{result.offices_created}/~{result.offices_updated}, "
+            f"employees +{result.employees_created}/~{result.employees_updated} "
+            f"in {result.timings_ms['total']:.0f} ms"
+        )
         return result
 
     async def _load_session(self, db: AsyncSession, session_id: UUID) -> SyncSession:
@@ -86,12 +134,62 @@ class SyncCommitService:
             raise HTTPException(status_code=404, detail="Sync session not found.")
         return session
 
+    async def _prefetch(
+        self,
+        db: AsyncSession,
+        office_records: list[dict[str, Any]],
+        employee_records: list[dict[str, Any]],
+        employee_payloads: dict,
+    ) -> _CommitTargets:
+        """
+        Load matched offices/employees and the offices of new employees, one query per table.
+
+        Relationships are not loaded (``raiseload``); the commit only writes columns.
+        """
+        targets = _CommitTargets(offices_by_id={}, offices_by_department={}, employees_by_id={}, short_codes=set())
+        office_ids = {
+            str(record["local_id"])
+            for record in office_records
+            if record.get("match_type") == "matched" and record.get("local_id")
+        }
+        employee_ids = {
+            str(record["local_id"])
+            for record in employee_records
+            if record.get("match_type") == "matched" and record.get("local_id")
+        }
+        department_ids = {
+            employee_payloads.get(str(record.get("vitec_id") or ""), {}).get("department_id")
+            for record in employee_records
+            if record.get("match_type") == "new"
+        } - {None}
+
+        if office_ids or department_ids:
+            offices = await db.execute(
+                select(Office)
+                .options(raiseload("*"))
+                .where(or_(Office.id.in_(office_ids), Office.vitec_department_id.in_(department_ids)))
+            )
+            for office in offices.scalars().all():
+                targets.offices_by_id[str(office.id)] = office
+                if office.vitec_department_id is not None:
+                    targets.offices_by_department.setdefault(office.vitec_department_id, office)
+
+        if employee_ids:
+            employees = await db.execute(select(Employee).options(raiseload("*")).where(Employee.id.in_(employee_ids)))
+            targets.employees_by_id = {str(employee.id): employee for employee in employees.scalars().all()}
+
+        if any(record.get("match_type") == "new" for record in office_records):
+            targets.short_codes = set((await db.execute(select(Office.short_code))).scalars().all())
+
+        return targets
+
     async def _commit_offices(
         self,
         db: AsyncSession,
         office_records: list[dict[str, Any]],
         decisions: dict,
         payloads: dict,
+        targets: _CommitTargets,
         result: SyncCommitResult,
     ) -> None:
         for record in office_records:
@@ -106,10 +204,7 @@ class SyncCommitService:
 
             if record.get("match_type") == "matched":
                 local_id = record.get("local_id")
-                if not local_id:
-                    result.offices_skipped += 1
-                    continue
-                office = await OfficeService.get_by_id(db, local_id)
+                office = targets.offices_by_id.get(str(local_id)) if local_id else None
                 if not office:
                     result.offices_skipped += 1
                     continue
@@ -122,12 +217,12 @@ class SyncCommitService:
                     result.offices_skipped += 1
                     continue
 
-                update = OfficeUpdate(**accepted_fields)
-                updated = await OfficeService.update(db, local_id, update)
-                if updated:
-                    result.offices_updated += 1
-                else:
-                    result.offices_skipped += 1
+                update_data = OfficeUpdate(**accepted_fields).model_dump(exclude_unset=True)
+                if "short_code" in update_data:
+                    update_data["short_code"] = update_data["short_code"].upper()
+                for field_name, value in update_data.items():
+                    setattr(office, field_name, value)
+                result.offices_updated += 1
                 continue
 
             if record.get("match_type") == "new":
@@ -137,7 +232,7 @@ class SyncCommitService:
 
                 payload = payloads.get(str(record.get("vitec_id") or ""), {})
                 base_code = payload.get("department_number") or accepted_fields.get("name") or "OFF"
-                short_code = await OfficeService._ensure_unique_short_code(db, str(base_code))
+                short_code = OfficeService._claim_short_code(str(base_code), targets.short_codes)
 
                 create = OfficeCreate(
                     name=accepted_fields["name"],
@@ -151,15 +246,22 @@ class SyncCommitService:
                     postal_code=accepted_fields.get("postal_code"),
                     city=accepted_fields.get("city"),
                 )
-                await OfficeService.create(db, create)
+                office = OfficeService.build(create)
+                db.add(office)
+                if office.vitec_department_id is not None:
+                    targets.offices_by_department.setdefault(office.vitec_department_id, office)
                 result.offices_created += 1
 
+        # One flush for all office changes; also assigns ids before new employees reference them
+        await db.flush()
+
     async def _commit_employees(
         self,
         db: AsyncSession,
         employee_records: list[dict[str, Any]],
         decisions: dict,
         payloads: dict,
+        targets: _CommitTargets,
         result: SyncCommitResult,
     ) -> None:
         for record in employee_records:
@@ -174,10 +276,7 @@ class SyncCommitService:
 
             if record.get("match_type") == "matched":
                 local_id = record.get("local_id")
-                if not local_id:
-                    result.employees_skipped += 1
-                    continue
-                employee = await EmployeeService.get_by_id(db, local_id)
+                employee = targets.employees_by_id.get(str(local_id)) if local_id else None
                 if not employee:
                     result.employees_skipped += 1
                     continue
@@ -190,12 +289,12 @@ class SyncCommitService:
                     result.employees_skipped += 1
                     continue
 
-                update = EmployeeUpdate(**accepted_fields)
-                updated = await EmployeeService.update(db, local_id, update)
-                if updated:
-                    result.employees_updated += 1
-                else:
-                    result.employees_skipped += 1
+                update_data = EmployeeUpdate(**accepted_fields).model_dump(exclude_unset=True)
+                if "office_id" in update_data:
+                    update_data["office_id"] = str(update_data["office_id"])
+                for field_name, value in update_data.items():
+                    setattr(employee, field_name, value)
+                result.employees_updated += 1
                 continue
 
             if record.get("match_type") == "new":
@@ -209,7 +308,7 @@ class SyncCommitService:
                     result.employees_skipped += 1
                     continue
 
-                office = await OfficeService.get_by_vitec_department_id(db, department_id)
+                office = targets.offices_by_department.get(department_id)
                 if not office:
                     result.employees_skipped += 1
                     continue
@@ -224,9 +323,11 @@ class SyncCommitService:
                     phone=accepted_fields.get("phone"),
                     system_roles=accepted_fields.get("system_roles") or [],
                 )
-                await EmployeeService.create(db, create)
+                db.add(EmployeeService.build(create))
                 result.employees_created += 1
 
+        await db.flush()
+
     def _accepted_fields(self, record: dict, decisions: dict) -> dict:
         accepted: dict[str, Any] = {}
         for field in record.get("fields", []):
@@ -9,7 +9,7 @@ from collections.abc import Sequence
 from difflib import SequenceMatcher
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.employee import Employee
@@ -21,6 +21,75 @@ from app.services.office_service import OfficeService
 logger = logging.getLogger(__name__)
 
 
+class SyncMatchIndex:
+    """
+    Local offices and employees, loaded once and indexed for matching a Vitec roster.
+
+    Exact lookups (organization number, Vitec ids, lowercased email and office
+    name, first+last name within an office) are dict hits. Fuzzy office-name
+    matching keeps one ``SequenceMatcher`` per office with the office name as
+    the pre-analyzed second sequence, and skips offices whose cheap upper
+    bounds cannot beat the best ratio so far.
+    """
+
+    def __init__(self, offices: Sequence[Office], employees: Sequence[Employee]) -> None:
+        self.offices = list(offices)
+        self.employees = list(employees)
+
+        self.office_by_org_number: dict[str, Office] = {}
+        self.office_by_vitec_id: dict[int, Office] = {}
+        self.office_by_name: dict[str, Office] = {}
+        for office in self.offices:
+            if office.organization_number:
+                self.office_by_org_number.setdefault(office.organization_number, office)
+            if office.vitec_department_id is not None:
+                self.office_by_vitec_id.setdefault(office.vitec_department_id, office)
+            if office.name:
+                self.office_by_name.setdefault(office.name.lower(), office)
+        self._office_name_matchers: list[tuple[Office, SequenceMatcher]] | None = None
+
+        self.employee_by_vitec_id: dict[str, Employee] = {}
+        self.employee_by_email: dict[str, Employee] = {}
+        self.employee_by_name_office: dict[tuple[str, str, str], Employee] = {}
+        for employee in self.employees:
+            if employee.vitec_employee_id:
+                self.employee_by_vitec_id.setdefault(employee.vitec_employee_id, employee)
+            if employee.email:
+                self.employee_by_email.setdefault(employee.email.lower(), employee)
+            if employee.office_id is not None:
+                key = (employee.first_name, employee.last_name, str(employee.office_id))
+                self.employee_by_name_office.setdefault(key, employee)
+
+    @classmethod
+    async def load(cls, db: AsyncSession) -> SyncMatchIndex:
+        """Build the index with one query per table."""
+        offices = (await db.execute(select(Office))).scalars().all()
+        employees = (await db.execute(select(Employee))).scalars().all()
+        return cls(offices, employees)
+
+    def fuzzy_office(self, normalized_name: str) -> tuple[Office | None, float]:
+        """Office whose normalized name is most similar to ``normalized_name`` (first best wins)."""
+        if self._office_name_matchers is None:
+            self._office_name_matchers = [
+                (office, SequenceMatcher(None, "", SyncMatchingService._normalize_name(office.name) or ""))
+                for office in self.offices
+            ]
+
+        best_match: Office | None = None
+        best_ratio = 0.0
+        floor = SyncMatchingService.FUZZY_MATCH_THRESHOLD
+        for office, matcher in self._office_name_matchers:
+            matcher.set_seq1(normalized_name)
+            bound = max(best_ratio, floor)
+            if matcher.real_quick_ratio() < bound or matcher.quick_ratio() < bound:
+                continue
+            ratio = matcher.ratio()
+            if ratio > best_ratio:
+                best_ratio = ratio
+                best_match = office
+        return best_match, best_ratio
+
+
 class SyncMatchingService:
     OFFICE_FIELDS: Sequence[str] = (
         "name",
@@ -97,7 +166,10 @@ class SyncMatchingService:
         return diffs
 
     @staticmethod
-    async def match_office(db: AsyncSession, raw_department: dict) -> RecordDiff:
+    async def match_office(db: AsyncSession, raw_department: dict, index: SyncMatchIndex | None = None) -> RecordDiff:
+        """Match one Vitec department; pass ``index`` when matching many (see ``SyncMatchIndex``)."""
+        if index is None:
+            index = await SyncMatchIndex.load(db)
         payload = OfficeService._map_department_payload(raw_department or {})
         match: Office | None = None
         match_method: str | None = None
@@ -105,39 +177,26 @@ class SyncMatchingService:
 
         org_number = payload.get("organization_number")
         if org_number:
-            match = await OfficeService.get_by_organization_number(db, org_number)
+            match = index.office_by_org_number.get(org_number)
             if match:
                 match_method = "organization_number"
                 match_confidence = 1.0
 
         if not match and payload.get("vitec_department_id") is not None:
-            match = await OfficeService.get_by_vitec_department_id(
-                db,
-                payload["vitec_department_id"],
-            )
+            match = index.office_by_vitec_id.get(payload["vitec_department_id"])
             if match:
                 match_method = "vitec_department_id"
                 match_confidence = 1.0
 
         normalized_name = SyncMatchingService._normalize_name(payload.get("name"))
         if not match and normalized_name:
-            result = await db.execute(select(Office).where(func.lower(Office.name) == normalized_name))
-            match = result.scalar_one_or_none()
+            match = index.office_by_name.get(normalized_name)
             if match:
                 match_method = "name_exact"
                 match_confidence = 0.9
 
         if not match and normalized_name:
-            result = await db.execute(select(Office))
-            offices = result.scalars().all()
-            best_match: Office | None = None
-            best_ratio = 0.0
-            for office in offices:
-                office_name = SyncMatchingService._normalize_name(office.name) or ""
-                ratio = SequenceMatcher(None, normalized_name, office_name).ratio()
-                if ratio > best_ratio:
-                    best_ratio = ratio
-                    best_match = office
+            best_match, best_ratio = index.fuzzy_office(normalized_name)
             if best_match and best_ratio >= SyncMatchingService.FUZZY_MATCH_THRESHOLD:
                 match = best_match
                 match_method = "name_fuzzy"
@@ -164,7 +223,10 @@ class SyncMatchingService:
         )
 
     @staticmethod
-    async def match_employee(db: AsyncSession, raw_employee: dict) -> RecordDiff:
+    async def match_employee(db: AsyncSession, raw_employee: dict, index: SyncMatchIndex | None = None) -> RecordDiff:
+        """Match one Vitec employee; pass ``index`` when matching many (see ``SyncMatchIndex``)."""
+        if index is None:
+            index = await SyncMatchIndex.load(db)
         payload = EmployeeService._map_employee_payload(raw_employee or {})
         match: Employee | None = None
         match_method: str | None = None
@@ -172,15 +234,14 @@ class SyncMatchingService:
 
         vitec_employee_id = payload.get("vitec_employee_id")
         if vitec_employee_id:
-            match = await EmployeeService.get_by_vitec_employee_id(db, vitec_employee_id)
+            match = index.employee_by_vitec_id.get(vitec_employee_id)
             if match:
                 match_method = "vitec_employee_id"
                 match_confidence = 1.0
 
         email = payload.get("email")
         if not match and email:
-            result = await db.execute(select(Employee).where(func.lower(Employee.email) == email.lower()))
-            match = result.scalar_one_or_none()
+            match = index.employee_by_email.get(email.lower())
             if match:
                 match_method = "email"
                 match_confidence = 0.95
@@ -189,15 +250,9 @@ class SyncMatchingService:
         last_name = payload.get("last_name")
         department_id = payload.get("department_id")
         if not match and first_name and last_name and department_id is not None:
-            office = await OfficeService.get_by_vitec_department_id(db, department_id)
+            office = index.office_by_vitec_id.get(department_id)
             if office:
-                result = await db.execute(
-                    select(Employee)
-                    .where(Employee.first_name == first_name)
-                    .where(Employee.last_name == last_name)
-                    .where(Employee.office_id == str(office.id))
-                )
-                match = result.scalar_one_or_none()
+                match = index.employee_by_name_office.get((first_name, last_name, str(office.id)))
                 if match:
                     match_method = "name_office"
                     match_confidence = 0.8
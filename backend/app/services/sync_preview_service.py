@@ -12,13 +12,11 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.models.employee import Employee
-from app.models.office import Office
 from app.models.sync_session import SyncSession
 from app.schemas.sync import RecordDiff, SyncPreview, SyncSummary
 from app.services.employee_service import EmployeeService
 from app.services.office_service import OfficeService
-from app.services.sync_matching_service import SyncMatchingService
+from app.services.sync_matching_service import SyncMatchIndex, SyncMatchingService
 from app.services.vitec_hub_service import VitecHubService
 
 
@@ -54,14 +52,17 @@ class SyncPreviewService:
         await db.flush()
         await db.refresh(session)
 
-        office_diffs, matched_offices, office_payloads = await self._build_office_diffs(db, departments)
+        # Local offices/employees are loaded once; every match below is an in-memory lookup
+        index = await SyncMatchIndex.load(db)
+        office_diffs, matched_offices, office_payloads = await self._build_office_diffs(db, departments, index)
         employee_diffs, matched_employees, missing_office, employee_payloads = await self._build_employee_diffs(
             db,
             employees,
+            index,
         )
 
-        office_not_in_vitec = await self._local_offices_not_in_vitec(db, matched_offices)
-        employee_not_in_vitec = await self._local_employees_not_in_vitec(db, matched_employees)
+        office_not_in_vitec = self._local_offices_not_in_vitec(index, matched_offices)
+        employee_not_in_vitec = self._local_employees_not_in_vitec(index, matched_employees)
 
         office_diffs.extend(office_not_in_vitec)
         employee_diffs.extend(employee_not_in_vitec)
@@ -144,6 +145,7 @@ class SyncPreviewService:
         self,
         db: AsyncSession,
         departments: list[dict],
+        index: SyncMatchIndex,
     ) -> tuple[list[RecordDiff], set[str], dict[str, dict]]:
         office_diffs: list[RecordDiff] = []
         matched_ids: set[str] = set()
@@ -154,7 +156,7 @@ class SyncPreviewService:
             vitec_id = payload.get("vitec_department_id")
             if vitec_id is not None:
                 payloads[str(vitec_id)] = payload
-            diff = await self._matching.match_office(db, raw or {})
+            diff = await self._matching.match_office(db, raw or {}, index)
             office_diffs.append(diff)
             if diff.match_type == "matched" and diff.local_id:
                 matched_ids.add(str(diff.local_id))
@@ -164,13 +166,14 @@ class SyncPreviewService:
         self,
         db: AsyncSession,
         employees: list[dict],
+        index: SyncMatchIndex,
     ) -> tuple[list[RecordDiff], set[str], int, dict[str, dict]]:
         employee_diffs: list[RecordDiff] = []
         matched_ids: set[str] = set()
         missing_office = 0
         payloads: dict[str, dict] = {}
 
-        office_lookup = await self._office_lookup(db)
+        office_lookup = index.office_by_vitec_id
         for raw in employees:
             payload = EmployeeService._map_employee_payload(raw or {})
             vitec_id = payload.get("vitec_employee_id")
@@ -180,26 +183,19 @@ class SyncPreviewService:
             if department_id is None or department_id not in office_lookup:
                 missing_office += 1
 
-            diff = await self._matching.match_employee(db, raw or {})
+            diff = await self._matching.match_employee(db, raw or {}, index)
             employee_diffs.append(diff)
             if diff.match_type == "matched" and diff.local_id:
                 matched_ids.add(str(diff.local_id))
         return employee_diffs, matched_ids, missing_office, payloads
 
-    async def _office_lookup(self, db: AsyncSession) -> dict[int, Office]:
-        result = await db.execute(select(Office))
-        offices = result.scalars().all()
-        return {office.vitec_department_id: office for office in offices if office.vitec_department_id}
-
-    async def _local_offices_not_in_vitec(
+    def _local_offices_not_in_vitec(
         self,
-        db: AsyncSession,
+        index: SyncMatchIndex,
         matched_ids: set[str],
     ) -> list[RecordDiff]:
-        result = await db.execute(select(Office))
-        offices = result.scalars().all()
         diffs: list[RecordDiff] = []
-        for office in offices:
+        for office in index.offices:
             if str(office.id) in matched_ids:
                 continue
             diffs.append(
@@ -215,15 +211,13 @@ class SyncPreviewService:
             )
         return diffs
 
-    async def _local_employees_not_in_vitec(
+    def _local_employees_not_in_vitec(
         self,
-        db: AsyncSession,
+        index: SyncMatchIndex,
         matched_ids: set[str],
     ) -> list[RecordDiff]:
-        result = await db.execute(select(Employee))
-        employees = result.scalars().all()
         diffs: list[RecordDiff] = []
-        for employee in employees:
+        for employee in index.employees:
             if str(employee.id) in matched_ids:
                 continue
             diffs.append(
@@ -13,6 +13,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.merge_field import MergeField
 from app.models.template import Template
+from app.services.merge_field_service import MergeFieldService
+from app.services.template_fingerprint_service import TemplateFingerprintService
 
 logger = logging.getLogger(__name__)
 
@@ -64,17 +66,11 @@ class TemplateAnalyzerService:
         if not template.content:
             raise HTTPException(status_code=400, detail="Template has no content")
 
-        content = template.content
-
-        # Extract merge fields
-        merge_fields = cls.extract_merge_fields(content)
-
-        # Extract conditions
-        conditions = cls.extract_conditions(content)
-
-        # Extract loops
-        loops = cls.extract_loops(content)
-        loop_expressions = [f"{loop['variable']} in {loop['collection']}" for loop in loops]
+        # Structural facts are parsed once per content hash and reused afterwards
+        fingerprint = await TemplateFingerprintService.get_for_content(db, template.content)
+        merge_fields = fingerprint["merge_fields"]
+        conditions = fingerprint["conditions"]
+        loop_expressions = [f"{loop['variable']} in {loop['collection']}" for loop in fingerprint["loops"]]
 
         # Get existing merge field paths
         existing_result = await db.execute(select(MergeField.path))
@@ -104,37 +100,17 @@ class TemplateAnalyzerService:
         Returns:
             Dict containing:
             - templates_scanned: int
+            - templates_parsed: int - templates whose content had to be (re)parsed
             - total_merge_fields: int
             - total_conditions: int
             - total_loops: int
             - unique_fields: List[str]
             - unknown_fields: List[str]
         """
-        # Get all HTML templates
-        result = await db.execute(
-            select(Template).where(Template.file_type == "html").where(Template.content.isnot(None))
-        )
-        templates = list(result.scalars().all())
-
-        # Aggregate results
-        all_fields: set[str] = set()
-        all_conditions: set[str] = set()
-        all_loops: list[dict] = []
-        field_usage: dict[str, int] = {}
-
-        for template in templates:
-            content = template.content or ""
-
-            fields = cls.extract_merge_fields(content)
-            conditions = cls.extract_conditions(content)
-            loops = cls.extract_loops(content)
-
-            all_fields.update(fields)
-            all_conditions.update(conditions)
-            all_loops.extend(loops)
-
-            for field in fields:
-                field_usage[field] = field_usage.get(field, 0) + 1
+        # Only templates whose content changed since their last fingerprint are loaded and parsed
+        scan = await TemplateFingerprintService.scan_library(db)
+        field_usage: dict[str, int] = scan["field_usage"]
+        all_fields = set(field_usage)
 
         # Get existing merge field paths
         existing_result = await db.execute(select(MergeField.path))
@@ -143,20 +119,16 @@ class TemplateAnalyzerService:
         # Find unknown fields
         unknown_fields = list(all_fields - existing_paths)
 
-        # Update usage counts
+        # Update usage counts (one set-based statement)
         if update_usage_counts:
-            for path, count in field_usage.items():
-                field_result = await db.execute(select(MergeField).where(MergeField.path == path))
-                field = field_result.scalar_one_or_none()
-                if field:
-                    field.usage_count = count
-            await db.flush()
+            await MergeFieldService.set_usage_counts(db, field_usage)
 
         return {
-            "templates_scanned": len(templates),
+            "templates_scanned": scan["templates_scanned"],
+            "templates_parsed": scan["templates_parsed"],
             "total_merge_fields": len(all_fields),
-            "total_conditions": len(all_conditions),
-            "total_loops": len(all_loops),
+            "total_conditions": len(scan["conditions"]),
+            "total_loops": scan["loop_count"],
             "unique_fields": list(all_fields),
             "unknown_fields": unknown_fields,
         }
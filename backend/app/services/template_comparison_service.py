@@ -18,6 +18,8 @@ from app.schemas.template_comparison import (
     Conflict,
     StructuralChange,
 )
+from app.services.cpu_pool_service import run_cpu_bound
+from app.services.template_fingerprint_service import compute_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -36,8 +38,6 @@ NO_TOUCH_PATTERNS = [
 ]
 
 MERGE_FIELD_RE = re.compile(r"\[\[(\*?)([^\]]+)\]\]")
-VITEC_IF_RE = re.compile(r'vitec-if="([^"]*)"')
-VITEC_FOREACH_RE = re.compile(r'vitec-foreach="([^"]*)"')
 
 
 def _is_no_touch(title: str) -> bool:
@@ -92,27 +92,6 @@ def _get_text_blocks(soup: BeautifulSoup) -> dict[str, str]:
     return blocks
 
 
-def _get_merge_fields(html: str) -> set[str]:
-    return {m.group(0) for m in MERGE_FIELD_RE.finditer(html)}
-
-
-def _get_vitec_conditions(html: str) -> set[str]:
-    return {m.group(1) for m in VITEC_IF_RE.finditer(html)}
-
-
-def _get_vitec_loops(html: str) -> set[str]:
-    return {m.group(1) for m in VITEC_FOREACH_RE.finditer(html)}
-
-
-def _get_tag_structure(soup: BeautifulSoup) -> list[str]:
-    """Get a list of tag names in document order for structural comparison."""
-    return [tag.name for tag in soup.find_all(True)]
-
-
-def _get_style_blocks(soup: BeautifulSoup) -> list[str]:
-    return [style.get_text() for style in soup.find_all("style")]
-
-
 def _get_attributes_map(soup: BeautifulSoup) -> dict[str, dict[str, str]]:
     """Get a map of element_path -> attributes for elements with vitec-* attrs or id/class."""
     result: dict[str, dict[str, str]] = {}
@@ -141,8 +120,14 @@ class TemplateComparisonService:
         template_id: UUID | None = None,
         template_title: str | None = None,
         vitec_source_hash: str | None = None,
+        stored_fingerprint: dict | None = None,
     ) -> ComparisonResult:
-        """Compare stored template against updated Vitec source."""
+        """Compare stored template against updated Vitec source.
+
+        ``stored_fingerprint`` is the persisted fingerprint of ``stored_html``
+        (see TemplateFingerprintService); it is computed here when omitted.
+        Differing documents are parsed and diffed on the shared CPU pool.
+        """
         stored_hash = _compute_hash(stored_html)
         updated_hash = _compute_hash(updated_html)
 
@@ -156,10 +141,30 @@ class TemplateComparisonService:
                 hashes_match=True,
             )
 
+        return await run_cpu_bound(compare_documents, stored_html, updated_html, vitec_source_hash, stored_fingerprint)
+
+    def compare_differing(
+        self,
+        stored_html: str,
+        updated_html: str,
+        vitec_source_hash: str | None = None,
+        stored_fingerprint: dict | None = None,
+    ) -> ComparisonResult:
+        """Blocking diff of two documents whose hashes differ (the CPU pool job behind ``compare``)."""
+        stored_hash = _compute_hash(stored_html)
+        updated_hash = _compute_hash(updated_html)
+
         stored_soup = BeautifulSoup(stored_html, "html.parser")
         updated_soup = BeautifulSoup(updated_html, "html.parser")
 
-        changes = self._structural_diff(stored_soup, updated_soup, stored_html, updated_html)
+        changes = self._structural_diff(
+            stored_soup,
+            updated_soup,
+            stored_html,
+            updated_html,
+            stored_fingerprint or compute_fingerprint(stored_html),
+            compute_fingerprint(updated_html),
+        )
         classification = self._classify_changes(changes)
         conflicts = self._detect_conflicts(stored_html, vitec_source_hash, changes)
 
@@ -178,13 +183,15 @@ class TemplateComparisonService:
         updated_soup: BeautifulSoup,
         stored_html: str,
         updated_html: str,
+        stored_fingerprint: dict,
+        updated_fingerprint: dict,
     ) -> list[StructuralChange]:
-        """Identify structural changes between two parsed HTML trees."""
+        """Identify structural changes between two parsed HTML trees and their fingerprints."""
         changes: list[StructuralChange] = []
 
         # 1. Compare merge fields
-        stored_fields = _get_merge_fields(stored_html)
-        updated_fields = _get_merge_fields(updated_html)
+        stored_fields = set(stored_fingerprint["merge_field_tokens"])
+        updated_fields = set(updated_fingerprint["merge_field_tokens"])
         for field in sorted(stored_fields - updated_fields):
             changes.append(
                 StructuralChange(
@@ -207,8 +214,8 @@ class TemplateComparisonService:
             )
 
         # 2. Compare vitec-if conditions
-        stored_conds = _get_vitec_conditions(stored_html)
-        updated_conds = _get_vitec_conditions(updated_html)
+        stored_conds = set(stored_fingerprint["conditions"])
+        updated_conds = set(updated_fingerprint["conditions"])
         for cond in sorted(stored_conds - updated_conds):
             changes.append(
                 StructuralChange(
@@ -231,8 +238,8 @@ class TemplateComparisonService:
             )
 
         # 3. Compare vitec-foreach loops
-        stored_loops = _get_vitec_loops(stored_html)
-        updated_loops = _get_vitec_loops(updated_html)
+        stored_loops = set(stored_fingerprint["foreach_expressions"])
+        updated_loops = set(updated_fingerprint["foreach_expressions"])
         for loop in sorted(stored_loops - updated_loops):
             changes.append(
                 StructuralChange(
@@ -254,17 +261,10 @@ class TemplateComparisonService:
                 )
             )
 
-        # 4. Compare tag structure
-        stored_tags = _get_tag_structure(stored_soup)
-        updated_tags = _get_tag_structure(updated_soup)
-        if stored_tags != updated_tags:
-            stored_counts: dict[str, int] = {}
-            updated_counts: dict[str, int] = {}
-            for t in stored_tags:
-                stored_counts[t] = stored_counts.get(t, 0) + 1
-            for t in updated_tags:
-                updated_counts[t] = updated_counts.get(t, 0) + 1
-
+        # 4. Compare tag structure (element counts per tag name)
+        stored_counts: dict[str, int] = stored_fingerprint["tag_histogram"]
+        updated_counts: dict[str, int] = updated_fingerprint["tag_histogram"]
+        if stored_counts != updated_counts:
             all_tag_names = set(stored_counts.keys()) | set(updated_counts.keys())
             for tag_name in sorted(all_tag_names):
                 old_count = stored_counts.get(tag_name, 0)
@@ -303,8 +303,8 @@ class TemplateComparisonService:
                 )
 
         # 6. Compare style blocks
-        stored_styles = _get_style_blocks(stored_soup)
-        updated_styles = _get_style_blocks(updated_soup)
+        stored_styles = stored_fingerprint["style_blocks"]
+        updated_styles = updated_fingerprint["style_blocks"]
         if stored_styles != updated_styles:
             changes.append(
                 StructuralChange(
@@ -440,3 +440,13 @@ def get_comparison_service() -> TemplateComparisonService:
     if _comparison_service is None:
         _comparison_service = TemplateComparisonService()
     return _comparison_service
+
+
+def compare_documents(
+    stored_html: str,
+    updated_html: str,
+    vitec_source_hash: str | None = None,
+    stored_fingerprint: dict | None = None,
+) -> ComparisonResult:
+    """``TemplateComparisonService.compare_differing`` as a picklable worker job (see cpu_pool_service)."""
+    return get_comparison_service().compare_differing(stored_html, updated_html, vitec_source_hash, stored_fingerprint)
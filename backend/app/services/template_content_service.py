@@ -11,7 +11,9 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.template import Template, TemplateVersion
-from app.services.sanitizer_service import SanitizerService
+from app.services.content_blob_service import ContentBlobService
+from app.services.cpu_pool_service import run_cpu_bound
+from app.services.sanitizer_service import sanitize_html
 from app.services.template_analyzer_service import TemplateAnalyzerService
 
 logger = logging.getLogger(__name__)
@@ -86,11 +88,10 @@ class TemplateContentService:
         # Sanitize content if requested
         processed_content = content
         if auto_sanitize:
-            sanitizer = SanitizerService()
-            processed_content = sanitizer.sanitize(content)
+            processed_content = await run_cpu_bound(sanitize_html, content)
             logger.info(f"Sanitized content for template {template_id}")
 
-        # Update template content
+        # Update template content (search_text and the search index follow on flush, see Template listeners)
         template.content = processed_content
         template.updated_by = updated_by
 
@@ -134,6 +135,17 @@ class TemplateContentService:
         Returns:
             Created TemplateVersion
         """
+        # Store the HTML as a delta against the template's previous snapshot
+        content_hash = None
+        if template.content is not None:
+            previous = await db.execute(
+                select(TemplateVersion.content_hash)
+                .where(TemplateVersion.template_id == template.id, TemplateVersion.content_hash.isnot(None))
+                .order_by(TemplateVersion.version_number.desc())
+                .limit(1)
+            )
+            content_hash = await ContentBlobService.put(db, template.content, base_hash=previous.scalar_one_or_none())
+
         version = TemplateVersion(
             template_id=template.id,
             version_number=template.version,
@@ -142,6 +154,7 @@ class TemplateContentService:
             file_size_bytes=template.file_size_bytes,
             created_by=created_by,
             change_notes=change_notes,
+            content_hash=content_hash,
         )
 
         db.add(version)
@@ -150,6 +163,62 @@ class TemplateContentService:
 
         return version
 
+    @staticmethod
+    async def get_version_content(db: AsyncSession, template_id: UUID, version_number: int) -> str | None:
+        """
+        Reconstruct the HTML content of a template version snapshot.
+
+        Args:
+            db: Database session
+            template_id: Template UUID
+            version_number: Version number of the snapshot
+
+        Returns:
+            HTML content, or None if the snapshot predates content versioning
+
+        Raises:
+            HTTPException: If the version does not exist
+        """
+        result = await db.execute(
+            select(TemplateVersion.content_hash).where(
+                TemplateVersion.template_id == str(template_id), TemplateVersion.version_number == version_number
+            )
+        )
+        row = result.one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Template version not found")
+        if row.content_hash is None:
+            return None
+        return await ContentBlobService.get(db, row.content_hash)
+
+    @staticmethod
+    async def restore_version(db: AsyncSession, template_id: UUID, version_number: int, *, restored_by: str) -> dict:
+        """
+        Restore the content of a version snapshot (saved as a new version).
+
+        Args:
+            db: Database session
+            template_id: Template UUID
+            version_number: Version to restore
+            restored_by: User email
+
+        Returns:
+            Same dict as ``save_content``
+
+        Raises:
+            HTTPException: If the version does not exist or has no stored content
+        """
+        content = await TemplateContentService.get_version_content(db, template_id, version_number)
+        if content is None:
+            raise HTTPException(status_code=409, detail="Template version has no stored content")
+        return await TemplateContentService.save_content(
+            db,
+            template_id,
+            content=content,
+            updated_by=restored_by,
+            change_notes=f"Gjenopprettet fra versjon {version_number}",
+        )
+
     @staticmethod
     def compute_content_hash(content: str) -> str:
         """
@@ -0,0 +1,114 @@
+"""
+Template Count Cache - In-process cache for template library totals and facet counts.
+
+``TemplateService.get_counts`` results are cached per filter set. Any committed
+session that flushed a Template change (insert, update, delete, tag/category
+links) clears the cache; the TTL bounds staleness from writes made by other
+processes.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.template import Template
+
+logger = logging.getLogger(__name__)
+
+_DIRTY_FLAG = "template_counts_dirty"
+
+
+class TemplateCountCache:
+    """LRU + TTL cache keyed by a normalized filter tuple."""
+
+    def __init__(self, *, ttl_seconds: float | None = None, max_entries: int | None = None) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def ttl_seconds(self) -> float:
+        return settings.TEMPLATE_COUNT_CACHE_TTL_SECONDS if self._ttl_seconds is None else self._ttl_seconds
+
+    @property
+    def max_entries(self) -> int:
+        return settings.TEMPLATE_COUNT_CACHE_MAX_ENTRIES if self._max_entries is None else self._max_entries
+
+    @staticmethod
+    def make_key(**filters: Any) -> tuple:
+        """Order-independent key; list values are sorted and stringified, empty values dropped."""
+        items = []
+        for name, value in sorted(filters.items()):
+            if value is None or value == [] or value == "":
+                continue
+            if isinstance(value, list | tuple | set):
+                value = tuple(sorted(str(v) for v in value))
+            else:
+                value = str(value)
+            items.append((name, value))
+        return tuple(items)
+
+    def get(self, key: tuple) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: tuple, value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > max(1, self.max_entries):
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        if self._entries:
+            self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+template_count_cache = TemplateCountCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_template_writes(session: Session, flush_context) -> None:
+    if session.info.get(_DIRTY_FLAG):
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Template):
+            session.info[_DIRTY_FLAG] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_DIRTY_FLAG, False):
+        template_count_cache.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _clear_after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_DIRTY_FLAG, None)
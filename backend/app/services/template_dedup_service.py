@@ -3,17 +3,17 @@ Template Deduplication Service — identifies merge candidates, analyzes
 differences, and produces merged templates using vitec-if conditional logic.
 """
 
-import hashlib
 import logging
 import re
 from difflib import SequenceMatcher
 from uuid import UUID
 
-from bs4 import BeautifulSoup, Tag
-from sqlalchemy import select
+from bs4 import BeautifulSoup
+from sqlalchemy import func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, raiseload, selectinload
 
-from app.models.template import Template
+from app.models.template import Template, TemplateSignature
 from app.schemas.template_dedup import (
     ContentSection,
     MergeAnalysis,
@@ -22,7 +22,10 @@ from app.schemas.template_dedup import (
     MergePreview,
     MergeResult,
 )
-from app.services.sanitizer_service import get_sanitizer_service
+from app.services.cpu_pool_service import run_cpu_bound
+from app.services.sanitizer_service import validate_html_structure
+from app.services.template_fingerprint_service import TemplateFingerprintService, content_hash, top_level_sections
+from app.utils.template_minhash import LshIndex, jaccard, signature_record, template_shingles
 
 logger = logging.getLogger(__name__)
 
@@ -59,7 +62,10 @@ TITLE_NOISE_PATTERN = re.compile(
 )
 
 MIN_PREFIX_LENGTH = 15
-SIMILARITY_THRESHOLD = 0.55
+# Minimum shingle Jaccard similarity for two templates to be merge candidates (see app.utils.template_minhash)
+SIMILARITY_THRESHOLD = 0.5
+# Templates loaded per query when computing signatures or shingle sets
+SIGNATURE_BACKFILL_BATCH = 200
 
 
 def _extract_base_title(title: str) -> str:
@@ -117,42 +123,24 @@ def _normalize_html(html: str) -> str:
     return str(soup)
 
 
-def _content_similarity(a: str, b: str) -> float:
-    """Return 0-1 similarity ratio between two HTML strings."""
-    norm_a = _normalize_html(a)
-    norm_b = _normalize_html(b)
-    return SequenceMatcher(None, norm_a, norm_b).ratio()
-
+def content_similarities(primary: str, others: list[str]) -> list[float]:
+    """
+    Return the 0-1 similarity ratio of ``primary`` to each of ``others``.
 
-def _hash_text(text: str) -> str:
-    return hashlib.sha256(text.encode()).hexdigest()[:16]
+    Runs as a CPU pool job; ``primary`` is normalized and indexed once.
+    """
+    norm_primary = _normalize_html(primary)
+    matcher = SequenceMatcher(None, b=norm_primary)
+    scores: list[float] = []
+    for other in others:
+        matcher.set_seq1(_normalize_html(other))
+        scores.append(matcher.ratio())
+    return scores
 
 
 def _extract_top_level_sections(html: str) -> list[dict]:
-    """
-    Break an HTML template into top-level sections for comparison.
-
-    Returns a list of dicts with keys: tag, path, content, hash.
-    """
-    soup = BeautifulSoup(html, "lxml")
-    wrapper = soup.find(id="vitecTemplate")
-    target = wrapper if wrapper else (soup.body or soup)
-
-    sections: list[dict] = []
-    idx = 0
-    for child in target.children:
-        if isinstance(child, Tag):
-            content_str = str(child)
-            sections.append(
-                {
-                    "tag": child.name,
-                    "path": f"{child.name}[{idx}]",
-                    "content": content_str,
-                    "hash": _hash_text(content_str),
-                }
-            )
-            idx += 1
-    return sections
+    """Top-level sections of an HTML template (tag, path, content, hash); see ``top_level_sections``."""
+    return top_level_sections(BeautifulSoup(html, "lxml"))
 
 
 def _vitec_if_property_type(prop_type: str) -> str:
@@ -177,18 +165,23 @@ def _vitec_if_property_type(prop_type: str) -> str:
     return f"oppdrag.oppdragstype.key == &quot;{escaped}&quot;"
 
 
-def _build_candidate_group(base_title: str, group_templates: list[Template]) -> MergeCandidateGroup:
-    """Build a MergeCandidateGroup from a list of templates with shared purpose."""
+def _build_candidate_group(
+    base_title: str,
+    group_templates: list[Template],
+    similarity_to_primary: dict[str, float],
+    content_lengths: dict[str, int],
+) -> MergeCandidateGroup:
+    """Build a MergeCandidateGroup from a list of templates with shared purpose (the first is the primary)."""
     primary = group_templates[0]
     candidates: list[MergeCandidate] = []
     for t in group_templates:
-        sim = 1.0 if t.id == primary.id else _content_similarity(primary.content or "", t.content or "")
+        sim = 1.0 if t.id == primary.id else similarity_to_primary.get(str(t.id), 0.0)
         candidates.append(
             MergeCandidate(
                 template_id=t.id,
                 title=t.title,
                 property_type=_extract_property_type(t.title),
-                content_length=len(t.content or ""),
+                content_length=content_lengths.get(str(t.id), 0),
                 similarity_score=round(sim, 3),
             )
         )
@@ -208,6 +201,28 @@ def _build_candidate_group(base_title: str, group_templates: list[Template]) ->
     )
 
 
+def _connected_groups(pairs: list[tuple[str, str]]) -> list[list[str]]:
+    """Union-find over similar pairs; returns groups of two or more ids."""
+    parent: dict[str, str] = {}
+
+    def find(x: str) -> str:
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in pairs:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    groups: dict[str, list[str]] = {}
+    for x in parent:
+        groups.setdefault(find(x), []).append(x)
+    return [members for members in groups.values() if len(members) >= 2]
+
+
 class TemplateDedupService:
     """Service for template deduplication analysis and merge operations."""
 
@@ -217,19 +232,34 @@ class TemplateDedupService:
 
         Uses two strategies:
         1. Exact base title match (after stripping property type suffixes)
-        2. Prefix-based grouping with content similarity for templates that
-           share a common leading phrase (e.g. "Innhenting av opplysninger")
+        2. Near-duplicate content across the rest of the library: stored MinHash
+           signatures go into an LSH index, and only colliding pairs get an exact
+           shingle Jaccard check (>= SIMILARITY_THRESHOLD). Similar pairs are
+           joined into groups.
+
+        Content is only loaded for templates that end up in a shortlisted pair or title group.
         """
         result = await db.execute(
-            select(Template).where(
+            select(Template, func.length(Template.content))
+            .options(
+                load_only(Template.id, Template.title, Template.origin, raiseload=True),
+                selectinload(Template.categories),
+                raiseload(Template.tags),
+                raiseload(Template.versions),
+            )
+            .where(
                 Template.content.isnot(None),
                 Template.content != "",
                 Template.file_type.in_(["html", "htm"]),
             )
+            .order_by(Template.title, Template.id)
         )
-        templates = list(result.scalars().all())
+        rows = result.all()
 
-        eligible = [t for t in templates if not _is_no_touch(t.title, getattr(t, "origin", None))]
+        eligible = [t for t, _ in rows if not _is_no_touch(t.title, t.origin)]
+        content_lengths = {str(t.id): length or 0 for t, length in rows}
+        by_id = {str(t.id): t for t in eligible}
+        shingles: dict[str, set[str]] = {}
 
         # Pass 1: group by exact base title (property type suffix stripping)
         base_groups: dict[str, list[Template]] = {}
@@ -238,47 +268,86 @@ class TemplateDedupService:
             if base not in base_groups:
                 base_groups[base] = []
             base_groups[base].append(t)
+        title_groups = [(base, group) for base, group in base_groups.items() if len(group) >= 2]
+        await TemplateDedupService._load_shingles(db, [str(t.id) for _, group in title_groups for t in group], shingles)
 
         grouped_ids: set[str] = set()
         candidate_groups: list[MergeCandidateGroup] = []
 
-        for base_title, group_templates in base_groups.items():
-            if len(group_templates) < 2:
-                continue
-            group = _build_candidate_group(base_title, group_templates)
-            candidate_groups.append(group)
+        for base_title, group_templates in title_groups:
+            primary_shingles = shingles.get(str(group_templates[0].id), set())
+            similarity = {str(t.id): jaccard(primary_shingles, shingles.get(str(t.id), set())) for t in group_templates}
+            candidate_groups.append(_build_candidate_group(base_title, group_templates, similarity, content_lengths))
             for t in group_templates:
                 grouped_ids.add(str(t.id))
 
-        # Pass 2: prefix-based grouping for remaining templates
-        remaining = [t for t in eligible if str(t.id) not in grouped_ids]
-        prefix_groups: dict[str, list[Template]] = {}
-        for t in remaining:
-            prefix = _extract_title_prefix(t.title)
-            if prefix not in prefix_groups:
-                prefix_groups[prefix] = []
-            prefix_groups[prefix].append(t)
-
-        for prefix, group_templates in prefix_groups.items():
-            if len(group_templates) < 2:
-                continue
-
-            primary = group_templates[0]
-            similar: list[Template] = [primary]
-            for t in group_templates[1:]:
-                sim = _content_similarity(primary.content or "", t.content or "")
-                if sim >= SIMILARITY_THRESHOLD:
-                    similar.append(t)
-
-            if len(similar) >= 2:
-                group = _build_candidate_group(prefix, similar)
-                candidate_groups.append(group)
-                for t in similar:
-                    grouped_ids.add(str(t.id))
-
+        # Pass 2: LSH over the remaining templates' signatures, exact check on colliding pairs only
+        remaining = [tid for tid in by_id if tid not in grouped_ids]
+        signatures = await TemplateDedupService._load_signatures(db, remaining)
+        index = LshIndex()
+        for tid in remaining:
+            index.add(tid, signatures.get(tid, []))
+        pairs = list(index.candidate_pairs())
+        await TemplateDedupService._load_shingles(db, sorted({tid for pair in pairs for tid in pair}), shingles)
+        similar_pairs = [(a, b) for a, b in pairs if jaccard(shingles[a], shingles[b]) >= SIMILARITY_THRESHOLD]
+
+        for member_ids in _connected_groups(similar_pairs):
+            group_templates = sorted((by_id[tid] for tid in member_ids), key=lambda t: (t.title, str(t.id)))
+            primary_shingles = shingles[str(group_templates[0].id)]
+            similarity = {tid: jaccard(primary_shingles, shingles[tid]) for tid in member_ids}
+            prefix = _extract_title_prefix(group_templates[0].title)
+            candidate_groups.append(_build_candidate_group(prefix, group_templates, similarity, content_lengths))
+
+        logger.info(
+            "Dedup scan: %d templates, %d title groups, %d LSH pairs, %d similar",
+            len(eligible),
+            len(title_groups),
+            len(pairs),
+            len(similar_pairs),
+        )
         candidate_groups.sort(key=lambda g: len(g.candidates), reverse=True)
         return candidate_groups
 
+    @staticmethod
+    async def _load_signatures(db: AsyncSession, template_ids: list[str]) -> dict[str, list[int]]:
+        """Stored MinHash signatures for ``template_ids``; computes and stores any that are missing."""
+        signatures: dict[str, list[int]] = {}
+        for start in range(0, len(template_ids), SIGNATURE_BACKFILL_BATCH):
+            batch = template_ids[start : start + SIGNATURE_BACKFILL_BATCH]
+            rows = await db.execute(
+                select(TemplateSignature.template_id, TemplateSignature.minhash).where(
+                    TemplateSignature.template_id.in_(batch)
+                )
+            )
+            for template_id, minhash in rows.all():
+                signatures[str(template_id)] = minhash or []
+
+        missing = [tid for tid in template_ids if tid not in signatures]
+        for start in range(0, len(missing), SIGNATURE_BACKFILL_BATCH):
+            batch = missing[start : start + SIGNATURE_BACKFILL_BATCH]
+            content_rows = await db.execute(select(Template.id, Template.content).where(Template.id.in_(batch)))
+            records = []
+            for template_id, content in content_rows.all():
+                record = signature_record(content)
+                if record:
+                    records.append({"template_id": template_id, **record})
+                    signatures[str(template_id)] = record["minhash"]
+            if records:
+                await db.execute(insert(TemplateSignature), records)
+        if missing:
+            logger.info("Computed %d missing template signatures", len(missing))
+        return signatures
+
+    @staticmethod
+    async def _load_shingles(db: AsyncSession, template_ids: list[str], cache: dict[str, set[str]]) -> None:
+        """Fill ``cache`` with shingle sets for ``template_ids`` (content is loaded once per template)."""
+        missing = [tid for tid in template_ids if tid not in cache]
+        for start in range(0, len(missing), SIGNATURE_BACKFILL_BATCH):
+            batch = missing[start : start + SIGNATURE_BACKFILL_BATCH]
+            rows = await db.execute(select(Template.id, Template.content).where(Template.id.in_(batch)))
+            for template_id, content in rows.all():
+                cache[str(template_id)] = template_shingles(content or "")
+
     @staticmethod
     async def analyze_group(db: AsyncSession, template_ids: list[UUID]) -> MergeAnalysis:
         """Deep-compare a group of templates to identify shared vs divergent content."""
@@ -300,18 +369,19 @@ class TemplateDedupService:
         ]
 
         primary = templates[0]
+        scores = await run_cpu_bound(
+            content_similarities, primary.content or "", [t.content or "" for t in templates[1:]]
+        )
+        similarity = {str(t.id): score for t, score in zip(templates[1:], scores, strict=True)}
+        similarity[str(primary.id)] = 1.0
         for c in candidates:
-            if c.template_id == primary.id:
-                c.similarity_score = 1.0
-            else:
-                match_t = next((t for t in templates if t.id == c.template_id), None)
-                if match_t:
-                    c.similarity_score = round(_content_similarity(primary.content or "", match_t.content or ""), 3)
+            c.similarity_score = round(similarity[str(c.template_id)], 3)
 
-        # Extract sections per template
-        all_sections: dict[UUID, list[dict]] = {}
-        for t in templates:
-            all_sections[t.id] = _extract_top_level_sections(t.content or "")
+        # Sections per template, from the stored fingerprints (parsed once per content hash)
+        fingerprints = await TemplateFingerprintService.get_many(db, [t.content for t in templates])
+        all_sections: dict[UUID, list[dict]] = {
+            t.id: fingerprints[content_hash(t.content)]["sections"] for t in templates
+        }
 
         # Build hash-to-templates map for each section index
         max_sections = max(len(s) for s in all_sections.values()) if all_sections else 0
@@ -332,7 +402,7 @@ class TemplateDedupService:
                     if h not in hashes:
                         hashes[h] = []
                     hashes[h].append(str(tid))
-                    section_content[h] = sec["content"][:100]
+                    section_content[h] = sec["preview"]
 
             template_count = sum(1 for tid, secs in all_sections.items() if idx < len(secs))
 
@@ -477,8 +547,7 @@ class TemplateDedupService:
         merged_html = "\n".join(merged_parts)
 
         # Validate with sanitizer
-        sanitizer = get_sanitizer_service()
-        validation = sanitizer.validate_structure(merged_html)
+        validation = await run_cpu_bound(validate_html_structure, merged_html)
 
         return MergePreview(
             merged_html=merged_html,
@@ -0,0 +1,280 @@
+"""
+Template Fingerprint Service - Structural facts parsed once per content hash.
+
+The analyzer, merge field discovery, dedup section comparison and Vitec change
+comparison all need the same structural view of a template (top-level
+sections, merge fields, vitec-if/foreach expressions, tag counts, style
+blocks). ``compute_fingerprint`` derives it from a single parse; the service
+stores it in ``template_fingerprints`` keyed by the SHA-256 of the content so
+unchanged content is never parsed again.
+"""
+
+import hashlib
+import logging
+import re
+from collections import Counter
+from collections.abc import Iterable
+
+from bs4 import BeautifulSoup, Tag
+from sqlalchemy import and_, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.template import Template
+from app.models.template_fingerprint import TemplateFingerprint
+
+logger = logging.getLogger(__name__)
+
+# Bump when compute_fingerprint changes; rows with an older version are recomputed on read.
+FINGERPRINT_VERSION = 1
+# Characters of section markup kept as a preview
+SECTION_PREVIEW_LENGTH = 100
+# Rows written per INSERT statement
+UPSERT_CHUNK_SIZE = 200
+# Rows fetched per round trip when streaming templates or fingerprints during a library scan
+SCAN_BATCH_SIZE = 200
+
+MERGE_FIELD_PATTERN = re.compile(r"\[\[(\*?)([^\]]+)\]\]")
+VITEC_IF_PATTERN = re.compile(r'vitec-if="([^"]+)"')
+VITEC_FOREACH_PATTERN = re.compile(r'vitec-foreach="([^"]+)"')
+FOREACH_EXPRESSION_PATTERN = re.compile(r"(\w+)\s+in\s+(.+)", re.DOTALL)
+
+FINGERPRINT_FIELDS = (
+    "content_hash",
+    "fingerprint_version",
+    "sections",
+    "merge_fields",
+    "merge_field_tokens",
+    "conditions",
+    "loops",
+    "foreach_expressions",
+    "tag_histogram",
+    "style_blocks",
+)
+
+
+def content_hash(content: str | None) -> str:
+    """SHA-256 hex digest of the raw content (same key as ``TemplateSignature.content_hash``)."""
+    return hashlib.sha256((content or "").encode()).hexdigest()
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def top_level_sections(soup: BeautifulSoup) -> list[dict]:
+    """
+    Break a parsed template into top-level sections for comparison.
+
+    Sections are the element children of the ``#vitecTemplate`` wrapper (or
+    ``<body>``). Returns a list of dicts with keys: tag, path, content, hash.
+    """
+    wrapper = soup.find(id="vitecTemplate")
+    target = wrapper if wrapper else (soup.body or soup)
+
+    sections: list[dict] = []
+    idx = 0
+    for child in target.children:
+        if isinstance(child, Tag):
+            content_str = str(child)
+            sections.append(
+                {
+                    "tag": child.name,
+                    "path": f"{child.name}[{idx}]",
+                    "content": content_str,
+                    "hash": _hash_text(content_str),
+                }
+            )
+            idx += 1
+    return sections
+
+
+def compute_fingerprint(html: str | None) -> dict:
+    """Column values for a ``TemplateFingerprint`` row, from one lxml parse plus attribute regexes."""
+    html = html or ""
+    soup = BeautifulSoup(html, "lxml")
+
+    sections = [
+        {
+            "tag": section["tag"],
+            "path": section["path"],
+            "hash": section["hash"],
+            "preview": section["content"][:SECTION_PREVIEW_LENGTH],
+        }
+        for section in top_level_sections(soup)
+    ]
+
+    merge_fields: set[str] = set()
+    merge_field_tokens: set[str] = set()
+    for match in MERGE_FIELD_PATTERN.finditer(html):
+        merge_fields.add(match.group(2).strip())
+        merge_field_tokens.add(match.group(0))
+
+    foreach_expressions: list[str] = []
+    loops: list[dict] = []
+    for match in VITEC_FOREACH_PATTERN.finditer(html):
+        expression = match.group(1)
+        foreach_expressions.append(expression)
+        loop = FOREACH_EXPRESSION_PATTERN.match(expression)
+        if loop:
+            loops.append({"variable": loop.group(1), "collection": loop.group(2)})
+
+    return {
+        "content_hash": content_hash(html),
+        "fingerprint_version": FINGERPRINT_VERSION,
+        "sections": sections,
+        "merge_fields": sorted(merge_fields),
+        "merge_field_tokens": sorted(merge_field_tokens),
+        "conditions": sorted({m.group(1) for m in VITEC_IF_PATTERN.finditer(html)}),
+        "loops": loops,
+        "foreach_expressions": foreach_expressions,
+        "tag_histogram": dict(sorted(Counter(tag.name for tag in soup.find_all(True)).items())),
+        "style_blocks": [style.get_text() for style in soup.find_all("style")],
+    }
+
+
+def _as_dict(row: TemplateFingerprint) -> dict:
+    return {field: getattr(row, field) for field in FINGERPRINT_FIELDS}
+
+
+class TemplateFingerprintService:
+    """Loads stored fingerprints and computes/stores the ones that are missing or outdated."""
+
+    @staticmethod
+    async def get_for_content(db: AsyncSession, content: str | None) -> dict:
+        """Fingerprint of ``content`` (see ``compute_fingerprint`` for the keys)."""
+        fingerprints = await TemplateFingerprintService.get_many(db, [content])
+        return fingerprints[content_hash(content)]
+
+    @staticmethod
+    async def get_many(db: AsyncSession, contents: Iterable[str | None]) -> dict[str, dict]:
+        """
+        Fingerprints for several documents, keyed by content hash.
+
+        Stored rows are reused when their ``fingerprint_version`` is current;
+        everything else is parsed once per distinct hash and upserted.
+        """
+        by_hash: dict[str, str] = {}
+        for content in contents:
+            by_hash.setdefault(content_hash(content), content or "")
+
+        fingerprints: dict[str, dict] = {}
+        hashes = list(by_hash)
+        for start in range(0, len(hashes), UPSERT_CHUNK_SIZE):
+            result = await db.execute(
+                select(TemplateFingerprint).where(
+                    TemplateFingerprint.content_hash.in_(hashes[start : start + UPSERT_CHUNK_SIZE]),
+                    TemplateFingerprint.fingerprint_version == FINGERPRINT_VERSION,
+                )
+            )
+            for row in result.scalars().all():
+                fingerprints[row.content_hash] = _as_dict(row)
+
+        computed = [compute_fingerprint(content) for h, content in by_hash.items() if h not in fingerprints]
+        if computed:
+            await TemplateFingerprintService._upsert(db, computed)
+            for fingerprint in computed:
+                fingerprints[fingerprint["content_hash"]] = fingerprint
+            logger.info(f"Computed {len(computed)} template fingerprint(s)")
+        return fingerprints
+
+    @staticmethod
+    async def _upsert(db: AsyncSession, rows: list[dict]) -> None:
+        """Insert fingerprints, replacing rows with an older ``fingerprint_version``."""
+        insert = sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            stmt = insert(TemplateFingerprint).values(rows[start : start + UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["content_hash"],
+                set_={field: stmt.excluded[field] for field in FINGERPRINT_FIELDS if field != "content_hash"},
+                where=TemplateFingerprint.fingerprint_version < stmt.excluded.fingerprint_version,
+            )
+            await db.execute(stmt)
+
+    @staticmethod
+    async def scan_library(db: AsyncSession) -> dict:
+        """
+        Aggregate the fingerprints of every HTML template.
+
+        Only templates whose content hash has no current fingerprint are loaded
+        and parsed (see ``_refresh_library``); everything else is read from
+        ``template_fingerprints``, one row per distinct content.
+
+        Returns:
+            Dict with templates_scanned, templates_parsed, field_usage
+            (path -> number of templates using it), conditions (set) and
+            loop_count (vitec-foreach occurrences across all templates).
+        """
+        templates_parsed = await TemplateFingerprintService._refresh_library(db)
+
+        fingerprint = TemplateFingerprint
+        stmt = (
+            select(fingerprint.merge_fields, fingerprint.conditions, fingerprint.loops, func.count(Template.id))
+            .join(Template, Template.content_hash == fingerprint.content_hash)
+            .where(Template.file_type == "html", Template.content.isnot(None))
+            .group_by(fingerprint.content_hash)
+            .execution_options(yield_per=SCAN_BATCH_SIZE)
+        )
+        templates_scanned = 0
+        loop_count = 0
+        field_usage: Counter[str] = Counter()
+        conditions: set[str] = set()
+        result = await db.stream(stmt)
+        async for merge_fields, fingerprint_conditions, loops, template_count in result:
+            templates_scanned += template_count
+            loop_count += len(loops) * template_count
+            conditions.update(fingerprint_conditions)
+            for path in merge_fields:
+                field_usage[path] += template_count
+
+        return {
+            "templates_scanned": templates_scanned,
+            "templates_parsed": templates_parsed,
+            "field_usage": dict(field_usage),
+            "conditions": conditions,
+            "loop_count": loop_count,
+        }
+
+    @staticmethod
+    async def _refresh_library(db: AsyncSession) -> int:
+        """
+        Fingerprint HTML templates whose ``content_hash`` has no current fingerprint.
+
+        Content is streamed in ``SCAN_BATCH_SIZE`` batches; templates whose
+        ``content_hash`` is missing (rows older than the column) get it filled
+        in without touching ``updated_at``. Returns the number of templates loaded.
+        """
+        fingerprint = TemplateFingerprint
+        stmt = (
+            select(Template.id, Template.content, Template.content_hash)
+            .outerjoin(
+                fingerprint,
+                and_(
+                    fingerprint.content_hash == Template.content_hash,
+                    fingerprint.fingerprint_version == FINGERPRINT_VERSION,
+                ),
+            )
+            .where(Template.file_type == "html", Template.content.isnot(None), fingerprint.content_hash.is_(None))
+            .execution_options(yield_per=SCAN_BATCH_SIZE)
+        )
+        table = Template.__table__
+        set_hash = (
+            update(table)
+            .where(table.c.id == bindparam("template_id"))
+            .values(content_hash=bindparam("new_hash"), updated_at=table.c.updated_at)
+        )
+
+        loaded = 0
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            await TemplateFingerprintService.get_many(db, (content for _, content, _ in rows))
+            stale = [
+                {"template_id": template_id, "new_hash": content_hash(content)}
+                for template_id, content, stored_hash in rows
+                if stored_hash != content_hash(content)
+            ]
+            if stale:
+                await db.execute(set_hash, stale)
+            loaded += len(rows)
+        return loaded
@@ -0,0 +1,335 @@
+"""
+Template Search Service - Ranked full-text search over the template library.
+
+Indexed fields are title, description and the visible text of the HTML body
+(``Template.search_text``, kept in step with ``content`` by a model listener, so
+``TemplateContentService.save_content`` and every other content write reindex).
+
+- **PostgreSQL**: the generated ``templates.search_vector`` column (Norwegian
+  ``tsvector``; title weighted A, description B, body C) with a GIN index,
+  ranked with ``ts_rank_cd`` and highlighted with ``ts_headline``. When nothing
+  matches, a ``pg_trgm`` word-similarity fallback on title/description catches
+  typos. See migration 20261017_0004.
+- **SQLite** (dev): an FTS5 table ``templates_fts`` kept current by triggers,
+  ranked with ``bm25`` and highlighted with ``snippet``. Created (and filled) on
+  first use, so existing dev databases pick it up without a migration.
+
+Snippets are HTML-escaped with matches wrapped in ``<mark>``.
+"""
+
+import html
+import logging
+import re
+import time
+
+from sqlalchemy import Text, bindparam, column, func, literal, literal_column, or_, select, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.template import Template
+from app.utils.template_search_text import html_to_search_text
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = "norwegian"
+MAX_SEARCH_LIMIT = 100
+SNIPPET_WORDS = 16
+
+# Private-use sentinels mark matches inside snippets until the text is escaped.
+_MARK_START = "\ue000"
+_MARK_STOP = "\ue001"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_HEADLINE_OPTIONS = (
+    f"StartSel={_MARK_START}, StopSel={_MARK_STOP}, MaxWords={SNIPPET_WORDS + 8}, MinWords={SNIPPET_WORDS // 2}, "
+    'MaxFragments=2, FragmentDelimiter=" … "'
+)
+
+_SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS templates_fts USING fts5("
+    "template_id UNINDEXED, title, description, body, tokenize = 'unicode61 remove_diacritics 0')",
+    "CREATE TRIGGER IF NOT EXISTS templates_fts_ai AFTER INSERT ON templates BEGIN "
+    "INSERT INTO templates_fts(rowid, template_id, title, description, body) "
+    "VALUES (new.rowid, new.id, new.title, coalesce(new.description, ''), coalesce(new.search_text, '')); END",
+    "CREATE TRIGGER IF NOT EXISTS templates_fts_ad AFTER DELETE ON templates BEGIN "
+    "DELETE FROM templates_fts WHERE rowid = old.rowid; END",
+    "CREATE TRIGGER IF NOT EXISTS templates_fts_au AFTER UPDATE OF title, description, search_text ON templates BEGIN "
+    "DELETE FROM templates_fts WHERE rowid = old.rowid; "
+    "INSERT INTO templates_fts(rowid, template_id, title, description, body) "
+    "VALUES (new.rowid, new.id, new.title, coalesce(new.description, ''), coalesce(new.search_text, '')); END",
+)
+
+
+def _dialect_name(db: AsyncSession) -> str:
+    return db.get_bind().dialect.name
+
+
+def _render_snippet(raw: str | None) -> str | None:
+    """Escape ``raw`` for HTML and turn the match sentinels into ``<mark>`` tags."""
+    if not raw:
+        return None
+    escaped = html.escape(raw, quote=False)
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_STOP, "</mark>")
+
+
+def _plain_snippet(*values: str | None) -> str | None:
+    for value in values:
+        if value:
+            words = value.split()
+            snippet = " ".join(words[: SNIPPET_WORDS * 2])
+            return html.escape(snippet + (" …" if len(words) > SNIPPET_WORDS * 2 else ""), quote=False)
+    return None
+
+
+class TemplateSearchService:
+    """
+    Service for searching templates by title, description and body text.
+    """
+
+    @staticmethod
+    def fts5_query(query: str) -> str | None:
+        """
+        Build an FTS5 MATCH expression from free text.
+
+        Every word must match (as a prefix); FTS5 operators in the input are treated as plain words.
+        """
+        tokens = _TOKEN_RE.findall(query.lower())
+        if not tokens:
+            return None
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    @staticmethod
+    async def ensure_sqlite_index(db: AsyncSession) -> bool:
+        """
+        Create and fill the SQLite FTS5 index if it does not exist yet.
+
+        Returns False when this SQLite build has no FTS5 (callers fall back to LIKE).
+        """
+        exists = await db.scalar(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'templates_fts'"))
+        if exists:
+            return True
+
+        # Rows written before search_text existed have no body text yet.
+        table = Template.__table__
+        rows = await db.execute(select(Template.id, Template.content).where(Template.search_text.is_(None)))
+        params = [
+            {"template_id": str(template_id), "search_text": search_text}
+            for template_id, content in rows.all()
+            if (search_text := html_to_search_text(content))
+        ]
+        if params:
+            await db.execute(
+                update(table)
+                .where(table.c.id == bindparam("template_id"))
+                .values(search_text=bindparam("search_text"), updated_at=table.c.updated_at),
+                params,
+            )
+
+        try:
+            for statement in _SQLITE_FTS_DDL:
+                await db.execute(text(statement))
+        except OperationalError as exc:
+            logger.warning("SQLite FTS5 unavailable, template search falls back to LIKE: %s", exc)
+            return False
+        await db.execute(
+            text(
+                "INSERT INTO templates_fts(rowid, template_id, title, description, body) "
+                "SELECT rowid, id, title, coalesce(description, ''), coalesce(search_text, '') FROM templates"
+            )
+        )
+        logger.info("Built SQLite template search index")
+        return True
+
+    @staticmethod
+    async def filter_clause(db: AsyncSession, query: str) -> ColumnElement[bool]:
+        """
+        WHERE clause matching templates for ``query`` (used by ``TemplateService.get_list``).
+
+        PostgreSQL matches the tsvector or a trigram word similarity on the title; SQLite matches the FTS5 index.
+        """
+        dialect = _dialect_name(db)
+        if dialect == "postgresql":
+            return or_(
+                literal_column("templates.search_vector").op("@@")(func.websearch_to_tsquery(SEARCH_CONFIG, query)),
+                literal(query, Text).op("<%")(Template.title),
+            )
+        if dialect == "sqlite":
+            match = TemplateSearchService.fts5_query(query)
+            if match is not None and await TemplateSearchService.ensure_sqlite_index(db):
+                fts_rows = text("SELECT rowid FROM templates_fts WHERE templates_fts MATCH :fts_query").bindparams(
+                    fts_query=match
+                )
+                return literal_column("templates.rowid").in_(fts_rows.columns(column("rowid")))
+        pattern = f"%{query}%"
+        return or_(Template.title.ilike(pattern), Template.description.ilike(pattern))
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        query: str,
+        *,
+        status: str | None = None,
+        limit: int = 20,
+    ) -> dict:
+        """
+        Ranked search with highlighted snippets.
+
+        Args:
+            db: Database session
+            query: Free-text query (PostgreSQL accepts web-search syntax: quotes, ``or``, ``-word``)
+            status: Optional status filter
+            limit: Maximum hits (capped at ``MAX_SEARCH_LIMIT``)
+
+        Returns:
+            Dict with ``query``, ``hits`` (best first; each with ``rank``, ``snippet`` and
+            ``match`` = "fulltext" or "fuzzy") and ``took_ms``.
+        """
+        started = time.perf_counter()
+        query = query.strip()
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+        hits: list[dict] = []
+        if query:
+            dialect = _dialect_name(db)
+            if dialect == "postgresql":
+                hits = await TemplateSearchService._search_postgres(db, query, status=status, limit=limit)
+                if not hits:
+                    hits = await TemplateSearchService._search_trigram(db, query, status=status, limit=limit)
+            else:
+                if dialect == "sqlite":
+                    hits = await TemplateSearchService._search_sqlite(db, query, status=status, limit=limit)
+                if not hits:
+                    hits = await TemplateSearchService._search_like(db, query, status=status, limit=limit)
+        return {
+            "query": query,
+            "hits": hits,
+            "took_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    @staticmethod
+    def _hit(row, *, rank: float, snippet: str | None, match: str) -> dict:
+        return {
+            "id": str(row.id),
+            "title": row.title,
+            "description": row.description,
+            "status": row.status,
+            "workflow_status": row.workflow_status,
+            "updated_at": row.updated_at.isoformat() if hasattr(row.updated_at, "isoformat") else row.updated_at,
+            "rank": round(float(rank or 0.0), 6),
+            "snippet": snippet,
+            "match": match,
+        }
+
+    @staticmethod
+    async def _search_postgres(db: AsyncSession, query: str, *, status: str | None, limit: int) -> list[dict]:
+        # Rank and limit first; ts_headline only runs for the returned rows.
+        status_filter = "AND t.status = :status" if status else ""
+        sql = text(
+            f"""
+            WITH q AS (SELECT websearch_to_tsquery(:config, :query) AS tsq),
+            ranked AS (
+                SELECT t.id, ts_rank_cd(t.search_vector, q.tsq) AS rank
+                FROM templates t, q
+                WHERE t.search_vector @@ q.tsq {status_filter}
+                ORDER BY rank DESC
+                LIMIT :limit
+            )
+            SELECT t.id, t.title, t.description, t.status, t.workflow_status, t.updated_at, ranked.rank,
+                   ts_headline(:config, concat_ws(' ', t.description, t.search_text), q.tsq, :options) AS snippet
+            FROM ranked JOIN templates t ON t.id = ranked.id, q
+            ORDER BY ranked.rank DESC
+            """
+        )
+        params = {"config": SEARCH_CONFIG, "query": query, "limit": limit, "options": _HEADLINE_OPTIONS}
+        if status:
+            params["status"] = status
+        rows = (await db.execute(sql, params)).all()
+        return [
+            TemplateSearchService._hit(
+                row,
+                rank=row.rank,
+                snippet=_render_snippet(row.snippet),
+                match="fulltext",
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    async def _search_trigram(db: AsyncSession, query: str, *, status: str | None, limit: int) -> list[dict]:
+        status_filter = "AND status = :status" if status else ""
+        sql = text(
+            f"""
+            SELECT id, title, description, status, workflow_status, updated_at,
+                   greatest(word_similarity(:query, title), word_similarity(:query, coalesce(description, ''))) AS rank
+            FROM templates
+            WHERE (:query <% title OR :query <% description) {status_filter}
+            ORDER BY rank DESC
+            LIMIT :limit
+            """
+        )
+        params = {"query": query, "limit": limit}
+        if status:
+            params["status"] = status
+        rows = (await db.execute(sql, params)).all()
+        return [
+            TemplateSearchService._hit(row, rank=row.rank, snippet=_plain_snippet(row.description), match="fuzzy")
+            for row in rows
+        ]
+
+    @staticmethod
+    async def _search_sqlite(db: AsyncSession, query: str, *, status: str | None, limit: int) -> list[dict]:
+        match = TemplateSearchService.fts5_query(query)
+        if match is None or not await TemplateSearchService.ensure_sqlite_index(db):
+            return []
+        status_filter = "AND t.status = :status" if status else ""
+        # bm25 weights follow the column order: template_id, title, description, body.
+        sql = text(
+            f"""
+            SELECT t.id, t.title, t.description, t.status, t.workflow_status, t.updated_at,
+                   bm25(templates_fts, 0.0, 10.0, 4.0, 1.0) AS score,
+                   snippet(templates_fts, -1, :start, :stop, ' … ', {SNIPPET_WORDS}) AS snippet
+            FROM templates_fts JOIN templates t ON t.rowid = templates_fts.rowid
+            WHERE templates_fts MATCH :match {status_filter}
+            ORDER BY score
+            LIMIT :limit
+            """
+        )
+        params = {"match": match, "start": _MARK_START, "stop": _MARK_STOP, "limit": limit}
+        if status:
+            params["status"] = status
+        rows = (await db.execute(sql, params)).all()
+        # bm25 is "lower is better"; negate so rank is "higher is better" on both backends.
+        return [
+            TemplateSearchService._hit(row, rank=-row.score, snippet=_render_snippet(row.snippet), match="fulltext")
+            for row in rows
+        ]
+
+    @staticmethod
+    async def _search_like(db: AsyncSession, query: str, *, status: str | None, limit: int) -> list[dict]:
+        pattern = f"%{query}%"
+        stmt = (
+            select(
+                Template.id,
+                Template.title,
+                Template.description,
+                Template.status,
+                Template.workflow_status,
+                Template.updated_at,
+            )
+            .where(
+                or_(
+                    Template.title.ilike(pattern),
+                    Template.description.ilike(pattern),
+                    Template.search_text.ilike(pattern),
+                )
+            )
+            .order_by(Template.title.ilike(pattern).desc(), Template.updated_at.desc())
+            .limit(limit)
+        )
+        if status:
+            stmt = stmt.where(Template.status == status)
+        rows = (await db.execute(stmt)).all()
+        return [
+            TemplateSearchService._hit(row, rank=0.0, snippet=_plain_snippet(row.description), match="fuzzy")
+            for row in rows
+        ]
@@ -2,19 +2,96 @@
 Template Service - Business logic for template operations.
 """
 
+import base64
+import json
 import logging
+import unicodedata
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import Text, cast, func, or_, select
+from sqlalchemy import Select, bindparam, exists, func, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.category import Category
 from app.models.tag import Tag
-from app.models.template import Template
+from app.models.template import (
+    TEMPLATE_FACET_ATTRIBUTES,
+    Template,
+    template_categories,
+    template_facet_values,
+    template_facets,
+)
+from app.services.template_count_cache import TemplateCountCache, template_count_cache
+from app.services.template_search_service import TemplateSearchService
+from app.utils.template_attachments import extract_attachment_names
 
 logger = logging.getLogger(__name__)
 
+# Columns loaded for template listings. Everything else (content, metadata, Vitec
+# settings) stays unloaded and raises if touched, so list cost is independent of
+# template size.
+LIST_COLUMNS = (
+    Template.id,
+    Template.title,
+    Template.description,
+    Template.file_name,
+    Template.file_type,
+    Template.file_size_bytes,
+    Template.status,
+    Template.version,
+    Template.preview_url,
+    Template.created_at,
+    Template.updated_at,
+    Template.attachment_names,
+    Template.workflow_status,
+    Template.is_archived_legacy,
+    Template.origin,
+)
+
+# Sort columns supported by keyset pagination (non-null, indexed together with id).
+KEYSET_SORT_COLUMNS = ("updated_at", "created_at", "title")
+
+
+# Norwegian letters without an NFKD decomposition.
+_ASCII_FOLD = str.maketrans({"ø": "o", "Ø": "O", "æ": "ae", "Æ": "Ae"})
+
+
+def _encode_cursor(key, template_id, *, sort_by: str, sort_order: str) -> str:
+    if isinstance(key, datetime):
+        key = {"dt": key.isoformat()}
+    payload = {"s": sort_by, "o": sort_order, "k": key, "id": str(template_id)}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, *, sort_by: str, sort_order: str) -> tuple:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        key, template_id = payload["k"], payload["id"]
+        if isinstance(key, dict):
+            key = datetime.fromisoformat(key["dt"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if payload.get("s") != sort_by or payload.get("o") != sort_order:
+        raise ValueError("Cursor does not match the requested sort")
+    return key, template_id
+
+
+def _receiver_variants(receiver: str) -> set[str]:
+    """The receiver as given plus its ASCII-folded form (e.g. "Kjøper" also matches "Kjoper")."""
+    folded = unicodedata.normalize("NFKD", receiver.translate(_ASCII_FOLD)).encode("ascii", "ignore").decode("ascii")
+    return {receiver, folded} - {""}
+
+
+def _facet_filter(facets: tuple[str, ...], values: set[str]):
+    """EXISTS clause over ``template_facets`` (served by idx_template_facets_facet_value)."""
+    return exists().where(
+        template_facets.c.template_id == Template.id,
+        template_facets.c.facet.in_(facets),
+        template_facets.c.value.in_(values),
+    )
+
 
 class TemplateService:
     """
@@ -33,6 +110,10 @@ class TemplateService:
         category_id: UUID | None = None,
         category_ids: list[UUID] | None = None,
         receiver: str | None = None,
+        phase: str | None = None,
+        assignment_type: str | None = None,
+        department: str | None = None,
+        property_type: str | None = None,
         page: int = 1,
         per_page: int = 20,
         sort_by: str = "updated_at",
@@ -44,110 +125,248 @@ class TemplateService:
         Args:
             db: Database session
             status: Filter by status (draft, published, archived)
-            search: Search in title/description
+            search: Full-text search over title, description and body (see TemplateSearchService)
             tag_ids: Filter by tag IDs
             category_id: Filter by a single category ID
             category_ids: Filter by multiple category IDs
             receiver: Filter by receiver (primary or extra receivers)
+            phase: Filter by Vitec phase
+            assignment_type: Filter by assignment type
+            department: Filter by department
+            property_type: Filter by property type
             page: Page number (1-indexed)
             per_page: Items per page
             sort_by: Field to sort by
             sort_order: asc or desc
 
         Returns:
-            Tuple of (templates list, total count)
+            Tuple of (templates list, total count). Templates only have ``LIST_COLUMNS``
+            plus tags and categories loaded. The total comes from ``get_counts`` (cached).
+        """
+        filters = {
+            "status": status,
+            "search": search,
+            "tag_ids": tag_ids,
+            "category_id": category_id,
+            "category_ids": category_ids,
+            "receiver": receiver,
+            "phase": phase,
+            "assignment_type": assignment_type,
+            "department": department,
+            "property_type": property_type,
+        }
+        total = (await TemplateService.get_counts(db, **filters))["total"]
+        query = await TemplateService._list_query(db, **filters)
+
+        # Apply sorting (id breaks ties so pages never overlap)
+        sort_column = getattr(Template, sort_by, Template.updated_at)
+        if sort_order == "desc":
+            query = query.order_by(sort_column.desc(), Template.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Template.id.asc())
+
+        # Apply pagination
+        query = query.offset((page - 1) * per_page).limit(per_page)
+
+        # Execute
+        result = await db.execute(query)
+        templates = list(result.scalars().unique().all())
+        await TemplateService._backfill_attachment_names(db, templates)
+
+        return templates, total
+
+    @staticmethod
+    async def get_list_keyset(
+        db: AsyncSession,
+        *,
+        cursor: str | None = None,
+        per_page: int = 20,
+        sort_by: str = "updated_at",
+        sort_order: str = "desc",
+        **filters,
+    ) -> tuple[list[Template], str | None]:
+        """
+        Get one page of templates after ``cursor`` (keyset pagination on ``(sort column, id)``).
+
+        Takes the same filters as ``get_list``. Each page is an index range scan, so
+        deep pages cost the same as the first. ``sort_by`` is limited to ``KEYSET_SORT_COLUMNS``
+        (others fall back to updated_at).
+
+        Returns:
+            Tuple of (templates list, cursor for the next page or None on the last page)
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for a different sort
         """
-        # Base query with relationships
-        query = select(Template).options(selectinload(Template.tags), selectinload(Template.categories))
+        if sort_by not in KEYSET_SORT_COLUMNS:
+            sort_by = "updated_at"
+        descending = sort_order == "desc"
+        sort_column = getattr(Template, sort_by)
+        sort_key = sort_column
+        if sort_by != "title" and db.get_bind().dialect.name == "sqlite":
+            # SQLite stores datetimes as text in more than one format; compare as numbers.
+            sort_key = func.julianday(sort_column)
+
+        query = (await TemplateService._list_query(db, **filters)).add_columns(sort_key.label("sort_key"))
+        if cursor:
+            key, last_id = _decode_cursor(cursor, sort_by=sort_by, sort_order=sort_order)
+            position = tuple_(sort_key, Template.id)
+            boundary = tuple_(
+                bindparam("cursor_key", key, type_=sort_key.type),
+                bindparam("cursor_id", last_id, type_=Template.id.type),
+            )
+            query = query.where(position < boundary if descending else position > boundary)
+        if descending:
+            query = query.order_by(sort_key.desc(), Template.id.desc())
+        else:
+            query = query.order_by(sort_key.asc(), Template.id.asc())
+        rows = (await db.execute(query.limit(per_page + 1))).all()
+
+        next_cursor = None
+        if len(rows) > per_page:
+            rows = rows[:per_page]
+            next_cursor = _encode_cursor(rows[-1].sort_key, rows[-1][0].id, sort_by=sort_by, sort_order=sort_order)
+        templates = [row[0] for row in rows]
+        await TemplateService._backfill_attachment_names(db, templates)
+        return templates, next_cursor
+
+    @staticmethod
+    async def get_counts(db: AsyncSession, **filters) -> dict:
+        """
+        Total and per-status/per-category counts for a filter set (same filters as ``get_list``).
+
+        Served from ``template_count_cache`` until a template write is committed or the TTL expires.
 
-        # Apply filters
+        Returns:
+            Dict with ``total``, ``by_status`` ({status: count}) and ``by_category`` ({category_id: count})
+        """
+        key = TemplateCountCache.make_key(**filters)
+        cached = template_count_cache.get(key)
+        if cached is not None:
+            return cached
+
+        matching = await TemplateService._apply_filters(db, select(Template.id), **filters)
+        status_rows = await db.execute(
+            select(Template.status, func.count()).where(Template.id.in_(matching)).group_by(Template.status)
+        )
+        by_status = {status or "": count for status, count in status_rows.all()}
+        link = template_categories.c
+        category_rows = await db.execute(
+            select(link.category_id, func.count()).where(link.template_id.in_(matching)).group_by(link.category_id)
+        )
+        counts = {
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "by_category": {str(category_id): count for category_id, count in category_rows.all()},
+        }
+        template_count_cache.set(key, counts)
+        return counts
+
+    @staticmethod
+    async def _list_query(db: AsyncSession, **filters) -> Select:
+        """Unsorted, unpaginated listing query (summary columns, tags and categories) with filters applied."""
+        query = select(Template).options(
+            load_only(*LIST_COLUMNS, raiseload=True),
+            selectinload(Template.tags),
+            selectinload(Template.categories),
+            raiseload(Template.versions),
+        )
+        return await TemplateService._apply_filters(db, query, **filters)
+
+    @staticmethod
+    async def _apply_filters(
+        db: AsyncSession,
+        query: Select,
+        *,
+        status: str | None = None,
+        search: str | None = None,
+        tag_ids: list[UUID] | None = None,
+        category_id: UUID | None = None,
+        category_ids: list[UUID] | None = None,
+        receiver: str | None = None,
+        phase: str | None = None,
+        assignment_type: str | None = None,
+        department: str | None = None,
+        property_type: str | None = None,
+    ) -> Select:
+        """Add the ``get_list`` filters to ``query`` (a select over templates)."""
         if status:
             query = query.where(Template.status == status)
 
         if search:
-            search_pattern = f"%{search}%"
-            query = query.where(or_(Template.title.ilike(search_pattern), Template.description.ilike(search_pattern)))
+            query = query.where(await TemplateSearchService.filter_clause(db, search))
 
+        # Relationship and facet filters are EXISTS subqueries so matching rows are never duplicated
+        # and count/offset/limit stay correct.
         if tag_ids:
-            query = query.join(Template.tags).where(Tag.id.in_(tag_ids))
+            query = query.where(Template.tags.any(Tag.id.in_(tag_ids)))
 
         # Handle single category_id or multiple category_ids
         if category_id:
-            query = query.join(Template.categories).where(Category.id == category_id)
+            query = query.where(Template.categories.any(Category.id == category_id))
         elif category_ids:
-            query = query.join(Template.categories).where(Category.id.in_(category_ids))
+            query = query.where(Template.categories.any(Category.id.in_(category_ids)))
 
-        receiver_variants = None
         if receiver:
-            receiver_normalized = receiver
-            try:
-                import unicodedata
-
-                receiver_normalized = unicodedata.normalize("NFKD", receiver).encode("ascii", "ignore").decode("ascii")
-            except Exception:
-                receiver_normalized = receiver
-
-            receiver_variants = {receiver, receiver_normalized}
-
-            try:
-                dialect = db.get_bind().dialect.name
-            except Exception:
-                dialect = None
-
-            if dialect == "sqlite":
-                # SQLite JSON containment is unreliable; filter in Python.
-                sort_column = getattr(Template, sort_by, Template.updated_at)
-                if sort_order == "desc":
-                    query = query.order_by(sort_column.desc())
-                else:
-                    query = query.order_by(sort_column.asc())
-
-                result = await db.execute(query)
-                templates = result.scalars().unique().all()
-
-                import json
-
-                def matches_receiver(template: Template) -> bool:
-                    if template.receiver in receiver_variants:
-                        return True
-                    extra = template.extra_receivers or []
-                    if isinstance(extra, str):
-                        try:
-                            extra = json.loads(extra)
-                        except json.JSONDecodeError:
-                            extra = [extra]
-                    return any(value in receiver_variants for value in extra)
-
-                filtered = [t for t in templates if matches_receiver(t)]
-                total = len(filtered)
-                start = (page - 1) * per_page
-                end = start + per_page
-                return filtered[start:end], total
-
-            conditions = [Template.receiver.in_(receiver_variants)]
-            for variant in receiver_variants:
-                conditions.append(cast(Template.extra_receivers, Text).ilike(f"%{variant}%"))
-            query = query.where(or_(*conditions))
-
-        # Count total
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await db.scalar(count_query) or 0
-
-        # Apply sorting
-        sort_column = getattr(Template, sort_by, Template.updated_at)
-        if sort_order == "desc":
-            query = query.order_by(sort_column.desc())
-        else:
-            query = query.order_by(sort_column.asc())
+            query = query.where(_facet_filter(("receiver", "extra_receiver"), _receiver_variants(receiver)))
+        for facet, value in (
+            ("phase", phase),
+            ("assignment_type", assignment_type),
+            ("department", department),
+            ("property_type", property_type),
+        ):
+            if value:
+                query = query.where(_facet_filter((facet,), {value}))
+        return query
 
-        # Apply pagination
-        query = query.offset((page - 1) * per_page).limit(per_page)
+    @staticmethod
+    async def _backfill_attachment_names(db: AsyncSession, templates: list[Template]) -> None:
+        """
+        Compute ``attachment_names`` for listed rows written before the column existed.
 
-        # Execute
-        result = await db.execute(query)
-        templates = result.scalars().unique().all()
+        Loads metadata only for those rows and stores the result without touching ``updated_at``.
+        """
+        missing = {str(t.id): t for t in templates if t.attachment_names is None}
+        if not missing:
+            return
+        rows = await db.execute(select(Template.id, Template.metadata_json).where(Template.id.in_(list(missing))))
+        params = []
+        for template_id, metadata_json in rows.all():
+            names = extract_attachment_names(metadata_json)
+            set_committed_value(missing[str(template_id)], "attachment_names", names)
+            params.append({"template_id": str(template_id), "names": names})
+        if params:
+            table = Template.__table__
+            await db.execute(
+                update(table)
+                .where(table.c.id == bindparam("template_id"))
+                .values(attachment_names=bindparam("names"), updated_at=table.c.updated_at),
+                params,
+            )
+
+    @staticmethod
+    async def rebuild_facets(db: AsyncSession) -> int:
+        """
+        Rewrite ``template_facets`` for every template from its list columns.
 
-        return list(templates), total
+        Normal writes keep facets current; this is for databases created before the table existed.
+
+        Returns:
+            Number of facet rows written
+        """
+        columns = [getattr(Template, attr) for attr in TEMPLATE_FACET_ATTRIBUTES.values()]
+        rows = []
+        for template_id, *values in (await db.execute(select(Template.id, *columns))).all():
+            for facet, raw in zip(TEMPLATE_FACET_ATTRIBUTES, values, strict=True):
+                rows.extend(
+                    {"template_id": template_id, "facet": facet, "value": value} for value in template_facet_values(raw)
+                )
+        await db.execute(template_facets.delete())
+        if rows:
+            await db.execute(template_facets.insert(), rows)
+        template_count_cache.invalidate()
+        logger.info(f"Rebuilt {len(rows)} template facet rows")
+        return len(rows)
 
     @staticmethod
     async def get_by_id(db: AsyncSession, template_id: UUID) -> Template | None:
@@ -3,13 +3,19 @@ Vitec Hub Service
 
 Handles authenticated requests to the Vitec Megler Hub API.
 Rate-limited to stay well below Vitec's ~600 req/sec limit.
+
+All instances share one pooled ``httpx.AsyncClient`` (HTTP keep-alive, bounded
+connections) and one token-bucket rate limiter. The client is closed from the
+FastAPI lifespan via ``close_vitec_http_client()``.
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
+import random
 import time
+from email.utils import parsedate_to_datetime
 from typing import Any
 
 import httpx
@@ -19,16 +25,141 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Shared rate limiter: min delay between requests (sec)
-_vitec_rate_lock: asyncio.Lock | None = None
-_vitec_last_request_at: float = 0.0
-
-
-def _get_vitec_rate_lock() -> asyncio.Lock:
-    global _vitec_rate_lock
-    if _vitec_rate_lock is None:
-        _vitec_rate_lock = asyncio.Lock()
-    return _vitec_rate_lock
+# Transient upstream statuses retried with exponential backoff (idempotent methods only)
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Upper bound for a single Retry-After / backoff sleep (sec)
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+
+    Up to ``capacity`` requests may start immediately; after that tokens refill at
+    ``rate`` per second. Each caller reserves a token up front and sleeps only for
+    its own wait time, so callers are never serialized behind a lock.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+
+    def _reserve(self) -> float:
+        """Take one token (possibly going into debt) and return seconds to wait."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        self._tokens -= 1.0
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_vitec_rate_limiter: TokenBucket | None = None
+_vitec_http_client: httpx.AsyncClient | None = None
+_vitec_http_client_loop: asyncio.AbstractEventLoop | None = None
+# Closes of clients replaced after an event loop change, kept so they are not garbage collected mid-close
+_vitec_client_closes: set[asyncio.Future] = set()
+
+
+def _get_vitec_rate_limiter() -> TokenBucket:
+    global _vitec_rate_limiter
+    rps = max(1, min(settings.VITEC_RATE_LIMIT_REQUESTS_PER_SECOND, 200))
+    burst = max(1, min(settings.VITEC_RATE_LIMIT_BURST, rps))
+    if _vitec_rate_limiter is None or _vitec_rate_limiter.rate != rps or _vitec_rate_limiter.capacity != burst:
+        _vitec_rate_limiter = TokenBucket(rate=rps, capacity=burst)
+    return _vitec_rate_limiter
+
+
+def _log_failed_close(future: asyncio.Future) -> None:
+    _vitec_client_closes.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        logger.debug("Closing a replaced Vitec Hub HTTP client failed: %s", future.exception())
+
+
+def _close_replaced_client(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None) -> None:
+    """Close a client created on another event loop, on that loop while it is still running."""
+    if client.is_closed:
+        return
+    if loop is not None and loop.is_running():
+        future = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+    else:
+        future = asyncio.ensure_future(client.aclose())
+    _vitec_client_closes.add(future)
+    future.add_done_callback(_log_failed_close)
+
+
+def get_vitec_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled Vitec Hub client, creating it on first use (or after an event loop change)."""
+    global _vitec_http_client, _vitec_http_client_loop
+    loop = asyncio.get_running_loop()
+    if _vitec_http_client is None or _vitec_http_client.is_closed or _vitec_http_client_loop is not loop:
+        if _vitec_http_client is not None:
+            _close_replaced_client(_vitec_http_client, _vitec_http_client_loop)
+        _vitec_http_client = httpx.AsyncClient(
+            timeout=settings.VITEC_HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.VITEC_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.VITEC_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=30.0,
+            ),
+        )
+        _vitec_http_client_loop = loop
+    return _vitec_http_client
+
+
+async def close_vitec_http_client() -> None:
+    """Close the pooled Vitec Hub client. Called on application shutdown."""
+    global _vitec_http_client, _vitec_http_client_loop
+    client = _vitec_http_client
+    _vitec_http_client = None
+    _vitec_http_client_loop = None
+    loop = asyncio.get_running_loop()
+    pending = [future for future in _vitec_client_closes if future.get_loop() is loop]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("Vitec Hub HTTP client closed")
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter: ~0.5s, 1s, 2s, ... capped at MAX_RETRY_DELAY_SECONDS."""
+    base = 0.5 * (2**attempt)
+    return min(MAX_RETRY_DELAY_SECONDS, base + random.uniform(0, base / 2))
+
+
+def _retry_delay(response: httpx.Response, *, method: str, attempt: int) -> float | None:
+    """Seconds to wait before retrying ``response``, or None if it should not be retried."""
+    if response.status_code == 429:
+        retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+        return min(MAX_RETRY_DELAY_SECONDS, retry_after if retry_after is not None else _backoff_delay(attempt))
+    if response.status_code in RETRYABLE_STATUS_CODES and method in IDEMPOTENT_METHODS:
+        return _backoff_delay(attempt)
+    return None
 
 
 class VitecHubService:
@@ -68,29 +199,47 @@ class VitecHubService:
                 detail="Vitec Hub credentials are not configured.",
             )
 
-        # Rate limit: stay well below Vitec's ~600 req/sec
-        global _vitec_last_request_at
-        rps = max(1, min(settings.VITEC_RATE_LIMIT_REQUESTS_PER_SECOND, 200))
-        min_interval = 1.0 / rps
-        lock = _get_vitec_rate_lock()
-        async with lock:
-            now = time.monotonic()
-            elapsed = now - _vitec_last_request_at
-            if elapsed < min_interval:
-                await asyncio.sleep(min_interval - elapsed)
-            _vitec_last_request_at = time.monotonic()
-
         url = f"{self._base_url}/{path.lstrip('/')}"
-        try:
-            async with httpx.AsyncClient(
-                auth=self._get_auth(),
-                timeout=30.0,
-                headers={"Accept": accept},
-            ) as client:
-                response = await client.request(method, url)
-        except httpx.HTTPError as exc:
-            logger.error("Vitec Hub request failed: %s", exc)
-            raise HTTPException(status_code=502, detail="Vitec Hub request failed.") from exc
+        method = method.upper()
+        max_retries = max(0, settings.VITEC_MAX_RETRIES)
+        attempt = 0
+        while True:
+            # Rate limit: stay well below Vitec's ~600 req/sec
+            await _get_vitec_rate_limiter().acquire()
+            try:
+                response = await get_vitec_http_client().request(
+                    method,
+                    url,
+                    auth=self._get_auth(),
+                    headers={"Accept": accept},
+                )
+            except httpx.TransportError as exc:
+                if method in IDEMPOTENT_METHODS and attempt < max_retries:
+                    delay = _backoff_delay(attempt)
+                    logger.warning("Vitec Hub request failed (%s); retrying in %.1fs", exc, delay)
+                    attempt += 1
+                    await asyncio.sleep(delay)
+                    continue
+                logger.error("Vitec Hub request failed: %s", exc)
+                raise HTTPException(status_code=502, detail="Vitec Hub request failed.") from exc
+            except httpx.HTTPError as exc:
+                logger.error("Vitec Hub request failed: %s", exc)
+                raise HTTPException(status_code=502, detail="Vitec Hub request failed.") from exc
+
+            delay = _retry_delay(response, method=method, attempt=attempt) if attempt < max_retries else None
+            if delay is not None:
+                logger.warning(
+                    "Vitec Hub returned %s for %s; retry %d/%d in %.1fs",
+                    response.status_code,
+                    path,
+                    attempt + 1,
+                    max_retries,
+                    delay,
+                )
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            break
 
         if response.status_code == 401:
             raise HTTPException(status_code=401, detail="Vitec Hub unauthorized.")
@@ -208,6 +357,31 @@ class VitecHubService:
         data = await self._request("GET", path)
         return list(data) if isinstance(data, list) else []
 
+    async def get_accounting_estate_by_id(
+        self,
+        installation_id: str,
+        estate_id: str,
+    ) -> dict[str, Any] | None:
+        """
+        Fetch a single accounting estate (used to fill in missing addresses).
+
+        Args:
+            installation_id: Vitec installation ID
+            estate_id: Estate ID (UUID)
+
+        Returns:
+            AccountingEstateObject, or None when Vitec answers 404
+
+        Raises:
+            HTTPException: 502 when Vitec answers with something other than an estate
+        """
+        data = await self._request("GET", f"{installation_id}/Accounting/Estates/{estate_id}")
+        if data is None:
+            return None
+        if not isinstance(data, dict):
+            raise HTTPException(status_code=502, detail="Invalid Vitec Hub response.")
+        return data
+
     async def get_accounting_transactions(
         self,
         installation_id: str,
@@ -326,3 +326,8 @@ class VitecNormalizerService:
         if soup.html and soup.body:
             return "".join(str(child) for child in soup.body.children).strip()
         return str(soup).strip()
+
+
+def normalize_html(html: str) -> tuple[str, dict[str, int | bool]]:
+    """``VitecNormalizerService.normalize`` as a picklable worker job (see cpu_pool_service)."""
+    return VitecNormalizerService().normalize(html)
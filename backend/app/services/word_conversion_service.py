@@ -4,6 +4,7 @@ Document Conversion Service — Converts .docx and .rtf files to Vitec Next-read
 Uses mammoth for .docx→HTML and striprtf for .rtf→text conversion, then post-processes
 with BeautifulSoup to enforce the rules from .planning/vitec-html-ruleset.md.
 The output passes through SanitizerService for final Vitec Stilark compliance.
+``convert`` runs the pipeline on the shared CPU pool (see cpu_pool_service).
 """
 
 import io
@@ -15,6 +16,7 @@ from bs4 import BeautifulSoup, Tag
 from striprtf.striprtf import rtf_to_text
 
 from app.schemas.word_conversion import ConversionResult, ValidationItem
+from app.services.cpu_pool_service import run_cpu_bound
 from app.services.sanitizer_service import SanitizerService
 from app.services.template_analyzer_service import TemplateAnalyzerService
 
@@ -51,14 +53,19 @@ class WordConversionService:
 
         Raises:
             ValueError: If the file cannot be parsed.
+            CpuPoolTimeoutError: If conversion exceeds the CPU pool deadline.
         """
+        return await run_cpu_bound(convert_document, file_bytes, filename)
+
+    def convert_sync(self, file_bytes: bytes, filename: str = "upload.docx") -> ConversionResult:
+        """Blocking conversion pipeline (runs in a CPU pool worker, see ``convert``)."""
         ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
 
         if ext == "rtf":
-            return await self._convert_rtf(file_bytes, filename)
-        return await self._convert_docx(file_bytes, filename)
+            return self._convert_rtf(file_bytes, filename)
+        return self._convert_docx(file_bytes, filename)
 
-    async def _convert_docx(
+    def _convert_docx(
         self,
         docx_bytes: bytes,
         filename: str,
@@ -85,7 +92,7 @@ class WordConversionService:
 
         return self._finalize(raw_html, warnings)
 
-    async def _convert_rtf(
+    def _convert_rtf(
         self,
         rtf_bytes: bytes,
         filename: str,
@@ -537,3 +544,8 @@ def get_word_conversion_service() -> WordConversionService:
     if _word_conversion_service is None:
         _word_conversion_service = WordConversionService()
     return _word_conversion_service
+
+
+def convert_document(file_bytes: bytes, filename: str) -> ConversionResult:
+    """``WordConversionService.convert_sync`` as a picklable worker job (see cpu_pool_service)."""
+    return get_word_conversion_service().convert_sync(file_bytes, filename)
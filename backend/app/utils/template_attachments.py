@@ -0,0 +1,82 @@
+"""
+Attachment name extraction from template metadata.
+
+Vitec imports store attachment info in several shapes (normalized
+``vitec_attachments``, raw API lists, nested ``vitec_details``/``vitec_raw``).
+"""
+
+from typing import Any
+
+
+def _normalize_attachment_name(value: Any) -> str | None:
+    if value is None:
+        return None
+    name = str(value).strip()
+    return name or None
+
+
+def _looks_like_attachment_key(key: str) -> bool:
+    lowered = key.lower()
+    return "attachment" in lowered or "vedlegg" in lowered
+
+
+def _extract_attachment_names_from_value(value: Any) -> list[str]:
+    names: list[str] = []
+    if value is None:
+        return names
+    if isinstance(value, list):
+        for entry in value:
+            names.extend(_extract_attachment_names_from_value(entry))
+        return names
+    if isinstance(value, dict):
+        for key in ("name", "fileName", "filename", "title", "documentName", "attachmentName", "templateName"):
+            if key in value:
+                name = _normalize_attachment_name(value.get(key))
+                if name:
+                    names.append(name)
+                    break
+        return names
+    name = _normalize_attachment_name(value)
+    if name:
+        names.append(name)
+    return names
+
+
+def _find_attachment_values(source: dict[str, Any], *, depth: int = 0, max_depth: int = 2) -> list[Any]:
+    if depth > max_depth:
+        return []
+    values: list[Any] = []
+    for key, value in source.items():
+        if _looks_like_attachment_key(key):
+            values.append(value)
+        if isinstance(value, dict):
+            values.extend(_find_attachment_values(value, depth=depth + 1, max_depth=max_depth))
+    return values
+
+
+def extract_attachment_names(metadata_json: dict | None) -> list[str]:
+    """Sorted, de-duplicated attachment names found in a template's Vitec metadata."""
+    if not isinstance(metadata_json, dict):
+        return []
+
+    # Prefer normalized attachments stored by importer
+    if isinstance(metadata_json.get("vitec_attachments"), list):
+        raw_entries = metadata_json.get("vitec_attachments", [])
+        names = _extract_attachment_names_from_value(raw_entries)
+        return sorted(set(names))
+
+    candidates: list[Any] = []
+    for key in ("attachments", "attachmentTemplates", "attachmentTemplateList"):
+        if isinstance(metadata_json.get(key), list):
+            candidates.append(metadata_json.get(key))
+
+    for source_key in ("vitec_details", "vitec_raw"):
+        source = metadata_json.get(source_key)
+        if isinstance(source, dict):
+            candidates.extend(_find_attachment_values(source))
+
+    names: list[str] = []
+    for candidate in candidates:
+        names.extend(_extract_attachment_names_from_value(candidate))
+
+    return sorted(set(names))
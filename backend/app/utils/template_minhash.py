@@ -0,0 +1,128 @@
+"""
+Shingle/MinHash signatures for near-duplicate template detection.
+
+Templates are tokenized into tag names and words, shingled into overlapping
+``SHINGLE_SIZE``-token windows and summarized as a ``NUM_BINS``-value
+one-permutation MinHash (one 64-bit hash per shingle; each bin keeps the minimum
+of the hashes that fall into it; empty bins are filled from the next non-empty
+bin). Two signatures agree in a bin with probability ≈ the Jaccard similarity
+of the shingle sets, which ``LshIndex`` exploits by banding the signature so
+similar templates share a bucket. Exact Jaccard is only computed for the pairs
+that collide.
+"""
+
+import hashlib
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+
+SHINGLE_SIZE = 4
+NUM_BINS = 128
+LSH_BANDS = 32
+LSH_ROWS = NUM_BINS // LSH_BANDS  # 4 rows/band: pairs above ~0.45 Jaccard very likely collide
+
+# Tags (attributes dropped), comments (skipped), merge fields and words.
+_TOKEN_RE = re.compile(r"<\s*(/?[a-zA-Z][\w-]*)[^>]*>|<!--.*?-->|(\[\[[^\]]+\]\]|[^\W_]+)", re.DOTALL)
+_MAX_VALUE = (1 << 32) - 1
+# Offset added per hop when an empty bin borrows from a later bin (keeps borrowed values distinct).
+_DENSIFY_STEP = 1 << 32
+
+
+def template_tokens(html: str) -> list[str]:
+    """Tag names (``<p``, ``</p``) and lowercased words/merge fields, in document order."""
+    tokens: list[str] = []
+    for tag, word in _TOKEN_RE.findall(html or ""):
+        if tag:
+            tokens.append(f"<{tag.lower()}")
+        elif word:
+            tokens.append(word.lower())
+    return tokens
+
+
+def template_shingles(html: str) -> set[str]:
+    """Set of ``SHINGLE_SIZE``-token windows (the whole token list for very short documents)."""
+    tokens = template_tokens(html)
+    if len(tokens) <= SHINGLE_SIZE:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i : i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash_signature(shingles: Iterable[str]) -> list[int]:
+    """One-permutation MinHash with rotation densification. Empty input gives an empty list."""
+    bins: list[int | None] = [None] * NUM_BINS
+    for shingle in shingles:
+        h = _hash64(shingle)
+        index, value = h % NUM_BINS, (h >> 32) & _MAX_VALUE
+        current = bins[index]
+        if current is None or value < current:
+            bins[index] = value
+    if all(value is None for value in bins):
+        return []
+    signature: list[int] = []
+    for index, value in enumerate(bins):
+        hops = 0
+        while value is None:
+            hops += 1
+            value = bins[(index + hops) % NUM_BINS]
+        signature.append(value + hops * _DENSIFY_STEP)
+    return signature
+
+
+def signature_record(content: str | None) -> dict | None:
+    """Column values for a ``TemplateSignature`` row (None when the content has no tokens)."""
+    shingles = template_shingles(content or "")
+    if not shingles:
+        return None
+    return {
+        "content_hash": hashlib.sha256(content.encode()).hexdigest(),
+        "shingle_count": len(shingles),
+        "minhash": minhash_signature(shingles),
+    }
+
+
+def estimated_similarity(a: list[int], b: list[int]) -> float:
+    """Fraction of agreeing bins (≈ Jaccard similarity of the underlying shingle sets)."""
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    return sum(1 for x, y in zip(a, b, strict=True) if x == y) / len(a)
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class LshIndex:
+    """Banded LSH over MinHash signatures; ``candidate_pairs`` yields each colliding pair once."""
+
+    def __init__(self, bands: int = LSH_BANDS, rows: int = LSH_ROWS) -> None:
+        self.bands = bands
+        self.rows = rows
+        self._buckets: list[dict[tuple[int, ...], list[str]]] = [defaultdict(list) for _ in range(bands)]
+
+    def add(self, key: str, signature: list[int]) -> None:
+        if len(signature) < self.bands * self.rows:
+            return
+        for band, buckets in enumerate(self._buckets):
+            start = band * self.rows
+            buckets[tuple(signature[start : start + self.rows])].append(key)
+
+    def candidate_pairs(self) -> Iterator[tuple[str, str]]:
+        seen: set[tuple[str, str]] = set()
+        for buckets in self._buckets:
+            for keys in buckets.values():
+                if len(keys) < 2:
+                    continue
+                for i, a in enumerate(keys):
+                    for b in keys[i + 1 :]:
+                        pair = (a, b) if a < b else (b, a)
+                        if pair not in seen:
+                            seen.add(pair)
+                            yield pair
@@ -0,0 +1,31 @@
+"""
+Plain-text extraction from template HTML for the search index.
+
+Templates are stored as HTML; the search index (``Template.search_text``) holds
+the visible text only, so markup, inline CSS and scripts never match a query.
+"""
+
+import html
+import re
+
+_INVISIBLE_BLOCK_RE = re.compile(r"<(script|style|head|title)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def html_to_search_text(content: str | None) -> str | None:
+    """
+    Return the visible text of ``content`` with whitespace collapsed.
+
+    Merge fields (``[[...]]``) are kept so they can be searched for. Returns
+    ``None`` for empty input.
+    """
+    if not content:
+        return None
+    text = _INVISIBLE_BLOCK_RE.sub(" ", content)
+    text = _COMMENT_RE.sub(" ", text)
+    text = _TAG_RE.sub(" ", text)
+    text = html.unescape(text).replace("\xa0", " ")
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return text or None
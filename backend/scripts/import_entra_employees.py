@@ -31,6 +31,8 @@ from app.models.employee import Employee
 
 GRAPH_SCOPE = "https://graph.microsoft.com/.default"
 GRAPH_USERS_URL = "https://graph.microsoft.com/v1.0/users"
+# Graph returns 100 users per page; report progress about once per page
+PROGRESS_EVERY = 100
 GRAPH_FIELDS = ",".join(
     [
         "id",
@@ -140,6 +142,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--dry-run", action="store_true", help="Preview changes without updating the database.")
     parser.add_argument("--filter-email", help="Only update a specific employee email.")
     parser.add_argument("--json", action="store_true", help="Output a JSON summary only.")
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Also print JSON progress lines (with an 'event' key) before the summary.",
+    )
     return parser.parse_args()
 
 
@@ -154,6 +161,10 @@ def main() -> None:
     def log_error(message: str) -> None:
         print(message, file=sys.stderr)
 
+    def progress(stage: str, **counts: int) -> None:
+        if args.progress:
+            print(json.dumps({"event": "progress", "stage": stage, **counts}), flush=True)
+
     database_url = os.environ.get("DATABASE_URL")
     tenant_id = os.environ.get("ENTRA_TENANT_ID")
     client_id = os.environ.get("ENTRA_CLIENT_ID")
@@ -189,8 +200,13 @@ def main() -> None:
 
         log(f"Loaded {len(employees)} employees from database")
         log("Fetching users from Microsoft Graph...")
+        progress("employees_loaded", employees_loaded=len(employees))
 
+        entra_users_seen = 0
         for user in fetch_entra_users(access_token):
+            entra_users_seen += 1
+            if entra_users_seen % PROGRESS_EVERY == 0:
+                progress("fetching_users", entra_users_seen=entra_users_seen, matched_updated=updated)
             candidate_emails = build_candidate_emails(user)
             employee = None
             for email in candidate_emails:
@@ -228,6 +244,7 @@ def main() -> None:
 
             updated += 1
 
+        progress("saving", entra_users_seen=entra_users_seen, matched_updated=updated)
         if args.dry_run:
             db.rollback()
         else:
@@ -33,6 +33,8 @@ GRAPH_GROUPS_URL = "https://graph.microsoft.com/v1.0/groups"
 
 # Select only Unified (M365) groups
 GRAPH_FILTER = "groupTypes/any(c:c eq 'Unified')"
+# Report matching progress every N groups (--fetch-details makes two Graph calls per match)
+PROGRESS_EVERY = 10
 GRAPH_FIELDS = ",".join(
     [
         "id",
@@ -283,6 +285,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Fetch additional details (member count, SharePoint URL). Slower.",
     )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Also print JSON progress lines (with an 'event' key) before the summary.",
+    )
     return parser.parse_args()
 
 
@@ -298,6 +305,10 @@ def main() -> None:
     def log_error(message: str) -> None:
         print(message, file=sys.stderr)
 
+    def progress(stage: str, **counts: int) -> None:
+        if args.progress:
+            print(json.dumps({"event": "progress", "stage": stage, **counts}), flush=True)
+
     # Get environment variables
     database_url = os.environ.get("DATABASE_URL")
     tenant_id = os.environ.get("ENTRA_TENANT_ID")
@@ -340,10 +351,15 @@ def main() -> None:
         # Fetch and process groups
         groups_list = list(fetch_entra_groups(access_token))
         log(f"Found {len(groups_list)} M365 Groups")
+        progress("groups_fetched", offices_loaded=len(offices), groups_total=len(groups_list))
 
         skipped_groups = 0
 
-        for group in groups_list:
+        for index, group in enumerate(groups_list, start=1):
+            if index % PROGRESS_EVERY == 0:
+                progress(
+                    "matching_groups", groups_processed=index, groups_total=len(groups_list), matched_updated=updated
+                )
             office, match_reason = find_matching_office(group, offices)
 
             if match_reason == "skipped":
@@ -383,6 +399,7 @@ def main() -> None:
             if mismatch_fields:
                 log(f"    Mismatches: {', '.join(mismatch_fields)}")
 
+        progress("saving", groups_processed=len(groups_list), groups_total=len(groups_list), matched_updated=updated)
         # Commit or rollback
         if args.dry_run:
             db.rollback()
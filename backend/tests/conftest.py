@@ -1,12 +1,48 @@
 """
 Pytest configuration and shared fixtures.
+
+The SQLite fixtures (``session_factory``, ``sqlite_tables``, ``template_factory``) are
+shared test infrastructure: template, search, dedup, fingerprint, version-store and
+sales-cache tests all build their in-memory databases through them.
 """
 
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 
+import app.models  # noqa: F401  (registers every table and relationship target)
 from app.database import get_db
+from app.models.base import Base
+from app.models.template import Template
+from app.services.template_count_cache import template_count_cache
+
+SQLITE_TEST_URL = "sqlite+aiosqlite:///:memory:"
+TEMPLATE_TABLES = (
+    "tags",
+    "categories",
+    "content_blobs",
+    "layout_partials",
+    "layout_partial_versions",
+    "layout_partial_defaults",
+    "templates",
+    "template_tags",
+    "template_categories",
+    "template_facets",
+    "template_signatures",
+    "template_fingerprints",
+    "template_versions",
+    "merge_fields",
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_template_count_cache():
+    """Template counts are cached per process; never let one test's database leak into another."""
+    template_count_cache.invalidate()
+    yield
+    template_count_cache.invalidate()
 
 
 @pytest.fixture
@@ -36,3 +72,46 @@ def client(app):
     """Create a test client for the app."""
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture
+def sqlite_tables() -> tuple[str, ...]:
+    """Tables ``session_factory`` creates; override in a module or parametrize to use others."""
+    return TEMPLATE_TABLES
+
+
+@pytest.fixture
+async def session_factory(sqlite_tables):
+    """Session factory for an in-memory SQLite database holding ``sqlite_tables``."""
+    engine = create_async_engine(
+        SQLITE_TEST_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [Base.metadata.tables[name] for name in sqlite_tables]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+    try:
+        yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+def make_template(title: str, content: str | None = None, **kwargs) -> Template:
+    return Template(
+        title=title,
+        file_name=f"{title}.html",
+        file_type="html",
+        file_size_bytes=len(content) if content else 100,
+        azure_blob_url="",
+        created_by="test",
+        updated_by="test",
+        content=content,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def template_factory():
+    """Build unsaved ``Template`` rows with the required columns filled in."""
+    return make_template
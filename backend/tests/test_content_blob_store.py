@@ -0,0 +1,154 @@
+"""
+Tests for the content-addressed, delta-compressed version store.
+"""
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+
+from app.database import get_db
+from app.models.audit_log import AuditLog
+from app.models.content_blob import ContentBlob
+from app.models.layout_partial import LayoutPartial
+from app.models.layout_partial_version import LayoutPartialVersion
+from app.models.template import Template
+from app.routers import templates
+from app.schemas.layout_partial_version import LayoutPartialVersionCreate
+from app.services.content_blob_service import ContentBlobService
+from app.services.layout_partial_version_service import LayoutPartialVersionService
+from app.services.template_content_service import TemplateContentService
+from tests.conftest import TEMPLATE_TABLES
+
+
+@pytest.fixture
+def sqlite_tables():
+    return (*TEMPLATE_TABLES, "audit_logs")
+
+
+def _document(revision: int) -> str:
+    rows = "".join(f"<tr><td>Punkt {i}</td><td>[[oppdrag.felt{i}]]</td></tr>" for i in range(200))
+    return f"<div id='vitecTemplate'><h1>Kjøpekontrakt rev. {revision}</h1><table>{rows}</table></div>"
+
+
+@pytest.mark.asyncio
+async def test_versions_are_deduplicated_delta_compressed_and_reconstructable(session_factory):
+    async with session_factory() as db:
+        hashes: list[str] = []
+        for revision in range(20):
+            hashes.append(
+                await ContentBlobService.put(db, _document(revision), base_hash=hashes[-1] if hashes else None)
+            )
+        assert await ContentBlobService.put(db, _document(3), base_hash=hashes[-1]) == hashes[3]
+
+        blobs = {blob.content_hash: blob for blob in (await db.execute(select(ContentBlob))).scalars()}
+        assert len(blobs) == 20
+        assert [blobs[h].chain_depth for h in hashes] == list(range(16)) + [0, 1, 2, 3]
+        assert blobs[hashes[16]].encoding == "full" and blobs[hashes[17]].base_hash == hashes[16]
+
+        raw = sum(blob.raw_size for blob in blobs.values())
+        stored = sum(blob.stored_size for blob in blobs.values())
+        assert stored * 20 < raw
+
+        contents = await ContentBlobService.get_many(db, hashes)
+        assert [contents[h] for h in hashes] == [_document(revision) for revision in range(20)]
+        assert await ContentBlobService.get(db, hashes[15]) == _document(15)
+        assert await ContentBlobService.get(db, "0" * 64) is None
+
+
+@pytest.mark.asyncio
+async def test_template_versions_store_and_restore_content(session_factory):
+    async with session_factory() as db:
+        template = Template(
+            title="Kjøpekontrakt",
+            file_name="kontrakt.html",
+            file_type="html",
+            file_size_bytes=100,
+            azure_blob_url="",
+            created_by="test",
+            updated_by="test",
+            content=_document(0),
+        )
+        db.add(template)
+        await db.commit()
+
+        for revision in (1, 2, 1):
+            await TemplateContentService.save_content(db, template.id, content=_document(revision), updated_by="test")
+        await db.commit()
+
+        assert await TemplateContentService.get_version_content(db, template.id, 1) == _document(0)
+        assert await TemplateContentService.get_version_content(db, template.id, 3) == _document(2)
+        # Versions 2 and 4 hold the same body
+        assert await db.scalar(select(func.count()).select_from(ContentBlob)) == 3
+
+        await TemplateContentService.restore_version(db, template.id, 1, restored_by="test")
+        await db.commit()
+        await db.refresh(template)
+
+    assert template.content == _document(0)
+    assert template.version == 5
+
+
+@pytest.mark.asyncio
+async def test_version_content_and_restore_endpoints(session_factory, template_factory):
+    async with session_factory() as db:
+        template = template_factory("Kjøpekontrakt", _document(0))
+        db.add(template)
+        await db.commit()
+        await TemplateContentService.save_content(db, template.id, content=_document(1), updated_by="test")
+        await db.commit()
+        template_id = template.id
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+            await session.commit()
+
+    app = FastAPI()
+    app.include_router(templates.router, prefix="/api/templates")
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        content = await client.get(f"/api/templates/{template_id}/versions/1/content")
+        missing = await client.get(f"/api/templates/{template_id}/versions/9/content")
+        restored = await client.post(f"/api/templates/{template_id}/versions/1/restore")
+
+    assert content.status_code == 200
+    assert content.json()["content"] == _document(0)
+    assert missing.status_code == 404
+    assert restored.status_code == 200
+    assert restored.json()["version"] == 3
+
+    async with session_factory() as db:
+        template = await db.get(Template, template_id)
+        assert template.content == _document(0)
+        assert await TemplateContentService.get_version_content(db, template_id, 2) == _document(1)
+        assert await db.scalar(select(AuditLog.action)) == "content_restored"
+
+
+@pytest.mark.asyncio
+async def test_layout_partial_versions_reference_the_blob_store(session_factory):
+    async with session_factory() as db:
+        partial = LayoutPartial(
+            name="Bunntekst", type="footer", context="pdf", html_content="<p>v0</p>", created_by="t", updated_by="t"
+        )
+        db.add(partial)
+        await db.flush()
+        for revision in (1, 2):
+            await LayoutPartialVersionService.create_version(
+                db, partial.id, LayoutPartialVersionCreate(html_content=_document(revision), created_by="t")
+            )
+        await db.commit()
+
+        stored = (await db.execute(select(LayoutPartialVersion.html_content, LayoutPartialVersion.content_hash))).all()
+        assert all(html is None and content_hash for html, content_hash in stored)
+
+        result = await LayoutPartialVersionService.revert_to_version(db, partial.id, 1, reverted_by="t")
+        await db.commit()
+        db.expunge_all()
+
+        version = await LayoutPartialVersionService.get_version(db, partial.id, result["new_version"])
+        versions, _ = await LayoutPartialVersionService.list_versions(db, partial.id)
+
+    assert version.html_content == _document(1)
+    assert [v.html_content for v in versions] == [_document(1), _document(2), _document(1)]
+    assert partial.html_content == _document(1)
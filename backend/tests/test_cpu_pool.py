@@ -0,0 +1,74 @@
+"""
+Tests for the shared CPU pool used for CPU-bound HTML processing.
+
+Covers:
+- Worker-process execution of module-level jobs
+- Per-job deadlines (while running and while waiting for a slot)
+- Queue-depth and job metrics
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.cpu_pool_service import CpuPool, CpuPoolTimeoutError
+from app.services.sanitizer_service import SanitizerService, sanitize_html
+from app.services.vitec_normalizer_service import VitecNormalizerService, normalize_html
+
+HTML = "<p><font face='Arial'>Selger: [[selger.navn]]</font></p>"
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_in_worker_processes_and_time_out():
+    pool = CpuPool(max_workers=1, max_pending=4, timeout_seconds=30)
+    pool.start()
+    try:
+        assert await pool.run(normalize_html, HTML) == VitecNormalizerService().normalize(HTML)
+        assert await pool.run(sanitize_html, HTML, "custom-theme") == SanitizerService("custom-theme").sanitize(HTML)
+
+        with pytest.raises(CpuPoolTimeoutError):
+            await pool.run(time.sleep, 1.0, timeout=0.2)
+        # The running job keeps its worker until it finishes
+        assert pool.stats()["running"] == 1
+    finally:
+        await pool.shutdown()
+
+    stats = pool.stats()
+    assert stats["mode"] == "thread"
+    assert (stats["submitted"], stats["completed"], stats["timed_out"], stats["running"]) == (3, 3, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_admission_is_bounded_and_reported_as_queue_depth():
+    pool = CpuPool(max_workers=0, max_pending=1, timeout_seconds=5)
+    try:
+        first = asyncio.create_task(pool.run(time.sleep, 0.3))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(pool.run(time.sleep, 0.0, timeout=0.1))
+        await asyncio.sleep(0.02)
+
+        stats = pool.stats()
+        assert (stats["running"], stats["waiting_for_slot"], stats["queue_depth"]) == (1, 1, 1)
+
+        with pytest.raises(CpuPoolTimeoutError):
+            await second
+        await first
+        assert await pool.run(sanitize_html, HTML) == SanitizerService().sanitize(HTML)
+    finally:
+        await pool.shutdown()
+
+    stats = pool.stats()
+    assert (stats["submitted"], stats["completed"], stats["timed_out"], stats["max_waiting_for_slot"]) == (2, 2, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_job_errors_propagate_and_are_counted():
+    pool = CpuPool(max_workers=0)
+    try:
+        with pytest.raises(ValueError):
+            await pool.run(int, "not a number")
+    finally:
+        await pool.shutdown()
+
+    assert (pool.stats()["failed"], pool.stats()["completed"]) == (1, 0)
@@ -0,0 +1,214 @@
+"""
+Tests for the native Graph engine that pushes employees to Entra ID.
+
+Runs against a local stub of the Graph, token and Exchange endpoints.
+
+Covers:
+- User lookups and profile patches go through $batch, 20 sub-requests per call
+- Throttled sub-requests are retried; batch calls respect the concurrency bound
+- Photo and signature uploads per matched user; dry runs send no writes
+"""
+
+import asyncio
+import re
+import uuid
+from urllib.parse import parse_qs, unquote
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request, Response
+
+import app.models  # noqa: F401  (registers relationship targets)
+from app.integrations.microsoft_graph import MicrosoftGraphClient, graph_token_cache
+from app.models.employee import Employee
+from app.models.office import Office
+from app.services.entra_graph_sync_service import EntraGraphSync
+
+TENANT = "tenant-1"
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    graph_token_cache.clear()
+    yield
+    graph_token_cache.clear()
+
+
+class GraphStub:
+    """Minimal Graph/Exchange/token server recording what it receives."""
+
+    def __init__(self, users: list[dict]) -> None:
+        self.users = {user["userPrincipalName"].lower(): user for user in users}
+        self.batch_sizes: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.throttle_once = True
+        self.token_scopes: list[str] = []
+        self.patches: dict[str, dict] = {}
+        self.photos: dict[str, bytes] = {}
+        self.signatures: list[dict] = []
+        self.app = self._build_app()
+
+    def _sub_response(self, request: dict) -> dict:
+        method, url = request["method"], request["url"]
+        path, _, query = url.partition("?")
+        if method == "PATCH":
+            self.patches[path.rsplit("/", 1)[1]] = request["body"]
+            return {"id": request["id"], "status": 204, "headers": {}}
+        if path == "/users":
+            query_filter = parse_qs(query)["$filter"][0]
+            email = re.search(r"smtp:([^']+)'", query_filter).group(1)
+            found = [user for user in self.users.values() if f"smtp:{email}" in user.get("proxyAddresses", [])]
+            return {"id": request["id"], "status": 200, "body": {"value": found}}
+        user = self.users.get(unquote(path.removeprefix("/users/")).lower())
+        if user is None:
+            return {"id": request["id"], "status": 404, "body": {"error": {"code": "Request_ResourceNotFound"}}}
+        return {"id": request["id"], "status": 200, "body": user}
+
+    def _build_app(self) -> FastAPI:
+        stub = FastAPI()
+
+        @stub.post("/{tenant}/oauth2/v2.0/token")
+        async def token(request: Request):
+            form = parse_qs((await request.body()).decode())
+            self.token_scopes.append(form["scope"][0])
+            return {"access_token": f"token-{len(self.token_scopes)}", "expires_in": 3600}
+
+        @stub.post("/v1.0/$batch")
+        async def batch(request: Request):
+            requests = (await request.json())["requests"]
+            self.batch_sizes.append(len(requests))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            responses = []
+            for sub_request in requests:
+                if self.throttle_once:
+                    self.throttle_once = False
+                    responses.append({"id": sub_request["id"], "status": 429, "headers": {"Retry-After": "0"}})
+                else:
+                    responses.append(self._sub_response(sub_request))
+            return {"responses": responses}
+
+        @stub.put("/v1.0/users/{user_id}/photo/$value")
+        async def upload_photo(user_id: str, request: Request):
+            self.photos[user_id] = await request.body()
+            return Response(status_code=200)
+
+        @stub.get("/photos/{name}")
+        async def photo(name: str):
+            return Response(content=f"jpeg:{name}".encode(), media_type="image/jpeg")
+
+        @stub.post("/adminapi/beta/{tenant}/InvokeCommand")
+        async def invoke_command(request: Request):
+            self.signatures.append((await request.json())["CmdletInput"])
+            return {"value": []}
+
+        return stub
+
+
+def _entra_user(index: int, **overrides) -> dict:
+    return {
+        "id": f"user-{index}",
+        "userPrincipalName": f"ansatt{index}@proaktiv.no",
+        "displayName": f"Ansatt{index} Test",
+        "givenName": f"Ansatt{index}",
+        "surname": "Test",
+        "department": "Proaktiv Gruppen AS",
+        "officeLocation": "Bergen",
+        "postalCode": "5003",
+        "country": "NO",
+        **overrides,
+    }
+
+
+def _employees(count: int) -> list[Employee]:
+    office = Office(id=uuid.uuid4(), name="Proaktiv Bergen", legal_name="Proaktiv Gruppen AS", short_code="BGO")
+    office.city, office.postal_code = "Bergen", "5003"
+    employees = []
+    for index in range(count):
+        employee = Employee(
+            id=uuid.uuid4(),
+            first_name=f"Ansatt{index}",
+            last_name="Test",
+            email=f"ansatt{index}@proaktiv.no",
+            title="Megler" if index % 2 else None,
+            profile_image_url=f"http://graph.test/photos/{index}.jpg" if index < 3 else None,
+        )
+        employee.office = office
+        employees.append(employee)
+    return employees
+
+
+def _engine(stub: GraphStub, *, concurrency: int = 2) -> tuple[EntraGraphSync, httpx.AsyncClient]:
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub.app), base_url="http://graph.test")
+    graph = MicrosoftGraphClient(
+        tenant_id=TENANT,
+        client_id="client",
+        client_secret="secret",
+        base_url="http://graph.test/v1.0",
+        login_url="http://graph.test",
+        http_client=http,
+    )
+    engine = EntraGraphSync(
+        graph,
+        render_signature=lambda employee: (f"<p>{employee.full_name}</p>", employee.full_name),
+        concurrency=concurrency,
+        exchange_url="http://graph.test/adminapi/beta/{tenant_id}/InvokeCommand",
+    )
+    return engine, http
+
+
+@pytest.mark.asyncio
+async def test_sync_batches_lookups_and_patches_and_uploads_per_user():
+    employees = _employees(25)
+    employees[24].email = "alias@proaktiv.no"
+    employees[23].email = "ukjent@proaktiv.no"
+    employees[22].email = None
+    users = [_entra_user(index) for index in range(22)]
+    users.append(_entra_user(24, userPrincipalName="a24@proaktiv.no", proxyAddresses=["smtp:alias@proaktiv.no"]))
+    stub = GraphStub(users)
+    engine, http = _engine(stub)
+
+    async with http:
+        results = await engine.sync(employees, ["profile", "photo", "signature"])
+
+    by_employee = [results[str(employee.id)] for employee in employees]
+    assert by_employee[24].entra_user_id == "user-24"
+    assert by_employee[23].error == "Entra user not found for ukjent@proaktiv.no"
+    assert by_employee[22].error == "Employee has no email address"
+    assert sum(result.success for result in by_employee) == 23
+
+    # 24 UPN lookups in 2 calls (plus the throttled one resent), 1 fallback lookup call, 1 patch call
+    assert stub.batch_sizes[:2] in ([20, 4], [4, 20])
+    assert stub.batch_sizes[2:] == [1, 2, 11]
+    assert stub.max_in_flight == 2
+    # Only employees with a title differ from Entra; country/address already match
+    assert set(stub.patches) == {f"user-{index}" for index in range(1, 22, 2)}
+    assert stub.patches["user-1"] == {"jobTitle": "Megler"}
+    assert by_employee[1].profile_changes == ["jobTitle: '' -> 'Megler'"]
+    assert (by_employee[0].profile_updated, by_employee[1].profile_updated) == (False, True)
+
+    assert stub.photos == {f"user-{index}": f"jpeg:{index}.jpg".encode() for index in range(3)}
+    assert sorted(cmdlet["Parameters"]["Identity"] for cmdlet in stub.signatures) == sorted(
+        employee.email for employee in employees if employee.email and employee.email != "ukjent@proaktiv.no"
+    )
+    assert stub.token_scopes == ["https://graph.microsoft.com/.default", EntraGraphSync.EXCHANGE_SCOPE]
+
+
+@pytest.mark.asyncio
+async def test_dry_run_reports_changes_without_writing():
+    employees = _employees(4)
+    stub = GraphStub([_entra_user(index) for index in range(4)])
+    stub.throttle_once = False
+    engine, http = _engine(stub)
+
+    async with http:
+        results = await engine.sync(employees, ["profile", "photo", "signature"], dry_run=True)
+
+    assert [results[str(employee.id)].profile_updated for employee in employees] == [False, True, False, True]
+    assert [results[str(employee.id)].photo_updated for employee in employees] == [True, True, True, False]
+    assert all(results[str(employee.id)].signature_pushed for employee in employees)
+    assert (stub.patches, stub.photos, stub.signatures) == ({}, {}, [])
+    assert stub.batch_sizes == [4]
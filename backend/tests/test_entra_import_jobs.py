@@ -0,0 +1,249 @@
+"""
+Tests for background Entra import jobs.
+
+Runs a stand-in import script (same CLI contract as scripts/import_entra_*.py).
+
+Covers:
+- Starting an import returns right away; progress lines become job events
+- Identical imports started while one runs share the job, also across processes
+- Jobs abandoned by a process that died are marked failed on startup
+- Cancellation terminates the script; failures keep the script's error
+- The SSE stream replays the events and ends after the final one
+"""
+
+import asyncio
+import json
+import textwrap
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+import app.models  # noqa: F401  (registers relationship targets)
+from app.models.base import Base
+from app.models.entra_import_job import EntraImportJob
+from app.routers import entra_sync
+from app.services import entra_import_job_service
+from app.services.entra_import_job_service import entra_import_jobs
+
+FAKE_IMPORT = textwrap.dedent(
+    """
+    import json, sys, time
+
+    args = sys.argv[1:]
+    assert args[:2] == ["--json", "--progress"], args
+    if "--fail" in open(__file__.replace("import.py", "mode")).read():
+        print("ERROR: Graph said no", file=sys.stderr)
+        sys.exit(1)
+    delay = float(open(__file__.replace("import.py", "mode")).read().split()[0])
+    print("not json")
+    for page in (1, 2):
+        time.sleep(delay)
+        print(json.dumps({"event": "progress", "stage": "fetching_users", "entra_users_seen": page * 100}), flush=True)
+    print(json.dumps({"employees_loaded": 3, "matched_updated": 2, "dry_run": "--dry-run" in args}))
+    """
+)
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(element, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+async def import_script(tmp_path, monkeypatch):
+    # A file database: the runner and readers use separate connections, as they do on PostgreSQL
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    tables = [Base.metadata.tables[name] for name in ("entra_import_jobs", "entra_import_job_events")]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(entra_import_job_service, "async_session_factory", factory)
+
+    script = tmp_path / "import.py"
+    script.write_text(FAKE_IMPORT)
+    mode = tmp_path / "mode"
+    mode.write_text("0.05")
+    monkeypatch.setitem(entra_import_job_service.IMPORT_SCRIPTS, "employees", script)
+    for name in ("ENTRA_TENANT_ID", "ENTRA_CLIENT_ID", "ENTRA_CLIENT_SECRET"):
+        monkeypatch.setenv(name, "test")
+
+    try:
+        yield mode
+    finally:
+        await entra_import_jobs.stop()
+        await engine.dispose()
+
+
+async def test_import_runs_in_background_and_records_progress(import_script):
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    job = await entra_import_jobs.start("employees", {"dry_run": True, "filter_email": None})
+    assert time.perf_counter() - started < 0.5
+    assert job.status == "queued"
+
+    job = await entra_import_jobs.wait(job.id)
+    ticker_task.cancel()
+
+    # The event loop kept running while the script slept
+    assert ticks >= 5
+    assert job.status == "succeeded"
+    assert job.result == {"employees_loaded": 3, "matched_updated": 2, "dry_run": True}
+    assert job.progress == {"stage": "fetching_users", "entra_users_seen": 200}
+    assert job.started_at is not None and job.finished_at is not None
+
+    events = await entra_import_jobs.list_events(job.id)
+    assert [event.event_type for event in events] == ["started", "progress", "progress", "succeeded"]
+    assert events[1].payload_json == {"stage": "fetching_users", "entra_users_seen": 100}
+    assert [event.id for event in await entra_import_jobs.list_events(job.id, since_id=events[1].id)] == [
+        events[2].id,
+        events[3].id,
+    ]
+
+
+async def test_identical_imports_share_the_running_job(import_script):
+    options = {"dry_run": False, "filter_email": None}
+    first, second, other = await asyncio.gather(
+        entra_import_jobs.start("employees", options),
+        entra_import_jobs.start("employees", options),
+        entra_import_jobs.start("employees", {"dry_run": True, "filter_email": None}),
+    )
+    assert first.id == second.id != other.id
+
+    await entra_import_jobs.wait(first.id)
+    await entra_import_jobs.wait(other.id)
+    again = await entra_import_jobs.start("employees", options)
+    assert again.id != first.id
+    await entra_import_jobs.wait(again.id)
+
+
+async def _insert_job(status: str, options: dict, age_seconds: float) -> str:
+    async with entra_import_job_service.async_session_factory() as db:
+        job = EntraImportJob(
+            kind="employees",
+            status=status,
+            options=options,
+            created_at=datetime.now(UTC) - timedelta(seconds=age_seconds),
+        )
+        db.add(job)
+        await db.commit()
+        return str(job.id)
+
+
+async def test_import_running_in_another_process_is_shared(import_script, monkeypatch):
+    options = {"dry_run": True, "filter_email": None}
+    elsewhere = await _insert_job("running", options, age_seconds=10)
+    abandoned = await _insert_job("running", {"dry_run": False, "filter_email": None}, age_seconds=3600)
+
+    job = await entra_import_jobs.start("employees", dict(reversed(options.items())))
+    assert job.id == elsewhere and not entra_import_jobs.is_running(job.id)
+
+    async def finish_elsewhere():
+        await asyncio.sleep(0.1)
+        await entra_import_jobs._finish(elsewhere, "succeeded", result={"employees_loaded": 1})
+
+    monkeypatch.setattr(entra_import_job_service, "WAIT_POLL_SECONDS", 0.02)
+    finished, _ = await asyncio.gather(entra_import_jobs.wait(elsewhere), finish_elsewhere())
+    assert (finished.status, finished.result) == ("succeeded", {"employees_loaded": 1})
+
+    fresh = await entra_import_jobs.start("employees", {"dry_run": False, "filter_email": None})
+    assert fresh.id != abandoned
+    await entra_import_jobs.wait(fresh.id)
+
+
+async def test_startup_fails_jobs_abandoned_by_a_dead_process(import_script):
+    abandoned = await _insert_job("running", {"dry_run": True}, age_seconds=3600)
+    queued = await _insert_job("queued", {}, age_seconds=3600)
+    elsewhere = await _insert_job("running", {"dry_run": False}, age_seconds=10)
+
+    await entra_import_job_service.start_entra_import_jobs()
+
+    for job_id in (abandoned, queued):
+        job = await entra_import_jobs.get(job_id)
+        assert (job.status, job.finished_at is not None) == ("failed", True)
+        assert [event.event_type for event in await entra_import_jobs.list_events(job_id)] == ["failed"]
+    assert (await entra_import_jobs.get(elsewhere)).status == "running"
+
+
+async def test_cancel_terminates_the_import(import_script):
+    import_script.write_text("30")
+    job = await entra_import_jobs.start("employees", {"dry_run": False})
+    while (await entra_import_jobs.get(job.id)).status != "running":
+        await asyncio.sleep(0.01)
+
+    started = time.perf_counter()
+    job = await entra_import_jobs.cancel(job.id)
+    assert time.perf_counter() - started < 5
+    assert (job.status, job.cancel_requested, job.error) == ("cancelled", True, "Import cancelled")
+    assert [event.event_type for event in await entra_import_jobs.list_events(job.id)] == ["started", "cancelled"]
+    assert not entra_import_jobs.is_running(job.id)
+
+
+async def test_failed_import_keeps_the_script_error(import_script):
+    import_script.write_text("--fail")
+    job = await entra_import_jobs.wait((await entra_import_jobs.start("employees", {})).id)
+    assert (job.status, job.error, job.result) == ("failed", "ERROR: Graph said no", None)
+
+
+async def test_blocking_import_endpoint_still_returns_the_summary(import_script):
+    app = FastAPI()
+    app.include_router(entra_sync.router, prefix="/api")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/entra-sync/import", json={"dry_run": True})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "success": True,
+        "dry_run": True,
+        "employees_loaded": 3,
+        "matched_updated": 2,
+        "employees_not_matched": None,
+        "entra_users_not_matched": None,
+        "error": None,
+    }
+
+
+async def test_event_stream_ends_after_the_final_event(import_script):
+    app = FastAPI()
+    app.include_router(entra_sync.router, prefix="/api")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/entra-sync/import-jobs/employees", json={"dry_run": True})
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+
+        stream = await client.get(
+            f"/api/entra-sync/import-jobs/{job_id}/events/stream", params={"poll_interval_seconds": 0.2}
+        )
+        job = (await client.get(f"/api/entra-sync/import-jobs/{job_id}")).json()
+        missing = await client.get(f"/api/entra-sync/import-jobs/{uuid.uuid4()}/events/stream")
+
+    messages = [block for block in stream.text.split("\n\n") if block.startswith("id: ")]
+    event_types = [block.split("\n")[1].removeprefix("event: ") for block in messages]
+    assert event_types == ["started", "progress", "progress", "succeeded"]
+    final = json.loads(messages[-1].split("data: ", 1)[1])
+    assert final["payload"]["matched_updated"] == 2
+    assert job["status"] == "succeeded"
+    assert missing.status_code == 404
+
+
+async def test_shutdown_cancels_running_jobs(import_script):
+    import_script.write_text("30")
+    job = await entra_import_jobs.start("employees", {"dry_run": True})
+    await asyncio.sleep(0.2)
+
+    await entra_import_job_service.stop_entra_import_jobs()
+    assert (await entra_import_jobs.get(job.id)).status == "cancelled"
@@ -0,0 +1,128 @@
+"""
+Tests for the process-wide Graph token cache and pooled Graph client.
+
+Covers:
+- Concurrent callers share one token request; later calls reuse the token
+- Early refresh before expiry, keeping the current token while it is valid
+- GraphService.send_mail reuses the cached token and retries once on 401
+"""
+
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from app.integrations import microsoft_graph
+from app.integrations.microsoft_graph import GraphTokenCache, close_graph_http_client, get_graph_http_client
+from app.services import graph_service
+from app.services.graph_service import GraphService
+
+
+class TokenServer:
+    """Token + sendMail endpoints behind an httpx.MockTransport."""
+
+    def __init__(self, *, expires_in: float = 3600, reject_first_mail: bool = False) -> None:
+        self.expires_in = expires_in
+        self.reject_first_mail = reject_first_mail
+        self.token_requests = 0
+        self.mail_tokens: list[str] = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/oauth2/v2.0/token"):
+            self.token_requests += 1
+            assert parse_qs(request.content.decode())["grant_type"] == ["client_credentials"]
+            await asyncio.sleep(0.01)
+            return httpx.Response(
+                200, json={"access_token": f"token-{self.token_requests}", "expires_in": self.expires_in}
+            )
+        self.mail_tokens.append(request.headers["Authorization"])
+        if self.reject_first_mail and len(self.mail_tokens) == 1:
+            return httpx.Response(401, json={"error": {"code": "InvalidAuthenticationToken"}})
+        return httpx.Response(202)
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+CREDENTIALS = {"tenant_id": "tenant", "client_id": "client", "client_secret": "secret"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_token_request():
+    server = TokenServer()
+    cache = GraphTokenCache(refresh_margin_seconds=300)
+    async with server.client() as client:
+        tokens = await asyncio.gather(*(cache.get(**CREDENTIALS, http_client=client) for _ in range(10)))
+        again = await cache.get(**CREDENTIALS, http_client=client)
+        other_scope = await cache.get(**CREDENTIALS, scope="https://outlook.office365.com/.default", http_client=client)
+
+    assert set(tokens) == {"token-1"} and again == "token-1"
+    assert other_scope == "token-2"
+    stats = cache.stats()
+    assert (stats["fetches"], stats["coalesced"], stats["hits"]) == (2, 9, 1)
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_refreshed_early_without_blocking_other_callers():
+    server = TokenServer(expires_in=0.2)
+    cache = GraphTokenCache(refresh_margin_seconds=300)  # capped at half the lifetime: refresh after 0.1s
+    async with server.client() as client:
+        assert await cache.get(**CREDENTIALS, http_client=client) == "token-1"
+        await asyncio.sleep(0.12)
+        refreshing = asyncio.create_task(cache.get(**CREDENTIALS, http_client=client))
+        await asyncio.sleep(0)
+        # Still within its lifetime, so the old token is served while the refresh runs
+        assert await cache.get(**CREDENTIALS, http_client=client) == "token-1"
+        assert await refreshing == "token-2"
+
+        await asyncio.sleep(0.25)
+        cache.invalidate(tenant_id="tenant", client_id="client")
+        assert await cache.get(**CREDENTIALS, http_client=client) == "token-3"
+
+
+@pytest.mark.asyncio
+async def test_send_mail_reuses_pooled_client_and_cached_token(monkeypatch):
+    server = TokenServer(reject_first_mail=True)
+    client = server.client()
+    monkeypatch.setattr(microsoft_graph, "get_graph_http_client", lambda: client)
+    monkeypatch.setattr(graph_service, "get_graph_http_client", lambda: client)
+    monkeypatch.setattr(microsoft_graph, "graph_token_cache", GraphTokenCache())
+    monkeypatch.setattr(graph_service, "graph_token_cache", microsoft_graph.graph_token_cache)
+    monkeypatch.setenv("ENTRA_TENANT_ID", "tenant")
+    monkeypatch.setenv("ENTRA_CLIENT_ID", "client")
+    monkeypatch.setenv("ENTRA_CLIENT_SECRET", "secret")
+
+    async with client:
+        for _ in range(3):
+            assert await GraphService.send_mail("noreply@proaktiv.no", "ansatt@proaktiv.no", "Signatur", "<p>Hei</p>")
+
+    # The first sendMail was rejected (401) and retried with a fresh token; the rest reuse it
+    assert server.token_requests == 2
+    assert server.mail_tokens == ["Bearer token-1", "Bearer token-2", "Bearer token-2", "Bearer token-2"]
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_is_shared_and_closed():
+    client = get_graph_http_client()
+    assert get_graph_http_client() is client
+
+    await close_graph_http_client()
+    assert client.is_closed
+    assert get_graph_http_client() is not client
+    await close_graph_http_client()
+
+
+@pytest.mark.asyncio
+async def test_client_from_a_previous_event_loop_is_closed_when_replaced():
+    client = get_graph_http_client()
+    previous_loop = asyncio.new_event_loop()
+    microsoft_graph._graph_http_client_loop = previous_loop
+    try:
+        replacement = get_graph_http_client()
+        await close_graph_http_client()
+    finally:
+        previous_loop.close()
+
+    assert replacement is not client
+    assert client.is_closed and replacement.is_closed
@@ -0,0 +1,166 @@
+"""
+Tests for the in-app report scheduler (cache warming + subscription delivery).
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+
+from app.models.report_subscription import ReportSubscription
+from app.routers import reports
+from app.services import report_scheduler_service, sales_report_service
+from app.services.report_delivery_service import ReportDeliveryService
+from app.services.report_scheduler_service import ReportScheduler
+
+
+class FakeSales:
+    is_configured = True
+
+    def __init__(self, locked: set[int] | None = None, failing: set[int] | None = None) -> None:
+        self.locked = locked or set()
+        self.failing = failing or set()
+        self.warmed: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def list_report_department_ids(self) -> list[int]:
+        return [1, 2, 3, 4, 5]
+
+    async def warm_department_cache(self, department_id: int) -> dict:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if department_id in self.failing:
+                raise RuntimeError("Vitec down")
+            if department_id in self.locked:
+                return {"skipped": "locked"}
+            self.warmed.append(department_id)
+            return {"estates_upserted": 0, "transactions_upserted": 0}
+        finally:
+            self.in_flight -= 1
+
+
+class FakeDelivery(ReportDeliveryService):
+    """Claims through the real service; fails delivery for subscriptions named "fail"."""
+
+    def __init__(self, session_factory=None) -> None:
+        self.session_factory = session_factory
+        self.delivered: list[str] = []
+        self.claimed_before_send: list[bool] = []
+
+    async def deliver(self, sub: ReportSubscription) -> tuple[bool, str | None]:
+        # The claim must already be committed: a separate session sees the next run scheduled.
+        async with self.session_factory() as db:
+            stored = await db.get(ReportSubscription, sub.id)
+            self.claimed_before_send.append(stored.last_status == "sending" and stored.next_run_at > datetime.utcnow())
+        self.delivered.append(sub.name)
+        return (False, "send_failed") if sub.name == "fail" else (True, None)
+
+
+@pytest.fixture
+def sqlite_tables() -> tuple[str, ...]:
+    return ("report_subscriptions",)
+
+
+@pytest.mark.asyncio
+async def test_warm_caches_counts_and_bounds_concurrency():
+    sales = FakeSales(locked={2}, failing={3})
+    scheduler = ReportScheduler(sales=sales)
+
+    with patch.object(report_scheduler_service.settings, "REPORTS_FANOUT_CONCURRENCY", 2):
+        counts = await scheduler.warm_caches()
+
+    assert counts == {"synced": 3, "skipped": 1, "failed": 1}
+    assert sorted(sales.warmed) == [1, 4, 5]
+    assert sales.max_in_flight == 2
+    status = scheduler.status()
+    assert status["warm_runs"] == 1
+    assert status["warm_departments_failed"] == 1
+    assert status["last_warm_error"].startswith("3:")
+
+
+@pytest.mark.asyncio
+async def test_warm_caches_skips_when_not_configured():
+    sales = FakeSales()
+    sales.is_configured = False
+    scheduler = ReportScheduler(sales=sales)
+
+    assert await scheduler.warm_caches() == {"synced": 0, "skipped": 0, "failed": 0}
+    assert scheduler.metrics["warm_runs"] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_due_subscriptions_claims_before_sending_and_records_results(session_factory):
+    due_at = datetime.utcnow() - timedelta(minutes=5)
+    async with session_factory() as db:
+        for name in ("ok", "fail"):
+            db.add(ReportSubscription(name=name, recipients_json=["a@example.com"], next_run_at=due_at))
+        db.add(ReportSubscription(name="later", next_run_at=datetime.utcnow() + timedelta(days=1)))
+        await db.commit()
+    delivery = FakeDelivery(session_factory)
+    scheduler = ReportScheduler(sales=FakeSales(), delivery=delivery)
+
+    with patch.object(report_scheduler_service, "async_session_factory", session_factory):
+        result = await scheduler.run_due_subscriptions()
+        again = await scheduler.run_due_subscriptions()
+
+    assert result == {"processed": 2, "sent": 1, "failed": 1}
+    assert again == {"processed": 0, "sent": 0, "failed": 0}
+    assert sorted(delivery.delivered) == ["fail", "ok"]
+    assert delivery.claimed_before_send == [True, True]
+    async with session_factory() as db:
+        rows = {sub.name: sub for sub in (await db.execute(select(ReportSubscription))).scalars()}
+    assert (rows["ok"].last_status, rows["ok"].last_error) == ("success", None)
+    assert (rows["fail"].last_status, rows["fail"].last_error) == ("failed", "send_failed")
+    assert rows["later"].last_status is None
+    assert scheduler.metrics["subscriptions_sent"] == 1
+    assert scheduler.metrics["subscriptions_failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_start_and_stop_loops():
+    scheduler = ReportScheduler(sales=FakeSales(), delivery=FakeDelivery())
+    with (
+        patch.object(report_scheduler_service.settings, "REPORTS_SCHEDULER_JITTER_SECONDS", 0),
+        patch.object(scheduler, "run_due_subscriptions", return_value=None),
+    ):
+        scheduler.start()
+        assert scheduler.running
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+
+    assert not scheduler.running
+    assert scheduler.metrics["warm_runs"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_due_endpoint_goes_through_the_locked_scheduler_run():
+    app = FastAPI()
+    app.include_router(reports.router, prefix="/api")
+    scheduler = ReportScheduler(sales=FakeSales(), delivery=FakeDelivery())
+    with (
+        patch.object(reports, "get_report_scheduler", return_value=scheduler),
+        patch.object(scheduler, "run_due_subscriptions", return_value={"processed": 0, "sent": 0, "failed": 0}) as run,
+    ):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/api/reports/subscriptions/run-due")
+
+    assert response.status_code == 200
+    assert response.json() == {"processed": 0, "sent": 0, "failed": 0}
+    run.assert_awaited_once()
+
+
+def test_data_freshness_note_describes_the_interactive_max_age():
+    with (
+        patch.object(sales_report_service.settings, "REPORTS_SCHEDULER_ENABLED", True),
+        patch.object(sales_report_service.settings, "REPORTS_CACHE_WARM_INTERVAL_SECONDS", 900),
+    ):
+        assert sales_report_service._data_freshness_note().startswith("Cache reused while newer than 30 min")
+    with patch.object(sales_report_service.settings, "REPORTS_SCHEDULER_ENABLED", False):
+        assert sales_report_service._data_freshness_note().startswith("Current month re-synced on every load")
@@ -0,0 +1,717 @@
+"""
+Tests for SalesReportService cache sync against an in-memory SQLite database.
+
+Covers:
+- Bulk upsert of estates and transactions (insert + update on re-sync)
+- Placeholder estates for transactions without estate payloads
+- Sync event throughput metrics
+- Concurrent month fetching with a bounded number of in-flight requests
+- Monthly revenue rollup maintenance
+- Persistent estate address lookups (positive and negative caching)
+"""
+
+import asyncio
+import io
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+import openpyxl
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.models.report_sales_cache import (
+    ReportSalesCacheState,
+    ReportSalesEstateCache,
+    ReportSalesMonthlyRollup,
+    ReportSalesSyncEvent,
+    ReportSalesTransactionCache,
+)
+from app.services import sales_report_service
+from app.services.sales_report_service import SalesReportService
+
+ESTATE_A = "11111111-1111-1111-1111-111111111111"
+ESTATE_B = "22222222-2222-2222-2222-222222222222"
+ESTATE_C = "33333333-3333-3333-3333-333333333333"
+
+
+@pytest.fixture
+def sqlite_tables():
+    return tuple(
+        model.__tablename__
+        for model in (
+            ReportSalesCacheState,
+            ReportSalesEstateCache,
+            ReportSalesMonthlyRollup,
+            ReportSalesSyncEvent,
+            ReportSalesTransactionCache,
+        )
+    )
+
+
+class FakeHub:
+    """Minimal VitecHubService stand-in returning canned accounting payloads."""
+
+    is_configured = True
+
+    def __init__(self, estates: list[dict], transactions_by_month: dict[str, list[dict]]) -> None:
+        self.estates = estates
+        self.transactions_by_month = transactions_by_month
+        self.transaction_calls: list[str] = []
+        self.estate_details: dict[str, dict] = {}
+        self.detail_calls: list[str] = []
+
+    async def get_accounting_estates(self, installation_id, *, department_id=None, changed_after=None):
+        return list(self.estates)
+
+    async def get_accounting_estate_by_id(self, installation_id, estate_id):
+        self.detail_calls.append(estate_id)
+        detail = self.estate_details.get(estate_id)
+        if isinstance(detail, Exception):
+            raise detail
+        return detail
+
+    async def get_accounting_transactions(self, installation_id, from_date, to_date, **kwargs):
+        month = from_date[:7]
+        self.transaction_calls.append(month)
+        return list(self.transactions_by_month.get(month, []))
+
+
+def _txn(estate_id: str, amount: float, day: int = 5, month: int = 1, user_id: str = "E1") -> dict:
+    return {
+        "postingDate": f"2025-{month:02d}-{day:02d}T00:00:00",
+        "account": "3000",
+        "userId": user_id,
+        "estateId": estate_id,
+        "amount": amount,
+        "vatAmount": amount * 0.25,
+        "description": "Vederlag",
+    }
+
+
+class SlowHub(FakeHub):
+    """FakeHub variant that tracks how many transaction fetches are in flight."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_accounting_transactions(self, installation_id, from_date, to_date, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Later months answer first to prove the writer still consumes in order.
+            await asyncio.sleep(0.05 / int(from_date[5:7]))
+            return await super().get_accounting_transactions(installation_id, from_date, to_date, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+class FailingHub(FakeHub):
+    """FakeHub variant whose transaction fetches fail for some months."""
+
+    def __init__(self, *args, failing_months: set[str], **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.failing_months = failing_months
+
+    async def get_accounting_transactions(self, installation_id, from_date, to_date, **kwargs):
+        if from_date[:7] in self.failing_months:
+            raise RuntimeError(f"Vitec Hub error for {from_date[:7]}")
+        return await super().get_accounting_transactions(installation_id, from_date, to_date, **kwargs)
+
+
+async def _run_sync(session_factory, hub: FakeHub, to_dt: datetime | None = None) -> dict:
+    service = SalesReportService(hub=hub)
+    async with session_factory() as db:
+        result = await service._sync_sales_cache(
+            db=db,
+            installation_id="INST",
+            department_id=1120,
+            from_dt=datetime(2025, 1, 1, tzinfo=UTC),
+            to_dt=to_dt or datetime(2025, 2, 28, 23, 59, 59, tzinfo=UTC),
+        )
+        await db.commit()
+    return result
+
+
+@pytest.mark.asyncio
+async def test_sync_bulk_upserts_estates_and_transactions(session_factory):
+    hub = FakeHub(
+        estates=[
+            {
+                "estateId": ESTATE_A,
+                "sold": "2025-01-03T00:00:00",
+                "address": "Storgata 1",
+                "brokersIdWithRoles": [{"employeeId": "E1"}],
+            }
+        ],
+        transactions_by_month={
+            "2025-01": [_txn(ESTATE_A, 1000.0), _txn(ESTATE_B, 500.0, day=6)],
+            "2025-02": [_txn(ESTATE_A, 250.0, month=2)],
+        },
+    )
+
+    result = await _run_sync(session_factory, hub)
+
+    assert result["transactions_upserted"] == 3
+    # One estate from the estates API, one placeholder for the transaction-only estate
+    assert result["estates_upserted"] == 2
+    async with session_factory() as db:
+        tx_count = (await db.execute(select(func.count()).select_from(ReportSalesTransactionCache))).scalar_one()
+        assert tx_count == 3
+        placeholder = await db.get(ReportSalesEstateCache, f"INST:{ESTATE_B}")
+        assert placeholder is not None
+        assert placeholder.address == "(ukjent adresse)"
+        estate = await db.get(ReportSalesEstateCache, f"INST:{ESTATE_A}")
+        assert estate.address == "Storgata 1"
+        assert estate.brokers_json == [{"employeeId": "E1"}]
+        event = (await db.execute(select(ReportSalesSyncEvent))).scalars().one()
+        assert event.payload_json["rows_ingested"] == 5
+        assert "rows_per_sec" in event.payload_json
+        assert "write_duration_ms" in event.payload_json
+
+
+@pytest.mark.asyncio
+async def test_sync_updates_existing_rows_without_duplicates(session_factory):
+    hub = FakeHub(
+        estates=[{"estateId": ESTATE_A, "address": "Storgata 1", "brokersIdWithRoles": []}],
+        transactions_by_month={"2025-01": [_txn(ESTATE_A, 1000.0)]},
+    )
+    await _run_sync(session_factory, hub)
+
+    # Address changes upstream; identical transaction is re-delivered.
+    hub.estates = [{"estateId": ESTATE_A, "address": "Storgata 2", "brokersIdWithRoles": []}]
+    async with session_factory() as db:
+        state = await db.get(ReportSalesCacheState, "INST:1120")
+        state.month_sync_json = {}
+        await db.commit()
+    await _run_sync(session_factory, hub)
+
+    async with session_factory() as db:
+        tx_count = (await db.execute(select(func.count()).select_from(ReportSalesTransactionCache))).scalar_one()
+        assert tx_count == 1
+        estate = await db.get(ReportSalesEstateCache, f"INST:{ESTATE_A}")
+        assert estate.address == "Storgata 2"
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_future_and_orphan_transactions(session_factory):
+    orphan = _txn("", 100.0)
+    orphan["userId"] = ""
+    future = _txn(ESTATE_A, 100.0)
+    future["postingDate"] = "2999-01-01T00:00:00"
+    hub = FakeHub(estates=[], transactions_by_month={"2025-01": [orphan, future, _txn(ESTATE_A, 10.0)]})
+
+    result = await _run_sync(session_factory, hub)
+
+    assert result["transactions_upserted"] == 1
+    async with session_factory() as db:
+        event = (await db.execute(select(ReportSalesSyncEvent))).scalars().one()
+        assert event.payload_json["rows_skipped"] == {"future_date": 1, "orphan": 1}
+
+
+@pytest.mark.asyncio
+async def test_sync_fetches_months_concurrently_within_cap(session_factory):
+    hub = SlowHub(
+        estates=[],
+        transactions_by_month={f"2025-{m:02d}": [_txn(ESTATE_A, float(m), month=m)] for m in range(1, 13)},
+    )
+
+    with (
+        patch.object(sales_report_service.settings, "VITEC_SALES_SYNC_MONTH_CONCURRENCY", 4),
+        patch.object(sales_report_service.settings, "VITEC_RATE_LIMIT_REQUESTS_PER_SECOND", 50),
+    ):
+        result = await _run_sync(session_factory, hub, to_dt=datetime(2025, 12, 31, 23, 59, 59, tzinfo=UTC))
+
+    assert result["transactions_upserted"] == 12
+    assert 1 < hub.max_in_flight <= 4
+    assert sorted(hub.transaction_calls) == [f"2025-{m:02d}" for m in range(1, 13)]
+    async with session_factory() as db:
+        state = await db.get(ReportSalesCacheState, "INST:1120")
+        assert sorted(state.month_sync_json) == [f"2025-{m:02d}" for m in range(1, 13)]
+        event = (await db.execute(select(ReportSalesSyncEvent))).scalars().one()
+        assert event.payload_json["months_fetched"] == 12
+        assert event.payload_json["fetch_concurrency"] == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_month_fetches_are_raised_or_logged(session_factory, caplog):
+    hub = FailingHub(
+        estates=[],
+        transactions_by_month={"2025-01": [_txn(ESTATE_A, 100.0)]},
+        failing_months={"2025-02", "2025-03"},
+    )
+
+    with pytest.raises(RuntimeError, match="2025-02"):
+        await _run_sync(session_factory, hub, to_dt=datetime(2025, 3, 31, 23, 59, 59, tzinfo=UTC))
+
+    assert sorted(hub.transaction_calls) == ["2025-01"]
+    assert [r.getMessage() for r in caplog.records if "transaction fetch" in r.getMessage()] == [
+        "Sales transaction fetch for 2025-03 failed: Vitec Hub error for 2025-03"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pending_month_fetches_are_cancelled_when_the_writer_fails(session_factory):
+    hub = FakeHub(estates=[], transactions_by_month={"2025-01": [_txn(ESTATE_A, 100.0)]})
+    blocked: set[str] = set()
+    original_fetch = hub.get_accounting_transactions
+
+    async def fetch(installation_id, from_date, to_date, **kwargs):
+        if from_date[:7] != "2025-01":
+            blocked.add(from_date[:7])
+            try:
+                await asyncio.Event().wait()
+            finally:
+                blocked.discard(from_date[:7])
+        return await original_fetch(installation_id, from_date, to_date, **kwargs)
+
+    hub.get_accounting_transactions = fetch
+    original_upsert = SalesReportService._bulk_upsert
+
+    async def failing_upsert(db, model, rows, **kwargs):
+        if model is ReportSalesTransactionCache:
+            raise RuntimeError("write failed")
+        return await original_upsert(db, model, rows, **kwargs)
+
+    service = SalesReportService(hub=hub)
+    async with session_factory() as db:
+        with patch.object(SalesReportService, "_bulk_upsert", staticmethod(failing_upsert)):
+            with pytest.raises(RuntimeError, match="write failed"):
+                await service._sync_sales_cache(
+                    db=db,
+                    installation_id="INST",
+                    department_id=1120,
+                    from_dt=datetime(2025, 1, 1, tzinfo=UTC),
+                    to_dt=datetime(2025, 3, 31, 23, 59, 59, tzinfo=UTC),
+                )
+        # The blocked February/March fetches were cancelled before the error reached the caller.
+        assert not blocked
+
+
+def test_month_fetch_concurrency_respects_rate_limit():
+    with (
+        patch.object(sales_report_service.settings, "VITEC_SALES_SYNC_MONTH_CONCURRENCY", 8),
+        patch.object(sales_report_service.settings, "VITEC_RATE_LIMIT_REQUESTS_PER_SECOND", 3),
+    ):
+        assert sales_report_service._month_fetch_concurrency() == 3
+
+
+@pytest.mark.asyncio
+async def test_monthly_revenue_matches_per_month_report_totals(session_factory):
+    hub = FakeHub(
+        estates=[
+            {
+                "estateId": ESTATE_A,
+                "sold": "2025-01-03T00:00:00",
+                "address": "Storgata 1",
+                "brokersIdWithRoles": [{"employeeId": "E1"}],
+            }
+        ],
+        transactions_by_month={
+            "2025-01": [_txn(ESTATE_A, 1000.0), _txn(ESTATE_B, -400.0, day=6), _txn(ESTATE_A, 70.0, user_id="E9")],
+            "2025-02": [_txn(ESTATE_A, 250.0, month=2, day=28)],
+        },
+    )
+    await _run_sync(session_factory, hub)
+    service = SalesReportService(hub=hub)
+
+    async with session_factory() as db:
+        monthly = await service._aggregate_monthly_revenue(
+            db=db,
+            installation_id="INST",
+            department_id=1120,
+            year=2025,
+            include_vat=True,
+        )
+        per_month = {}
+        for month in (1, 2):
+            start, end = sales_report_service._month_bounds(2025, month)
+            report_data, *_ = await service._build_report_tuple_from_cache(
+                db=db,
+                installation_id="INST",
+                department_id=1120,
+                year=2025,
+                from_date=start.strftime("%Y-%m-%dT%H:%M:%S"),
+                to_date=end.strftime("%Y-%m-%dT%H:%M:%S"),
+                from_dt=start,
+                to_dt=end,
+                include_vat=True,
+                broker_map={},
+            )
+            per_month[month] = report_data["total_revenue"]
+
+    # E9 has no sold estate this year and is excluded; credits count as positive revenue.
+    assert monthly == {1: pytest.approx(1750.0), 2: pytest.approx(312.5)}
+    assert per_month == {1: pytest.approx(monthly[1]), 2: pytest.approx(monthly[2])}
+
+
+@pytest.mark.asyncio
+async def test_report_sums_in_sql_and_loads_detail_only_on_request(session_factory):
+    hub = FakeHub(
+        estates=[
+            {
+                "estateId": ESTATE_A,
+                "sold": "2025-01-03T00:00:00",
+                "address": "Storgata 1",
+                "brokersIdWithRoles": [{"employeeId": "E1"}],
+            }
+        ],
+        transactions_by_month={
+            "2025-01": [
+                _txn(ESTATE_A, 1000.0),
+                _txn(ESTATE_A, 200.0, day=9),
+                {**_txn(ESTATE_A, 999.0), "account": "9999"},
+            ],
+        },
+    )
+    await _run_sync(session_factory, hub)
+    service = SalesReportService(hub=hub)
+    start, _ = sales_report_service._month_bounds(2025, 1)
+    _, end = sales_report_service._month_bounds(2025, 2)
+
+    async def build(include_transactions: bool) -> dict:
+        async with session_factory() as db:
+            report_data, *_ = await service._build_report_tuple_from_cache(
+                db=db,
+                installation_id="INST",
+                department_id=1120,
+                year=2025,
+                from_date=start.strftime("%Y-%m-%dT%H:%M:%S"),
+                to_date=end.strftime("%Y-%m-%dT%H:%M:%S"),
+                from_dt=start,
+                to_dt=end,
+                include_vat=False,
+                broker_map={"E1": "Test Megler"},
+                include_transactions=include_transactions,
+            )
+        return report_data
+
+    summary = await build(include_transactions=False)
+    detail = await build(include_transactions=True)
+
+    assert summary["total_revenue"] == detail["total_revenue"] == 1200.0
+    summary_prop = summary["brokers"][0]["properties"][0]
+    detail_prop = detail["brokers"][0]["properties"][0]
+    assert summary_prop["address"] == "Storgata 1"
+    assert summary_prop["total"] == detail_prop["total"] == 1200.0
+    assert summary_prop["transactions"] == []
+    assert [t["amount"] for t in detail_prop["transactions"]] == [1000.0, 200.0]
+
+
+@pytest.mark.asyncio
+async def test_best_performers_include_transactions_for_returned_properties(session_factory):
+    hub = FakeHub(
+        estates=[
+            {
+                "estateId": ESTATE_A,
+                "sold": "2025-01-03T00:00:00",
+                "address": "Storgata 1",
+                "brokersIdWithRoles": [{"employeeId": "E1"}],
+            },
+            {
+                "estateId": ESTATE_B,
+                "sold": "2025-01-04T00:00:00",
+                "address": "Lillegata 2",
+                "brokersIdWithRoles": [{"employeeId": "E2"}],
+            },
+        ],
+        transactions_by_month={
+            "2025-01": [
+                _txn(ESTATE_A, 1000.0),
+                _txn(ESTATE_A, 200.0, day=9),
+                _txn(ESTATE_B, 300.0, user_id="E2"),
+            ],
+        },
+    )
+    hub.get_employees = lambda installation_id: asyncio.sleep(
+        0, [{"employeeId": "E1", "name": "Test Megler"}, {"employeeId": "E2", "name": "Annen Megler"}]
+    )
+    await _run_sync(session_factory, hub)
+
+    with (
+        patch.object(sales_report_service, "async_session_factory", session_factory),
+        patch.object(sales_report_service.settings, "VITEC_INSTALLATION_ID", "INST"),
+    ):
+        data = await SalesReportService(hub=hub).get_best_performers_data(
+            from_date="2025-01-01",
+            to_date="2025-02-28",
+            department_ids=[1120],
+            top_n=1,
+        )
+
+    # Only the top broker is returned, with its property drill-down
+    (top,) = data["unknown"]
+    assert top["broker_id"] == "E1"
+    (prop,) = top["properties"]
+    assert [(t["posting_date"], t["amount"]) for t in prop["transactions"]] == [
+        ("05.01.2025", 1000.0),
+        ("09.01.2025", 200.0),
+    ]
+    department_props = {
+        broker["broker_id"]: broker["properties"][0]["transactions"] for broker in data["departments"][0]["brokers"]
+    }
+    assert [t["amount"] for t in department_props["E2"]] == [300.0]
+
+
+@pytest.mark.asyncio
+async def test_excel_export_streams_transactions_per_broker(session_factory):
+    hub = FakeHub(
+        estates=[
+            {"estateId": ESTATE_A, "sold": "2025-01-03T00:00:00", "address": "Storgata 1"},
+            {"estateId": ESTATE_B, "sold": "2025-01-04T00:00:00", "address": "Lillegata 2"},
+        ],
+        transactions_by_month={
+            "2025-01": [
+                _txn(ESTATE_A, 1000.0),
+                _txn(ESTATE_A, 200.0, day=9),
+                _txn(ESTATE_B, 300.0, user_id="E2"),
+            ],
+        },
+    )
+    hub.get_employees = lambda installation_id: asyncio.sleep(0, [{"employeeId": "E1", "name": "Test Megler"}])
+    await _run_sync(session_factory, hub)
+
+    streamed: list[str] = []
+    original = SalesReportService._stream_broker_estates
+
+    async def recording_stream(**kwargs):
+        async for broker_id, estates in original(**kwargs):
+            streamed.append(broker_id)
+            yield broker_id, estates
+
+    with (
+        patch.object(sales_report_service, "async_session_factory", session_factory),
+        patch.object(sales_report_service.settings, "VITEC_INSTALLATION_ID", "INST"),
+        patch.object(SalesReportService, "_stream_broker_estates", staticmethod(recording_stream)),
+    ):
+        workbook = await SalesReportService(hub=hub).build_report(from_date="2025-01-01", to_date="2025-02-28")
+
+    rows = list(openpyxl.load_workbook(io.BytesIO(workbook)).active.iter_rows(values_only=True))
+    assert streamed == ["E1", "E2"]
+    assert rows[4:] == [
+        ("Test Megler", 1, None, None, 1200),
+        ("  Storgata 1", None, "—", "—", None),
+        ("    05.01.2025 | Konto 3000 | Vederlag", None, None, None, 1000),
+        ("    09.01.2025 | Konto 3000 | Vederlag", None, None, None, 200),
+        ("E2", 1, None, None, 300),
+        ("  Lillegata 2", None, "—", "—", None),
+        ("    05.01.2025 | Konto 3000 | Vederlag", None, None, None, 300),
+        ("Sum", 2, None, None, 1500),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sync_maintains_monthly_rollup(session_factory):
+    hub = FakeHub(
+        estates=[
+            {
+                "estateId": ESTATE_A,
+                "sold": "2025-01-03T00:00:00",
+                "brokersIdWithRoles": [{"employeeId": "E1"}, {"employeeId": "E2"}],
+            }
+        ],
+        transactions_by_month={
+            "2025-01": [_txn(ESTATE_A, 1000.0), _txn(ESTATE_A, -400.0, day=6)],
+            "2025-02": [_txn(ESTATE_A, 250.0, month=2, day=28, user_id="E2")],
+        },
+    )
+    hub.transactions_by_month["2025-02"].append(_txn(ESTATE_A, 50.0, month=2, day=27, user_id="E2"))
+    await _run_sync(session_factory, hub, to_dt=datetime(2025, 12, 31, 23, 59, 59, tzinfo=UTC))
+    service = SalesReportService(hub=hub)
+
+    async with session_factory() as db:
+        rows = (
+            (await db.execute(select(ReportSalesMonthlyRollup).order_by(ReportSalesMonthlyRollup.month)))
+            .scalars()
+            .all()
+        )
+        state = await db.get(ReportSalesCacheState, "INST:1120")
+        event = (await db.execute(select(ReportSalesSyncEvent))).scalars().one()
+        covered = await SalesReportService._rollup_covers(
+            db=db,
+            installation_id="INST",
+            department_id=1120,
+            months=[(2025, m) for m in range(1, 13)],
+        )
+        monthly = await service._aggregate_monthly_revenue(
+            db=db,
+            installation_id="INST",
+            department_id=1120,
+            year=2025,
+            include_vat=False,
+        )
+
+    assert event.payload_json["rollup_months_refreshed"] == 12
+    assert [(r.month, r.user_id, r.transaction_count) for r in rows] == [(1, "E1", 2), (2, "E2", 2)]
+    assert rows[0].amount_sum == pytest.approx(600.0)
+    assert rows[0].revenue_excl_vat == pytest.approx(1400.0)
+    assert rows[1].revenue_incl_vat == pytest.approx(375.0)
+    assert sorted(state.rollup_months_json) == [f"2025-{m:02d}" for m in range(1, 13)]
+    assert covered is True
+    assert monthly == {1: pytest.approx(1400.0), 2: pytest.approx(300.0)}
+
+
+@pytest.mark.asyncio
+async def test_address_lookups_are_cached_including_not_found(session_factory):
+    hub = FakeHub(
+        estates=[],
+        transactions_by_month={"2025-01": [_txn(ESTATE_B, 500.0), _txn(ESTATE_C, 300.0, day=7)]},
+    )
+    hub.estate_details[ESTATE_B] = {"estateId": ESTATE_B, "address": "Kirkegata 2"}
+    service = SalesReportService(hub=hub)
+    start, _ = sales_report_service._month_bounds(2025, 1)
+    _, end = sales_report_service._month_bounds(2025, 2)
+
+    async def sync_and_build() -> tuple[dict, dict]:
+        async with session_factory() as db:
+            sync_result = await service._sync_sales_cache(
+                db=db, installation_id="INST", department_id=1120, from_dt=start, to_dt=end
+            )
+            report_data, *_ = await service._build_report_tuple_from_cache(
+                db=db,
+                installation_id="INST",
+                department_id=1120,
+                year=2025,
+                from_date=start.strftime("%Y-%m-%dT%H:%M:%S"),
+                to_date=end.strftime("%Y-%m-%dT%H:%M:%S"),
+                from_dt=start,
+                to_dt=end,
+                include_vat=False,
+                broker_map={},
+                sync_metadata=sync_result,
+            )
+            await db.commit()
+            event = await db.get(ReportSalesSyncEvent, sync_result["sync_event_id"])
+            return report_data, event.payload_json
+
+    first_report, first_payload = await sync_and_build()
+    # The list endpoint now returns ESTATE_B without an address; the looked-up one must survive.
+    hub.estates = [{"estateId": ESTATE_B, "sold": "2025-01-03T00:00:00"}]
+    second_report, second_payload = await sync_and_build()
+
+    assert sorted(hub.detail_calls) == [ESTATE_B, ESTATE_C]
+    assert first_payload["address_cache_misses"] == 2
+    assert first_payload["address_lookups_not_found"] == 1
+    assert second_payload["address_cache_hits"] == 1
+    assert second_payload["address_cache_misses"] == 0
+    addresses = {p["address"] for b in second_report["brokers"] for p in b["properties"]}
+    assert any(a.startswith("Kirkegata 2") for a in addresses)
+    async with session_factory() as db:
+        found = await db.get(ReportSalesEstateCache, f"INST:{ESTATE_B}")
+        missing = await db.get(ReportSalesEstateCache, f"INST:{ESTATE_C}")
+    assert (found.address, found.address_lookup_status) == ("Kirkegata 2", "found")
+    assert missing.address_lookup_status == "not_found"
+    assert missing.address_lookup_at is not None
+
+    with patch.object(sales_report_service.settings, "REPORTS_ESTATE_ADDRESS_LOOKUP_TTL_HOURS", -1):
+        _, expired_payload = await sync_and_build()
+    assert expired_payload["address_cache_misses"] == 1
+    assert hub.detail_calls.count(ESTATE_C) == 2
+
+
+@pytest.mark.asyncio
+async def test_only_failed_lookups_are_retried(session_factory):
+    hub = FakeHub(
+        estates=[],
+        transactions_by_month={
+            "2025-01": [_txn(ESTATE_A, 100.0), _txn(ESTATE_B, 500.0, day=6), _txn(ESTATE_C, 300.0, day=7)]
+        },
+    )
+    hub.estate_details[ESTATE_A] = HTTPException(status_code=502, detail="Vitec Hub error 500")
+    hub.estate_details[ESTATE_B] = {"estateId": ESTATE_B}
+    service = SalesReportService(hub=hub)
+    start, end = sales_report_service._month_bounds(2025, 1)
+
+    for _ in range(2):
+        async with session_factory() as db:
+            sync_result = await service._sync_sales_cache(
+                db=db, installation_id="INST", department_id=1120, from_dt=start, to_dt=end
+            )
+            await service._build_report_tuple_from_cache(
+                db=db,
+                installation_id="INST",
+                department_id=1120,
+                year=2025,
+                from_date=start.strftime("%Y-%m-%dT%H:%M:%S"),
+                to_date=end.strftime("%Y-%m-%dT%H:%M:%S"),
+                from_dt=start,
+                to_dt=end,
+                include_vat=False,
+                broker_map={},
+                sync_metadata=sync_result,
+            )
+            await db.commit()
+
+    # The failed lookup is retried; the address-less detail and the 404 are not
+    assert sorted(hub.detail_calls) == sorted([ESTATE_A, ESTATE_A, ESTATE_B, ESTATE_C])
+    async with session_factory() as db:
+        statuses = {
+            row.estate_id: row.address_lookup_status
+            for row in (await db.execute(select(ReportSalesEstateCache))).scalars()
+        }
+    assert statuses == {ESTATE_A: None, ESTATE_B: "not_found", ESTATE_C: "not_found"}
+
+
+@pytest.mark.asyncio
+async def test_address_lookup_inserts_marker_for_uncached_estate(session_factory):
+    hub = FakeHub(estates=[], transactions_by_month={})
+    hub.estate_details[ESTATE_A] = {"estateId": ESTATE_A, "address": "Storgata 1", "estateType": "Enebolig"}
+    service = SalesReportService(hub=hub)
+
+    for _ in range(2):
+        async with session_factory() as db:
+            estate_address, estate_metadata = await service._load_estate_details(
+                db=db, installation_id="INST", department_id=1120, estate_ids={ESTATE_A, ESTATE_B}
+            )
+            await service._enrich_cached_estate_addresses(
+                db=db,
+                installation_id="INST",
+                department_id=1120,
+                estate_address=estate_address,
+                estate_metadata=estate_metadata,
+                estate_ids={ESTATE_A, ESTATE_B},
+            )
+            await db.commit()
+
+    # ESTATE_A is now found and ESTATE_B (404) is remembered, so neither is looked up again
+    assert sorted(hub.detail_calls) == [ESTATE_A, ESTATE_B]
+    async with session_factory() as db:
+        found = await db.get(ReportSalesEstateCache, f"INST:{ESTATE_A}")
+        missing = await db.get(ReportSalesEstateCache, f"INST:{ESTATE_B}")
+    assert (found.address, found.address_lookup_status, found.department_id) == ("Storgata 1", "found", 1120)
+    assert (missing.address, missing.address_lookup_status) == ("(ukjent adresse)", "not_found")
+
+
+@pytest.mark.asyncio
+async def test_fresh_cache_skips_vitec_sync(session_factory):
+    hub = FakeHub(estates=[], transactions_by_month={"2025-01": [_txn(ESTATE_A, 100.0)]})
+    await _run_sync(session_factory, hub)
+    calls_after_first = list(hub.transaction_calls)
+    service = SalesReportService(hub=hub)
+
+    async with session_factory() as db:
+        fresh = await service._sync_sales_cache(
+            db=db,
+            installation_id="INST",
+            department_id=1120,
+            from_dt=datetime(2025, 1, 1, tzinfo=UTC),
+            to_dt=datetime(2025, 2, 28, 23, 59, 59, tzinfo=UTC),
+            max_age_seconds=600,
+        )
+        # A month outside the cached range still forces a sync.
+        stale = await service._sync_sales_cache(
+            db=db,
+            installation_id="INST",
+            department_id=1120,
+            from_dt=datetime(2025, 1, 1, tzinfo=UTC),
+            to_dt=datetime(2025, 3, 31, 23, 59, 59, tzinfo=UTC),
+            max_age_seconds=600,
+        )
+        await db.commit()
+
+    assert fresh["cache_fresh"] is True
+    assert fresh["sync_event_id"] is None
+    assert "cache_fresh" not in stale
+    assert hub.transaction_calls == calls_after_first + ["2025-03"]
@@ -0,0 +1,79 @@
+"""
+Tests for the write-only Excel exports in SalesReportService.
+"""
+
+import io
+from unittest.mock import AsyncMock, patch
+
+import openpyxl
+import pytest
+
+from app.services import sales_report_service
+from app.services.sales_report_service import SalesReportService
+
+ESTATE_A = "11111111-1111-1111-1111-111111111111"
+
+
+async def _write_report(service: SalesReportService):
+    broker_estates = {
+        "E1": {
+            ESTATE_A: [
+                {"postingDate": "2025-01-05T00:00:00", "account": "3000", "amount": 1000.0, "vatAmount": 250.0},
+                {"postingDate": "2025-01-09T00:00:00", "account": "3020", "amount": 200.0, "vatAmount": 50.0},
+            ]
+        }
+    }
+    return await service._write_excel(
+        year=2025,
+        department_id=1120,
+        from_date="2025-01-01T00:00:00",
+        to_date="2025-12-31T23:59:59",
+        broker_map={"E1": "Test Megler"},
+        broker_estates=sales_report_service._iter_broker_estates(broker_estates, ["E1", "E2"]),
+        estate_address={ESTATE_A: "Storgata 1"},
+        estate_metadata={ESTATE_A: {"property_type": "Enebolig", "assignment_type": "Salg", "assignment_number": "7"}},
+        include_vat=False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_sales_report_workbook_rows_and_outline():
+    with await _write_report(SalesReportService(hub=object())) as fh:
+        wb = openpyxl.load_workbook(io.BytesIO(fh.read()))
+    ws = wb["Formidlingsrapport"]
+
+    values = list(ws.iter_rows(values_only=True))
+    assert values[0][0] == "Formidlingsrapport - Vederlag og andre inntekter"
+    assert values[3][4] == "Sum vederlag + andre inntekter (kr) eksl. mva."
+    assert values[4][:2] == ("Test Megler", 1)
+    assert values[5][0] == "  Storgata 1 (7)"
+    assert values[-1] == ("Sum", 1, None, None, 1200)
+    assert ws["A4"].font.bold is True
+    assert ws["A6"].font.italic is True
+    assert {str(r) for r in ws.merged_cells.ranges} == {"A1:E1", "A2:E2"}
+    assert [ws.row_dimensions[i].outline_level for i in range(5, 9)] == [0, 1, 2, 2]
+    assert ws.column_dimensions["A"].width == 45
+
+
+@pytest.mark.asyncio
+async def test_stream_best_performers_matches_bytes_export():
+    data = {
+        "from_date_display": "01.01.2025",
+        "to_date_display": "31.12.2025",
+        "eiendomsmegler": [{"name": "Test Megler", "total_sales": 3, "total_revenue": 1500.4}],
+        "eiendomsmeglerfullmektig": [],
+        "departments": [{"department_name": "Proaktiv", "total_sales": 3, "total_revenue": 1500.4}],
+    }
+    service = SalesReportService(hub=object())
+
+    with patch.object(SalesReportService, "get_best_performers_data", AsyncMock(return_value=data)):
+        whole = await service.build_best_performers_report(year=2025)
+        chunks = list(await service.stream_best_performers_report(year=2025))
+
+    assert chunks and all(len(c) <= sales_report_service.EXCEL_STREAM_CHUNK_SIZE for c in chunks)
+    ws = openpyxl.load_workbook(io.BytesIO(b"".join(chunks))).active
+    rows = list(ws.iter_rows(values_only=True))
+    assert rows[0][0] == "Best performers"
+    assert ("Test Megler", 3, 1500) in rows
+    assert ("Proaktiv", 3, 1500) in rows
+    assert openpyxl.load_workbook(io.BytesIO(whole)).active.max_row == ws.max_row
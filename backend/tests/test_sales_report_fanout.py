@@ -0,0 +1,107 @@
+"""
+Tests for franchise/best-performer fan-out in SalesReportService.
+
+Covers:
+- Employees and departments fetched once per request
+- Bounded concurrency of per-department report builds
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.services import sales_report_service
+from app.services.sales_report_service import SalesReportService
+
+
+class CountingHub:
+    is_configured = True
+
+    def __init__(self) -> None:
+        self.employee_calls = 0
+        self.department_calls = 0
+
+    async def get_employees(self, installation_id):
+        self.employee_calls += 1
+        await asyncio.sleep(0.01)
+        return [
+            {"employeeId": "E1", "name": "Megler En", "title": "Eiendomsmegler"},
+            {"employeeId": "E2", "name": "Fullmektig To", "title": "Eiendomsmeglerfullmektig"},
+        ]
+
+    async def get_departments(self, installation_id):
+        self.department_calls += 1
+        return [{"departmentId": dep_id, "name": f"Avd {dep_id}"} for dep_id in range(1, 11)] + [
+            {"departmentId": 99, "name": "Oppgjør"}
+        ]
+
+
+def _report_tuple(department_id: int, broker_map: dict[str, str]) -> tuple:
+    broker_id = "E1" if department_id % 2 else "E2"
+    report = {
+        "year": 2026,
+        "total_sales": 1,
+        "total_revenue": float(department_id * 100),
+        "brokers": [
+            {
+                "broker_id": broker_id,
+                "name": broker_map[broker_id],
+                "sale_count": 1,
+                "total": float(department_id * 100),
+                "properties": [],
+            }
+        ],
+    }
+    return report, broker_map, set(), {}, {}, {}, False
+
+
+@pytest.fixture
+def fanout_env():
+    hub = CountingHub()
+    state = {"in_flight": 0, "max_in_flight": 0, "departments": []}
+
+    async def fake_cached(self, *, department_id, broker_map, **kwargs):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        state["departments"].append(department_id)
+        try:
+            await asyncio.sleep(0.01)
+            return _report_tuple(department_id, broker_map)
+        finally:
+            state["in_flight"] -= 1
+
+    async def no_names(department_ids):
+        return {}
+
+    with (
+        patch.object(sales_report_service.settings, "VITEC_INSTALLATION_ID", "INST"),
+        patch.object(sales_report_service.settings, "REPORTS_FANOUT_CONCURRENCY", 3),
+        patch.object(SalesReportService, "_fetch_report_data_cached", new=fake_cached),
+        patch.object(SalesReportService, "_resolve_department_names", new=staticmethod(no_names)),
+    ):
+        yield hub, state
+
+
+@pytest.mark.asyncio
+async def test_franchise_fetches_employees_once_and_caps_concurrency(fanout_env):
+    hub, state = fanout_env
+
+    data = await SalesReportService(hub=hub).get_franchise_report_data(year=2026)
+
+    assert hub.employee_calls == 1
+    assert hub.department_calls == 1
+    assert sorted(state["departments"]) == list(range(1, 11))
+    assert 1 < state["max_in_flight"] <= 3
+    assert data["summary"]["department_count"] == 10
+
+
+@pytest.mark.asyncio
+async def test_best_performers_reuses_employee_list(fanout_env):
+    hub, _ = fanout_env
+
+    data = await SalesReportService(hub=hub).get_best_performers_data(year=2026, top_n=3)
+
+    assert hub.employee_calls == 1
+    assert [r["broker_id"] for r in data["eiendomsmegler"]] == ["E1"]
+    assert [r["broker_id"] for r in data["eiendomsmeglerfullmektig"]] == ["E2"]
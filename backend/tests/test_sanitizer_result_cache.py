@@ -0,0 +1,120 @@
+"""
+Tests for the sanitizer/normalizer result cache.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.routers import sanitizer
+from app.services.sanitizer_result_cache import SanitizerResultCache, sanitizer_result_cache
+
+HTML = "<p><font face='Arial' style='color:red'>Selger: [[selger.navn]]</font></p>"
+
+
+@pytest.fixture
+async def async_client():
+    sanitizer_result_cache.clear()
+    test_app = FastAPI()
+    test_app.include_router(sanitizer.router)
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    sanitizer_result_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_endpoints_report_cache_hits_per_operation_and_options(async_client):
+    first = await async_client.post("/api/sanitize/preview", json={"html": HTML})
+    second = await async_client.post("/api/sanitize/preview", json={"html": HTML})
+    themed = await async_client.post("/api/sanitize/preview", json={"html": HTML, "theme_class": "other-theme"})
+    normalized = await async_client.post("/api/sanitize/normalize", json={"html": HTML})
+    normalized_again = await async_client.post("/api/sanitize/normalize", json={"html": HTML})
+
+    assert [r.status_code for r in (first, second, themed, normalized, normalized_again)] == [200] * 5
+    assert [r.headers["X-Cache"] for r in (first, second, themed, normalized, normalized_again)] == [
+        "MISS",
+        "HIT",
+        "MISS",
+        "MISS",
+        "HIT",
+    ]
+    assert first.json() == second.json()
+    assert "other-theme" in themed.json()["html"]
+    assert normalized.json() == normalized_again.json()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_computation_and_errors_are_not_cached():
+    cache = SanitizerResultCache(ttl_seconds=60, max_entries=10, max_bytes=10_000, redis_url="")
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"html": "<p>ok</p>"}
+
+    results = await asyncio.gather(*(cache.get_or_compute("preview", HTML, compute) for _ in range(5)))
+    assert calls == 1
+    assert [hit for _, hit in results] == [False, True, True, True, True]
+
+    async def failing():
+        raise ValueError("parse error")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await cache.get_or_compute("validate", HTML, failing)
+
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["entries"]) == (3, 4, 1)
+    assert stats["hit_ratio"] == round(4 / 7, 4)
+
+
+@pytest.mark.asyncio
+async def test_waiters_take_over_when_the_leading_request_is_cancelled():
+    cache = SanitizerResultCache(ttl_seconds=60, max_entries=10, max_bytes=10_000, redis_url="")
+    started = asyncio.Event()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        started.set()
+        await asyncio.sleep(0.05 if calls > 1 else 10)
+        return {"html": "<p>ok</p>"}
+
+    leader = asyncio.create_task(cache.get_or_compute("preview", HTML, compute))
+    await started.wait()
+    waiters = [asyncio.create_task(cache.get_or_compute("preview", HTML, compute)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    results = await asyncio.gather(*waiters)
+    assert leader.cancelled()
+    # One waiter recomputes; the others coalesce onto it
+    assert calls == 2
+    assert sorted(hit for _, hit in results) == [False, True, True]
+    assert all(value == {"html": "<p>ok</p>"} for value, _ in results)
+
+
+@pytest.mark.asyncio
+async def test_entries_are_bounded_by_count_bytes_and_ttl():
+    cache = SanitizerResultCache(ttl_seconds=60, max_entries=2, max_bytes=40, redis_url="")
+
+    async def value(text):
+        return text
+
+    for html in ("a", "b", "c"):
+        await cache.get_or_compute("strip-styles", html, lambda html=html: value(html * 10))
+    assert cache.stats()["entries"] == 2
+    assert (await cache.get_or_compute("strip-styles", "a", lambda: value("a" * 10)))[1] is False
+
+    await cache.get_or_compute("strip-styles", "big", lambda: value("x" * 100))
+    assert (await cache.get_or_compute("strip-styles", "big", lambda: value("x" * 100)))[1] is False
+
+    expired = SanitizerResultCache(ttl_seconds=0, max_entries=10, max_bytes=10_000, redis_url="")
+    await expired.get_or_compute("validate", HTML, lambda: value({"is_valid": True}))
+    assert expired.stats()["entries"] == 0
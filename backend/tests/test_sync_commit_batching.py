@@ -0,0 +1,198 @@
+"""
+Tests for batched Vitec sync commits and hub syncs.
+
+Covers:
+- Session commit prefetches its targets and applies them with one flush per table
+- New employees can reference offices created in the same commit
+- Hub syncs match against preloaded rows and write notifications in one INSERT
+"""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (registers relationship targets)
+from app.models.base import Base
+from app.models.employee import Employee
+from app.models.notification import Notification
+from app.models.office import Office
+from app.models.sync_session import SyncSession
+from app.services.employee_service import EmployeeService
+from app.services.office_service import OfficeService
+from app.services.sync_commit_service import SyncCommitService
+from app.services.vitec_hub_service import VitecHubService
+
+TEST_DB_URL = "sqlite+aiosqlite:///:memory:"
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(element, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+async def async_engine():
+    engine = create_async_engine(
+        TEST_DB_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    tables = [Base.metadata.tables[name] for name in ("offices", "employees", "notifications", "sync_sessions")]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def db_session(async_engine):
+    factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+
+
+@pytest.fixture
+def statements(async_engine):
+    """Leading keyword (SELECT, INSERT, ...) of every SQL statement run on the engine."""
+    seen: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement.split(None, 1)[0].upper())
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+def _field(name: str, vitec_value):
+    return {"field_name": name, "local_value": None, "vitec_value": vitec_value, "has_diff": True}
+
+
+async def _seed(db: AsyncSession) -> tuple[list[Office], list[Employee]]:
+    offices = [
+        Office(name=f"Proaktiv {index}", short_code=f"PA{index}", vitec_department_id=index) for index in range(3)
+    ]
+    db.add_all(offices)
+    await db.flush()
+    employees = [
+        Employee(first_name=f"Ansatt{index}", last_name="Test", office_id=str(offices[index % 3].id))
+        for index in range(6)
+    ]
+    db.add_all(employees)
+    await db.flush()
+    return offices, employees
+
+
+@pytest.mark.asyncio
+async def test_commit_session_applies_records_in_batches(db_session, statements):
+    offices, employees = await _seed(db_session)
+    office_records = [
+        {
+            "match_type": "matched",
+            "local_id": str(office.id),
+            "vitec_id": str(office.vitec_department_id),
+            "fields": [_field("email", f"kontor{index}@proaktiv.no")],
+        }
+        for index, office in enumerate(offices)
+    ] + [
+        {"match_type": "new", "vitec_id": "77", "fields": [_field("name", "Proaktiv Ny"), _field("city", "Bergen")]},
+    ]
+    employee_records = [
+        {
+            "match_type": "matched",
+            "local_id": str(employee.id),
+            "vitec_id": f"E{index}",
+            "fields": [_field("title", "Megler")],
+        }
+        for index, employee in enumerate(employees)
+    ] + [
+        {
+            "match_type": "new",
+            "vitec_id": "NEW",
+            "fields": [_field("first_name", "Nina"), _field("last_name", "Ny")],
+        },
+    ]
+    decisions = {
+        "office": {
+            str(record.get("local_id") or record["vitec_id"]): {f["field_name"]: "accept" for f in record["fields"]}
+            for record in office_records
+        },
+        "employee": {
+            str(record.get("local_id") or record["vitec_id"]): {f["field_name"]: "accept" for f in record["fields"]}
+            for record in employee_records
+        },
+    }
+    session = SyncSession(
+        preview_data={
+            "offices": office_records,
+            "employees": employee_records,
+            "_payloads": {
+                "offices": {"77": {"vitec_department_id": 77, "department_number": "PA0"}},
+                "employees": {f"E{index}": {"vitec_employee_id": f"E{index}"} for index in range(len(employees))}
+                | {"NEW": {"vitec_employee_id": "NEW", "department_id": 77}},
+            },
+        },
+        decisions=decisions,
+        expires_at=datetime.now(UTC) + timedelta(hours=1),
+    )
+    db_session.add(session)
+    await db_session.flush()
+    statements.clear()
+
+    result = await SyncCommitService().commit_session(db_session, session.id)
+
+    assert (result.offices_updated, result.offices_created, result.offices_skipped) == (3, 1, 0)
+    assert (result.employees_updated, result.employees_created, result.employees_skipped) == (6, 1, 0)
+    assert set(result.timings_ms) == {"prefetch", "offices", "employees", "finalize", "total"}
+    # Session load + one prefetch query per table + short codes, no per-record reads
+    assert statements.count("SELECT") == 4
+
+    new_office = (
+        await db_session.execute(
+            select(Office.id, Office.city, Office.short_code).where(Office.vitec_department_id == 77)
+        )
+    ).one()
+    assert (new_office.city, new_office.short_code) == ("Bergen", "PA02")
+    new_employee_office = await db_session.scalar(select(Employee.office_id).where(Employee.vitec_employee_id == "NEW"))
+    assert new_employee_office == new_office.id
+    titles = (await db_session.execute(select(Employee.title).where(Employee.vitec_employee_id.like("E%")))).scalars()
+    assert set(titles) == {"Megler"}
+    assert session.status == "committed"
+
+
+@pytest.mark.asyncio
+async def test_sync_from_hub_batches_matches_and_notifications(db_session, statements):
+    offices, employees = await _seed(db_session)
+    await db_session.commit()
+    departments = [{"departmentId": 0, "marketName": "Proaktiv Stavanger"}] + [
+        {"departmentId": 10 + index, "marketName": f"Proaktiv Ny {index}", "departmentNumber": "PA0"}
+        for index in range(2)
+    ]
+    roster = [
+        {"employeeId": f"E{index}", "name": f"Ansatt{index} Test", "departmentId": index % 3} for index in range(6)
+    ] + [{"employeeId": "NEW", "name": "Nina Ny", "departmentId": 10}]
+    statements.clear()
+
+    with (
+        patch.object(VitecHubService, "get_departments", AsyncMock(return_value=departments)),
+        patch.object(VitecHubService, "get_employees", AsyncMock(return_value=roster)),
+    ):
+        office_summary = await OfficeService.sync_from_hub(db_session, installation_id="test")
+        employee_summary = await EmployeeService.sync_from_hub(db_session, installation_id="test")
+
+    assert (office_summary["created"], office_summary["updated"]) == (2, 1)
+    assert (employee_summary["created"], employee_summary["updated"]) == (1, 6)
+    short_codes = (await db_session.execute(select(Office.short_code).where(Office.vitec_department_id >= 10))).all()
+    assert sorted(code for (code,) in short_codes) == ["PA02", "PA03"]
+    # Every added/updated row gets a notification, written with one INSERT per sync
+    assert await db_session.scalar(select(func.count()).select_from(Notification)) == 10
+    assert statements.count("SELECT") <= 6
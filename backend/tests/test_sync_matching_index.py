@@ -0,0 +1,96 @@
+"""
+Tests for the in-memory matching index used by the Vitec sync preview.
+"""
+
+import uuid
+from difflib import SequenceMatcher
+
+import pytest
+
+import app.models  # noqa: F401  (registers relationship targets)
+from app.models.employee import Employee
+from app.models.office import Office
+from app.services.sync_matching_service import SyncMatchIndex, SyncMatchingService
+
+
+def _office(name: str, *, org: str | None = None, department_id: int | None = None) -> Office:
+    return Office(
+        id=uuid.uuid4(),
+        name=name,
+        short_code=name[:3].upper(),
+        organization_number=org,
+        vitec_department_id=department_id,
+    )
+
+
+def _employee(first: str, last: str, office: Office, *, email: str | None = None, vitec_id: str | None = None):
+    return Employee(
+        id=uuid.uuid4(),
+        first_name=first,
+        last_name=last,
+        office_id=office.id,
+        email=email,
+        vitec_employee_id=vitec_id,
+    )
+
+
+OFFICES = [
+    _office("Proaktiv Stavanger", org="911111111", department_id=1),
+    _office("Proaktiv Sandnes", department_id=2),
+    _office("Proaktiv Bergen Sentrum"),
+    _office("Proaktiv Bergen Vest"),
+]
+EMPLOYEES = [
+    _employee("Kari", "Nordmann", OFFICES[0], email="Kari@Proaktiv.no", vitec_id="KN1"),
+    _employee("Ola", "Hansen", OFFICES[1]),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("department", "expected", "method"),
+    [
+        ({"organisationNumber": "911111111", "departmentId": 99, "name": "X"}, 0, "organization_number"),
+        ({"departmentId": 2, "name": "Noe annet"}, 1, "vitec_department_id"),
+        ({"marketName": "  proaktiv bergen vest "}, 3, "name_exact"),
+        ({"marketName": "Proaktiv Bergen Sentrm"}, 2, "name_fuzzy"),
+        ({"marketName": "Helt ukjent kontor"}, None, None),
+    ],
+)
+async def test_match_office_uses_index(department, expected, method):
+    diff = await SyncMatchingService.match_office(None, department, SyncMatchIndex(OFFICES, EMPLOYEES))
+
+    assert diff.match_method == method
+    assert diff.local_id == (OFFICES[expected].id if expected is not None else None)
+    assert diff.match_type == ("matched" if expected is not None else "new")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("raw", "expected", "method"),
+    [
+        ({"employeeId": "KN1", "name": "Kari Nordmann"}, 0, "vitec_employee_id"),
+        ({"employeeId": "NY", "email": "kari@proaktiv.NO", "name": "K N"}, 0, "email"),
+        ({"name": "Ola Hansen", "departmentId": 2}, 1, "name_office"),
+        ({"name": "Ola Hansen", "departmentId": 1}, None, None),
+    ],
+)
+async def test_match_employee_uses_index(raw, expected, method):
+    diff = await SyncMatchingService.match_employee(None, raw, SyncMatchIndex(OFFICES, EMPLOYEES))
+
+    assert diff.match_method == method
+    assert diff.local_id == (EMPLOYEES[expected].id if expected is not None else None)
+
+
+def test_fuzzy_index_matches_full_scan():
+    offices = [_office(f"Proaktiv {name}") for name in ("Oslo", "Oslo Sør", "Oslo Vest", "Asker", "Bærum", "Lier")]
+    index = SyncMatchIndex(offices, [])
+
+    for query in ("proaktiv oslo sr", "proaktiv osl vest", "proaktiv asker og bærum", "proaktiv lier", "x"):
+        ratios = [SequenceMatcher(None, query, office.name.lower()).ratio() for office in offices]
+        best = max(ratios)
+        office, ratio = index.fuzzy_office(query)
+        if best >= SyncMatchingService.FUZZY_MATCH_THRESHOLD:
+            assert (office, ratio) == (offices[ratios.index(best)], best)
+        else:
+            assert office is None or ratio < SyncMatchingService.FUZZY_MATCH_THRESHOLD
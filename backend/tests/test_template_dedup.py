@@ -0,0 +1,104 @@
+"""
+Tests for MinHash/LSH near-duplicate detection in TemplateDedupService.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.models.template import Template, TemplateSignature
+from app.services import template_dedup_service
+from app.services.template_dedup_service import TemplateDedupService
+from app.utils.template_minhash import (
+    LshIndex,
+    estimated_similarity,
+    jaccard,
+    minhash_signature,
+    template_shingles,
+)
+
+
+def _body(words: range, extra: str = "") -> str:
+    return "<div id='vitecTemplate'><p>" + " ".join(f"ledd{i}" for i in words) + f"</p>{extra}</div>"
+
+
+def test_minhash_estimate_tracks_jaccard_and_lsh_pairs_similar_documents():
+    a = template_shingles(_body(range(400)))
+    b = template_shingles(_body(range(20, 420)))
+    c = template_shingles(_body(range(1000, 1400)))
+    sig_a, sig_b, sig_c = (minhash_signature(s) for s in (a, b, c))
+
+    assert abs(estimated_similarity(sig_a, sig_b) - jaccard(a, b)) < 0.15
+    assert estimated_similarity(sig_a, sig_c) < 0.1
+
+    index = LshIndex()
+    for key, sig in (("a", sig_a), ("b", sig_b), ("c", sig_c)):
+        index.add(key, sig)
+    assert list(index.candidate_pairs()) == [("a", "b")]
+
+
+@pytest.mark.asyncio
+async def test_find_candidates_groups_near_duplicates_across_titles(session_factory, template_factory):
+    async with session_factory() as db:
+        db.add_all(
+            [
+                template_factory("Akseptbrev til kjøper", _body(range(300))),
+                template_factory("Bekreftelse på aksept", _body(range(300), "<p>Gjelder bruktbolig</p>")),
+                template_factory("Oppgjørsoppstilling", _body(range(5000, 5300))),
+                # Same base title; grouped by pass 1 regardless of content.
+                template_factory("Salgsoppgave Bruktbolig", _body(range(9000, 9100))),
+                template_factory("Salgsoppgave Fritid", _body(range(9000, 9090))),
+            ]
+        )
+        await db.commit()
+
+        # Signatures are written with the content; drop one to exercise the backfill.
+        first_id = (await db.execute(select(Template.id).where(Template.title == "Akseptbrev til kjøper"))).scalar()
+        await db.execute(delete(TemplateSignature).where(TemplateSignature.template_id == first_id))
+
+        groups = await TemplateDedupService.find_candidates(db)
+
+        assert sorted((g.base_title, sorted(c.title for c in g.candidates)) for g in groups) == [
+            ("Akseptbrev til kjøper", ["Akseptbrev til kjøper", "Bekreftelse på aksept"]),
+            ("Salgsoppgave", ["Salgsoppgave Bruktbolig", "Salgsoppgave Fritid"]),
+        ]
+        content_group = next(g for g in groups if g.base_title.startswith("Akseptbrev"))
+        assert 0.9 < content_group.candidates[1].similarity_score < 1.0
+        assert await db.scalar(select(TemplateSignature.content_hash).where(TemplateSignature.template_id == first_id))
+
+
+@pytest.mark.asyncio
+async def test_signature_follows_content_writes(session_factory, template_factory):
+    async with session_factory() as db:
+        template = template_factory("Mal", _body(range(50)))
+        db.add(template)
+        await db.commit()
+        before = await db.scalar(select(TemplateSignature.content_hash))
+
+        template.content = _body(range(60))
+        await db.commit()
+        after = await db.scalar(select(TemplateSignature.content_hash))
+
+        template.title = "Ny tittel"
+        await db.commit()
+        assert await db.scalar(select(TemplateSignature.content_hash)) == after
+
+    assert before and after and before != after
+
+
+@pytest.mark.asyncio
+async def test_load_signatures_reads_only_requested_templates_in_batches(session_factory, template_factory):
+    async with session_factory() as db:
+        templates = [template_factory(f"Mal {i}", _body(range(i, i + 40))) for i in range(3)]
+        db.add_all(templates)
+        await db.commit()
+        ids = [str(t.id) for t in templates]
+        await db.execute(delete(TemplateSignature).where(TemplateSignature.template_id == ids[2]))
+        await db.commit()
+
+        with patch.object(template_dedup_service, "SIGNATURE_BACKFILL_BATCH", 1):
+            signatures = await TemplateDedupService._load_signatures(db, [ids[0], ids[2]])
+
+    assert set(signatures) == {ids[0], ids[2]}
+    assert all(signatures.values())
@@ -0,0 +1,155 @@
+"""
+Tests for persisted template fingerprints and the analyzers that read them.
+"""
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.models.merge_field import MergeField
+from app.models.template import Template
+from app.models.template_fingerprint import TemplateFingerprint
+from app.services import template_fingerprint_service
+from app.services.merge_field_service import MergeFieldService
+from app.services.template_analyzer_service import TemplateAnalyzerService
+from app.services.template_comparison_service import TemplateComparisonService
+from app.services.template_dedup_service import TemplateDedupService
+from app.services.template_fingerprint_service import TemplateFingerprintService, compute_fingerprint, content_hash
+
+CONTENT = (
+    "<style>p{margin:0}</style>"
+    "<div id='vitecTemplate'>"
+    "<p>Selger: [[selger.navn]] og [[*kjoper.navn]]</p>"
+    "<div vitec-if=\"Model.eiendom.type == 'Tomt'\"><p>[[eiendom.adresse]]</p></div>"
+    '<table><tr vitec-foreach="selger in Model.selgere"><td>[[selger.navn]]</td></tr></table>'
+    "</div>"
+)
+
+
+def test_compute_fingerprint_matches_pattern_extractors():
+    fingerprint = compute_fingerprint(CONTENT)
+
+    assert fingerprint["content_hash"] == content_hash(CONTENT)
+    assert fingerprint["merge_fields"] == TemplateAnalyzerService.extract_merge_fields(CONTENT)
+    assert fingerprint["conditions"] == TemplateAnalyzerService.extract_conditions(CONTENT)
+    assert fingerprint["loops"] == TemplateAnalyzerService.extract_loops(CONTENT)
+    assert fingerprint["merge_field_tokens"] == ["[[*kjoper.navn]]", "[[eiendom.adresse]]", "[[selger.navn]]"]
+    assert fingerprint["foreach_expressions"] == ["selger in Model.selgere"]
+    assert fingerprint["style_blocks"] == ["p{margin:0}"]
+    assert fingerprint["tag_histogram"]["p"] == 2 and fingerprint["tag_histogram"]["td"] == 1
+    assert [section["path"] for section in fingerprint["sections"]] == ["p[0]", "div[1]", "table[2]"]
+
+
+@pytest.mark.asyncio
+async def test_fingerprint_is_computed_once_per_content_hash(session_factory, monkeypatch, template_factory):
+    calls: list[str] = []
+    original = template_fingerprint_service.compute_fingerprint
+
+    def counting(html):
+        calls.append(html)
+        return original(html)
+
+    monkeypatch.setattr(template_fingerprint_service, "compute_fingerprint", counting)
+
+    async with session_factory() as db:
+        db.add_all([template_factory("Kontrakt Bruktbolig", CONTENT), template_factory("Kontrakt Fritid", CONTENT)])
+        await db.commit()
+
+        scan = await TemplateAnalyzerService.scan_all(db, update_usage_counts=False)
+        assert scan["templates_scanned"] == 2
+        assert sorted(scan["unique_fields"]) == ["eiendom.adresse", "kjoper.navn", "selger.navn"]
+        assert len(calls) == 1
+
+        template = (await db.execute(select(Template).limit(1))).scalar_one()
+        analysis = await TemplateAnalyzerService.analyze(db, template.id)
+        discovery = await MergeFieldService.discover_from_template(db, template)
+        await db.commit()
+
+        assert analysis["loops_found"] == ["selger in Model.selgere"]
+        assert sorted(discovery["merge_fields"]) == sorted(analysis["merge_fields_found"])
+        assert len(calls) == 1
+        assert await db.scalar(select(func.count()).select_from(TemplateFingerprint)) == 1
+
+        template.content = CONTENT.replace("[[eiendom.adresse]]", "[[eiendom.matrikkel]]")
+        await db.commit()
+        analysis = await TemplateAnalyzerService.analyze(db, template.id)
+
+    assert "eiendom.matrikkel" in analysis["merge_fields_found"]
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_outdated_fingerprint_version_is_recomputed(session_factory, monkeypatch):
+    async with session_factory() as db:
+        await TemplateFingerprintService.get_for_content(db, CONTENT)
+        await db.commit()
+
+        monkeypatch.setattr(template_fingerprint_service, "FINGERPRINT_VERSION", 2)
+        fingerprint = await TemplateFingerprintService.get_for_content(db, "<p>[[ny.kode]]</p>")
+        assert fingerprint["fingerprint_version"] == 2
+        await TemplateFingerprintService.get_for_content(db, CONTENT)
+        await db.commit()
+
+        versions = (await db.execute(select(TemplateFingerprint.fingerprint_version))).scalars().all()
+
+    assert versions == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_dedup_and_comparison_use_fingerprints(session_factory, template_factory):
+    updated = CONTENT.replace("[[eiendom.adresse]]", "[[eiendom.matrikkel]]").replace("<style>p{margin:0}</style>", "")
+
+    async with session_factory() as db:
+        first, second = template_factory("Oppgjør Bruktbolig", CONTENT), template_factory("Oppgjør Fritid", updated)
+        db.add_all([first, second])
+        await db.commit()
+
+        analysis = await TemplateDedupService.analyze_group(db, [first.id, second.id])
+        stored_fingerprint = await TemplateFingerprintService.get_for_content(db, first.content)
+
+    assert [section.path for section in analysis.shared_sections] == ["p[0]", "table[2]"]
+    assert [section.path for section in analysis.divergent_sections] == ["div[1]"]
+
+    result = await TemplateComparisonService().compare(CONTENT, updated, stored_fingerprint=stored_fingerprint)
+    described = {(change.category, change.before, change.after) for change in result.changes}
+    assert ("merge_fields", "[[eiendom.adresse]]", None) in described
+    assert ("merge_fields", None, "[[eiendom.matrikkel]]") in described
+    assert any(change.element_path == "<style>" for change in result.changes)
+
+
+@pytest.mark.asyncio
+async def test_library_scan_only_parses_changed_templates_and_sets_usage_in_bulk(session_factory, template_factory):
+    async with session_factory() as db:
+        first = template_factory("Kontrakt Bruktbolig", CONTENT)
+        legacy = template_factory("Kontrakt Tomt", "<p>[[selger.navn]] [[eiendom.gnr]]</p>")
+        db.add_all([first, legacy, template_factory("Kontrakt Fritid", CONTENT)])
+        for path, usage_count in [("selger.navn", 0), ("eiendom.adresse", 9), ("oppdrag.nr", 4)]:
+            db.add(MergeField(path=path, category="Test", label=path, usage_count=usage_count))
+        await db.commit()
+        # Rows written before templates.content_hash existed have no hash yet
+        await db.execute(update(Template).where(Template.id == legacy.id).values(content_hash=None))
+        await db.commit()
+        await db.refresh(legacy)
+        legacy_updated_at = legacy.updated_at
+
+        scan = await TemplateAnalyzerService.scan_all(db)
+        await db.commit()
+        assert (scan["templates_scanned"], scan["templates_parsed"], scan["total_loops"]) == (3, 3, 2)
+        assert sorted(scan["unknown_fields"]) == ["eiendom.gnr", "kjoper.navn"]
+
+        usage = dict((await db.execute(select(MergeField.path, MergeField.usage_count))).all())
+        assert usage == {"selger.navn": 3, "eiendom.adresse": 2, "oppdrag.nr": 0}
+        await db.refresh(legacy)
+        assert legacy.content_hash is not None and legacy.updated_at == legacy_updated_at
+
+        assert (await TemplateAnalyzerService.scan_all(db))["templates_parsed"] == 0
+
+        first.content = "<p>[[oppdrag.nr]]</p>"
+        await db.commit()
+        scan = await TemplateAnalyzerService.scan_all(db)
+        discovery = await MergeFieldService.discover_all(db, create_missing=False)
+        await db.commit()
+        usage = dict((await db.execute(select(MergeField.path, MergeField.usage_count))).all())
+
+    assert scan["templates_parsed"] == 1
+    assert usage == {"selger.navn": 2, "eiendom.adresse": 1, "oppdrag.nr": 1}
+    assert discovery["templates_scanned"] == 3 and sorted(discovery["new_fields"]) == ["eiendom.gnr", "kjoper.navn"]
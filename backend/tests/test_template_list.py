@@ -0,0 +1,194 @@
+"""
+Tests for the lightweight template listing (TemplateService.get_list).
+"""
+
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.exc import InvalidRequestError
+
+from app.models.template import Template
+from app.services.template_count_cache import template_count_cache
+from app.services.template_service import TemplateService
+
+
+@pytest.mark.asyncio
+async def test_list_uses_precomputed_attachment_names_and_never_loads_content(session_factory, template_factory):
+    async with session_factory() as db:
+        db.add(
+            template_factory(
+                "Kontrakt",
+                content="<p>" + "x" * 50_000 + "</p>",
+                metadata_json={"vitec_attachments": [{"name": "Egenerklæring"}, {"name": "Budskjema"}]},
+            )
+        )
+        await db.commit()
+
+    async with session_factory() as db:
+        templates, total = await TemplateService.get_list(db)
+
+        assert total == 1
+        template = templates[0]
+        assert template.attachment_names == ["Budskjema", "Egenerklæring"]
+        # Large columns are not loaded and may not be lazy-loaded from a listing.
+        with pytest.raises(InvalidRequestError):
+            _ = template.content
+        with pytest.raises(InvalidRequestError):
+            _ = template.metadata_json
+
+
+@pytest.mark.asyncio
+async def test_attachment_names_follow_metadata_updates(session_factory, template_factory):
+    async with session_factory() as db:
+        template = template_factory("Oppgjør", metadata_json={"attachments": ["A.pdf"]})
+        db.add(template)
+        await db.commit()
+        template.metadata_json = {"attachments": ["B.pdf", "A.pdf"]}
+        await db.commit()
+
+    async with session_factory() as db:
+        stored = (await db.execute(select(Template.attachment_names))).scalar_one()
+    assert stored == ["A.pdf", "B.pdf"]
+
+
+@pytest.mark.asyncio
+async def test_list_backfills_legacy_rows_without_touching_updated_at(session_factory):
+    updated_at = datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC)
+    async with session_factory() as db:
+        await db.execute(
+            insert(Template.__table__).values(
+                id="11111111-1111-1111-1111-111111111111",
+                title="Legacy",
+                file_name="legacy.html",
+                file_type="html",
+                file_size_bytes=1,
+                azure_blob_url="",
+                created_by="test",
+                updated_by="test",
+                metadata={"vitec_details": {"vedlegg": [{"fileName": "Tegning.pdf"}]}},
+                updated_at=updated_at,
+            )
+        )
+        await db.commit()
+
+    async with session_factory() as db:
+        templates, _ = await TemplateService.get_list(db)
+        await db.commit()
+    assert templates[0].attachment_names == ["Tegning.pdf"]
+
+    async with session_factory() as db:
+        names, stored_updated_at = (await db.execute(select(Template.attachment_names, Template.updated_at))).one()
+    assert names == ["Tegning.pdf"]
+    assert stored_updated_at.replace(tzinfo=UTC) == updated_at
+
+
+@pytest.mark.asyncio
+async def test_facet_filters_paginate_in_the_database(session_factory, template_factory):
+    async with session_factory() as db:
+        for i in range(5):
+            db.add(template_factory(f"Selger {i}", receiver="Selger", phases=["Oppdrag"]))
+        db.add(template_factory("Kjøper primær", receiver="Kjøper", phases=["Oppgjør"]))
+        extra = template_factory("Kjøper ekstra", receiver="Selger", extra_receivers=["Kjoper"], phases=["Oppgjør"])
+        db.add(extra)
+        await db.commit()
+
+        page, total = await TemplateService.get_list(
+            db, receiver="Kjøper", per_page=1, sort_by="title", sort_order="asc"
+        )
+        assert total == 2
+        assert [t.title for t in page] == ["Kjøper ekstra"]
+
+        page, total = await TemplateService.get_list(db, receiver="Selger", phase="Oppdrag", page=2, per_page=4)
+        assert total == 5 and len(page) == 1
+
+        extra.extra_receivers = []
+        extra.phases = ["Oppdrag"]
+        await db.commit()
+        _, total = await TemplateService.get_list(db, receiver="Kjøper")
+        assert total == 1
+        _, total = await TemplateService.get_list(db, phase="Oppdrag")
+        assert total == 6
+
+
+@pytest.mark.asyncio
+async def test_rebuild_facets_covers_rows_written_without_listeners(session_factory):
+    async with session_factory() as db:
+        await db.execute(
+            insert(Template.__table__).values(
+                id="22222222-2222-2222-2222-222222222222",
+                title="Rå import",
+                file_name="raw.html",
+                file_type="html",
+                file_size_bytes=1,
+                azure_blob_url="",
+                created_by="test",
+                updated_by="test",
+                departments=["1120", "1121"],
+            )
+        )
+        _, total = await TemplateService.get_list(db, department="1121")
+        assert total == 0
+
+        assert await TemplateService.rebuild_facets(db) == 2
+        _, total = await TemplateService.get_list(db, department="1121")
+        assert total == 1
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_every_row_once(session_factory, template_factory):
+    updated_at = datetime(2025, 3, 1, tzinfo=UTC)
+    async with session_factory() as db:
+        # Identical sort values force the id tiebreaker.
+        for i in range(7):
+            db.add(template_factory(f"T{i}", updated_at=updated_at if i < 4 else datetime(2025, 3, i, tzinfo=UTC)))
+        await db.commit()
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await TemplateService.get_list_keyset(db, cursor=cursor, per_page=3)
+            seen.extend(t.title for t in page)
+            if cursor is None:
+                break
+        assert sorted(seen) == [f"T{i}" for i in range(7)]
+        assert seen[:3] == ["T6", "T5", "T4"]
+
+        _, title_cursor = await TemplateService.get_list_keyset(db, per_page=2, sort_by="title", sort_order="asc")
+        with pytest.raises(ValueError):
+            await TemplateService.get_list_keyset(db, cursor=title_cursor)
+
+
+@pytest.mark.asyncio
+async def test_counts_are_cached_until_a_template_write_commits(session_factory, template_factory):
+    async with session_factory() as db:
+        db.add_all([template_factory("A", status="draft"), template_factory("B", status="published")])
+        await db.commit()
+
+        counts = await TemplateService.get_counts(db)
+        assert counts["total"] == 2 and counts["by_status"] == {"draft": 1, "published": 1}
+        hits = template_count_cache.hits
+        _, total = await TemplateService.get_list(db)
+        assert total == 2 and template_count_cache.hits == hits + 1
+
+        # Writes outside the ORM are not seen until the entry expires or a template write commits.
+        await db.execute(insert(Template.__table__).values(**_raw_row("33333333-3333-3333-3333-333333333333")))
+        assert (await TemplateService.get_counts(db))["total"] == 2
+
+        db.add(template_factory("C", status="draft"))
+        await db.commit()
+        counts = await TemplateService.get_counts(db)
+        assert counts["total"] == 4 and counts["by_status"]["draft"] == 3
+
+
+def _raw_row(template_id: str) -> dict:
+    return {
+        "id": template_id,
+        "title": "Raw",
+        "file_name": "raw.html",
+        "file_type": "html",
+        "file_size_bytes": 1,
+        "azure_blob_url": "",
+        "created_by": "test",
+        "updated_by": "test",
+        "status": "draft",
+    }
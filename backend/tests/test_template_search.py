@@ -0,0 +1,73 @@
+"""
+Tests for template full-text search (SQLite FTS5 backend).
+"""
+
+import pytest
+
+from app.services.template_content_service import TemplateContentService
+from app.services.template_search_service import TemplateSearchService
+from app.services.template_service import TemplateService
+from app.utils.template_search_text import html_to_search_text
+
+
+def test_html_to_search_text_keeps_visible_text_only():
+    html = "<style>p{color:red}</style><p>Kjøper &amp; selger</p><!-- x --><p>[[kjoper.navn]]&nbsp;signerer</p>"
+    assert html_to_search_text(html) == "Kjøper & selger [[kjoper.navn]] signerer"
+    assert html_to_search_text("<p> </p>") is None
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_title_over_body_and_highlights(session_factory, template_factory):
+    async with session_factory() as db:
+        db.add_all(
+            [
+                template_factory("Akseptbrev", content="<p>Vi bekrefter at budet er akseptert av selger.</p>"),
+                template_factory("Budskjema", description="Skjema for bud", content="<p>Fyll inn <b>bud</b> her</p>"),
+                template_factory("Kontrakt", content="<p>Ingen treff her</p>"),
+            ]
+        )
+        await db.commit()
+
+    async with session_factory() as db:
+        result = await TemplateSearchService.search(db, "bud")
+
+    hits = result["hits"]
+    assert [hit["title"] for hit in hits] == ["Budskjema", "Akseptbrev"]
+    assert all(hit["match"] == "fulltext" for hit in hits)
+    assert hits[0]["rank"] > hits[1]["rank"]
+    assert "<mark>budet</mark>" in hits[1]["snippet"]
+
+
+@pytest.mark.asyncio
+async def test_save_content_reindexes_body_and_list_search_uses_index(session_factory, template_factory):
+    async with session_factory() as db:
+        template = template_factory("Oppgjørsoppstilling", content="<p>Gammel tekst</p>")
+        db.add(template)
+        await db.commit()
+        assert (await TemplateSearchService.search(db, "gammel"))["hits"]
+
+        await TemplateContentService.save_content(
+            db, template.id, content="<p>Ny tekst om <i>sluttoppgjør</i> &amp; renter</p>", updated_by="test"
+        )
+        await db.commit()
+
+        assert not (await TemplateSearchService.search(db, "gammel"))["hits"]
+        hits = (await TemplateSearchService.search(db, "sluttoppgjør renter"))["hits"]
+        assert [hit["title"] for hit in hits] == ["Oppgjørsoppstilling"]
+        assert "&amp;" in hits[0]["snippet"]
+
+        templates, total = await TemplateService.get_list(db, search="sluttoppg")
+        assert total == 1 and templates[0].title == "Oppgjørsoppstilling"
+        _, total = await TemplateService.get_list(db, search="gammel")
+        assert total == 0
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_substring_match(session_factory, template_factory):
+    async with session_factory() as db:
+        db.add(template_factory("Salgsoppgave", content="<p>Oppgave</p>"))
+        await db.commit()
+
+        result = await TemplateSearchService.search(db, "soppg")
+
+    assert [(hit["title"], hit["match"]) for hit in result["hits"]] == [("Salgsoppgave", "fuzzy")]
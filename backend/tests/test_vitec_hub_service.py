@@ -0,0 +1,120 @@
+"""
+Tests for VitecHubService transport behavior.
+
+Covers:
+- Pooled client reuse across service instances (and closing after an event loop change)
+- Retry on 429 Retry-After and transient 5xx
+- Token-bucket burst and pacing
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.services import vitec_hub_service
+from app.services.vitec_hub_service import TokenBucket, VitecHubService
+
+
+@pytest.fixture
+def mock_transport_client():
+    """Install a pooled client backed by a scripted MockTransport."""
+    responses: list[httpx.Response] = []
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses.pop(0)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with (
+        patch.object(vitec_hub_service, "get_vitec_http_client", return_value=client),
+        patch.object(vitec_hub_service.asyncio, "sleep") as mock_sleep,
+    ):
+        yield responses, requests, mock_sleep
+
+
+def _service() -> VitecHubService:
+    return VitecHubService(base_url="https://hub.test", product_login="login", access_key="key")
+
+
+@pytest.mark.asyncio
+async def test_retries_after_429_honoring_retry_after(mock_transport_client):
+    responses, requests, mock_sleep = mock_transport_client
+    responses.extend(
+        [
+            httpx.Response(429, headers={"Retry-After": "2"}),
+            httpx.Response(200, json=[{"departmentId": 1}]),
+        ]
+    )
+
+    data = await _service().get_departments("INST")
+
+    assert data == [{"departmentId": 1}]
+    assert len(requests) == 2
+    mock_sleep.assert_any_call(2.0)
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_5xx_then_gives_up(mock_transport_client):
+    responses, requests, _ = mock_transport_client
+    responses.extend([httpx.Response(503, text="busy") for _ in range(4)])
+
+    with patch.object(vitec_hub_service.settings, "VITEC_MAX_RETRIES", 3):
+        with pytest.raises(HTTPException) as exc_info:
+            await _service().get_employees("INST")
+
+    assert exc_info.value.status_code == 502
+    assert len(requests) == 4
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors(mock_transport_client):
+    responses, requests, _ = mock_transport_client
+    responses.append(httpx.Response(403))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await _service().get_employees("INST")
+
+    assert exc_info.value.status_code == 403
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_is_shared_and_closed():
+    first = vitec_hub_service.get_vitec_http_client()
+    second = vitec_hub_service.get_vitec_http_client()
+    assert first is second
+
+    await vitec_hub_service.close_vitec_http_client()
+    assert first.is_closed
+    assert vitec_hub_service.get_vitec_http_client() is not first
+    await vitec_hub_service.close_vitec_http_client()
+
+
+@pytest.mark.asyncio
+async def test_client_from_a_previous_event_loop_is_closed_when_replaced():
+    client = vitec_hub_service.get_vitec_http_client()
+    previous_loop = asyncio.new_event_loop()
+    vitec_hub_service._vitec_http_client_loop = previous_loop
+    try:
+        replacement = vitec_hub_service.get_vitec_http_client()
+        await vitec_hub_service.close_vitec_http_client()
+    finally:
+        previous_loop.close()
+
+    assert replacement is not client
+    assert client.is_closed and replacement.is_closed
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=10, capacity=3)
+
+    waits = [bucket._reserve() for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    # Tokens go into debt so each queued caller gets its own slot instead of waiting on a lock
+    assert waits[3] == pytest.approx(0.1, abs=0.01)
+    assert waits[4] == pytest.approx(0.2, abs=0.01)